@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Cache HTTP en Disco con GET Condicional
+Guarda cada respuesta con su ETag/Last-Modified y revalida con If-None-Match/If-Modified-Since
+
+Política por entrada:
+  - más nueva que el TTL: se usa sin consultar al servidor
+  - más vieja que el TTL: se revalida; un 304 renueva la entrada sin bajar el cuerpo
+  - más vieja que la edad máxima: se descarta y se descarga completa
+
+Cada URL es un JSON (nombre = sha256 de la URL) escrito de forma atómica. El
+directorio por defecto es datos/cache_http; se cambia con SCRAPERS_CACHE_HTTP.
+
+Autor: Sistema RAG MVP
+Fecha: 2025-08-17
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+DIRECTORIO_CACHE = Path(__file__).parent.parent / "datos" / "cache_http"
+TTL_SEGUNDOS = 15 * 60
+EDAD_MAXIMA_SEGUNDOS = 7 * 24 * 60 * 60
+
+
+def huella(texto: str) -> str:
+    """sha256 del cuerpo, para detectar descargas completas sin cambios"""
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+
+class CacheHTTP:
+    """Respuestas HTTP por URL en disco, con validadores para revalidar"""
+
+    def __init__(
+        self,
+        directorio: Optional[str] = None,
+        ttl: float = TTL_SEGUNDOS,
+        edad_maxima: float = EDAD_MAXIMA_SEGUNDOS,
+    ):
+        self.directorio = Path(directorio or os.environ.get("SCRAPERS_CACHE_HTTP") or DIRECTORIO_CACHE)
+        self.ttl = ttl
+        self.edad_maxima = edad_maxima
+
+    def _ruta(self, url: str) -> Path:
+        return self.directorio / f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.json"
+
+    def _escribir(self, entrada: Dict[str, Any]):
+        """Escritura atómica: archivo temporal en el mismo directorio y reemplazo"""
+        self.directorio.mkdir(parents=True, exist_ok=True)
+        descriptor, temporal = tempfile.mkstemp(dir=self.directorio, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "w", encoding="utf-8") as f:
+                json.dump(entrada, f, ensure_ascii=False)
+            os.replace(temporal, self._ruta(entrada["url"]))
+        except BaseException:
+            os.unlink(temporal)
+            raise
+
+    def leer(self, url: str) -> Optional[Dict[str, Any]]:
+        """Entrada guardada de la URL, o None si no existe, está dañada o superó la edad máxima"""
+        ruta = self._ruta(url)
+        try:
+            with open(ruta, "r", encoding="utf-8") as f:
+                entrada = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - entrada.get("guardado", 0) > self.edad_maxima:
+            ruta.unlink(missing_ok=True)
+            return None
+        return entrada
+
+    def vigente(self, entrada: Dict[str, Any]) -> bool:
+        """Si la entrada puede usarse sin consultar al servidor"""
+        return time.time() - entrada["guardado"] < self.ttl
+
+    @staticmethod
+    def encabezados_condicionales(entrada: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since a partir de los validadores guardados"""
+        if entrada is None:
+            return {}
+        encabezados = {}
+        if entrada.get("etag"):
+            encabezados["If-None-Match"] = entrada["etag"]
+        if entrada.get("last_modified"):
+            encabezados["If-Modified-Since"] = entrada["last_modified"]
+        return encabezados
+
+    @staticmethod
+    def _validadores(encabezados: Dict[str, str]) -> Dict[str, Optional[str]]:
+        minusculas = {clave.lower(): valor for clave, valor in encabezados.items()}
+        return {"etag": minusculas.get("etag"), "last_modified": minusculas.get("last-modified")}
+
+    def guardar(self, url: str, respuesta: Dict[str, Any]) -> Dict[str, Any]:
+        """Guarda una respuesta completa con sus validadores"""
+        entrada = {
+            "url": url,
+            "guardado": time.time(),
+            "estado": respuesta["estado"],
+            "encabezados": respuesta["encabezados"],
+            "texto": respuesta["texto"],
+            "sha256": huella(respuesta["texto"]),
+            **self._validadores(respuesta["encabezados"]),
+        }
+        self._escribir(entrada)
+        return entrada
+
+    def renovar(self, entrada: Dict[str, Any], encabezados: Dict[str, str]) -> Dict[str, Any]:
+        """Tras un 304: reinicia el TTL y actualiza los validadores que haya enviado el servidor"""
+        nuevos = {clave: valor for clave, valor in self._validadores(encabezados).items() if valor}
+        entrada = {**entrada, **nuevos, "guardado": time.time()}
+        self._escribir(entrada)
+        return entrada
+
+    @staticmethod
+    def respuesta(entrada: Dict[str, Any], origen: str) -> Dict[str, Any]:
+        """Entrada guardada con la forma de una respuesta de ClienteHTTP"""
+        return {
+            "url": entrada["url"],
+            "estado": entrada["estado"],
+            "texto": entrada["texto"],
+            "encabezados": entrada["encabezados"],
+            "origen": origen,
+        }
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Cliente HTTP Asíncrono Compartido por los Scrapers
+Pools de conexiones por host, keep-alive, timeouts y límites de concurrencia
+
+Todos los scrapers descargan a través de un ClienteHTTP: dentro de un mismo
+cliente las conexiones a cada host se reutilizan (keep-alive) y un semáforo
+global más uno por host acotan cuántas descargas hay en curso. Los fallos de
+red y las respuestas 5xx se reintentan con espera exponencial.
+
+Con aiohttp instalado se usa una ClientSession con TCPConnector; sin aiohttp
+cada host tiene su requests.Session con un pool propio y las descargas corren
+en hilos, con los mismos límites.
+
+Con una CacheHTTP las respuestas se guardan en disco y se revalidan con GET
+condicional (ver cache_http.py). Las llamadas bloqueantes de los scrapers
+usan la cache por defecto; SCRAPERS_SIN_CACHE=1 la saltea.
+
+Autor: Sistema RAG MVP
+Fecha: 2025-08-16
+"""
+
+import asyncio
+import logging
+import os
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, TypeVar
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from cache_http import CacheHTTP, huella
+
+try:
+    import aiohttp
+except ImportError:  # aiohttp es opcional: sin él se usa requests en hilos
+    aiohttp = None
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+
+TIMEOUT_SEGUNDOS = 30
+CONEXIONES_POR_HOST = 4
+CONEXIONES_TOTALES = 16
+REINTENTOS = 2
+ESPERA_REINTENTO_SEGUNDOS = 1.0
+KEEPALIVE_SEGUNDOS = 30
+
+T = TypeVar("T")
+
+
+class ErrorHTTP(Exception):
+    """Fallo de red o respuesta con estado de error"""
+
+    def __init__(self, url: str, mensaje: str, estado: Optional[int] = None):
+        super().__init__(f"{url}: {mensaje}")
+        self.url = url
+        self.estado = estado
+
+
+class ClienteHTTP:
+    """Cliente asíncrono con conexiones reutilizables y descargas concurrentes acotadas"""
+
+    def __init__(
+        self,
+        timeout: float = TIMEOUT_SEGUNDOS,
+        conexiones_por_host: int = CONEXIONES_POR_HOST,
+        conexiones_totales: int = CONEXIONES_TOTALES,
+        reintentos: int = REINTENTOS,
+        espera_reintento: float = ESPERA_REINTENTO_SEGUNDOS,
+        encabezados: Optional[Dict[str, str]] = None,
+        usar_aiohttp: Optional[bool] = None,
+        cache: Optional[CacheHTTP] = None,
+        ignorar_cache: bool = False,
+    ):
+        self.timeout = timeout
+        self.conexiones_por_host = conexiones_por_host
+        self.conexiones_totales = conexiones_totales
+        self.reintentos = reintentos
+        self.espera_reintento = espera_reintento
+        self.encabezados = {"User-Agent": USER_AGENT, **(encabezados or {})}
+        self.usar_aiohttp = aiohttp is not None if usar_aiohttp is None else usar_aiohttp and aiohttp is not None
+        self.cache = cache
+        # Saltea la lectura de la cache (las respuestas nuevas igual se guardan)
+        self.ignorar_cache = ignorar_cache
+        self.urls_sin_cambios: Set[str] = set()
+
+        self._sesion_aiohttp = None
+        self._sesiones: Dict[str, requests.Session] = {}
+        self._semaforo: Optional[asyncio.Semaphore] = None
+        self._semaforos_host: Dict[str, asyncio.Semaphore] = {}
+
+        self.stats = {"solicitudes": 0, "reintentos": 0, "errores": 0, "bytes": 0, "desde_cache": 0, "revalidadas": 0}
+
+    async def __aenter__(self) -> "ClienteHTTP":
+        await self.abrir()
+        return self
+
+    async def __aexit__(self, *excepcion):
+        await self.cerrar()
+
+    async def abrir(self):
+        """Crea el semáforo global y, con aiohttp, la sesión con su pool de conexiones"""
+        self._semaforo = asyncio.Semaphore(self.conexiones_totales)
+        self._semaforos_host = {}
+        if self.usar_aiohttp and self._sesion_aiohttp is None:
+            conector = aiohttp.TCPConnector(
+                limit=self.conexiones_totales,
+                limit_per_host=self.conexiones_por_host,
+                keepalive_timeout=KEEPALIVE_SEGUNDOS,
+            )
+            self._sesion_aiohttp = aiohttp.ClientSession(
+                connector=conector,
+                headers=self.encabezados,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+
+    async def cerrar(self):
+        """Cierra las conexiones abiertas"""
+        if self._sesion_aiohttp is not None:
+            await self._sesion_aiohttp.close()
+            self._sesion_aiohttp = None
+        for sesion in self._sesiones.values():
+            sesion.close()
+        self._sesiones = {}
+
+    def _sesion_host(self, host: str) -> requests.Session:
+        """requests.Session del host, con un pool del tamaño del límite por host"""
+        if host not in self._sesiones:
+            sesion = requests.Session()
+            sesion.headers.update(self.encabezados)
+            adaptador = HTTPAdapter(pool_connections=1, pool_maxsize=self.conexiones_por_host)
+            sesion.mount("http://", adaptador)
+            sesion.mount("https://", adaptador)
+            self._sesiones[host] = sesion
+        return self._sesiones[host]
+
+    async def _descargar_aiohttp(self, url: str, encabezados: Dict[str, str]) -> Dict[str, Any]:
+        try:
+            async with self._sesion_aiohttp.get(url, headers=encabezados) as respuesta:
+                texto = await respuesta.text()
+                if respuesta.status >= 400:
+                    raise ErrorHTTP(url, f"estado {respuesta.status}", respuesta.status)
+                return {"url": str(respuesta.url), "estado": respuesta.status, "texto": texto,
+                        "encabezados": dict(respuesta.headers)}
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise ErrorHTTP(url, str(e) or type(e).__name__) from e
+
+    async def _descargar_requests(self, url: str, encabezados: Dict[str, str]) -> Dict[str, Any]:
+        sesion = self._sesion_host(urlparse(url).netloc)
+        try:
+            respuesta = await asyncio.to_thread(sesion.get, url, headers=encabezados, timeout=self.timeout)
+            respuesta.raise_for_status()
+        except requests.HTTPError as e:
+            estado = e.response.status_code if e.response is not None else None
+            raise ErrorHTTP(url, str(e), estado) from e
+        except requests.RequestException as e:
+            raise ErrorHTTP(url, str(e)) from e
+        return {"url": url, "estado": respuesta.status_code, "texto": respuesta.text,
+                "encabezados": dict(respuesta.headers)}
+
+    async def _obtener_red(self, url: str, encabezados: Dict[str, str]) -> Dict[str, Any]:
+        """GET con reintentos ante fallos de red y estados 5xx"""
+        if self._semaforo is None:
+            await self.abrir()
+        host = urlparse(url).netloc
+        semaforo_host = self._semaforos_host.setdefault(host, asyncio.Semaphore(self.conexiones_por_host))
+        descargar = self._descargar_aiohttp if self.usar_aiohttp else self._descargar_requests
+
+        for intento in range(self.reintentos + 1):
+            async with self._semaforo, semaforo_host:
+                self.stats["solicitudes"] += 1
+                try:
+                    respuesta = await descargar(url, encabezados)
+                    self.stats["bytes"] += len(respuesta["texto"])
+                    return respuesta
+                except ErrorHTTP as e:
+                    reintentable = e.estado is None or e.estado >= 500
+                    if not reintentable or intento == self.reintentos:
+                        self.stats["errores"] += 1
+                        raise
+                    logger.warning(f"Reintentando {url} ({intento + 1}/{self.reintentos}): {e}")
+                    self.stats["reintentos"] += 1
+            # La espera se hace fuera de los semáforos para no bloquear otras descargas
+            await asyncio.sleep(self.espera_reintento * 2 ** intento)
+
+    def _registrar(self, url: str, respuesta: Dict[str, Any], sin_cambios: bool) -> Dict[str, Any]:
+        if sin_cambios:
+            self.urls_sin_cambios.add(url)
+        else:
+            self.urls_sin_cambios.discard(url)
+        return respuesta
+
+    async def obtener(
+        self, url: str, encabezados: Optional[Dict[str, str]] = None, ignorar_cache: Optional[bool] = None
+    ) -> Dict[str, Any]:
+        """
+        GET a través de la cache (si hay una) con reintentos ante fallos de red y estados 5xx
+
+        Returns:
+            Diccionario con url, estado, texto, encabezados y origen de la respuesta
+            ('red', 'cache' sin consultar al servidor o 'revalidada' tras un 304)
+
+        Raises:
+            ErrorHTTP: si la respuesta es 4xx o se agotan los reintentos
+        """
+        encabezados = dict(encabezados or {})
+        ignorar_cache = self.ignorar_cache if ignorar_cache is None else ignorar_cache
+        entrada = None
+        if self.cache is not None and not ignorar_cache:
+            entrada = self.cache.leer(url)
+            if entrada is not None and self.cache.vigente(entrada):
+                self.stats["desde_cache"] += 1
+                return self._registrar(url, self.cache.respuesta(entrada, "cache"), True)
+            encabezados = {**self.cache.encabezados_condicionales(entrada), **encabezados}
+
+        respuesta = await self._obtener_red(url, encabezados)
+        if respuesta["estado"] == 304:
+            if entrada is None:
+                raise ErrorHTTP(url, "304 sin copia en la cache", 304)
+            self.stats["revalidadas"] += 1
+            entrada = self.cache.renovar(entrada, respuesta["encabezados"])
+            return self._registrar(url, self.cache.respuesta(entrada, "revalidada"), True)
+
+        respuesta["origen"] = "red"
+        if self.cache is None:
+            return self._registrar(url, respuesta, False)
+        # Una descarga completa idéntica a la guardada también cuenta como sin cambios
+        anterior = entrada if entrada is not None else self.cache.leer(url)
+        sin_cambios = anterior is not None and anterior["sha256"] == huella(respuesta["texto"])
+        self.cache.guardar(url, respuesta)
+        return self._registrar(url, respuesta, sin_cambios)
+
+    def sin_cambios(self, url: str) -> bool:
+        """Si la última respuesta de la URL coincide con la guardada (cache vigente, 304 o cuerpo idéntico)"""
+        return url in self.urls_sin_cambios
+
+    async def obtener_texto(self, url: str) -> str:
+        """Cuerpo de la respuesta como texto"""
+        return (await self.obtener(url))["texto"]
+
+
+def ejecutar_con_cliente(funcion: Callable[[ClienteHTTP], Awaitable[T]], **opciones) -> T:
+    """Ejecuta de forma bloqueante una corrutina que recibe un cliente nuevo (con la cache en disco) y lo cierra al terminar"""
+
+    opciones.setdefault("cache", CacheHTTP())
+    opciones.setdefault("ignorar_cache", os.environ.get("SCRAPERS_SIN_CACHE") == "1")
+
+    async def _ejecutar() -> T:
+        async with ClienteHTTP(**opciones) as cliente:
+            return await funcion(cliente)
+
+    return asyncio.run(_ejecutar())
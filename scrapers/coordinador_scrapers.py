@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Coordinador de Scrapers
+Ejecuta los scrapers de todos los departamentos en paralelo con un cliente HTTP compartido
+
+Cada scraper descarga con el mismo ClienteHTTP (pools por host, límites de
+concurrencia) y parsea en un hilo propio: una actualización completa tarda lo
+que el sitio más lento y no la suma de todos.
+
+Las respuestas pasan por la cache HTTP en disco: con --solo-cambios los
+scrapers cuya página no cambió (304 o cache vigente) no vuelven a parsear.
+
+Uso:
+    python coordinador_scrapers.py
+    python coordinador_scrapers.py dc dm --conexiones-por-host 2 --timeout 20
+    python coordinador_scrapers.py --solo-cambios --ttl 0
+    python coordinador_scrapers.py --sin-cache
+
+Autor: Sistema RAG MVP
+Fecha: 2025-08-16
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from cache_http import TTL_SEGUNDOS, CacheHTTP
+from cliente_http import CONEXIONES_POR_HOST, TIMEOUT_SEGUNDOS, ClienteHTTP
+from scraper_horarios_dc import ScraperHorariosDC
+from scraper_horarios_instituto_calculo import ScraperHorariosIC
+from scraper_horarios_matematica import ScraperHorariosMat
+from scraper_materias_obligatorias import ScraperMateriasObligatorias
+
+logger = logging.getLogger(__name__)
+
+SCRAPERS = {
+    "obligatorias": ScraperMateriasObligatorias,
+    "dc": ScraperHorariosDC,
+    "dm": ScraperHorariosMat,
+    "ic": ScraperHorariosIC,
+}
+
+
+async def _ejecutar_scraper(
+    nombre: str, scraper: Any, cliente: ClienteHTTP, omitir_sin_cambios: bool
+) -> Dict[str, Any]:
+    """Resultado de un scraper como diccionario con su duración; los errores no frenan a los demás"""
+    inicio = time.perf_counter()
+    try:
+        resultado = await scraper.ejecutar_scraping_completo_async(cliente, omitir_sin_cambios=omitir_sin_cambios)
+    except Exception as e:
+        logger.error(f"Error en scraper {nombre}: {e}")
+        resultado = {"exito": False, "error": str(e)}
+    if isinstance(resultado, bool):
+        resultado = {"exito": resultado}
+    resultado["duracion"] = time.perf_counter() - inicio
+    return resultado
+
+
+async def ejecutar_scrapers(
+    nombres: Optional[List[str]] = None,
+    scrapers: Optional[Dict[str, Any]] = None,
+    omitir_sin_cambios: bool = False,
+    **opciones_cliente,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Ejecuta los scrapers en paralelo sobre un mismo cliente HTTP
+
+    Args:
+        nombres: Claves de SCRAPERS a ejecutar (todas si es None)
+        scrapers: Instancias ya creadas por nombre (reemplaza a `nombres`)
+        omitir_sin_cambios: No parsear las páginas que no cambiaron desde la última descarga
+        **opciones_cliente: Parámetros de ClienteHTTP (timeout, conexiones_por_host, cache, ...)
+
+    Returns:
+        Resultado de cada scraper por nombre, con la duración en segundos
+    """
+    if scrapers is None:
+        scrapers = {nombre: SCRAPERS[nombre]() for nombre in (nombres or SCRAPERS)}
+
+    async with ClienteHTTP(**opciones_cliente) as cliente:
+        resultados = await asyncio.gather(
+            *(_ejecutar_scraper(nombre, scraper, cliente, omitir_sin_cambios) for nombre, scraper in scrapers.items())
+        )
+        logger.info(f"Cliente HTTP: {cliente.stats}")
+    return dict(zip(scrapers, resultados))
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Ejecuta los scrapers de horarios en paralelo")
+    parser.add_argument("scrapers", nargs="*", help=f"Scrapers a ejecutar: {', '.join(SCRAPERS)} (todos por defecto)")
+    parser.add_argument("--conexiones-por-host", type=int, default=CONEXIONES_POR_HOST)
+    parser.add_argument("--timeout", type=float, default=TIMEOUT_SEGUNDOS, help="Timeout por solicitud en segundos")
+    parser.add_argument("--cache", help="Directorio de la cache HTTP (por defecto datos/cache_http)")
+    parser.add_argument("--ttl", type=float, default=TTL_SEGUNDOS,
+                        help="Segundos durante los que una respuesta guardada se usa sin revalidar")
+    parser.add_argument("--sin-cache", action="store_true", help="Descargar todo de nuevo sin leer la cache")
+    parser.add_argument("--solo-cambios", action="store_true", help="No parsear las páginas que no cambiaron")
+    args = parser.parse_args()
+    desconocidos = [nombre for nombre in args.scrapers if nombre not in SCRAPERS]
+    if desconocidos:
+        parser.error(f"scrapers desconocidos: {', '.join(desconocidos)}")
+
+    print("COORDINADOR DE SCRAPERS")
+    print("=" * 55)
+
+    inicio = time.perf_counter()
+    resultados = asyncio.run(
+        ejecutar_scrapers(
+            args.scrapers or None,
+            omitir_sin_cambios=args.solo_cambios,
+            conexiones_por_host=args.conexiones_por_host,
+            timeout=args.timeout,
+            cache=CacheHTTP(args.cache, ttl=args.ttl),
+            ignorar_cache=args.sin_cache,
+        )
+    )
+    total = time.perf_counter() - inicio
+
+    for nombre, resultado in resultados.items():
+        estado = "OK" if resultado["exito"] else f"ERROR: {resultado.get('error', 'ver logs')}"
+        if resultado.get("sin_cambios"):
+            estado = "sin cambios"
+        archivo = f" -> {resultado['archivo_generado']}" if resultado.get("archivo_generado") else ""
+        print(f"   - {nombre}: {estado} ({resultado['duracion']:.1f}s){archivo}")
+
+    suma = sum(resultado["duracion"] for resultado in resultados.values())
+    print(f"\nTiempo total: {total:.1f}s (secuencial hubiera sido ~{suma:.1f}s)")
+    return 0 if all(resultado["exito"] for resultado in resultados.values()) else 1
+
+
+if __name__ == "__main__":
+    exit(main())
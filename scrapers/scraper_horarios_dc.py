@@ -7,7 +7,7 @@ Autor: Sistema RAG MVP
 Fecha: 2025-07-26
 """
 
-import requests
+import asyncio
 import json
 import re
 from datetime import datetime
@@ -16,6 +16,8 @@ import logging
 from typing import Dict, List, Optional, Tuple
 from urllib.parse import urljoin, urlparse
 
+from cliente_http import ClienteHTTP, ErrorHTTP, ejecutar_con_cliente
+
 # Configuración de logging
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -28,12 +30,8 @@ class ScraperHorariosDC:
 
     def __init__(self):
         self.base_url = "https://www.dc.uba.ar/"
-        self.session = requests.Session()
-        self.session.headers.update(
-            {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-            }
-        )
+        # URL específica que sabemos que tiene los horarios
+        self.url_horarios_2c_2025 = "https://www.dc.uba.ar/ya-se-encuentran-publicadas-las-materias-del-primer-cuatrimestre-de-2025/"
 
         # Patrones regex para parsing de horarios
         self.patrones_horarios = {
@@ -91,40 +89,39 @@ class ScraperHorariosDC:
             "errores": [],
         }
 
-    def obtener_horarios_2c_2025(self) -> Optional[str]:
-        """Obtiene el HTML de horarios del 2do cuatrimestre 2025"""
-        # URL específica que sabemos que tiene los horarios
-        url_horarios = "https://www.dc.uba.ar/ya-se-encuentran-publicadas-las-materias-del-primer-cuatrimestre-de-2025/"
-
+    async def descargar_horarios_2c_2025(self, cliente: ClienteHTTP) -> Optional[str]:
+        """Descarga y verifica el HTML de horarios del 2do cuatrimestre 2025"""
         try:
-            logger.info(f"Obteniendo horarios de: {url_horarios}")
-            response = self.session.get(url_horarios, timeout=30)
-            response.raise_for_status()
-
-            # Verificar que la página contenga información de horarios
-            indicadores_tabla = [
-                "días y horarios",
-                "MATERIA",
-                "PERÍODO",
-                "TIPO",
-                "Profesores",
-            ]
-
-            texto_minuscula = response.text.lower()
-            encontrado = any(
-                indicador.lower() in texto_minuscula for indicador in indicadores_tabla
-            )
-            if not encontrado:
-                logger.error("La página no contiene la tabla de horarios esperada")
-                return None
+            logger.info(f"Obteniendo horarios de: {self.url_horarios_2c_2025}")
+            html = await cliente.obtener_texto(self.url_horarios_2c_2025)
+        except ErrorHTTP as e:
+            logger.error(f"Error al obtener HTML: {e}")
+            return None
 
-            logger.info(f"HTML obtenido exitosamente ({len(response.text)} caracteres)")
-            return response.text
+        # Verificar que la página contenga información de horarios
+        indicadores_tabla = [
+            "días y horarios",
+            "MATERIA",
+            "PERÍODO",
+            "TIPO",
+            "Profesores",
+        ]
 
-        except requests.RequestException as e:
-            logger.error(f"Error al obtener HTML: {e}")
+        texto_minuscula = html.lower()
+        encontrado = any(
+            indicador.lower() in texto_minuscula for indicador in indicadores_tabla
+        )
+        if not encontrado:
+            logger.error("La página no contiene la tabla de horarios esperada")
             return None
 
+        logger.info(f"HTML obtenido exitosamente ({len(html)} caracteres)")
+        return html
+
+    def obtener_horarios_2c_2025(self) -> Optional[str]:
+        """Obtiene el HTML de horarios del 2do cuatrimestre 2025"""
+        return ejecutar_con_cliente(self.descargar_horarios_2c_2025)
+
     def buscar_url_horarios_periodo(
         self, periodo: str = "2025", cuatrimestre: str = "2"
     ) -> Optional[str]:
@@ -132,8 +129,8 @@ class ScraperHorariosDC:
         try:
             # Primero buscar en la página principal de cursada
             url_cursada = "https://www.dc.uba.ar/cursada-de-grado/"
-            response = self.session.get(url_cursada)
-            soup = BeautifulSoup(response.text, "html.parser")
+            html = ejecutar_con_cliente(lambda cliente: cliente.obtener_texto(url_cursada))
+            soup = BeautifulSoup(html, "html.parser")
 
             # Buscar links que contengan palabras clave del período
             keywords = [
@@ -615,11 +612,28 @@ class ScraperHorariosDC:
 
     def ejecutar_scraping_completo(self) -> Dict:
         """Ejecuta el scraping completo de horarios DC"""
-        logger.info("=== INICIANDO SCRAPING HORARIOS DC ===")
+        return ejecutar_con_cliente(self.ejecutar_scraping_completo_async)
 
+    async def ejecutar_scraping_completo_async(
+        self, cliente: ClienteHTTP, omitir_sin_cambios: bool = False
+    ) -> Dict:
+        """
+        Ejecuta el scraping completo de horarios DC con un cliente HTTP compartido
+
+        Con omitir_sin_cambios no se parsea si la página no cambió desde la última descarga
+        """
+        logger.info("=== INICIANDO SCRAPING HORARIOS DC ===")
+        html = await self.descargar_horarios_2c_2025(cliente)
+        if html and omitir_sin_cambios and cliente.sin_cambios(self.url_horarios_2c_2025):
+            logger.info("Página sin cambios desde la última descarga: se omite el parseo")
+            return {"exito": True, "sin_cambios": True, "estadisticas": self.stats}
+        # El parseo corre en un hilo para no frenar las descargas de otros scrapers
+        return await asyncio.to_thread(self.procesar_html, html)
+
+    def procesar_html(self, html: Optional[str]) -> Dict:
+        """Extrae, valida y guarda los horarios del HTML descargado"""
         try:
-            # 1. Obtener HTML
-            html = self.obtener_horarios_2c_2025()
+            # 1. Verificar HTML
             if not html:
                 raise Exception("No se pudo obtener el HTML de horarios")
 
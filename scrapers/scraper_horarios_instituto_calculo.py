@@ -7,7 +7,7 @@ Autor: Sistema RAG MVP
 Fecha: 2025-07-27
 """
 
-import requests
+import asyncio
 import json
 import re
 from datetime import datetime
@@ -16,6 +16,8 @@ import logging
 from typing import Dict, List, Optional, Tuple
 from urllib.parse import urljoin, urlparse
 
+from cliente_http import ClienteHTTP, ErrorHTTP, ejecutar_con_cliente
+
 # Configuración de logging
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -29,12 +31,6 @@ class ScraperHorariosIC:
     def __init__(self):
         self.base_url = "https://ic.fcen.uba.ar/"
         self.url_materias = "https://ic.fcen.uba.ar/actividades-academicas/formacion/materias"
-        self.session = requests.Session()
-        self.session.headers.update(
-            {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-            }
-        )
 
         # Patrones regex para parsing de horarios
         self.patrones_horarios = {
@@ -90,29 +86,31 @@ class ScraperHorariosIC:
             "errores": [],
         }
 
-    def obtener_html_materias(self) -> Optional[str]:
-        """Obtiene el HTML de materias del Instituto de Cálculo"""
+    async def descargar_html_materias(self, cliente: ClienteHTTP) -> Optional[str]:
+        """Descarga y verifica el HTML de materias del Instituto de Cálculo"""
         try:
             logger.info(f"Obteniendo materias de: {self.url_materias}")
-            response = self.session.get(self.url_materias, timeout=30)
-            response.raise_for_status()
-
-            # Verificar que la página contenga las materias
-            indicadores = ["academicitem", "academictitle", "dateicon"]
-            texto_contenido = response.text.lower()
-            
-            encontrado = any(indicador.lower() in texto_contenido for indicador in indicadores)
-            if not encontrado:
-                logger.error("La página no contiene las materias esperadas")
-                return None
+            html = await cliente.obtener_texto(self.url_materias)
+        except ErrorHTTP as e:
+            logger.error(f"Error al obtener HTML: {e}")
+            return None
 
-            logger.info(f"HTML obtenido exitosamente ({len(response.text)} caracteres)")
-            return response.text
+        # Verificar que la página contenga las materias
+        indicadores = ["academicitem", "academictitle", "dateicon"]
+        texto_contenido = html.lower()
 
-        except requests.RequestException as e:
-            logger.error(f"Error al obtener HTML: {e}")
+        encontrado = any(indicador.lower() in texto_contenido for indicador in indicadores)
+        if not encontrado:
+            logger.error("La página no contiene las materias esperadas")
             return None
 
+        logger.info(f"HTML obtenido exitosamente ({len(html)} caracteres)")
+        return html
+
+    def obtener_html_materias(self) -> Optional[str]:
+        """Obtiene el HTML de materias del Instituto de Cálculo"""
+        return ejecutar_con_cliente(self.descargar_html_materias)
+
     def extraer_materias_de_html(self, html: str) -> List[Dict]:
         """Extrae materias del HTML del Instituto de Cálculo"""
         soup = BeautifulSoup(html, "html.parser")
@@ -443,11 +441,28 @@ class ScraperHorariosIC:
 
     def ejecutar_scraping_completo(self) -> Dict:
         """Ejecuta el scraping completo de materias del Instituto de Cálculo"""
-        logger.info("=== INICIANDO SCRAPING INSTITUTO DE CÁLCULO ===")
+        return ejecutar_con_cliente(self.ejecutar_scraping_completo_async)
 
+    async def ejecutar_scraping_completo_async(
+        self, cliente: ClienteHTTP, omitir_sin_cambios: bool = False
+    ) -> Dict:
+        """
+        Ejecuta el scraping completo de materias del Instituto de Cálculo con un cliente HTTP compartido
+
+        Con omitir_sin_cambios no se parsea si la página no cambió desde la última descarga
+        """
+        logger.info("=== INICIANDO SCRAPING INSTITUTO DE CÁLCULO ===")
+        html = await self.descargar_html_materias(cliente)
+        if html and omitir_sin_cambios and cliente.sin_cambios(self.url_materias):
+            logger.info("Página sin cambios desde la última descarga: se omite el parseo")
+            return {"exito": True, "sin_cambios": True, "estadisticas": self.stats}
+        # El parseo corre en un hilo para no frenar las descargas de otros scrapers
+        return await asyncio.to_thread(self.procesar_html, html)
+
+    def procesar_html(self, html: Optional[str]) -> Dict:
+        """Extrae, valida y guarda las materias del HTML descargado"""
         try:
-            # 1. Obtener HTML
-            html = self.obtener_html_materias()
+            # 1. Verificar HTML
             if not html:
                 raise Exception("No se pudo obtener el HTML de materias")
 
@@ -7,7 +7,7 @@ Autor: Sistema RAG MVP
 Fecha: 2025-07-27
 """
 
-import requests
+import asyncio
 import json
 import re
 from datetime import datetime
@@ -16,6 +16,8 @@ import logging
 from typing import Dict, List, Optional, Tuple
 from urllib.parse import urljoin, urlparse
 
+from cliente_http import ClienteHTTP, ErrorHTTP, ejecutar_con_cliente
+
 # Configuración de logging
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -29,12 +31,6 @@ class ScraperHorariosMat:
     def __init__(self):
         self.base_url = "https://web.dm.uba.ar/"
         self.url_horarios = "https://web.dm.uba.ar/index.php/docencia/materias/horarios?ano=2025&cuatrimestre=2"
-        self.session = requests.Session()
-        self.session.headers.update(
-            {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-            }
-        )
 
         # Patrones regex para parsing de horarios
         self.patrones_horarios = {
@@ -97,29 +93,31 @@ class ScraperHorariosMat:
             "errores": [],
         }
 
-    def obtener_html_horarios(self) -> Optional[str]:
-        """Obtiene el HTML de horarios de Matemática"""
+    async def descargar_html_horarios(self, cliente: ClienteHTTP) -> Optional[str]:
+        """Descarga y verifica el HTML de horarios de Matemática"""
         try:
             logger.info(f"Obteniendo horarios de: {self.url_horarios}")
-            response = self.session.get(self.url_horarios, timeout=30)
-            response.raise_for_status()
-
-            # Verificar que la página contenga las tablas de horarios
-            indicadores = ["<table class=\"horarios\">", "caption>", "diayhora"]
-            texto_contenido = response.text.lower()
-            
-            encontrado = any(indicador.lower() in texto_contenido for indicador in indicadores)
-            if not encontrado:
-                logger.error("La página no contiene las tablas de horarios esperadas")
-                return None
+            html = await cliente.obtener_texto(self.url_horarios)
+        except ErrorHTTP as e:
+            logger.error(f"Error al obtener HTML: {e}")
+            return None
 
-            logger.info(f"HTML obtenido exitosamente ({len(response.text)} caracteres)")
-            return response.text
+        # Verificar que la página contenga las tablas de horarios
+        indicadores = ["<table class=\"horarios\">", "caption>", "diayhora"]
+        texto_contenido = html.lower()
 
-        except requests.RequestException as e:
-            logger.error(f"Error al obtener HTML: {e}")
+        encontrado = any(indicador.lower() in texto_contenido for indicador in indicadores)
+        if not encontrado:
+            logger.error("La página no contiene las tablas de horarios esperadas")
             return None
 
+        logger.info(f"HTML obtenido exitosamente ({len(html)} caracteres)")
+        return html
+
+    def obtener_html_horarios(self) -> Optional[str]:
+        """Obtiene el HTML de horarios de Matemática"""
+        return ejecutar_con_cliente(self.descargar_html_horarios)
+
     def extraer_horarios_de_html(self, html: str) -> List[Dict]:
         """Extrae horarios del HTML de Matemática"""
         soup = BeautifulSoup(html, "html.parser")
@@ -420,11 +418,28 @@ class ScraperHorariosMat:
 
     def ejecutar_scraping_completo(self) -> Dict:
         """Ejecuta el scraping completo de horarios de Matemática"""
-        logger.info("=== INICIANDO SCRAPING HORARIOS MATEMÁTICA ===")
+        return ejecutar_con_cliente(self.ejecutar_scraping_completo_async)
 
+    async def ejecutar_scraping_completo_async(
+        self, cliente: ClienteHTTP, omitir_sin_cambios: bool = False
+    ) -> Dict:
+        """
+        Ejecuta el scraping completo de horarios de Matemática con un cliente HTTP compartido
+
+        Con omitir_sin_cambios no se parsea si la página no cambió desde la última descarga
+        """
+        logger.info("=== INICIANDO SCRAPING HORARIOS MATEMÁTICA ===")
+        html = await self.descargar_html_horarios(cliente)
+        if html and omitir_sin_cambios and cliente.sin_cambios(self.url_horarios):
+            logger.info("Página sin cambios desde la última descarga: se omite el parseo")
+            return {"exito": True, "sin_cambios": True, "estadisticas": self.stats}
+        # El parseo corre en un hilo para no frenar las descargas de otros scrapers
+        return await asyncio.to_thread(self.procesar_html, html)
+
+    def procesar_html(self, html: Optional[str]) -> Dict:
+        """Extrae, valida y guarda los horarios del HTML descargado"""
         try:
-            # 1. Obtener HTML
-            html = self.obtener_html_horarios()
+            # 1. Verificar HTML
             if not html:
                 raise Exception("No se pudo obtener el HTML de horarios")
 
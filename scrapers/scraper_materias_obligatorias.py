@@ -7,7 +7,7 @@ Autor: Sistema RAG MVP
 Fecha: 2025-07-26
 """
 
-import requests
+import asyncio
 import json
 import re
 from datetime import datetime
@@ -17,6 +17,8 @@ from typing import Dict, List, Optional
 import time
 from urllib.parse import urljoin
 
+from cliente_http import ClienteHTTP, ErrorHTTP, ejecutar_con_cliente
+
 # Configuración de logging
 logging.basicConfig(
     level=logging.INFO,
@@ -29,10 +31,6 @@ class ScraperMateriasObligatorias:
     
     def __init__(self):
         self.base_url = "https://lcd.exactas.uba.ar/materias-obligatorias/"
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
         
         # Mapeo de departamentos a códigos
         self.departamentos_map = {
@@ -52,24 +50,26 @@ class ScraperMateriasObligatorias:
             "2do cuatrimestre 2025": {"año": 2025, "cuatrimestre": "2"}
         }
     
-    def obtener_html(self) -> Optional[str]:
-        """Obtiene el HTML de la página de materias obligatorias"""
+    async def descargar_html(self, cliente: ClienteHTTP) -> Optional[str]:
+        """Descarga y verifica el HTML de la página de materias obligatorias"""
         try:
             logger.info(f"Obteniendo HTML de: {self.base_url}")
-            response = self.session.get(self.base_url, timeout=30)
-            response.raise_for_status()
-            
-            # Verificar que es la página correcta
-            if "Materias Obligatorias" not in response.text:
-                logger.error("La página no contiene el título esperado")
-                return None
-                
-            logger.info(f"HTML obtenido exitosamente ({len(response.text)} caracteres)")
-            return response.text
-            
-        except requests.RequestException as e:
+            html = await cliente.obtener_texto(self.base_url)
+        except ErrorHTTP as e:
             logger.error(f"Error al obtener HTML: {e}")
             return None
+        
+        # Verificar que es la página correcta
+        if "Materias Obligatorias" not in html:
+            logger.error("La página no contiene el título esperado")
+            return None
+            
+        logger.info(f"HTML obtenido exitosamente ({len(html)} caracteres)")
+        return html
+    
+    def obtener_html(self) -> Optional[str]:
+        """Obtiene el HTML de la página de materias obligatorias"""
+        return ejecutar_con_cliente(self.descargar_html)
     
     def extraer_materias_por_periodo(self, html: str) -> Dict[str, List[Dict]]:
         """Extrae materias organizadas por período académico"""
@@ -328,11 +328,28 @@ class ScraperMateriasObligatorias:
     
     def ejecutar_scraping_completo(self) -> bool:
         """Ejecuta el proceso completo de scraping"""
+        return ejecutar_con_cliente(self.ejecutar_scraping_completo_async)
+    
+    async def ejecutar_scraping_completo_async(
+        self, cliente: ClienteHTTP, omitir_sin_cambios: bool = False
+    ) -> bool:
+        """
+        Ejecuta el proceso completo de scraping con un cliente HTTP compartido
+
+        Con omitir_sin_cambios no se parsea si la página no cambió desde la última descarga
+        """
         logger.info("=== INICIANDO SCRAPING MATERIAS OBLIGATORIAS ===")
-        
+        html = await self.descargar_html(cliente)
+        if html and omitir_sin_cambios and cliente.sin_cambios(self.base_url):
+            logger.info("Página sin cambios desde la última descarga: se omite el parseo")
+            return True
+        # El parseo corre en un hilo para no frenar las descargas de otros scrapers
+        return await asyncio.to_thread(self.procesar_html, html)
+    
+    def procesar_html(self, html: Optional[str]) -> bool:
+        """Extrae, valida y guarda las materias del HTML descargado"""
         try:
-            # 1. Obtener HTML
-            html = self.obtener_html()
+            # 1. Verificar HTML
             if not html:
                 logger.error("No se pudo obtener el HTML")
                 return False
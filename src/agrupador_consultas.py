@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Agrupador de Consultas Concurrentes (micro-batching)
+Junta las solicitudes que llegan dentro de una ventana de pocos milisegundos
+y las procesa como un único lote: una pasada del modelo y una búsqueda FAISS
+para todas, en lugar de una por consulta
+
+Ninguna solicitud espera más de `espera_maxima_ms` a que se complete su lote,
+y un lote nunca supera `max_lote` solicitudes. Mientras se procesa un lote,
+las solicitudes nuevas se acumulan para el siguiente, así que bajo carga los
+lotes crecen solos.
+
+Autor: Sistema RAG MVP
+Fecha: 2025-08-11
+"""
+
+import asyncio
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class AgrupadorConsultas:
+    """Micro-batching asyncio sobre una función que procesa listas de solicitudes"""
+
+    def __init__(self, procesar_lote: Callable[[List[Any]], List[Any]], max_lote: int = 32,
+                 espera_maxima_ms: float = 5.0, ejecutor: Optional[Executor] = None):
+        """
+        Args:
+            procesar_lote: Recibe una lista de solicitudes y devuelve un resultado por cada una
+            max_lote: Solicitudes máximas por lote
+            espera_maxima_ms: Espera máxima de una solicitud a que se junte su lote
+            ejecutor: Ejecutor donde correr procesar_lote (None = el del loop)
+        """
+        self.procesar_lote = procesar_lote
+        self.max_lote = max(1, max_lote)
+        self.espera_maxima = max(0.0, espera_maxima_ms) / 1000
+        self.ejecutor = ejecutor
+        self._pendientes: List[Tuple[Any, asyncio.Future, float]] = []
+        self._hay_pendientes: Optional[asyncio.Event] = None
+        self._lote_completo: Optional[asyncio.Event] = None
+        self._tarea: Optional[asyncio.Task] = None
+        self.lotes_procesados = 0
+        self.solicitudes_procesadas = 0
+
+    def iniciar(self):
+        """Arranca la tarea que forma y procesa los lotes (requiere un loop en ejecución)"""
+        if self._tarea is None:
+            self._hay_pendientes = asyncio.Event()
+            self._lote_completo = asyncio.Event()
+            self._tarea = asyncio.get_running_loop().create_task(self._bucle())
+
+    async def detener(self):
+        """Detiene la tarea; las solicitudes pendientes fallan con CancelledError"""
+        if self._tarea is None:
+            return
+        self._tarea.cancel()
+        try:
+            await self._tarea
+        except asyncio.CancelledError:
+            pass
+        self._tarea = None
+        for _, futuro, _ in self._pendientes:
+            futuro.cancel()
+        self._pendientes = []
+
+    async def enviar(self, solicitud: Any) -> Any:
+        """Encola una solicitud y espera su resultado"""
+        self.iniciar()
+        loop = asyncio.get_running_loop()
+        futuro = loop.create_future()
+        self._pendientes.append((solicitud, futuro, loop.time()))
+        self._hay_pendientes.set()
+        if len(self._pendientes) >= self.max_lote:
+            self._lote_completo.set()
+        return await futuro
+
+    def estadisticas(self) -> Dict[str, float]:
+        """Lotes procesados y tamaño medio de lote"""
+        return {
+            'lotes': self.lotes_procesados,
+            'solicitudes': self.solicitudes_procesadas,
+            'tamano_medio_lote': self.solicitudes_procesadas / self.lotes_procesados if self.lotes_procesados else 0.0,
+            'max_lote': self.max_lote,
+            'espera_maxima_ms': self.espera_maxima * 1000,
+        }
+
+    async def _bucle(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._hay_pendientes.wait()
+
+            # Ventana de espera contada desde la solicitud más antigua
+            restante = self._pendientes[0][2] + self.espera_maxima - loop.time()
+            if len(self._pendientes) < self.max_lote and restante > 0:
+                self._lote_completo.clear()
+                try:
+                    await asyncio.wait_for(self._lote_completo.wait(), restante)
+                except asyncio.TimeoutError:
+                    pass
+
+            lote = self._pendientes[:self.max_lote]
+            del self._pendientes[:self.max_lote]
+            if not self._pendientes:
+                self._hay_pendientes.clear()
+
+            solicitudes = [solicitud for solicitud, _, _ in lote]
+            try:
+                resultados = await loop.run_in_executor(self.ejecutor, self.procesar_lote, solicitudes)
+            except Exception as e:
+                for _, futuro, _ in lote:
+                    if not futuro.done():
+                        futuro.set_exception(e)
+                continue
+
+            self.lotes_procesados += 1
+            self.solicitudes_procesadas += len(lote)
+            for (_, futuro, _), resultado in zip(lote, resultados):
+                if not futuro.done():
+                    futuro.set_result(resultado)
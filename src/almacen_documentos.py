@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Almacén Binario de Documentos RAG
+Reemplaza documentos_horarios.json por un archivo con tabla de offsets y
+decodificación perezosa por documento
+
+Formato del archivo:
+- Encabezado: MAGIC (8 bytes) + códec (1 byte) + offset de la tabla (uint64)
+- Registros: un registro codificado por documento con las partes pesadas
+  (contenido y materia_original completa)
+- Tabla: lista de [id, faiss_id, offset, longitud, metadatos, horarios]
+
+Al cargar solo se decodifica la tabla; el archivo se mapea en memoria y cada
+registro se decodifica la primera vez que se accede a su contenido. Los
+metadatos y los horarios quedan disponibles sin decodificar registros, que es
+lo que necesitan los índices estructurados y los listados.
+
+Autor: Sistema RAG MVP
+Fecha: 2025-08-07
+"""
+
+import json
+import mmap
+import os
+import struct
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List
+
+try:
+    import msgpack
+except ImportError:  # msgpack es opcional: sin él se usa JSON compacto
+    msgpack = None
+
+MAGIC = b'RAGDOC\x00\x01'
+_ENCABEZADO = struct.Struct('<8sBQ')
+
+CODEC_JSON = 0
+CODEC_MSGPACK = 1
+
+
+def _codificar(objeto: Any, codec: int) -> bytes:
+    if codec == CODEC_MSGPACK:
+        return msgpack.packb(objeto, use_bin_type=True)
+    return json.dumps(objeto, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _decodificar(datos: bytes, codec: int) -> Any:
+    if codec == CODEC_MSGPACK:
+        if msgpack is None:
+            raise ImportError("El almacén fue escrito con msgpack: instalar con 'pip install msgpack'")
+        return msgpack.unpackb(datos, raw=False, strict_map_key=False)
+    return json.loads(datos.decode('utf-8'))
+
+
+def a_dict(documento: Mapping) -> Dict:
+    """Copia un documento (perezoso o no) a dicts planos, p. ej. para serializarlo"""
+    if isinstance(documento, DocumentoAlmacenado):
+        return documento.a_dict()
+    return dict(documento)
+
+
+class MateriaAlmacenada(Mapping):
+    """materia_original perezosa: los horarios vienen de la tabla, el resto del registro"""
+
+    def __init__(self, documento: 'DocumentoAlmacenado'):
+        self._documento = documento
+
+    def __getitem__(self, clave: str) -> Any:
+        if clave == 'horarios':
+            return self._documento._horarios
+        return self._documento._registro()['materia_original'][clave]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._documento._registro()['materia_original'])
+
+    def __len__(self) -> int:
+        return len(self._documento._registro()['materia_original'])
+
+    def get(self, clave: str, default: Any = None) -> Any:
+        if clave == 'horarios':
+            return self._documento._horarios
+        return self._documento._registro()['materia_original'].get(clave, default)
+
+
+class DocumentoAlmacenado(Mapping):
+    """Documento RAG de solo lectura respaldado por un registro del almacén"""
+
+    __slots__ = ('_almacen', 'id', 'faiss_id', '_offset', '_longitud', '_metadatos', '_horarios', '_cache')
+
+    def __init__(self, almacen: 'AlmacenDocumentos', fila: List):
+        self._almacen = almacen
+        self.id, self.faiss_id, self._offset, self._longitud, self._metadatos, self._horarios = fila
+        self._cache = None
+
+    def _registro(self) -> Dict:
+        if self._cache is None:
+            self._cache = self._almacen.leer_registro(self._offset, self._longitud)
+        return self._cache
+
+    def __getitem__(self, clave: str) -> Any:
+        if clave == 'id':
+            return self.id
+        if clave == 'faiss_id':
+            return self.faiss_id
+        if clave == 'metadatos':
+            return self._metadatos
+        if clave == 'materia_original':
+            return MateriaAlmacenada(self)
+        if clave == 'contenido':
+            return self._registro()['contenido']
+        raise KeyError(clave)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(('id', 'faiss_id', 'contenido', 'metadatos', 'materia_original'))
+
+    def __len__(self) -> int:
+        return 5
+
+    def a_dict(self) -> Dict:
+        registro = self._registro()
+        return {
+            'id': self.id,
+            'faiss_id': self.faiss_id,
+            'contenido': registro['contenido'],
+            'metadatos': self._metadatos,
+            'materia_original': registro['materia_original'],
+        }
+
+
+class AlmacenDocumentos:
+    """Lectura y escritura del almacén binario de documentos"""
+
+    def __init__(self, ruta: str):
+        self.ruta = ruta
+        self._mmap = None
+        self.codec = CODEC_JSON
+
+    @staticmethod
+    def guardar(ruta: str, documentos: List[Mapping]):
+        """Escribe todos los documentos en un archivo nuevo (reemplazo atómico)"""
+        codec = CODEC_MSGPACK if msgpack is not None else CODEC_JSON
+        ruta_temporal = ruta + '.tmp'
+
+        with open(ruta_temporal, 'wb') as f:
+            f.write(_ENCABEZADO.pack(MAGIC, codec, 0))
+            tabla = []
+            for documento in documentos:
+                documento = a_dict(documento)
+                registro = _codificar({
+                    'contenido': documento['contenido'],
+                    'materia_original': documento['materia_original'],
+                }, codec)
+                offset = f.tell()
+                f.write(registro)
+                tabla.append([
+                    documento['id'],
+                    documento['faiss_id'],
+                    offset,
+                    len(registro),
+                    documento['metadatos'],
+                    documento['materia_original'].get('horarios', []),
+                ])
+
+            offset_tabla = f.tell()
+            f.write(_codificar(tabla, codec))
+            f.seek(0)
+            f.write(_ENCABEZADO.pack(MAGIC, codec, offset_tabla))
+
+        os.replace(ruta_temporal, ruta)
+
+    def cargar(self) -> List[DocumentoAlmacenado]:
+        """Mapea el archivo y decodifica solo la tabla de documentos"""
+        self.cerrar()
+        # El mapeo conserva su propio descriptor: el archivo se puede cerrar enseguida
+        with open(self.ruta, 'rb') as archivo:
+            self._mmap = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self.codec, offset_tabla = _ENCABEZADO.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Archivo de documentos inválido: {self.ruta}")
+
+        tabla = _decodificar(self._mmap[offset_tabla:], self.codec)
+        return [DocumentoAlmacenado(self, fila) for fila in tabla]
+
+    def leer_registro(self, offset: int, longitud: int) -> Dict:
+        """Decodifica un único registro"""
+        return _decodificar(self._mmap[offset:offset + longitud], self.codec)
+
+    def cerrar(self):
+        """Libera el mapeo del archivo"""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Benchmark de Recuperación del Sistema RAG de Horarios
+Latencia (p50/p95/p99 en frío y en caliente), recall@k y MRR sobre un set de
+consultas de referencia, tiempo de construcción del índice y pico de memoria
+
+La salida es JSON con claves ordenadas para poder comparar entre commits:
+
+    python benchmark_horarios.py --salida reportes/benchmark_antes.json
+    python benchmark_horarios.py --salida reportes/benchmark_despues.json --comparar reportes/benchmark_antes.json
+
+Cada consulta de referencia define qué documentos son relevantes con criterios
+sobre la materia (nombre, departamento) y sus horarios (día, franja, hora de
+inicio); un documento es relevante si cumple todos los criterios indicados.
+recall@k = relevantes en el top k / min(k, relevantes en el corpus).
+
+Autor: Sistema RAG MVP
+Fecha: 2025-08-12
+"""
+
+import argparse
+import json
+import logging
+import os
+import re
+import subprocess
+import sys
+from datetime import datetime
+from time import perf_counter
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+try:
+    from .config_paths import RAG_SISTEMA_DIR, REPORTES_DIR
+    from .bm25_horarios import normalizar_texto
+    from .fabrica_indices import crear_indice, vectores_indice
+    from .indice_horarios import FRANJAS_HORARIAS, hora_a_minutos, normalizar_dia
+    from .sistema_embeddings_horarios import MODOS_BUSQUEDA, SistemaEmbeddingsHorarios
+except ImportError:
+    from config_paths import RAG_SISTEMA_DIR, REPORTES_DIR
+    from bm25_horarios import normalizar_texto
+    from fabrica_indices import crear_indice, vectores_indice
+    from indice_horarios import FRANJAS_HORARIAS, hora_a_minutos, normalizar_dia
+    from sistema_embeddings_horarios import MODOS_BUSQUEDA, SistemaEmbeddingsHorarios
+
+logger = logging.getLogger(__name__)
+
+# Consultas de referencia (tests/test_consultas_horarios.py y tests/validacion_manual_completa.py)
+CONSULTAS_REFERENCIA: List[Dict[str, Any]] = [
+    {'consulta': '¿Cuándo se dicta Análisis Matemático I?', 'materias': ['analisis matematico i', 'analisis matematico 1', 'analisis i']},
+    {'consulta': '¿Horarios de Algoritmos y Estructuras de Datos?', 'materias': ['algoritmos y estructuras de datos']},
+    {'consulta': '¿Qué materias hay los martes por la tarde?', 'dia': 'martes', 'franja': 'tarde'},
+    {'consulta': '¿Qué materias empiezan a las 14:00?', 'inicio': '14:00'},
+    {'consulta': 'horarios de álgebra', 'materias': ['algebra']},
+    {'consulta': 'estadística', 'materias': ['estadistica']},
+    {'consulta': 'programación', 'materias': ['programacion']},
+    {'consulta': 'cálculo', 'materias': ['calculo']},
+    {'consulta': 'bases de datos', 'materias': ['base de datos', 'bases de datos']},
+    {'consulta': 'análisis numérico', 'materias': ['analisis numerico']},
+    {'consulta': 'probabilidades y estadística', 'materias': ['probabilidades y estadistica']},
+    {'consulta': 'cursada de algoritmos', 'materias': ['algoritmos']},
+    {'consulta': 'horarios instituto de cálculo', 'departamento': 'IC'},
+    {'consulta': 'qué hay los lunes', 'dia': 'lunes'},
+    {'consulta': 'materias por la mañana', 'franja': 'mañana'},
+    {'consulta': 'clases de noche', 'franja': 'noche'},
+    {'consulta': 'miércoles a la mañana', 'dia': 'miércoles', 'franja': 'mañana'},
+    {'consulta': 'clases que empiezan a las 10', 'inicio': '10:00'},
+]
+
+
+def percentiles_ms(tiempos: List[float]) -> Dict[str, float]:
+    """p50/p95/p99 y media en milisegundos de una lista de tiempos en segundos"""
+    if not tiempos:
+        return {'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'media': 0.0}
+    milisegundos = np.array(tiempos) * 1000
+    p50, p95, p99 = np.percentile(milisegundos, [50, 95, 99])
+    return {'p50': round(float(p50), 3), 'p95': round(float(p95), 3), 'p99': round(float(p99), 3),
+            'media': round(float(milisegundos.mean()), 3)}
+
+
+def pico_memoria_mb() -> Optional[float]:
+    """Pico de memoria residente del proceso (None si la plataforma no lo informa)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa KB, macOS bytes
+    return round(pico / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def es_relevante(documento: Dict, criterios: Dict[str, Any]) -> bool:
+    """Indica si un documento cumple todos los criterios de una consulta de referencia"""
+    metadatos = documento['metadatos']
+
+    if 'materias' in criterios:
+        nombre = normalizar_texto(metadatos['materia_nombre'])
+        if not any(re.search(rf"\b{re.escape(normalizar_texto(m))}\b", nombre) for m in criterios['materias']):
+            return False
+
+    if 'departamento' in criterios and metadatos['departamento_codigo'] != criterios['departamento']:
+        return False
+
+    if not any(k in criterios for k in ('dia', 'franja', 'inicio')):
+        return True
+
+    # Los criterios de horario los tiene que cumplir un mismo horario
+    dia = normalizar_dia(criterios.get('dia', ''))
+    desde, hasta = FRANJAS_HORARIAS.get(criterios.get('franja'), (0, 24 * 60))
+    inicio_buscado = hora_a_minutos(criterios.get('inicio', ''))
+    for horario in documento['materia_original'].get('horarios', []):
+        inicio = hora_a_minutos(horario.get('hora_inicio', ''))
+        fin = hora_a_minutos(horario.get('hora_fin', ''))
+        if inicio is None or fin is None:
+            continue
+        if dia and normalizar_dia(horario.get('dia', '')) != dia:
+            continue
+        if inicio_buscado is not None and inicio != inicio_buscado:
+            continue
+        if inicio < hasta and fin > desde:
+            return True
+    return False
+
+
+def buscar(sistema: SistemaEmbeddingsHorarios, consulta: str, k: int, modo: Optional[str] = None,
+           enrutar: bool = False) -> List:
+    """Búsqueda semántica directa o con el enrutador de intención (buscar_con_intencion)"""
+    if enrutar:
+        return sistema.buscar_con_intencion(consulta, k=k, modo=modo)[0]
+    return sistema.buscar_similares_horarios(consulta, k=k, modo=modo)
+
+
+def evaluar_calidad(sistema: SistemaEmbeddingsHorarios, consultas: List[Dict[str, Any]],
+                    k: int = 5, modo: Optional[str] = None, enrutar: bool = False) -> Dict[str, Any]:
+    """
+    recall@k y MRR de las consultas de referencia
+
+    Las consultas sin documentos relevantes en el corpus se informan pero no
+    entran en los promedios.
+    """
+    detalle = []
+    for criterios in consultas:
+        relevantes = sum(1 for documento in sistema.documentos if es_relevante(documento, criterios))
+        resultados = buscar(sistema, criterios['consulta'], k, modo, enrutar)
+        aciertos = [es_relevante(documento, criterios) for documento, _ in resultados]
+
+        fila = {'consulta': criterios['consulta'], 'relevantes_corpus': relevantes}
+        if relevantes:
+            fila[f'recall_at_{k}'] = round(sum(aciertos) / min(k, relevantes), 4)
+            fila['reciprocal_rank'] = round(1 / (aciertos.index(True) + 1), 4) if any(aciertos) else 0.0
+        detalle.append(fila)
+
+    evaluadas = [fila for fila in detalle if fila['relevantes_corpus']]
+    return {
+        f'recall_at_{k}': round(float(np.mean([f[f'recall_at_{k}'] for f in evaluadas])), 4) if evaluadas else None,
+        'mrr': round(float(np.mean([f['reciprocal_rank'] for f in evaluadas])), 4) if evaluadas else None,
+        'consultas_evaluadas': len(evaluadas),
+        'consultas_sin_relevantes': len(detalle) - len(evaluadas),
+        'detalle': detalle,
+    }
+
+
+def medir_latencia(sistema: SistemaEmbeddingsHorarios, consultas: List[str], k: int = 5,
+                   repeticiones: int = 5, modo: Optional[str] = None, enrutar: bool = False) -> Dict[str, Any]:
+    """
+    Latencia por consulta en frío y en caliente
+
+    Frío: primera pasada con el cache de consultas vacío (codifica cada consulta).
+    Caliente: las pasadas siguientes, con el cache y los índices perezosos ya armados.
+    """
+    sistema.cache_consultas.limpiar()
+
+    frio = []
+    for consulta in consultas:
+        inicio = perf_counter()
+        buscar(sistema, consulta, k, modo, enrutar)
+        frio.append(perf_counter() - inicio)
+
+    caliente = []
+    for _ in range(repeticiones):
+        for consulta in consultas:
+            inicio = perf_counter()
+            buscar(sistema, consulta, k, modo, enrutar)
+            caliente.append(perf_counter() - inicio)
+
+    return {'frio_ms': percentiles_ms(frio), 'caliente_ms': percentiles_ms(caliente),
+            'consultas': len(consultas), 'repeticiones': repeticiones}
+
+
+def medir_construccion_indice(sistema: SistemaEmbeddingsHorarios) -> float:
+    """Segundos para reconstruir el índice FAISS del sistema con sus mismos vectores y parámetros"""
+    vectores = vectores_indice(sistema.index)
+    configuracion = sistema.configuracion_indice
+    inicio = perf_counter()
+    indice = crear_indice(configuracion['tipo'], vectores.shape[1], vectores, configuracion.get('parametros'),
+                          configuracion.get('compresion', 'fp32'))
+    indice.add(vectores)
+    return round(perf_counter() - inicio, 4)
+
+
+def commit_actual() -> Optional[str]:
+    """Commit de git del árbol medido (None fuera de un repositorio)"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def ejecutar_benchmark(sistema: SistemaEmbeddingsHorarios, consultas: List[Dict[str, Any]] = CONSULTAS_REFERENCIA,
+                       k: int = 5, repeticiones: int = 5, modo: Optional[str] = None,
+                       enrutar: bool = False) -> Dict[str, Any]:
+    """
+    Benchmark completo sobre un sistema ya cargado
+
+    Args:
+        enrutar: Medir buscar_con_intencion (criterios estructurados por índices exactos)
+            en lugar de la búsqueda semántica directa
+
+    Returns:
+        Reporte serializable a JSON
+    """
+    modo = modo or sistema.modo_busqueda
+    reporte = {
+        'fecha': datetime.now().isoformat(),
+        'commit': commit_actual(),
+        'configuracion': {
+            'modelo': sistema.modelo_nombre,
+            'backend': sistema.backend,
+            'modo_busqueda': modo,
+            'enrutar': enrutar,
+            'indice': sistema.configuracion_indice.get('tipo', 'flat'),
+            'compresion': sistema.configuracion_indice.get('compresion', 'fp32'),
+            'k': k,
+            'documentos': len(sistema.documentos),
+            'version_snapshot': sistema.version_snapshot,
+        },
+    }
+
+    # La primera consulta carga el modelo (si hace falta) y los índices perezosos
+    inicio = perf_counter()
+    sistema.buscar_similares_horarios(consultas[0]['consulta'], k=k, modo=modo)
+    reporte['primera_consulta_s'] = round(perf_counter() - inicio, 4)
+    reporte['carga_modelo_s'] = round(sistema.tiempo_carga_modelo, 4) if sistema.tiempo_carga_modelo else None
+
+    reporte['latencia'] = medir_latencia(sistema, [c['consulta'] for c in consultas], k, repeticiones, modo, enrutar)
+    reporte['calidad'] = evaluar_calidad(sistema, consultas, k, modo, enrutar)
+    reporte['construccion_indice_s'] = medir_construccion_indice(sistema)
+    reporte['pico_memoria_mb'] = pico_memoria_mb()
+    return reporte
+
+
+def comparar_reportes(anterior: Dict[str, Any], actual: Dict[str, Any]) -> Dict[str, Any]:
+    """Diferencias (actual - anterior) de las métricas numéricas principales"""
+    def metricas(reporte):
+        calidad = reporte['calidad']
+        valores = {f'calidad.{clave}': valor for clave, valor in calidad.items() if clave.startswith('recall_at_') or clave == 'mrr'}
+        for fase in ('frio_ms', 'caliente_ms'):
+            for percentil, valor in reporte['latencia'][fase].items():
+                valores[f'latencia.{fase}.{percentil}'] = valor
+        for clave in ('carga_sistema_s', 'construccion_indice_s', 'pico_memoria_mb'):
+            valores[clave] = reporte.get(clave)
+        return valores
+
+    antes, despues = metricas(anterior), metricas(actual)
+    return {
+        clave: {'antes': antes.get(clave), 'despues': valor, 'diferencia': round(valor - antes[clave], 4)}
+        for clave, valor in despues.items()
+        if isinstance(valor, (int, float)) and isinstance(antes.get(clave), (int, float))
+    }
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Benchmark de recuperación del sistema RAG de horarios")
+    parser.add_argument("--sistema", "-s", default=str(RAG_SISTEMA_DIR), help="Directorio del sistema RAG")
+    parser.add_argument("--consultas", help="JSON con consultas de referencia (default: las incluidas)")
+    parser.add_argument("--k", type=int, default=5, help="Resultados por consulta (default: 5)")
+    parser.add_argument("--repeticiones", type=int, default=5, help="Pasadas en caliente (default: 5)")
+    parser.add_argument("--modo", "-m", choices=MODOS_BUSQUEDA, default="vectorial", help="Modo de búsqueda")
+    parser.add_argument("--enrutar", action="store_true", help="Medir el enrutador de intención (buscar_con_intencion)")
+    parser.add_argument("--backend", default="torch", help="Backend del codificador (torch, onnx, onnx-int8)")
+    parser.add_argument("--salida", "-o", help="Archivo JSON de salida (default: reportes/benchmark_<fecha>.json)")
+    parser.add_argument("--comparar", help="Reporte anterior contra el cual mostrar diferencias")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    consultas = CONSULTAS_REFERENCIA
+    if args.consultas:
+        with open(args.consultas, 'r', encoding='utf-8') as f:
+            consultas = json.load(f)
+
+    inicio = perf_counter()
+    sistema = SistemaEmbeddingsHorarios(backend=args.backend, modo_busqueda=args.modo)
+    sistema.cargar_sistema_horarios(args.sistema)
+    carga_sistema = round(perf_counter() - inicio, 4)
+
+    reporte = ejecutar_benchmark(sistema, consultas, args.k, args.repeticiones, args.modo, args.enrutar)
+    reporte['carga_sistema_s'] = carga_sistema
+
+    salida = args.salida or str(REPORTES_DIR / f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(salida)), exist_ok=True)
+    with open(salida, 'w', encoding='utf-8') as f:
+        json.dump(reporte, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+    latencia = reporte['latencia']
+    calidad = reporte['calidad']
+    print(f"⏱️ Frío     p50 {latencia['frio_ms']['p50']:.2f} ms  p95 {latencia['frio_ms']['p95']:.2f} ms  p99 {latencia['frio_ms']['p99']:.2f} ms")
+    print(f"⏱️ Caliente p50 {latencia['caliente_ms']['p50']:.2f} ms  p95 {latencia['caliente_ms']['p95']:.2f} ms  p99 {latencia['caliente_ms']['p99']:.2f} ms")
+    print(f"🎯 recall@{args.k} {calidad[f'recall_at_{args.k}']}  MRR {calidad['mrr']}  ({calidad['consultas_evaluadas']} consultas)")
+    print(f"🏗️ Índice {reporte['construccion_indice_s']:.3f}s  💾 Pico {reporte['pico_memoria_mb']} MB")
+    print(f"📄 Reporte: {salida}")
+
+    if args.comparar:
+        with open(args.comparar, 'r', encoding='utf-8') as f:
+            diferencias = comparar_reportes(json.load(f), reporte)
+        for clave, valores in sorted(diferencias.items()):
+            print(f"   {clave}: {valores['antes']} -> {valores['despues']} ({valores['diferencia']:+})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Índice Léxico BM25 para el Sistema RAG de Horarios
+Recuperación por términos exactos (nombres de materias, siglas) para combinar
+con la búsqueda vectorial mediante Reciprocal Rank Fusion (RRF)
+
+Se indexa el contenido enriquecido de cada documento más el nombre y el nombre
+normalizado de la materia (con mayor peso) y sus siglas, p. ej. "ALC" para
+Álgebra Lineal Computacional. Los términos se normalizan sin acentos, igual
+que las consultas.
+
+Autor: Sistema RAG MVP
+Fecha: 2025-08-08
+"""
+
+import heapq
+import math
+import re
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Palabras funcionales que no aportan a la coincidencia léxica
+PALABRAS_VACIAS = {
+    'a', 'al', 'con', 'cual', 'cuales', 'cuando', 'de', 'del', 'donde', 'el', 'en', 'es', 'hay', 'la',
+    'las', 'lo', 'los', 'me', 'mi', 'o', 'para', 'por', 'que', 'qué', 'se', 'su', 'un', 'una', 'y',
+}
+
+# Peso extra de los términos del nombre de la materia frente al resto del contenido
+PESO_NOMBRE = 3.0
+
+# Constante de Reciprocal Rank Fusion (valor habitual de la literatura)
+RRF_K = 60
+
+
+def normalizar_texto(texto: str) -> str:
+    """Minúsculas, sin acentos ni signos: la misma forma para documentos y consultas"""
+    texto = unicodedata.normalize('NFD', (texto or '').lower())
+    texto = ''.join(c for c in texto if unicodedata.category(c) != 'Mn')
+    return re.sub(r'[^\w\s]', ' ', texto)
+
+
+def tokenizar(texto: str) -> List[str]:
+    """Términos de un texto sin palabras vacías"""
+    return [t for t in normalizar_texto(texto).split() if t not in PALABRAS_VACIAS]
+
+
+def siglas(nombre: str) -> str:
+    """Siglas de un nombre de materia ("Álgebra Lineal Computacional" -> "alc")"""
+    palabras = [p for p in tokenizar(nombre) if p.isalpha() and not re.fullmatch(r'[ivx]+', p)]
+    return ''.join(p[0] for p in palabras) if len(palabras) >= 2 else ''
+
+
+def fusionar_rrf(rankings: Sequence[Sequence[int]], k: int = RRF_K) -> List[Tuple[int, float]]:
+    """
+    Reciprocal Rank Fusion de varios rankings de IDs
+
+    Returns:
+        Pares (id, score RRF) ordenados de mayor a menor score
+    """
+    scores: Dict[int, float] = {}
+    for ranking in rankings:
+        for posicion, identificador in enumerate(ranking):
+            scores[identificador] = scores.get(identificador, 0.0) + 1.0 / (k + posicion + 1)
+    return sorted(scores.items(), key=lambda par: (-par[1], par[0]))
+
+
+class IndiceBM25:
+    """Índice invertido BM25 sobre los documentos RAG, indexado por faiss_id"""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[int, float]] = {}
+        self.frecuencias: Dict[int, Dict[str, float]] = {}
+        self.longitudes: Dict[int, float] = {}
+        self.longitud_total = 0.0
+
+    @staticmethod
+    def _frecuencias_documento(documento: Dict) -> Dict[str, float]:
+        """Frecuencia ponderada de cada término del documento"""
+        metadatos = documento['metadatos']
+        frecuencias: Dict[str, float] = {}
+        for termino in tokenizar(documento['contenido']):
+            frecuencias[termino] = frecuencias.get(termino, 0.0) + 1.0
+
+        terminos_nombre = set()
+        for nombre in (metadatos.get('materia_nombre', ''), metadatos.get('materia_normalizada', '')):
+            terminos_nombre.update(tokenizar(nombre))
+            sigla = siglas(nombre)
+            if sigla:
+                terminos_nombre.add(sigla)
+        for termino in terminos_nombre:
+            frecuencias[termino] = frecuencias.get(termino, 0.0) + PESO_NOMBRE
+        return frecuencias
+
+    def __len__(self) -> int:
+        return len(self.frecuencias)
+
+    def construir(self, documentos: Iterable[Dict]):
+        """Construye el índice a partir de los documentos RAG"""
+        self.postings = {}
+        self.frecuencias = {}
+        self.longitudes = {}
+        self.longitud_total = 0.0
+        for documento in documentos:
+            self.agregar_documento(documento)
+
+    def agregar_documento(self, documento: Dict):
+        """Agrega (o reemplaza) un documento en el índice"""
+        faiss_id = documento['faiss_id']
+        if faiss_id in self.frecuencias:
+            self.quitar_documentos([faiss_id])
+
+        frecuencias = self._frecuencias_documento(documento)
+        self.frecuencias[faiss_id] = frecuencias
+        self.longitudes[faiss_id] = sum(frecuencias.values())
+        self.longitud_total += self.longitudes[faiss_id]
+        for termino, frecuencia in frecuencias.items():
+            self.postings.setdefault(termino, {})[faiss_id] = frecuencia
+
+    def quitar_documentos(self, faiss_ids: Iterable[int]):
+        """Quita los documentos indicados del índice"""
+        for faiss_id in faiss_ids:
+            frecuencias = self.frecuencias.pop(faiss_id, None)
+            if frecuencias is None:
+                continue
+            self.longitud_total -= self.longitudes.pop(faiss_id)
+            for termino in frecuencias:
+                posting = self.postings[termino]
+                del posting[faiss_id]
+                if not posting:
+                    del self.postings[termino]
+
+    def buscar(self, consulta: str, k: int = 10, mascara: Optional[np.ndarray] = None) -> List[Tuple[int, float]]:
+        """
+        Documentos con mayor score BM25 para la consulta
+
+        Args:
+            consulta: Texto libre
+            k: Cantidad máxima de resultados
+            mascara: Array booleano por faiss_id (filtros de metadatos); None = todos
+
+        Returns:
+            Pares (faiss_id, score) ordenados de mayor a menor score
+        """
+        total = len(self.frecuencias)
+        if not total:
+            return []
+        longitud_media = self.longitud_total / total
+
+        scores: Dict[int, float] = {}
+        for termino in set(tokenizar(consulta)):
+            posting = self.postings.get(termino)
+            if not posting:
+                continue
+            idf = math.log(1.0 + (total - len(posting) + 0.5) / (len(posting) + 0.5))
+            for faiss_id, frecuencia in posting.items():
+                if mascara is not None and (faiss_id >= len(mascara) or not mascara[faiss_id]):
+                    continue
+                normalizacion = self.k1 * (1 - self.b + self.b * self.longitudes[faiss_id] / longitud_media)
+                scores[faiss_id] = scores.get(faiss_id, 0.0) + idf * frecuencia * (self.k1 + 1) / (frecuencia + normalizacion)
+
+        return heapq.nlargest(k, scores.items(), key=lambda par: (par[1], -par[0]))
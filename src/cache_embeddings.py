@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Caches de Embeddings
+Evita recodificar textos que ya pasaron por el modelo
+
+- CacheEmbeddings: cache en disco de documentos, no recodifica textos que no
+  cambiaron entre scrapeos. Cada modelo tiene su propio almacén compuesto por
+  <modelo>.f32 (vectores float32 contiguos, append-only) y <modelo>.json
+  (índice hash del texto -> fila en el archivo de vectores).
+- CacheConsultasLRU: cache en memoria de vectores de consultas ya normalizadas.
+
+Autor: Sistema RAG MVP
+Fecha: 2025-08-06
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class CacheEmbeddings:
+    """Cache persistente de embeddings indexado por (modelo, hash del texto)"""
+
+    def __init__(self, directorio: str, modelo_nombre: str, dimension: int):
+        """
+        Inicializa el cache de embeddings
+
+        Args:
+            directorio: Directorio donde se guardan los archivos del cache
+            modelo_nombre: Nombre del modelo (forma parte de la clave)
+            dimension: Dimensión de los vectores del modelo
+        """
+        self.directorio = Path(directorio)
+        self.modelo_nombre = modelo_nombre
+        self.dimension = dimension
+
+        slug = re.sub(r'[^\w.-]', '_', modelo_nombre)
+        self.ruta_vectores = self.directorio / f"{slug}.f32"
+        self.ruta_claves = self.directorio / f"{slug}.json"
+
+        self.filas: Dict[str, int] = {}
+        self._vectores = np.empty((0, dimension), dtype=np.float32)
+        self._pendientes: List[np.ndarray] = []
+        self._reiniciar = False
+        self._cargar()
+
+    @staticmethod
+    def hash_texto(texto: str) -> str:
+        """Hash estable del texto que se va a codificar"""
+        return hashlib.sha256(texto.encode('utf-8')).hexdigest()
+
+    def _cargar(self):
+        """Carga el índice de claves y mapea los vectores existentes"""
+        if not self.ruta_vectores.exists():
+            return
+
+        # Si el índice no es utilizable el archivo de vectores se reescribe desde cero
+        self._reiniciar = True
+        try:
+            with open(self.ruta_claves, 'r', encoding='utf-8') as f:
+                datos = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"⚠️ Cache de embeddings ilegible, se ignora: {e}")
+            return
+
+        if datos.get('modelo') != self.modelo_nombre or datos.get('dimension') != self.dimension:
+            logger.warning("⚠️ Cache de embeddings de otro modelo/dimensión, se ignora")
+            return
+        self._reiniciar = False
+
+        filas_en_disco = os.path.getsize(self.ruta_vectores) // (4 * self.dimension)
+        if filas_en_disco:
+            self._vectores = np.memmap(
+                self.ruta_vectores, dtype=np.float32, mode='r',
+                shape=(filas_en_disco, self.dimension)
+            )
+
+        # Descartar claves que apunten fuera del archivo (escritura interrumpida)
+        self.filas = {h: fila for h, fila in datos.get('filas', {}).items() if fila < filas_en_disco}
+
+    def __len__(self) -> int:
+        return len(self.filas)
+
+    def obtener(self, hashes: List[str]) -> Dict[str, np.ndarray]:
+        """Devuelve los vectores cacheados para los hashes pedidos"""
+        encontrados = {}
+        filas_en_disco = len(self._vectores)
+        for h in hashes:
+            fila = self.filas.get(h)
+            if fila is None:
+                continue
+            if fila < filas_en_disco:
+                encontrados[h] = np.asarray(self._vectores[fila])
+            else:
+                encontrados[h] = self._pendientes[fila - filas_en_disco]
+        return encontrados
+
+    def agregar(self, hashes: List[str], vectores: np.ndarray):
+        """Agrega vectores nuevos al cache (se persisten con guardar())"""
+        vectores = np.asarray(vectores, dtype=np.float32)
+        for h, vector in zip(hashes, vectores):
+            if h in self.filas:
+                continue
+            self.filas[h] = len(self._vectores) + len(self._pendientes)
+            self._pendientes.append(vector)
+
+    def guardar(self):
+        """Persiste los vectores pendientes y el índice de claves"""
+        if not self._pendientes:
+            return
+
+        self.directorio.mkdir(parents=True, exist_ok=True)
+
+        # Los vectores se agregan al final; las filas existentes no se tocan
+        with open(self.ruta_vectores, 'wb' if self._reiniciar else 'ab') as f:
+            f.write(np.stack(self._pendientes).astype(np.float32).tobytes())
+
+        datos = {
+            'modelo': self.modelo_nombre,
+            'dimension': self.dimension,
+            'filas': self.filas,
+        }
+        ruta_temporal = self.ruta_claves.with_suffix('.json.tmp')
+        with open(ruta_temporal, 'w', encoding='utf-8') as f:
+            json.dump(datos, f)
+        os.replace(ruta_temporal, self.ruta_claves)
+
+        logger.info(f"💾 Cache de embeddings actualizado: {len(self.filas)} vectores ({len(self._pendientes)} nuevos)")
+
+        self._pendientes = []
+        self._reiniciar = False
+        filas_en_disco = os.path.getsize(self.ruta_vectores) // (4 * self.dimension)
+        self._vectores = np.memmap(
+            self.ruta_vectores, dtype=np.float32, mode='r',
+            shape=(filas_en_disco, self.dimension)
+        )
+
+
+class CacheConsultasLRU:
+    """Cache acotado de vectores de consultas con desalojo LRU"""
+
+    def __init__(self, capacidad: int = 1024):
+        """
+        Args:
+            capacidad: Cantidad máxima de consultas cacheadas (0 = deshabilitado)
+        """
+        self.capacidad = capacidad
+        self._vectores: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def obtener(self, consulta_normalizada: str) -> Optional[np.ndarray]:
+        """Devuelve el vector cacheado y lo marca como usado recientemente"""
+        vector = self._vectores.get(consulta_normalizada)
+        if vector is None:
+            self.fallos += 1
+            return None
+        self._vectores.move_to_end(consulta_normalizada)
+        self.aciertos += 1
+        return vector
+
+    def agregar(self, consulta_normalizada: str, vector: np.ndarray):
+        """Guarda un vector desalojando el menos usado si se supera la capacidad"""
+        if self.capacidad <= 0:
+            return
+        self._vectores[consulta_normalizada] = vector
+        self._vectores.move_to_end(consulta_normalizada)
+        while len(self._vectores) > self.capacidad:
+            self._vectores.popitem(last=False)
+
+    def limpiar(self):
+        """Vacía el cache (por ejemplo, al cambiar de modelo)"""
+        self._vectores.clear()
+
+    def __len__(self) -> int:
+        return len(self._vectores)
+
+    def estadisticas(self) -> Dict[str, Any]:
+        """Contadores de uso del cache"""
+        total = self.aciertos + self.fallos
+        return {
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'tasa_aciertos': self.aciertos / total if total else 0.0,
+            'tamano': len(self._vectores),
+            'capacidad': self.capacidad,
+        }
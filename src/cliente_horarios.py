@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Cliente del Servidor de Consultas de Horarios
+Envía consultas al servidor residente (servidor_horarios.py) por socket Unix
+
+Protocolo: un mensaje JSON por línea en cada sentido. Cada solicitud lleva
+una operación ('ping', 'buscar', 'estado', ...) y sus parámetros; la respuesta
+trae 'ok' y, según el caso, 'resultados' o 'error'.
+
+Autor: Sistema RAG MVP
+Fecha: 2025-08-10
+"""
+
+import json
+import os
+import socket
+from typing import Any, Dict, List, Optional
+
+try:
+    from .config_paths import RAG_SOCKET_FILE
+except ImportError:
+    from config_paths import RAG_SOCKET_FILE
+
+
+class ErrorServidor(Exception):
+    """El servidor respondió con un error o cerró la conexión"""
+
+
+class ClienteHorarios:
+    """Cliente bloqueante para el servidor de consultas"""
+
+    def __init__(self, ruta_socket: Optional[str] = None, timeout: float = 30.0):
+        """
+        Args:
+            ruta_socket: Socket del servidor (None = ubicación por defecto)
+            timeout: Segundos máximos de espera por respuesta
+        """
+        self.ruta_socket = str(ruta_socket or RAG_SOCKET_FILE)
+        self.timeout = timeout
+
+    def solicitar(self, mensaje: Dict[str, Any]) -> Dict[str, Any]:
+        """Envía una solicitud y devuelve la respuesta completa"""
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conexion:
+            conexion.settimeout(self.timeout)
+            conexion.connect(self.ruta_socket)
+            conexion.sendall(json.dumps(mensaje, ensure_ascii=False).encode('utf-8') + b'\n')
+            with conexion.makefile('rb') as lector:
+                linea = lector.readline()
+
+        if not linea:
+            raise ErrorServidor("El servidor cerró la conexión sin responder")
+        respuesta = json.loads(linea)
+        if not respuesta.get('ok'):
+            raise ErrorServidor(respuesta.get('error', 'Error desconocido del servidor'))
+        return respuesta
+
+    def disponible(self) -> bool:
+        """Indica si hay un servidor escuchando en el socket"""
+        if not hasattr(socket, 'AF_UNIX') or not os.path.exists(self.ruta_socket):
+            return False
+        try:
+            self.solicitar({'op': 'ping'})
+            return True
+        except (OSError, ValueError, ErrorServidor):
+            return False
+
+    def buscar(self, consulta: str, k: int = 5, modo: Optional[str] = None,
+               directorio_sistema: Optional[str] = None) -> List[Dict]:
+        """
+        Resultados estructurados de una consulta (mismo formato que ConsultorHorarios.procesar_consulta)
+
+        Args:
+            directorio_sistema: Si se indica, el servidor rechaza la consulta si sirve otro sistema
+        """
+        mensaje = {'op': 'buscar', 'consulta': consulta, 'k': k, 'modo': modo}
+        if directorio_sistema:
+            mensaje['sistema'] = os.path.realpath(directorio_sistema)
+        return self.solicitar(mensaje)['resultados']
+
+    def recargar(self) -> Dict[str, Any]:
+        """Pide al servidor activar la versión publicada del sistema ('recargado' y 'version')"""
+        respuesta = self.solicitar({'op': 'recargar'})
+        return {'recargado': respuesta['recargado'], 'version': respuesta['version']}
+
+    def estado(self) -> Dict[str, Any]:
+        """Estadísticas del servidor"""
+        return self.solicitar({'op': 'estado'})['estado']
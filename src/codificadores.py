@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Backends de Codificación de Embeddings
+Permite reemplazar SentenceTransformer (PyTorch fp32) por una exportación
+ONNX del mismo modelo con cuantización dinámica int8 para hosts solo-CPU
+
+Todos los codificadores exponen la misma interfaz que SentenceTransformer
+usada por los sistemas de embeddings: encode() y
+get_sentence_embedding_dimension().
+
+Uso:
+    python codificadores.py --exportar            # exporta y cuantiza el modelo
+    python codificadores.py --verificar           # deriva coseno ONNX vs torch
+
+Autor: Sistema RAG MVP
+Fecha: 2025-08-08
+"""
+
+import argparse
+import inspect
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+try:
+    from .config_paths import MODELOS_ONNX_DIR, RAG_SISTEMA_DIR
+except ImportError:
+    from config_paths import MODELOS_ONNX_DIR, RAG_SISTEMA_DIR
+
+logger = logging.getLogger(__name__)
+
+MODELO_POR_DEFECTO = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+BACKENDS = ('torch', 'onnx', 'onnx-int8')
+
+ARCHIVO_ONNX = "modelo.onnx"
+ARCHIVO_ONNX_INT8 = "modelo_int8.onnx"
+
+
+def directorio_onnx_modelo(modelo_nombre: str, directorio_base: Optional[str] = None) -> Path:
+    """Directorio donde se guarda la exportación ONNX de un modelo"""
+    base = Path(directorio_base) if directorio_base else MODELOS_ONNX_DIR
+    return base / modelo_nombre.replace('/', '__')
+
+
+class CodificadorOnnx:
+    """Codificador con onnxruntime y mean pooling, equivalente al SentenceTransformer exportado"""
+
+    def __init__(self, modelo_nombre: str, cuantizado: bool = True, directorio_base: Optional[str] = None,
+                 max_longitud: int = 128):
+        """
+        Args:
+            modelo_nombre: Modelo de sentence transformers exportado con exportar_onnx()
+            cuantizado: Si True usa la versión con cuantización dinámica int8
+            directorio_base: Directorio base de modelos ONNX (None = por defecto)
+            max_longitud: Longitud máxima en tokens (igual que el modelo original)
+        """
+        import onnxruntime
+        from transformers import AutoTokenizer
+
+        directorio = directorio_onnx_modelo(modelo_nombre, directorio_base)
+        archivo = directorio / (ARCHIVO_ONNX_INT8 if cuantizado else ARCHIVO_ONNX)
+        if not archivo.exists():
+            raise FileNotFoundError(
+                f"No existe {archivo}. Ejecuta primero: python codificadores.py --exportar --modelo {modelo_nombre}"
+            )
+
+        with open(directorio / "config_codificador.json", "r", encoding="utf-8") as f:
+            config = json.load(f)
+
+        self.modelo_nombre = modelo_nombre
+        self.max_longitud = config.get('max_longitud', max_longitud)
+        self.dimension = config['dimension']
+        self.tokenizer = AutoTokenizer.from_pretrained(str(directorio))
+
+        opciones = onnxruntime.SessionOptions()
+        opciones.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.sesion = onnxruntime.InferenceSession(str(archivo), opciones, providers=['CPUExecutionProvider'])
+        self.entradas = {entrada.name for entrada in self.sesion.get_inputs()}
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dimension
+
+    def encode(self, textos: List[str], batch_size: int = 32, show_progress_bar: bool = False,
+               convert_to_numpy: bool = True, **kwargs) -> np.ndarray:
+        """Codifica textos con mean pooling sobre los tokens (sin normalizar, igual que el original)"""
+        if isinstance(textos, str):
+            textos = [textos]
+
+        resultados = []
+        for inicio in range(0, len(textos), batch_size):
+            lote = textos[inicio:inicio + batch_size]
+            tokens = self.tokenizer(lote, padding=True, truncation=True,
+                                    max_length=self.max_longitud, return_tensors='np')
+            entradas = {nombre: tokens[nombre].astype(np.int64) for nombre in self.entradas if nombre in tokens}
+            salida_tokens = self.sesion.run(None, entradas)[0]
+
+            mascara = tokens['attention_mask'][..., None].astype(np.float32)
+            suma = (salida_tokens * mascara).sum(axis=1)
+            resultados.append(suma / np.clip(mascara.sum(axis=1), 1e-9, None))
+
+        if not resultados:
+            return np.empty((0, self.dimension), dtype=np.float32)
+        return np.concatenate(resultados).astype(np.float32)
+
+
+def crear_codificador(backend: str = 'torch', modelo_nombre: str = MODELO_POR_DEFECTO,
+                      directorio_onnx: Optional[str] = None):
+    """
+    Crea el codificador para el backend indicado
+
+    Args:
+        backend: 'torch' (SentenceTransformer), 'onnx' (fp32) u 'onnx-int8'
+        modelo_nombre: Nombre del modelo de sentence transformers
+        directorio_onnx: Directorio base de las exportaciones ONNX
+    """
+    if backend == 'torch':
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(modelo_nombre)
+    if backend in ('onnx', 'onnx-int8'):
+        return CodificadorOnnx(modelo_nombre, cuantizado=backend == 'onnx-int8', directorio_base=directorio_onnx)
+    raise ValueError(f"Backend de codificación desconocido: {backend} (opciones: {', '.join(BACKENDS)})")
+
+
+def identificador_codificador(modelo_nombre: str, backend: str) -> str:
+    """Identificador de modelo + backend (los vectores de distintos backends no son intercambiables)"""
+    return modelo_nombre if backend == 'torch' else f"{modelo_nombre}@{backend}"
+
+
+def exportar_onnx(modelo_nombre: str = MODELO_POR_DEFECTO, directorio_base: Optional[str] = None,
+                  cuantizar: bool = True) -> Path:
+    """
+    Exporta el transformer del modelo a ONNX y genera la versión int8 dinámica
+
+    Returns:
+        Directorio con modelo.onnx, modelo_int8.onnx, tokenizer y configuración
+    """
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from sentence_transformers import SentenceTransformer
+
+    directorio = directorio_onnx_modelo(modelo_nombre, directorio_base)
+    directorio.mkdir(parents=True, exist_ok=True)
+
+    logger.info(f"📦 Exportando {modelo_nombre} a ONNX en {directorio}")
+    modelo_st = SentenceTransformer(modelo_nombre, device='cpu')
+    transformer = modelo_st[0].auto_model.eval()
+    tokenizer = modelo_st.tokenizer
+    tokenizer.save_pretrained(str(directorio))
+
+    ejemplo = tokenizer(["Materia: Álgebra I"], return_tensors='pt')
+    nombres_entrada = [nombre for nombre in ('input_ids', 'attention_mask', 'token_type_ids') if nombre in ejemplo]
+    ejes_dinamicos = {nombre: {0: 'lote', 1: 'secuencia'} for nombre in nombres_entrada}
+    ejes_dinamicos['token_embeddings'] = {0: 'lote', 1: 'secuencia'}
+
+    # Exportador clásico (TorchScript); las versiones nuevas de torch usan dynamo por defecto
+    opciones_export = {}
+    if 'dynamo' in inspect.signature(torch.onnx.export).parameters:
+        opciones_export['dynamo'] = False
+
+    class TokensTransformer(torch.nn.Module):
+        """Llama al transformer con argumentos por nombre y devuelve solo los embeddings por token"""
+
+        def __init__(self):
+            super().__init__()
+            self.transformer = transformer
+
+        def forward(self, *entradas):
+            return self.transformer(**dict(zip(nombres_entrada, entradas))).last_hidden_state
+
+    ruta_onnx = directorio / ARCHIVO_ONNX
+    with torch.no_grad():
+        torch.onnx.export(
+            TokensTransformer(),
+            tuple(ejemplo[nombre] for nombre in nombres_entrada),
+            str(ruta_onnx),
+            input_names=nombres_entrada,
+            output_names=['token_embeddings'],
+            dynamic_axes=ejes_dinamicos,
+            opset_version=14,
+            **opciones_export,
+        )
+
+    if cuantizar:
+        logger.info("🗜️ Aplicando cuantización dinámica int8")
+        quantize_dynamic(str(ruta_onnx), str(directorio / ARCHIVO_ONNX_INT8), weight_type=QuantType.QInt8)
+
+    with open(directorio / "config_codificador.json", "w", encoding="utf-8") as f:
+        json.dump({
+            'modelo_nombre': modelo_nombre,
+            'dimension': modelo_st.get_sentence_embedding_dimension(),
+            'max_longitud': modelo_st.max_seq_length,
+        }, f, ensure_ascii=False, indent=2)
+
+    logger.info(f"✅ Exportación ONNX lista en {directorio}")
+    return directorio
+
+
+def verificar_paridad(referencia, codificador, textos: List[str], batch_size: int = 32) -> Dict[str, Any]:
+    """
+    Mide la deriva coseno entre un codificador y el de referencia (torch)
+
+    Returns:
+        Estadísticas de similitud coseno por texto entre ambos vectores y
+        coincidencia del vecino más cercano entre textos
+    """
+    vectores_ref = np.asarray(referencia.encode(textos, batch_size=batch_size, convert_to_numpy=True), dtype=np.float32)
+    vectores = np.asarray(codificador.encode(textos, batch_size=batch_size, convert_to_numpy=True), dtype=np.float32)
+
+    vectores_ref /= np.linalg.norm(vectores_ref, axis=1, keepdims=True)
+    vectores /= np.linalg.norm(vectores, axis=1, keepdims=True)
+    cosenos = (vectores_ref * vectores).sum(axis=1)
+
+    # El vecino más cercano de cada texto debería ser el mismo con ambos codificadores
+    similitudes_ref = vectores_ref @ vectores_ref.T
+    similitudes = vectores @ vectores.T
+    np.fill_diagonal(similitudes_ref, -np.inf)
+    np.fill_diagonal(similitudes, -np.inf)
+    coincidencia_vecino = float(np.mean(similitudes_ref.argmax(axis=1) == similitudes.argmax(axis=1))) if len(textos) > 1 else 1.0
+
+    return {
+        'textos': len(textos),
+        'coseno_medio': float(cosenos.mean()),
+        'coseno_minimo': float(cosenos.min()),
+        'coseno_p05': float(np.percentile(cosenos, 5)),
+        'deriva_maxima': float(1.0 - cosenos.min()),
+        'coincidencia_vecino_mas_cercano': coincidencia_vecino,
+    }
+
+
+def _textos_de_prueba(limite: int = 200) -> List[str]:
+    """Textos reales del sistema RAG para medir la paridad"""
+    try:
+        from .sistema_embeddings_horarios import SistemaEmbeddingsHorarios
+    except ImportError:
+        from sistema_embeddings_horarios import SistemaEmbeddingsHorarios
+
+    sistema = SistemaEmbeddingsHorarios().cargar_sistema_horarios(str(RAG_SISTEMA_DIR))
+    textos = [doc['contenido'] for doc in sistema.documentos[:limite]]
+    textos += [
+        "¿Cuándo se dicta Análisis Matemático I?",
+        "¿Qué materias hay los martes por la tarde?",
+        "Horarios de Algoritmos y Estructuras de Datos",
+        "Clases de noche",
+    ]
+    return textos
+
+
+def main():
+    """Exporta el modelo a ONNX y/o reporta la deriva respecto de torch"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="Backends ONNX para los sistemas de embeddings")
+    parser.add_argument("--modelo", default=MODELO_POR_DEFECTO, help="Modelo de sentence transformers")
+    parser.add_argument("--directorio", default=None, help="Directorio base de modelos ONNX")
+    parser.add_argument("--exportar", action="store_true", help="Exportar y cuantizar el modelo")
+    parser.add_argument("--verificar", action="store_true", help="Medir deriva coseno contra torch")
+    parser.add_argument("--backend", default="onnx-int8", choices=['onnx', 'onnx-int8'], help="Backend a verificar")
+    args = parser.parse_args()
+
+    if args.exportar:
+        exportar_onnx(args.modelo, args.directorio)
+
+    if args.verificar:
+        textos = _textos_de_prueba()
+        referencia = crear_codificador('torch', args.modelo)
+        codificador = crear_codificador(args.backend, args.modelo, args.directorio)
+        reporte = verificar_paridad(referencia, codificador, textos)
+        print(json.dumps(reporte, ensure_ascii=False, indent=2))
+
+    if not (args.exportar or args.verificar):
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@ Centraliza todas las rutas según la estructura establecida en el checklist
 """
 
 import os
+import tempfile
 from pathlib import Path
 
 # Directorio base del proyecto
@@ -35,9 +36,23 @@ MATERIAS_UNIFICADAS_FILE = DATOS_PROCESADOS_DIR / "materias_unificadas_20250727_
 MATERIAS_NORMALIZADAS_FILE = DATOS_PROCESADOS_DIR / "materias_normalizadas.json"
 
 # Sistema RAG
-RAG_DOCUMENTOS_FILE = RAG_SISTEMA_DIR / "documentos_horarios.json"
+RAG_DOCUMENTOS_FILE = RAG_SISTEMA_DIR / "documentos_horarios.json"  # formato anterior (solo lectura)
+RAG_DOCUMENTOS_BIN_FILE = RAG_SISTEMA_DIR / "documentos_horarios.bin"
 RAG_INDICE_FILE = RAG_SISTEMA_DIR / "indice_horarios.faiss"
 RAG_METADATOS_FILE = RAG_SISTEMA_DIR / "metadatos_horarios.json"
+RAG_CAMBIOS_FILE = RAG_SISTEMA_DIR / "cambios_documentos.jsonl"
+RAG_CONFLICTOS_FILE = RAG_SISTEMA_DIR / "conflictos_horarios.npy"  # bits empaquetados, memory-map
+RAG_COMISIONES_FILE = RAG_SISTEMA_DIR / "comisiones_horarios.json"  # filas de la matriz de conflictos
+RAG_CACHE_EMBEDDINGS_DIR = RAG_SISTEMA_DIR / "cache_embeddings"
+RAG_VERSIONES_DIR = RAG_SISTEMA_DIR / "versiones"
+RAG_VERSION_ACTUAL_FILE = RAG_SISTEMA_DIR / "ACTUAL"
+RAG_MANIFIESTO_FILE = RAG_VERSIONES_DIR / "manifiesto.json"  # dentro de cada versión
+
+# Socket del servidor de consultas (ruta corta: los sockets Unix admiten ~100 caracteres)
+RAG_SOCKET_FILE = Path(os.environ.get("RAG_HORARIOS_SOCKET", Path(tempfile.gettempdir()) / "rag_horarios.sock"))
+
+# Modelos de embeddings exportados (backend ONNX)
+MODELOS_ONNX_DIR = BASE_DIR / "modelos" / "onnx"
 
 # Archivos de descubrimiento
 INVENTARIO_SITIOS_FILE = DESCUBRIMIENTO_DIR / "inventario_sitios.json"
@@ -10,14 +10,23 @@ Fecha: 2025-07-27
 import argparse
 import sys
 import os
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import re
+import time
 from datetime import datetime
 import logging
 try:
-    from .sistema_embeddings_horarios import SistemaEmbeddingsHorarios
+    from .sistema_embeddings_horarios import SistemaEmbeddingsHorarios, MODOS_BUSQUEDA
+    from .cliente_horarios import ClienteHorarios, ErrorServidor
+    from .generador_horarios import mostrar_reporte
+    from .ocupacion_horarios import dibujar_mapa_calor
+    from .config_paths import RAG_SISTEMA_DIR
 except ImportError:
-    from sistema_embeddings_horarios import SistemaEmbeddingsHorarios
+    from sistema_embeddings_horarios import SistemaEmbeddingsHorarios, MODOS_BUSQUEDA
+    from cliente_horarios import ClienteHorarios, ErrorServidor
+    from generador_horarios import mostrar_reporte
+    from ocupacion_horarios import dibujar_mapa_calor
+    from config_paths import RAG_SISTEMA_DIR
 
 # Configuración de logging
 logging.basicConfig(
@@ -29,16 +38,22 @@ logger = logging.getLogger(__name__)
 class ConsultorHorarios:
     """Interfaz de consulta especializada para horarios académicos"""
     
-    def __init__(self, directorio_sistema: str = "rag_sistema_horarios"):
+    def __init__(self, directorio_sistema: str = str(RAG_SISTEMA_DIR), modo_busqueda: str = "vectorial",
+                 usar_servidor: bool = True, ruta_socket: Optional[str] = None):
         """
         Inicializa el consultor de horarios
         
         Args:
             directorio_sistema: Directorio donde está guardado el sistema RAG
+            modo_busqueda: 'vectorial', 'lexico' (BM25) o 'hibrido' (fusión RRF)
+            usar_servidor: Si True, las consultas individuales usan el servidor residente si está corriendo
+            ruta_socket: Socket del servidor residente (None = ubicación por defecto)
         """
-        self.sistema = SistemaEmbeddingsHorarios()
+        self.sistema = SistemaEmbeddingsHorarios(modo_busqueda=modo_busqueda)
         self.directorio_sistema = directorio_sistema
         self.sistema_cargado = False
+        self.usar_servidor = usar_servidor
+        self.ruta_socket = ruta_socket
         
         # Comandos especiales
         self.comandos_especiales = {
@@ -60,77 +75,77 @@ class ConsultorHorarios:
         try:
             if not os.path.exists(self.directorio_sistema):
                 print(f"❌ No se encontró el sistema RAG en: {self.directorio_sistema}")
-                print("💡 Ejecuta primero: python sistema_embeddings_horarios.py")
+                print("💡 Ejecuta primero: python sistema_embeddings_horarios.py, o indica otro directorio con --sistema")
                 return False
             
             print("🔄 Cargando sistema RAG de horarios...")
+            inicio = time.perf_counter()
             self.sistema.cargar_sistema_horarios(self.directorio_sistema)
             self.sistema_cargado = True
-            print("✅ Sistema RAG de horarios cargado exitosamente")
+            print(f"✅ Sistema RAG de horarios cargado exitosamente ({time.perf_counter() - inicio:.2f}s)")
             return True
             
         except Exception as e:
             print(f"❌ Error cargando el sistema: {e}")
             return False
 
-    def procesar_consulta(self, consulta: str, k: int = 5) -> List[Dict]:
+    def procesar_consulta(self, consulta: str, k: int = 5, modo: str = None) -> List[Dict]:
         """Procesa una consulta y devuelve resultados estructurados"""
         if not self.sistema_cargado:
             return []
-        
+
         try:
-            # Buscar similitudes
-            resultados = self.sistema.buscar_similares_horarios(consulta, k=k)
-            
-            resultados_estructurados = []
-            for doc, score in resultados:
-                materia = doc['materia_original']
-                metadatos = doc['metadatos']
-                
-                # Estructura resultado
-                resultado = {
-                    'score': score,
-                    'nombre': metadatos['materia_nombre'],
-                    'nombre_normalizado': metadatos['materia_normalizada'],
-                    'departamento': metadatos['departamento_nombre'],
-                    'codigo_dept': metadatos['departamento_codigo'],
-                    'tiene_horarios': metadatos['tiene_horarios'],
-                    'horarios': [],
-                    'docentes': [],
-                    'periodo': metadatos.get('periodo', {})
-                }
-                
-                # Procesar horarios
-                if materia.get('horarios'):
-                    for horario in materia['horarios']:
-                        resultado['horarios'].append({
-                            'dia': horario.get('dia', ''),
-                            'hora_inicio': horario.get('hora_inicio', ''),
-                            'hora_fin': horario.get('hora_fin', ''),
-                            'tipo': horario.get('tipo_actividad', ''),
-                            'comision': horario.get('comision', ''),
-                            'aula': horario.get('aula', '')
-                        })
-                
-                # Procesar docentes
-                if materia.get('docentes'):
-                    for docente in materia['docentes']:
-                        if isinstance(docente, dict):
-                            resultado['docentes'].append({
-                                'nombre': docente.get('nombre', ''),
-                                'rol': docente.get('rol', '')
-                            })
-                        else:
-                            resultado['docentes'].append({'nombre': str(docente), 'rol': ''})
-                
-                resultados_estructurados.append(resultado)
-            
-            return resultados_estructurados
-            
+            # Criterios estructurados desde los índices exactos; el resto por similitud
+            resultados, _ = self.sistema.buscar_con_intencion(consulta, k=k, modo=modo)
+            return [self.estructurar_resultado(doc, score) for doc, score in resultados]
+
         except Exception as e:
             print(f"❌ Error procesando consulta: {e}")
             return []
 
+    def estructurar_resultado(self, doc: Dict, score: float) -> Dict:
+        """Convierte un documento encontrado en un resultado serializable"""
+        materia = doc['materia_original']
+        metadatos = doc['metadatos']
+
+        # Estructura resultado
+        resultado = {
+            'score': score,
+            'nombre': metadatos['materia_nombre'],
+            'nombre_normalizado': metadatos['materia_normalizada'],
+            'departamento': metadatos['departamento_nombre'],
+            'codigo_dept': metadatos['departamento_codigo'],
+            'tiene_horarios': metadatos['tiene_horarios'],
+            'horarios': [],
+            'docentes': [],
+            'periodo': metadatos.get('periodo', {})
+        }
+
+        # Procesar horarios
+        if materia.get('horarios'):
+            for horario in materia['horarios']:
+                resultado['horarios'].append({
+                    'dia': horario.get('dia', ''),
+                    'hora_inicio': horario.get('hora_inicio', ''),
+                    'hora_fin': horario.get('hora_fin', ''),
+                    'tipo': horario.get('tipo_actividad', ''),
+                    'comision': horario.get('comision', ''),
+                    'aula': horario.get('aula', '')
+                })
+
+        # Procesar docentes
+        if materia.get('docentes'):
+            for docente in materia['docentes']:
+                if isinstance(docente, dict):
+                    resultado['docentes'].append({
+                        'nombre': docente.get('nombre', ''),
+                        'rol': docente.get('rol', '')
+                    })
+                else:
+                    resultado['docentes'].append({'nombre': str(docente), 'rol': ''})
+
+        return resultado
+
     def mostrar_resultado(self, resultado: Dict, indice: int):
         """Muestra un resultado de forma estructurada"""
         score = resultado['score']
@@ -192,7 +207,7 @@ class ConsultorHorarios:
                 print(f"   📅 Período: {' '.join(info_periodo)}")
 
     def buscar_por_dia(self, dia: str = None):
-        """Busca materias por día específico"""
+        """Busca materias por día específico (todas, desde el índice de horarios)"""
         if not dia:
             dia = input("📅 Ingresa el día (lunes, martes, etc.): ").strip().lower()
         
@@ -200,40 +215,101 @@ class ConsultorHorarios:
             print("❌ Debe especificar un día")
             return
         
-        consulta = f"materias clases {dia} cursada"
-        print(f"\n🔍 Buscando materias que se dictan los {dia}...")
-        
-        resultados = self.procesar_consulta(consulta, k=10)
+        if not self.sistema_cargado:
+            print("❌ Sistema no cargado")
+            return
         
-        # Filtrar por día específico
-        resultados_filtrados = []
-        for resultado in resultados:
-            for horario in resultado['horarios']:
-                if horario['dia'].lower() == dia.lower():
-                    resultados_filtrados.append(resultado)
-                    break
+        print(f"\n🔍 Buscando materias que se dictan los {dia}...")
+        intencion = self.sistema.interpretador.interpretar(dia)
+        if not intencion['dias']:
+            print(f"❌ No se reconoce el día: {dia}")
+            return
         
-        if resultados_filtrados:
-            print(f"\n📚 Materias que se dictan los {dia}:")
-            for i, resultado in enumerate(resultados_filtrados[:8], 1):
-                self.mostrar_resultado(resultado, i)
+        resultados, _ = self.sistema.buscar_con_intencion(' '.join(intencion['dias']), k=None)
+        if resultados:
+            print(f"\n📚 {len(resultados)} materias se dictan los {dia}:")
+            for i, (doc, score) in enumerate(resultados, 1):
+                self.mostrar_resultado(self.estructurar_resultado(doc, score), i)
         else:
             print(f"❌ No se encontraron materias para los {dia}")
 
     def buscar_por_franja(self, franja: str):
-        """Busca materias por franja horaria (mañana, tarde, noche)"""
-        consulta = f"materias clases {franja} horarios cursada"
-        print(f"\n🔍 Buscando materias de {franja}...")
+        """Busca materias por franja horaria (mañana, tarde, noche), desde el índice de horarios"""
+        if not self.sistema_cargado:
+            print("❌ Sistema no cargado")
+            return
         
-        resultados = self.procesar_consulta(consulta, k=10)
+        print(f"\n🔍 Buscando materias de {franja}...")
+        resultados, _ = self.sistema.buscar_con_intencion(franja, k=None)
         
         if resultados:
-            print(f"\n📚 Materias de {franja}:")
-            for i, resultado in enumerate(resultados[:6], 1):
-                self.mostrar_resultado(resultado, i)
+            print(f"\n📚 {len(resultados)} materias de {franja}:")
+            for i, (doc, score) in enumerate(resultados, 1):
+                self.mostrar_resultado(self.estructurar_resultado(doc, score), i)
         else:
             print(f"❌ No se encontraron materias de {franja}")
 
+    def combinar_materias(self, argumentos: str):
+        """
+        Combinaciones de comisiones sin superposiciones para cursar varias materias juntas
+        
+        Formato: "materia 1, materia 2, ... | desde 10, hasta 20, sin viernes"
+        """
+        if not self.sistema_cargado:
+            print("❌ Sistema no cargado")
+            return
+        
+        texto_materias, _, texto_preferencias = argumentos.partition('|')
+        materias = [m.strip() for m in texto_materias.split(',') if m.strip()]
+        if len(materias) < 2:
+            print("❌ Indica al menos dos materias separadas por comas")
+            return
+        
+        preferencias = {'dias_libres': []}
+        for preferencia in texto_preferencias.split(','):
+            palabra, _, valor = preferencia.strip().partition(' ')
+            if palabra == 'desde' and valor:
+                preferencias['no_antes_de'] = valor.strip()
+            elif palabra == 'hasta' and valor:
+                preferencias['no_despues_de'] = valor.strip()
+            elif palabra == 'sin' and valor:
+                preferencias['dias_libres'].append(valor.strip())
+        
+        print(f"\n🗓️ Buscando combinaciones para: {', '.join(materias)}...")
+        mostrar_reporte(self.sistema.generar_horarios(materias, preferencias, max_soluciones=3))
+
+    def buscar_en_ventanas_libres(self, argumentos: str):
+        """
+        Materias que entran completas en las ventanas libres del estudiante
+        
+        Formato: "martes 14-18 y jueves mañana | interés opcional para ordenar"
+        """
+        if not self.sistema_cargado:
+            print("❌ Sistema no cargado")
+            return
+        
+        texto_ventanas, _, interes = argumentos.partition('|')
+        ventanas = self.sistema.interpretador.interpretar_ventanas(texto_ventanas)
+        if not ventanas:
+            print("❌ Indica días u horarios libres, por ejemplo: martes 14-18 y jueves mañana")
+            return
+        
+        descripcion = ', '.join(f"{dia} {desde // 60:02d}:{desde % 60:02d}-{hasta // 60:02d}:{hasta % 60:02d}"
+                                for dia, desde, hasta in ventanas)
+        print(f"\n🕳️ Buscando materias que entren en: {descripcion}...")
+        resultados = self.sistema.buscar_en_ventanas(ventanas, interes=interes.strip() or None)
+        if not resultados:
+            print("❌ Ninguna materia entra completa en esas ventanas")
+            return
+        
+        print(f"\n📚 {len(resultados)} materias entran en tus horarios libres:")
+        for i, resultado in enumerate(resultados, 1):
+            opcion = resultado['opciones'][0]
+            comisiones = ', '.join(opcion['comisiones'].values()) or 'única'
+            horarios = '; '.join(f"{h['dia']} {h['desde']}-{h['hasta']}" for h in opcion['horarios'])
+            otras = f" (+{len(resultado['opciones']) - 1} opciones)" if len(resultado['opciones']) > 1 else ""
+            print(f"{i:2d}. {resultado['documento']['metadatos']['materia_nombre']} [{comisiones}]{otras}: {horarios}")
+
     def listar_materias(self):
         """Lista todas las materias disponibles"""
         if not self.sistema_cargado:
@@ -267,30 +343,33 @@ class ConsultorHorarios:
         
         print("\n🏢 Departamentos disponibles:")
         
-        stats_dept = {}
-        for doc in self.sistema.documentos:
-            codigo = doc['metadatos']['departamento_codigo']
-            nombre = doc['metadatos']['departamento_nombre']
-            tiene_horarios = doc['metadatos']['tiene_horarios']
-            
-            if codigo not in stats_dept:
-                stats_dept[codigo] = {
-                    'nombre': nombre,
-                    'total': 0,
-                    'con_horarios': 0
-                }
-            
-            stats_dept[codigo]['total'] += 1
-            if tiene_horarios:
-                stats_dept[codigo]['con_horarios'] += 1
-        
-        for codigo, stats in sorted(stats_dept.items()):
+        for codigo, stats in self.sistema.ocupacion.resumen_departamentos().items():
             total = stats['total']
             con_horarios = stats['con_horarios']
             porcentaje = (con_horarios / total * 100) if total > 0 else 0
             
             print(f"   • {codigo}: {stats['nombre']}")
-            print(f"     📊 {total} materias, {con_horarios} con horarios ({porcentaje:.1f}%)")
+            print(f"     📊 {total} materias, {con_horarios} con horarios ({porcentaje:.1f}%), "
+                  f"{stats['horas_semanales']:.1f} horas de clase por semana")
+
+    def mostrar_ocupacion(self, valor: str = ""):
+        """Mapa de calor semanal de todas las clases o de un departamento, tipo de actividad o aula"""
+        if not self.sistema_cargado:
+            print("❌ Sistema no cargado")
+            return
+        
+        ocupacion = self.sistema.ocupacion
+        dimension = clave = None
+        if valor:
+            encontrada = ocupacion.buscar_clave(valor)
+            if encontrada is None:
+                print(f"❌ '{valor}' no es un departamento, tipo de actividad ni aula conocido")
+                return
+            dimension, clave = encontrada
+        
+        titulo = f"{dimension.replace('_', ' ')} {clave}" if clave else "todas las clases"
+        print(f"\n🗺️ Ocupación semanal ({titulo}):")
+        print(dibujar_mapa_calor(ocupacion.mapa_calor(dimension, clave), ocupacion.granularidad))
 
     def mostrar_estadisticas(self):
         """Muestra estadísticas del sistema"""
@@ -307,16 +386,33 @@ class ConsultorHorarios:
         print(f"   🕐 Con horarios: {con_horarios} ({con_horarios/total_docs*100:.1f}%)")
         print(f"   ❌ Sin horarios: {sin_horarios} ({sin_horarios/total_docs*100:.1f}%)")
         
-        # Estadísticas por día
-        dias_count = {}
-        for doc in self.sistema.documentos:
-            for dia in doc['metadatos']['dias_semana']:
-                dias_count[dia] = dias_count.get(dia, 0) + 1
-        
+        # Estadísticas por día y horas pico (agregadas al cargar el índice)
+        dias_count = self.sistema.ocupacion.materias_por_dia()
         if dias_count:
             print(f"\n📅 Materias por día:")
-            for dia, count in sorted(dias_count.items()):
+            for dia, count in dias_count.items():
                 print(f"   • {dia}: {count} materias")
+        
+        picos = self.sistema.ocupacion.horas_pico(3)
+        if picos:
+            print(f"\n🔥 Horas pico:")
+            for pico in picos:
+                print(f"   • {pico['dia']} {pico['desde']}-{pico['hasta']}: {pico['clases']} clases en simultáneo")
+        
+        # Modelo de embeddings (se carga recién con la primera consulta semántica)
+        if self.sistema.tiempo_carga_modelo is not None:
+            print(f"\n🤖 Modelo: {self.sistema.modelo_nombre} (cargado en {self.sistema.tiempo_carga_modelo:.2f}s)")
+        elif self.sistema.modelo_cargado:
+            print(f"\n🤖 Modelo: {self.sistema.modelo_nombre} (cargado)")
+        else:
+            print(f"\n🤖 Modelo: {self.sistema.modelo_nombre} (sin cargar)")
+        print(f"🔎 Modo de búsqueda: {self.sistema.modo_busqueda}")
+        
+        # Cache de consultas
+        cache = self.sistema.cache_consultas.estadisticas()
+        print(f"\n⚡ Cache de consultas:")
+        print(f"   • Aciertos: {cache['aciertos']} / Fallos: {cache['fallos']} ({cache['tasa_aciertos']*100:.1f}% aciertos)")
+        print(f"   • Ocupación: {cache['tamano']}/{cache['capacidad']} consultas")
 
     def mostrar_ejemplos(self):
         """Muestra ejemplos de consultas"""
@@ -345,6 +441,9 @@ class ConsultorHorarios:
    • /departamentos - Lista departamentos
    • /dias lunes - Materias de un día específico
    • /mañana, /tarde, /noche - Por franja horaria
+   • /combinar álgebra i, análisis ii | desde 10, sin viernes - Horarios sin superposiciones
+   • /libre martes 14-18 y jueves mañana | programación - Qué entra en tus horarios libres
+   • /ocupacion dc - Mapa de calor semanal (departamento, tipo de actividad o aula)
    • /exit - Salir del programa
         """)
 
@@ -375,6 +474,9 @@ de manera natural. Puedes hacer preguntas como si le hablaras a una persona.
    • /materias - Listar todas las materias
    • /departamentos - Información de departamentos
    • /dias [día] - Buscar por día específico
+   • /combinar m1, m2 [| desde HH:MM, hasta HH:MM, sin día] - Combinar comisiones
+   • /libre ventanas [| interés] - Materias que entran en tus horarios libres
+   • /ocupacion [departamento|tipo|aula] - Mapa de calor de la semana
    • /exit - Salir
         """)
 
@@ -397,18 +499,44 @@ de manera natural. Puedes hacer preguntas como si le hablaras a una persona.
             self.buscar_por_dia(dia)
             return True
         
+        if entrada.startswith('/combinar '):
+            self.combinar_materias(entrada[10:])
+            return True
+        
+        if entrada.startswith('/libre '):
+            self.buscar_en_ventanas_libres(entrada[7:])
+            return True
+        
+        if entrada == '/ocupacion' or entrada.startswith('/ocupacion '):
+            self.mostrar_ocupacion(entrada[10:].strip())
+            return True
+        
         return False
 
+    def consultar_servidor(self, consulta: str, k: int = 5) -> Optional[List[Dict]]:
+        """Resultados desde el servidor residente, o None si no hay uno disponible para este sistema"""
+        cliente = ClienteHorarios(self.ruta_socket)
+        if not cliente.disponible():
+            return None
+        try:
+            return cliente.buscar(consulta, k, self.sistema.modo_busqueda, self.directorio_sistema)
+        except (OSError, ValueError, ErrorServidor) as e:
+            logger.info(f"Servidor no utilizable, se consulta localmente: {e}")
+            return None
+
     def ejecutar_consulta_individual(self, consulta: str, k: int = 5):
         """Ejecuta una consulta individual y muestra resultados"""
-        if not self.cargar_sistema():
-            return
+        # Con el servidor corriendo no hace falta cargar el sistema en este proceso
+        resultados = self.consultar_servidor(consulta, k) if self.usar_servidor else None
+        
+        if resultados is None:
+            if not self.cargar_sistema():
+                return
+            resultados = self.procesar_consulta(consulta, k=k)
         
         print(f"\n🔍 Consulta: {consulta}")
         print("=" * 60)
         
-        resultados = self.procesar_consulta(consulta, k=k)
-        
         if resultados:
             print(f"\n📚 Encontrados {len(resultados)} resultados:")
             for i, resultado in enumerate(resultados, 1):
@@ -467,12 +595,17 @@ def main():
     parser = argparse.ArgumentParser(description="Sistema RAG de Consulta de Horarios Académicos")
     parser.add_argument("--consulta", "-c", type=str, help="Consulta específica a realizar")
     parser.add_argument("--resultados", "-k", type=int, default=5, help="Número de resultados (default: 5)")
-    parser.add_argument("--sistema", "-s", type=str, default="rag_sistema_horarios", help="Directorio del sistema RAG")
+    parser.add_argument("--sistema", "-s", type=str, default=str(RAG_SISTEMA_DIR), help="Directorio del sistema RAG")
     parser.add_argument("--interactivo", "-i", action="store_true", help="Modo interactivo")
+    parser.add_argument("--modo", "-m", choices=MODOS_BUSQUEDA, default="vectorial",
+                        help="Modo de recuperación: vectorial, lexico (BM25) o hibrido (default: vectorial)")
+    parser.add_argument("--sin-servidor", action="store_true",
+                        help="No usar el servidor residente (servidor_horarios.py) aunque esté corriendo")
+    parser.add_argument("--socket", type=str, default=None, help="Socket del servidor residente")
     
     args = parser.parse_args()
     
-    consultor = ConsultorHorarios(args.sistema)
+    consultor = ConsultorHorarios(args.sistema, args.modo, usar_servidor=not args.sin_servidor, ruta_socket=args.socket)
     
     if args.consulta:
         # Modo consulta única
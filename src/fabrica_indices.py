@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Fábrica de Índices FAISS para los Sistemas de Embeddings
+Índice exacto (Flat) o aproximado (HNSW, IVF-Flat, IVF-PQ) según el tamaño
+del corpus y el compromiso recall/latencia de cada despliegue
+
+Todos los índices usan producto interno sobre vectores normalizados
+(similitud coseno). El tipo y sus parámetros se guardan en los metadatos del
+sistema; los parámetros de búsqueda (nprobe, efSearch) se pueden ajustar al
+cargar sin reconstruir el índice.
+
+Uso:
+    python fabrica_indices.py --reporte            # recall@k y latencia de cada tipo
+    python fabrica_indices.py --compresion         # memoria y recall de fp32/fp16/sq8
+
+Autor: Sistema RAG MVP
+Fecha: 2025-08-09
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+from time import perf_counter
+from typing import Any, Dict, Iterable, List, Optional
+
+import faiss
+import numpy as np
+
+try:
+    from .config_paths import RAG_SISTEMA_DIR, RAG_INDICE_FILE
+    from .snapshots_horarios import resolver_directorio
+except ImportError:
+    from config_paths import RAG_SISTEMA_DIR, RAG_INDICE_FILE
+    from snapshots_horarios import resolver_directorio
+
+logger = logging.getLogger(__name__)
+
+TIPOS_INDICE = ('flat', 'hnsw', 'ivf-flat', 'ivf-pq')
+
+# Almacenamiento de los vectores: float32 completo, float16 o escalar de 8 bits
+COMPRESIONES = ('fp32', 'fp16', 'sq8')
+_CODIGOS_SQ = {'fp16': 'SQfp16', 'sq8': 'SQ8'}
+
+
+def parametros_por_defecto(tipo: str, dimension: int, n_vectores: int) -> Dict[str, int]:
+    """Parámetros razonables para el tipo de índice y el tamaño del corpus"""
+    if tipo == 'hnsw':
+        return {'M': 32, 'efConstruction': 200, 'efSearch': 64}
+    if tipo in ('ivf-flat', 'ivf-pq'):
+        # ~4·sqrt(n) listas, con al menos 39 vectores de entrenamiento por lista
+        nlist = max(1, min(int(4 * math.sqrt(n_vectores)), n_vectores // 39))
+        parametros = {'nlist': nlist, 'nprobe': min(nlist, max(1, nlist // 8))}
+        if tipo == 'ivf-pq':
+            # Subcuantizadores: el mayor divisor de la dimensión hasta d/8 (48 para 384)
+            parametros['m'] = max(m for m in range(1, max(1, dimension // 8) + 1) if dimension % m == 0)
+            # Con pocos vectores no se pueden entrenar 256 centroides por subespacio
+            parametros['nbits'] = max(1, min(8, int(math.log2(max(2, n_vectores)))))
+        return parametros
+    return {}
+
+
+def resolver_parametros(tipo: str, dimension: int, n_vectores: int,
+                        parametros: Optional[Dict[str, int]] = None) -> Dict[str, int]:
+    """Parámetros por defecto del tipo sobrescritos por los indicados"""
+    return {**parametros_por_defecto(tipo, dimension, n_vectores), **(parametros or {})}
+
+
+def descripcion_factory(tipo: str, parametros: Dict[str, int], compresion: str = 'fp32') -> str:
+    """Cadena de faiss.index_factory para el tipo de índice y el almacenamiento de vectores"""
+    if compresion not in COMPRESIONES:
+        raise ValueError(f"Compresión desconocida: {compresion} (opciones: {', '.join(COMPRESIONES)})")
+    codigo = _CODIGOS_SQ.get(compresion)
+    if tipo == 'flat':
+        return codigo or 'Flat'
+    if tipo == 'hnsw':
+        return f"HNSW{parametros['M']}" + (f",{codigo}" if codigo else '')
+    if tipo == 'ivf-flat':
+        return f"IVF{parametros['nlist']},{codigo or 'Flat'}"
+    if tipo == 'ivf-pq':
+        if codigo:
+            raise ValueError("IVF-PQ ya comprime los vectores: no admite fp16/sq8")
+        return f"IVF{parametros['nlist']},PQ{parametros['m']}x{parametros['nbits']}"
+    raise ValueError(f"Tipo de índice desconocido: {tipo} (opciones: {', '.join(TIPOS_INDICE)})")
+
+
+def crear_indice(tipo: str, dimension: int, vectores: np.ndarray,
+                 parametros: Optional[Dict[str, int]] = None, compresion: str = 'fp32') -> faiss.Index:
+    """
+    Crea y entrena (si corresponde) un índice vacío
+
+    Args:
+        tipo: 'flat', 'hnsw', 'ivf-flat' o 'ivf-pq'
+        dimension: Dimensión de los vectores
+        vectores: Vectores normalizados usados para entrenar (IVF, PQ y SQ)
+        parametros: Sobrescriben los parámetros por defecto del tipo
+        compresion: 'fp32', 'fp16' o 'sq8' (cuantización escalar de los vectores)
+
+    Returns:
+        Índice base listo para agregar vectores (sin IDs propios)
+    """
+    parametros = resolver_parametros(tipo, dimension, len(vectores), parametros)
+    indice = faiss.index_factory(dimension, descripcion_factory(tipo, parametros, compresion), faiss.METRIC_INNER_PRODUCT)
+
+    if tipo == 'hnsw':
+        indice.hnsw.efConstruction = parametros['efConstruction']
+    if tipo == 'ivf-pq':
+        # El factory activa el entrenamiento polisémico, que solo sirve para
+        # búsqueda por Hamming y multiplica el tiempo de entrenamiento
+        indice.do_polysemous_training = False
+    if not indice.is_trained:
+        indice.train(np.ascontiguousarray(vectores, dtype=np.float32))
+    configurar_busqueda(indice, parametros)
+    return indice
+
+
+def configurar_busqueda(indice: faiss.Index, parametros: Dict[str, int]):
+    """Aplica los parámetros de búsqueda (nprobe, efSearch) a un índice, con o sin IDMap"""
+    base = indice_base(indice)
+    if isinstance(base, faiss.IndexHNSW) and 'efSearch' in parametros:
+        base.hnsw.efSearch = parametros['efSearch']
+    if isinstance(base, faiss.IndexIVF) and 'nprobe' in parametros:
+        base.nprobe = parametros['nprobe']
+
+
+def indice_base(indice: faiss.Index) -> faiss.Index:
+    """Índice interno de un IndexIDMap/IndexIDMap2 (o el mismo índice)"""
+    if isinstance(indice, (faiss.IndexIDMap, faiss.IndexIDMap2)):
+        return faiss.downcast_index(indice.index)
+    return indice
+
+
+def parametros_busqueda(indice: faiss.Index, selector: Optional[faiss.IDSelector] = None) -> Optional[faiss.SearchParameters]:
+    """
+    SearchParameters del tipo que espera el índice
+
+    HNSW e IVF rechazan un SearchParameters genérico y, con uno propio, usan
+    sus valores en lugar de los del índice: se copian efSearch y nprobe.
+    """
+    base = indice_base(indice)
+    if isinstance(base, faiss.IndexHNSW):
+        parametros = faiss.SearchParametersHNSW(efSearch=base.hnsw.efSearch)
+    elif isinstance(base, faiss.IndexIVF):
+        parametros = faiss.SearchParametersIVF(nprobe=base.nprobe)
+    elif selector is None:
+        return None
+    else:
+        parametros = faiss.SearchParameters()
+    if selector is not None:
+        parametros.sel = selector
+    return parametros
+
+
+def vectores_indice(indice: faiss.Index) -> np.ndarray:
+    """Vectores almacenados en el orden interno del índice (aproximados en PQ)"""
+    base = indice_base(indice)
+    if isinstance(base, faiss.IndexIVF):
+        base.make_direct_map()
+    return base.reconstruct_n(0, base.ntotal)
+
+
+def quitar_ids(indice: faiss.IndexIDMap2, ids: np.ndarray) -> faiss.IndexIDMap2:
+    """
+    Quita vectores por ID externo
+
+    IndexIDMap2 asume que el índice base compacta las posiciones al borrar,
+    como hacen Flat y los cuantizadores escalares. HNSW no admite borrado e
+    IVF conserva las posiciones internas, lo que desalinea el mapa de IDs:
+    en esos casos se reconstruye el índice (ya entrenado) con los vectores
+    restantes.
+
+    Returns:
+        El mismo índice, o uno nuevo si hubo que reconstruirlo
+    """
+    base = indice_base(indice)
+    if isinstance(base, faiss.IndexFlatCodes):
+        indice.remove_ids(ids)
+        return indice
+
+    ids_actuales = faiss.vector_to_array(indice.id_map)
+    conservar = ~np.isin(ids_actuales, ids)
+    vectores = vectores_indice(indice)
+
+    nuevo_base = faiss.clone_index(base)
+    nuevo_base.reset()
+    nuevo = faiss.IndexIDMap2(nuevo_base)
+    nuevo.add_with_ids(vectores[conservar], ids_actuales[conservar])
+    return nuevo
+
+
+def comprimir_indice(indice: faiss.IndexIDMap2, tipo: str, parametros: Dict[str, int],
+                     compresion: str) -> faiss.IndexIDMap2:
+    """
+    Reconstruye un índice con otro almacenamiento de vectores, conservando los IDs
+
+    Los vectores se obtienen del propio índice: pasar de fp16/sq8 a una forma
+    más precisa no recupera la precisión perdida.
+    """
+    vectores = vectores_indice(indice)
+    ids = faiss.vector_to_array(indice.id_map)
+    nuevo = faiss.IndexIDMap2(crear_indice(tipo, indice.d, vectores, parametros, compresion))
+    nuevo.add_with_ids(vectores, ids)
+    return nuevo
+
+
+def bytes_indice(indice: faiss.Index) -> int:
+    """Tamaño serializado del índice (aproxima la memoria que ocupa cargado)"""
+    return int(faiss.serialize_index(indice).nbytes)
+
+
+def medir_indice(indice: faiss.Index, vectores: np.ndarray, consultas: np.ndarray, k: int = 10) -> Dict[str, float]:
+    """
+    Recall@k contra búsqueda exacta y latencia por consulta
+
+    Args:
+        indice: Índice ya poblado con `vectores` (en el mismo orden)
+        vectores: Vectores normalizados indexados
+        consultas: Vectores de consulta normalizados
+        k: Vecinos a comparar (con menos de k vectores se comparan todos)
+    """
+    k_efectivo = min(k, len(vectores))
+    exacto = faiss.IndexFlatIP(vectores.shape[1])
+    exacto.add(np.ascontiguousarray(vectores, dtype=np.float32))
+    _, vecinos_exactos = exacto.search(consultas, k_efectivo)
+
+    parametros = parametros_busqueda(indice)
+    latencias = []
+    vecinos = np.empty_like(vecinos_exactos)
+    for i, consulta in enumerate(consultas):
+        inicio = perf_counter()
+        _, fila = indice.search(consulta[None, :], k_efectivo, params=parametros)
+        latencias.append((perf_counter() - inicio) * 1000)
+        vecinos[i] = fila[0]
+
+    aciertos = sum(len(set(fila) & set(exacta)) for fila, exacta in zip(vecinos, vecinos_exactos))
+    return {
+        f'recall_at_{k}': aciertos / (k_efectivo * len(consultas)),
+        'latencia_ms_p50': float(np.percentile(latencias, 50)),
+        'latencia_ms_p95': float(np.percentile(latencias, 95)),
+    }
+
+
+def consultas_sinteticas(vectores: np.ndarray, cantidad: int = 200, ruido: float = 0.05, semilla: int = 0) -> np.ndarray:
+    """Consultas cercanas a documentos existentes (vectores con ruido, normalizados)"""
+    generador = np.random.default_rng(semilla)
+    elegidos = vectores[generador.integers(0, len(vectores), cantidad)]
+    consultas = elegidos + generador.normal(0, ruido, elegidos.shape).astype(np.float32)
+    return (consultas / np.linalg.norm(consultas, axis=1, keepdims=True)).astype(np.float32)
+
+
+def reporte_indices(vectores: np.ndarray, consultas: np.ndarray, k: int = 10,
+                    tipos: Iterable[str] = TIPOS_INDICE,
+                    parametros: Optional[Dict[str, Dict[str, int]]] = None) -> List[Dict[str, Any]]:
+    """
+    Construye cada tipo de índice y reporta tiempo de construcción, memoria,
+    recall@k contra Flat y latencia de consulta
+    """
+    vectores = np.ascontiguousarray(vectores, dtype=np.float32)
+    reporte = []
+    for tipo in tipos:
+        parametros_tipo = resolver_parametros(tipo, vectores.shape[1], len(vectores), (parametros or {}).get(tipo))
+        inicio = perf_counter()
+        indice = crear_indice(tipo, vectores.shape[1], vectores, parametros_tipo)
+        indice.add(vectores)
+        tiempo_construccion = perf_counter() - inicio
+
+        reporte.append({
+            'tipo': tipo,
+            'factory': descripcion_factory(tipo, parametros_tipo),
+            'tiempo_construccion_s': tiempo_construccion,
+            'bytes': bytes_indice(indice),
+            **medir_indice(indice, vectores, consultas, k),
+        })
+    return reporte
+
+
+def reporte_compresion(vectores: np.ndarray, consultas: np.ndarray, k: int = 10, tipo: str = 'flat',
+                       parametros: Optional[Dict[str, int]] = None,
+                       compresiones: Iterable[str] = COMPRESIONES) -> List[Dict[str, Any]]:
+    """Memoria por vector, recall@k contra float32 exacto y latencia de cada compresión"""
+    vectores = np.ascontiguousarray(vectores, dtype=np.float32)
+    reporte = []
+    for compresion in compresiones:
+        indice = crear_indice(tipo, vectores.shape[1], vectores, parametros, compresion)
+        indice.add(vectores)
+        tamano = bytes_indice(indice)
+        reporte.append({
+            'tipo': tipo,
+            'compresion': compresion,
+            'bytes': tamano,
+            'bytes_por_vector': tamano / max(1, len(vectores)),
+            **medir_indice(indice, vectores, consultas, k),
+        })
+    return reporte
+
+
+def main():
+    """Compara los tipos de índice sobre los vectores del sistema de horarios"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="Recall@k y latencia de los tipos de índice FAISS")
+    parser.add_argument("--reporte", action="store_true", help="Generar el reporte comparativo")
+    parser.add_argument("--compresion", action="store_true", help="Comparar fp32/fp16/sq8 en lugar de tipos de índice")
+    parser.add_argument("--sistema", default=str(RAG_SISTEMA_DIR), help="Directorio del sistema RAG de horarios")
+    parser.add_argument("--k", type=int, default=10, help="Vecinos para recall@k (default: 10)")
+    parser.add_argument("--consultas", type=int, default=200, help="Consultas sintéticas (default: 200)")
+    parser.add_argument("--tipos", nargs="+", choices=TIPOS_INDICE, default=list(TIPOS_INDICE), help="Tipos a comparar")
+    args = parser.parse_args()
+
+    if not (args.reporte or args.compresion):
+        parser.print_help()
+        return
+
+    vectores = vectores_indice(faiss.read_index(os.path.join(resolver_directorio(args.sistema), RAG_INDICE_FILE.name)))
+    consultas = consultas_sinteticas(vectores, args.consultas)
+    if args.compresion:
+        reporte = [fila for tipo in args.tipos if tipo != 'ivf-pq'
+                   for fila in reporte_compresion(vectores, consultas, args.k, tipo)]
+    else:
+        reporte = reporte_indices(vectores, consultas, args.k, args.tipos)
+    print(json.dumps(reporte, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
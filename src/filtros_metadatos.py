@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Filtros de Metadatos para Búsqueda Vectorial
+Bitsets por atributo sobre los IDs FAISS de los documentos
+
+Para cada atributo filtrable y cada valor se mantiene un bitset (array booleano
+indexado por faiss_id). Un filtro combina valores de un mismo atributo con OR y
+atributos distintos con AND; el resultado se pasa a FAISS como IDSelectorBitmap
+para que solo se puntúen los candidatos que cumplen el filtro.
+
+Autor: Sistema RAG MVP
+Fecha: 2025-08-06
+"""
+
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+import faiss
+import numpy as np
+
+try:
+    from .indice_horarios import normalizar_dia
+except ImportError:
+    from indice_horarios import normalizar_dia
+
+ATRIBUTOS_FILTRABLES = ('departamento', 'dia', 'tipo_actividad', 'tiene_horarios', 'periodo')
+
+
+def codigo_periodo(periodo: Dict) -> str:
+    """Código de período normalizado ('1C', '2C', ...) a partir de los metadatos"""
+    if not periodo:
+        return ''
+    codigo = str(periodo.get('codigo') or '').upper()
+    if not codigo and periodo.get('cuatrimestre'):
+        codigo = f"{periodo['cuatrimestre']}C"
+    return codigo
+
+
+class IndiceMetadatos:
+    """Bitsets de IDs por atributo y valor para pre-filtrar búsquedas"""
+
+    def __init__(self):
+        self.bitsets: Dict[str, Dict[Any, np.ndarray]] = {atributo: {} for atributo in ATRIBUTOS_FILTRABLES}
+        self.capacidad = 0
+
+    @staticmethod
+    def normalizar_valor(atributo: str, valor: Any) -> Any:
+        """Normaliza un valor de filtro para que coincida con los del índice"""
+        if atributo == 'tiene_horarios':
+            return bool(valor)
+        if atributo == 'dia':
+            return normalizar_dia(str(valor)) or str(valor).lower()
+        if atributo == 'periodo' and isinstance(valor, dict):
+            return codigo_periodo(valor)
+        if atributo in ('departamento', 'periodo'):
+            return str(valor).upper()
+        return str(valor).lower()
+
+    @staticmethod
+    def _valores_documento(documento: Dict) -> Dict[str, Set[Any]]:
+        """Valores de cada atributo filtrable para un documento"""
+        metadatos = documento['metadatos']
+        dias = {normalizar_dia(dia) for dia in metadatos.get('dias_semana', [])}
+        return {
+            'departamento': {metadatos.get('departamento_codigo', '').upper()},
+            'dia': {dia for dia in dias if dia},
+            'tipo_actividad': {tipo.lower() for tipo in metadatos.get('tipos_actividad', []) if tipo},
+            'tiene_horarios': {bool(metadatos.get('tiene_horarios'))},
+            'periodo': {codigo_periodo(metadatos.get('periodo', {}))},
+        }
+
+    def _asegurar_capacidad(self, faiss_id: int):
+        """Agranda los bitsets para que entre el ID indicado"""
+        if faiss_id < self.capacidad:
+            return
+        nueva_capacidad = max(64, self.capacidad * 2, faiss_id + 1)
+        for valores in self.bitsets.values():
+            for valor, bitset in valores.items():
+                ampliado = np.zeros(nueva_capacidad, dtype=bool)
+                ampliado[:self.capacidad] = bitset
+                valores[valor] = ampliado
+        self.capacidad = nueva_capacidad
+
+    def construir(self, documentos: Iterable[Dict]):
+        """Construye los bitsets a partir de los documentos RAG"""
+        self.bitsets = {atributo: {} for atributo in ATRIBUTOS_FILTRABLES}
+        self.capacidad = 0
+        for documento in documentos:
+            self.agregar_documento(documento)
+
+    def agregar_documento(self, documento: Dict):
+        """Marca el ID del documento en los bitsets de sus valores"""
+        faiss_id = documento['faiss_id']
+        self._asegurar_capacidad(faiss_id)
+        for atributo, valores in self._valores_documento(documento).items():
+            for valor in valores:
+                if valor not in self.bitsets[atributo]:
+                    self.bitsets[atributo][valor] = np.zeros(self.capacidad, dtype=bool)
+                self.bitsets[atributo][valor][faiss_id] = True
+
+    def quitar_documentos(self, faiss_ids: Iterable[int]):
+        """Desmarca los IDs indicados en todos los bitsets"""
+        faiss_ids = np.array([i for i in faiss_ids if i < self.capacidad], dtype=np.int64)
+        if not len(faiss_ids):
+            return
+        for valores in self.bitsets.values():
+            for bitset in valores.values():
+                bitset[faiss_ids] = False
+
+    def mascara(self, filtros: Dict[str, Any]) -> Optional[np.ndarray]:
+        """
+        Combina los filtros en un único bitset
+
+        Args:
+            filtros: atributo -> valor o lista de valores aceptados (None se ignora)
+
+        Returns:
+            Array booleano por faiss_id, o None si no hay filtros activos
+        """
+        mascara = None
+        for atributo, valores in filtros.items():
+            if valores is None:
+                continue
+            if atributo not in self.bitsets:
+                raise ValueError(f"Atributo no filtrable: {atributo}")
+            if not isinstance(valores, (list, tuple, set)):
+                valores = [valores]
+
+            # OR entre valores del mismo atributo
+            mascara_atributo = np.zeros(self.capacidad, dtype=bool)
+            for valor in valores:
+                bitset = self.bitsets[atributo].get(self.normalizar_valor(atributo, valor))
+                if bitset is not None:
+                    mascara_atributo |= bitset
+
+            # AND entre atributos
+            mascara = mascara_atributo if mascara is None else mascara & mascara_atributo
+        return mascara
+
+    def selector(self, filtros: Dict[str, Any]) -> Tuple[Optional[faiss.IDSelector], int]:
+        """
+        Selector FAISS para los filtros indicados
+
+        Returns:
+            (selector o None si no hay filtros, cantidad de IDs seleccionados)
+        """
+        return self.selector_mascara(self.mascara(filtros))
+
+    @staticmethod
+    def selector_mascara(mascara: Optional[np.ndarray]) -> Tuple[Optional[faiss.IDSelector], int]:
+        """Selector FAISS para una máscara ya combinada (ver selector)"""
+        if mascara is None:
+            return None, -1
+        bitmap = np.packbits(mascara, bitorder='little')
+        return faiss.IDSelectorBitmap(bitmap), int(mascara.sum())
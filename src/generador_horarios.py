@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Generador de Horarios sin Conflictos
+Busca combinaciones de una opción de cursada por materia (teórica + práctica
++ laboratorio) que no se superpongan, con preferencias del estudiante
+
+Cada opción se convierte en una máscara de bits de la semana (un bit por
+franja de `granularidad` minutos, 2016 bits con 5 minutos): dos opciones son
+compatibles si el AND de sus máscaras es cero. La búsqueda es backtracking
+con:
+    - materias ordenadas de menos a más opciones,
+    - opciones con máscara idéntica colapsadas en una (se informan como equivalentes),
+    - chequeo hacia adelante: se poda si a alguna materia pendiente no le queda opción,
+    - ramificación y acotación sobre (penalización, días con clase), que solo crecen.
+
+Preferencias:
+    no_antes_de: '10:00'         sin clases antes de esa hora
+    no_despues_de: '20:00'       sin clases después de esa hora
+    dias_libres: ['viernes']     días sin clases
+    estrictas: True              descartar opciones que no las cumplen (False = penalizar
+                                 los minutos fuera de preferencia y ordenar por eso)
+
+Uso:
+    python generador_horarios.py "Álgebra I" "Análisis II" "Física I" --no-antes-de 10:00 --libre viernes
+
+Autor: Sistema RAG MVP
+Fecha: 2025-08-14
+"""
+
+import argparse
+import heapq
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from .indice_horarios import DIAS_SEMANA, hora_a_minutos, normalizar_dia
+    from .motor_conflictos import MINUTOS_DIA, MotorConflictos, describir_bloques
+except ImportError:
+    from indice_horarios import DIAS_SEMANA, hora_a_minutos, normalizar_dia
+    from motor_conflictos import MINUTOS_DIA, MotorConflictos, describir_bloques
+
+GRANULARIDAD_MINUTOS = 5
+
+
+def _contar_bits(mascara: int) -> int:
+    return bin(mascara).count('1')
+
+
+class GeneradorHorarios:
+    """Backtracking sobre máscaras de bits semanales de las opciones del motor de conflictos"""
+
+    def __init__(self, motor: MotorConflictos, granularidad: int = GRANULARIDAD_MINUTOS):
+        self.motor = motor
+        self.granularidad = granularidad
+        self.franjas_dia = MINUTOS_DIA // granularidad
+        self._dia_completo = (1 << self.franjas_dia) - 1
+
+    def mascara_bloques(self, bloques: Iterable[Tuple]) -> int:
+        """Máscara semanal de un conjunto de bloques (inicio hacia abajo, fin hacia arriba)"""
+        mascara = 0
+        for inicio, fin, *_ in bloques:
+            desde = inicio // self.granularidad
+            hasta = -(-fin // self.granularidad)
+            mascara |= ((1 << (hasta - desde)) - 1) << desde
+        return mascara
+
+    def mascara_preferencias(self, preferencias: Dict[str, Any]) -> int:
+        """Franjas de la semana en las que el estudiante no quiere cursar"""
+        no_antes = preferencias.get('no_antes_de')
+        no_despues = preferencias.get('no_despues_de')
+        no_antes = hora_a_minutos(no_antes) if isinstance(no_antes, str) else no_antes
+        no_despues = hora_a_minutos(no_despues) if isinstance(no_despues, str) else no_despues
+        dias_libres = {normalizar_dia(dia) for dia in preferencias.get('dias_libres') or []}
+
+        prohibida = 0
+        for posicion, dia in enumerate(DIAS_SEMANA):
+            if dia in dias_libres:
+                dia_mascara = self._dia_completo
+            else:
+                dia_mascara = 0
+                if no_antes:
+                    dia_mascara |= (1 << (no_antes // self.granularidad)) - 1
+                if no_despues is not None:
+                    desde = -(-no_despues // self.granularidad)
+                    dia_mascara |= self._dia_completo & ~((1 << desde) - 1)
+            prohibida |= dia_mascara << (posicion * self.franjas_dia)
+        return prohibida
+
+    def dias_mascara(self, mascara: int) -> int:
+        """Días con clase como máscara de 7 bits"""
+        dias = 0
+        for posicion in range(len(DIAS_SEMANA)):
+            if (mascara >> (posicion * self.franjas_dia)) & self._dia_completo:
+                dias |= 1 << posicion
+        return dias
+
+    def minutos_huecos(self, mascara: int) -> int:
+        """Minutos libres entre la primera y la última clase de cada día"""
+        huecos = 0
+        for posicion in range(len(DIAS_SEMANA)):
+            dia = (mascara >> (posicion * self.franjas_dia)) & self._dia_completo
+            if dia:
+                primera = (dia & -dia).bit_length() - 1
+                huecos += dia.bit_length() - primera - _contar_bits(dia)
+        return huecos * self.granularidad
+
+    def _opciones_materia(self, faiss_ids: List[int], prohibida: int, estrictas: bool) -> List[Dict[str, Any]]:
+        """Opciones de una materia con su máscara; las de máscara idéntica se colapsan"""
+        por_mascara: Dict[int, Dict[str, Any]] = {}
+        for faiss_id in faiss_ids:
+            if not self.motor.bloques.get(faiss_id):
+                continue
+            for indice, opcion in enumerate(self.motor.opciones[faiss_id]):
+                bloques = self.motor.bloques_opcion(faiss_id, indice)
+                mascara = self.mascara_bloques(bloques)
+                penalizacion = _contar_bits(mascara & prohibida) * self.granularidad
+                if estrictas and penalizacion:
+                    continue
+                eleccion = {'faiss_id': faiss_id, 'nombre': self.motor.nombres[faiss_id], 'comisiones': dict(opcion)}
+                if mascara in por_mascara:
+                    por_mascara[mascara]['equivalentes'].append(eleccion)
+                    continue
+                por_mascara[mascara] = {
+                    'mascara': mascara, 'dias': self.dias_mascara(mascara), 'penalizacion': penalizacion,
+                    'bloques': bloques, 'eleccion': eleccion, 'equivalentes': [],
+                }
+        return sorted(por_mascara.values(), key=lambda o: (o['penalizacion'], _contar_bits(o['dias'])))
+
+    def generar(self, grupos: Dict[str, Iterable[int]], preferencias: Optional[Dict[str, Any]] = None,
+                max_soluciones: int = 10, limite_nodos: int = 500000) -> Dict[str, Any]:
+        """
+        Mejores combinaciones sin superposiciones, una opción por materia
+
+        Las soluciones se ordenan por (minutos fuera de preferencia, días con
+        clase, minutos de huecos entre clases).
+
+        Args:
+            grupos: Etiqueta de cada materia -> IDs FAISS de sus documentos (alternativas)
+            preferencias: Ver el docstring del módulo
+            max_soluciones: Cantidad de combinaciones a devolver
+            limite_nodos: Corte de la búsqueda; si se alcanza, 'completo' es False
+
+        Returns:
+            soluciones: [{'costo': {...}, 'asignacion': [...]}] de la mejor a la peor
+            soluciones_encontradas: combinaciones válidas vistas durante la búsqueda
+            nodos: nodos explorados
+            completo: si la búsqueda terminó sin alcanzar el límite
+            sin_horarios: materias sin horarios cargados (no se incluyen en las combinaciones)
+            sin_opciones: materias cuyas opciones no cumplen las preferencias estrictas
+        """
+        preferencias = preferencias or {}
+        estrictas = preferencias.get('estrictas', True)
+        prohibida = self.mascara_preferencias(preferencias)
+
+        sin_horarios, sin_opciones, materias = [], [], []
+        for etiqueta, faiss_ids in grupos.items():
+            faiss_ids = list(faiss_ids)
+            if not any(self.motor.bloques.get(i) for i in faiss_ids):
+                sin_horarios.append(etiqueta)
+                continue
+            opciones = self._opciones_materia(faiss_ids, prohibida, estrictas)
+            if not opciones:
+                sin_opciones.append(etiqueta)
+            materias.append((etiqueta, opciones))
+
+        resultado = {'soluciones': [], 'soluciones_encontradas': 0, 'nodos': 0, 'completo': True,
+                     'sin_horarios': sin_horarios, 'sin_opciones': sin_opciones}
+        if sin_opciones or not materias:
+            return resultado
+
+        materias.sort(key=lambda m: len(m[1]))
+        mejores: List[Tuple] = []  # heap de (-costo, contador, elegidas): la peor arriba
+        estado = {'nodos': 0, 'encontradas': 0}
+
+        def cota_superada(penalizacion: int, dias: int) -> bool:
+            if len(mejores) < max_soluciones:
+                return False
+            peor = tuple(-c for c in mejores[0][0])
+            return (penalizacion, _contar_bits(dias)) > peor[:2]
+
+        def buscar(nivel: int, ocupada: int, dias: int, penalizacion: int, elegidas: List[Dict]):
+            estado['nodos'] += 1
+            if estado['nodos'] > limite_nodos:
+                resultado['completo'] = False
+                return
+            if nivel == len(materias):
+                estado['encontradas'] += 1
+                costo = (penalizacion, _contar_bits(dias), self.minutos_huecos(ocupada))
+                entrada = (tuple(-c for c in costo), estado['encontradas'], list(elegidas))
+                if len(mejores) < max_soluciones:
+                    heapq.heappush(mejores, entrada)
+                elif costo < tuple(-c for c in mejores[0][0]):
+                    heapq.heapreplace(mejores, entrada)
+                return
+
+            for opcion in materias[nivel][1]:
+                if opcion['mascara'] & ocupada:
+                    continue
+                nueva = ocupada | opcion['mascara']
+                nuevos_dias = dias | opcion['dias']
+                nueva_penalizacion = penalizacion + opcion['penalizacion']
+                if cota_superada(nueva_penalizacion, nuevos_dias):
+                    continue
+                # Chequeo hacia adelante: cada materia pendiente necesita alguna opción libre
+                if any(all(o['mascara'] & nueva for o in pendientes) for _, pendientes in materias[nivel + 1:]):
+                    continue
+                elegidas.append(opcion)
+                buscar(nivel + 1, nueva, nuevos_dias, nueva_penalizacion, elegidas)
+                elegidas.pop()
+                if estado['nodos'] > limite_nodos:
+                    return
+
+        buscar(0, 0, 0, 0, [])
+
+        resultado['nodos'] = min(estado['nodos'], limite_nodos)
+        resultado['soluciones_encontradas'] = estado['encontradas']
+        for costo, _, elegidas in sorted(mejores, key=lambda e: (tuple(-c for c in e[0]), e[1])):
+            penalizacion, dias, huecos = (-c for c in costo)
+            resultado['soluciones'].append({
+                'costo': {'minutos_fuera_de_preferencia': penalizacion, 'dias_con_clase': dias, 'minutos_huecos': huecos},
+                'asignacion': [self._describir(etiqueta, opcion) for (etiqueta, _), opcion in zip(materias, elegidas)],
+            })
+        return resultado
+
+    @staticmethod
+    def _describir(etiqueta: str, opcion: Dict[str, Any]) -> Dict[str, Any]:
+        return {'materia': etiqueta, **opcion['eleccion'], 'horarios': describir_bloques(opcion['bloques']),
+                'equivalentes': opcion['equivalentes']}
+
+
+def main():
+    """Función principal"""
+    try:
+        from .sistema_embeddings_horarios import SistemaEmbeddingsHorarios
+    except ImportError:
+        from sistema_embeddings_horarios import SistemaEmbeddingsHorarios
+
+    parser = argparse.ArgumentParser(description="Combinaciones de comisiones sin superposiciones")
+    parser.add_argument("materias", nargs='+', help="Nombres, prefijos o IDs de materias")
+    parser.add_argument("--sistema", "-s", default=None, help="Directorio del sistema RAG")
+    parser.add_argument("--no-antes-de", help="Sin clases antes de esta hora (HH:MM)")
+    parser.add_argument("--no-despues-de", help="Sin clases después de esta hora (HH:MM)")
+    parser.add_argument("--libre", action="append", default=[], help="Día sin clases (se puede repetir)")
+    parser.add_argument("--flexibles", action="store_true", help="Penalizar en lugar de descartar lo que no cumple las preferencias")
+    parser.add_argument("--soluciones", "-n", type=int, default=5, help="Cantidad de combinaciones a mostrar")
+    args = parser.parse_args()
+
+    sistema = SistemaEmbeddingsHorarios()
+    sistema.cargar_sistema_horarios(args.sistema)
+    preferencias = {'no_antes_de': args.no_antes_de, 'no_despues_de': args.no_despues_de,
+                    'dias_libres': args.libre, 'estrictas': not args.flexibles}
+    reporte = sistema.generar_horarios(args.materias, preferencias, max_soluciones=args.soluciones)
+    mostrar_reporte(reporte)
+
+
+def mostrar_reporte(reporte: Dict[str, Any]):
+    """Imprime las combinaciones de un reporte de generar_horarios"""
+    for referencia in reporte.get('no_encontradas', []):
+        print(f"❓ No se encontró: {referencia}")
+    for referencia in reporte['sin_horarios']:
+        print(f"📭 Sin horarios: {referencia}")
+    for referencia in reporte['sin_opciones']:
+        print(f"🚫 Ninguna comisión cumple las preferencias: {referencia}")
+    if not reporte['soluciones']:
+        if not reporte['sin_opciones']:
+            print("❌ No hay combinaciones sin superposiciones")
+        return
+
+    completo = "" if reporte['completo'] else " (búsqueda cortada por límite)"
+    print(f"🗓️ {reporte['soluciones_encontradas']} combinaciones válidas evaluadas{completo}; las mejores:")
+    for numero, solucion in enumerate(reporte['soluciones'], 1):
+        costo = solucion['costo']
+        print(f"\n{numero}. {costo['dias_con_clase']} días, {costo['minutos_huecos']} min de huecos"
+              + (f", {costo['minutos_fuera_de_preferencia']} min fuera de preferencia"
+                 if costo['minutos_fuera_de_preferencia'] else ""))
+        for asignacion in solucion['asignacion']:
+            comisiones = ', '.join(asignacion['comisiones'].values()) or 'única'
+            horarios = '; '.join(f"{h['dia']} {h['desde']}-{h['hasta']}" for h in asignacion['horarios'])
+            equivalentes = f" (+{len(asignacion['equivalentes'])} equivalentes)" if asignacion['equivalentes'] else ""
+            print(f"   • {asignacion['nombre']} [{comisiones}]{equivalentes}: {horarios}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Índice Estructurado de Horarios (día × intervalo)
+Responde consultas por franja horaria sin usar el modelo de embeddings
+
+Por cada día se mantiene una lista de intervalos en minutos ordenada por hora
+de inicio. Como la duración de una clase está acotada, los intervalos que se
+superponen con [desde, hasta) tienen su inicio en (desde - duración máxima, hasta),
+rango que se ubica con búsqueda binaria.
+
+Autor: Sistema RAG MVP
+Fecha: 2025-08-06
+"""
+
+import re
+import unicodedata
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Días en orden de la semana (forma canónica usada en los datos)
+DIAS_SEMANA = ['lunes', 'martes', 'miércoles', 'jueves', 'viernes', 'sábado', 'domingo']
+
+# Variantes aceptadas (sin acentos) -> día canónico
+_VARIANTES_DIAS = {
+    'lunes': 'lunes', 'lun': 'lunes', 'lu': 'lunes',
+    'martes': 'martes', 'mar': 'martes', 'ma': 'martes',
+    'miercoles': 'miércoles', 'mie': 'miércoles', 'mi': 'miércoles',
+    'jueves': 'jueves', 'jue': 'jueves', 'ju': 'jueves',
+    'viernes': 'viernes', 'vie': 'viernes', 'vi': 'viernes',
+    'sabado': 'sábado', 'sab': 'sábado', 'sa': 'sábado',
+    'domingo': 'domingo', 'dom': 'domingo', 'do': 'domingo',
+}
+
+# Franjas horarias [desde, hasta) en minutos
+FRANJAS_HORARIAS = {
+    'mañana': (7 * 60, 13 * 60),
+    'tarde': (13 * 60, 18 * 60),
+    'noche': (18 * 60, 23 * 60),
+}
+
+# Entrada del índice: (inicio, fin, faiss_id, posición del horario en la materia)
+Intervalo = Tuple[int, int, int, int]
+
+
+def normalizar_dia(dia: str) -> Optional[str]:
+    """Devuelve el nombre canónico del día o None si no se reconoce"""
+    if not dia:
+        return None
+    dia = unicodedata.normalize('NFD', dia.strip().lower())
+    dia = ''.join(c for c in dia if unicodedata.category(c) != 'Mn')
+    return _VARIANTES_DIAS.get(dia)
+
+
+def hora_a_minutos(hora: str) -> Optional[int]:
+    """Convierte '14:30', '14.30', '14hs' o '14' a minutos desde las 00:00"""
+    if not hora:
+        return None
+    match = re.match(r'^\s*(\d{1,2})(?:\s*[:.h]\s*(\d{2}))?', str(hora))
+    if not match:
+        return None
+    horas = int(match.group(1))
+    minutos = int(match.group(2) or 0)
+    if horas > 24 or minutos > 59:
+        return None
+    return horas * 60 + minutos
+
+
+def minutos_a_hora(minutos: int) -> str:
+    """Convierte minutos desde las 00:00 a 'HH:MM'"""
+    return f"{minutos // 60:02d}:{minutos % 60:02d}"
+
+
+def unir_ventanas(ventanas: Iterable[Tuple[str, int, int]]) -> List[Tuple[str, int, int]]:
+    """Normaliza los días y une las ventanas (día, desde, hasta) que se tocan o superponen"""
+    por_dia: Dict[str, List[Tuple[int, int]]] = {}
+    for dia, desde, hasta in ventanas:
+        dia = normalizar_dia(dia)
+        if dia is not None and hasta > desde:
+            por_dia.setdefault(dia, []).append((desde, hasta))
+
+    unidas = []
+    for dia in DIAS_SEMANA:
+        actual = None
+        for desde, hasta in sorted(por_dia.get(dia, [])):
+            if actual is not None and desde <= actual[1]:
+                actual = (actual[0], max(actual[1], hasta))
+                continue
+            if actual is not None:
+                unidas.append((dia, *actual))
+            actual = (desde, hasta)
+        if actual is not None:
+            unidas.append((dia, *actual))
+    return unidas
+
+
+class IndiceHorarios:
+    """Índice de intervalos horarios por día de la semana"""
+
+    def __init__(self):
+        self.intervalos: Dict[str, List[Intervalo]] = {dia: [] for dia in DIAS_SEMANA}
+        self.duracion_maxima: Dict[str, int] = {dia: 0 for dia in DIAS_SEMANA}
+
+    def construir(self, documentos: Iterable[Dict]):
+        """Construye el índice completo a partir de los documentos RAG"""
+        entradas = {dia: [] for dia in DIAS_SEMANA}
+        for documento in documentos:
+            for dia, intervalo in self._intervalos_documento(documento):
+                entradas[dia].append(intervalo)
+
+        for dia in DIAS_SEMANA:
+            entradas[dia].sort()
+            self.intervalos[dia] = entradas[dia]
+            self.duracion_maxima[dia] = max((fin - inicio for inicio, fin, _, _ in entradas[dia]), default=0)
+
+    def agregar_documento(self, documento: Dict):
+        """Agrega los horarios de un documento manteniendo el orden"""
+        for dia, intervalo in self._intervalos_documento(documento):
+            insort(self.intervalos[dia], intervalo)
+            self.duracion_maxima[dia] = max(self.duracion_maxima[dia], intervalo[1] - intervalo[0])
+
+    def quitar_documentos(self, faiss_ids: Iterable[int]):
+        """Quita todos los horarios de los documentos indicados"""
+        faiss_ids = set(faiss_ids)
+        for dia in DIAS_SEMANA:
+            self.intervalos[dia] = [e for e in self.intervalos[dia] if e[2] not in faiss_ids]
+
+    @staticmethod
+    def _intervalos_documento(documento: Dict) -> List[Tuple[str, Intervalo]]:
+        """Extrae los intervalos válidos (día, (inicio, fin, faiss_id, posición))"""
+        resultado = []
+        horarios = documento.get('materia_original', {}).get('horarios', [])
+        for posicion, horario in enumerate(horarios):
+            dia = normalizar_dia(horario.get('dia', ''))
+            inicio = hora_a_minutos(horario.get('hora_inicio', ''))
+            fin = hora_a_minutos(horario.get('hora_fin', ''))
+            if dia is None or inicio is None or fin is None or fin <= inicio:
+                continue
+            resultado.append((dia, (inicio, fin, documento['faiss_id'], posicion)))
+        return resultado
+
+    def _dias_consulta(self, dia: str) -> List[str]:
+        """Días sobre los que se consulta ('' = todos)"""
+        if not dia:
+            return DIAS_SEMANA
+        dia_normalizado = normalizar_dia(dia)
+        return [dia_normalizado] if dia_normalizado else []
+
+    def buscar_superpuestos(self, dia: str = "", desde: int = 0, hasta: int = 24 * 60) -> List[Tuple[str, Intervalo]]:
+        """
+        Intervalos que se superponen con [desde, hasta)
+
+        Args:
+            dia: Día de la semana ('' = cualquier día)
+            desde: Minuto de inicio de la ventana
+            hasta: Minuto de fin de la ventana
+        """
+        resultados = []
+        for dia_consulta in self._dias_consulta(dia):
+            intervalos = self.intervalos[dia_consulta]
+            # Solo pueden superponerse los que empiezan en (desde - duración máxima, hasta)
+            izquierda = bisect_left(intervalos, (desde - self.duracion_maxima[dia_consulta] + 1,))
+            derecha = bisect_left(intervalos, (hasta,))
+            for intervalo in intervalos[izquierda:derecha]:
+                if intervalo[1] > desde:
+                    resultados.append((dia_consulta, intervalo))
+        return resultados
+
+    def buscar_por_inicio(self, dia: str = "", desde: int = 0, hasta: int = 24 * 60) -> List[Tuple[str, Intervalo]]:
+        """Intervalos cuyo inicio está en [desde, hasta]"""
+        resultados = []
+        for dia_consulta in self._dias_consulta(dia):
+            intervalos = self.intervalos[dia_consulta]
+            izquierda = bisect_left(intervalos, (desde,))
+            derecha = bisect_left(intervalos, (hasta + 1,))
+            resultados.extend((dia_consulta, intervalo) for intervalo in intervalos[izquierda:derecha])
+        return resultados
+
+    def buscar_contenidos(self, dia: str = "", desde: int = 0, hasta: int = 24 * 60) -> List[Tuple[str, Intervalo]]:
+        """Intervalos completamente dentro de [desde, hasta]"""
+        resultados = []
+        for dia_consulta in self._dias_consulta(dia):
+            intervalos = self.intervalos[dia_consulta]
+            izquierda = bisect_left(intervalos, (desde,))
+            derecha = bisect_left(intervalos, (hasta,))
+            resultados.extend((dia_consulta, intervalo) for intervalo in intervalos[izquierda:derecha]
+                              if intervalo[1] <= hasta)
+        return resultados
+
+    def buscar_por_fin(self, dia: str = "", desde: int = 0, hasta: int = 24 * 60) -> List[Tuple[str, Intervalo]]:
+        """Intervalos cuyo fin está en [desde, hasta]"""
+        # Los que terminan a partir de `desde` son los que se superponen con [desde - 1, desde)
+        # o empiezan después; se filtra el fin sobre ese subconjunto
+        resultados = []
+        for dia_consulta, intervalo in self.buscar_superpuestos(dia, desde - 1, hasta):
+            if desde <= intervalo[1] <= hasta:
+                resultados.append((dia_consulta, intervalo))
+        return resultados
+
+    def __len__(self) -> int:
+        return sum(len(intervalos) for intervalos in self.intervalos.values())
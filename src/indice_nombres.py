@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Índice de Nombres de Materias (exacto y por prefijo)
+Resuelve en microsegundos las consultas que nombran una materia, sin pasar
+por el modelo de embeddings
+
+Cada materia se registra con varias formas normalizadas (sin acentos ni
+signos): el nombre, el nombre normalizado de los datos, cada parte de los
+nombres compuestos, variantes con números romanos/arábigos y sus siglas.
+Las formas exactas se guardan en un diccionario; para los prefijos se
+mantiene la lista de formas ordenada y se ubica el rango con búsqueda binaria
+(un trie implícito).
+
+Autor: Sistema RAG MVP
+Fecha: 2025-08-13
+"""
+
+import re
+import unicodedata
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+    from .bm25_horarios import siglas
+except ImportError:
+    from bm25_horarios import siglas
+
+# Largo mínimo de un prefijo para buscar por prefijo ("alg" sería ambiguo)
+MINIMO_PREFIJO = 4
+
+_ROMANOS = {'i': '1', 'ii': '2', 'iii': '3', 'iv': '4', 'v': '5'}
+_ARABIGOS = {arabigo: romano for romano, arabigo in _ROMANOS.items()}
+
+
+def normalizar_consulta(texto: str) -> str:
+    """Minúsculas sin acentos; conserva ':' y '.' de las horas y quita el resto de los signos"""
+    texto = unicodedata.normalize('NFD', (texto or '').lower())
+    texto = ''.join(c for c in texto if unicodedata.category(c) != 'Mn')
+    texto = re.sub(r'(?<!\d)[:.]|[:.](?!\d)', ' ', texto)
+    texto = re.sub(r'[^\w\s:.]', ' ', texto)
+    return re.sub(r'\s+', ' ', texto).strip()
+
+
+def variantes_numericas(forma: str) -> List[str]:
+    """La forma con el último número romano como arábigo o viceversa ("analisis i" <-> "analisis 1")"""
+    palabras = forma.split()
+    if not palabras:
+        return []
+    ultima = palabras[-1]
+    reemplazo = _ROMANOS.get(ultima) or _ARABIGOS.get(ultima)
+    return [' '.join(palabras[:-1] + [reemplazo])] if reemplazo else []
+
+
+def alias_nombre(nombre: str) -> List[str]:
+    """
+    Formas normalizadas con las que se puede nombrar una materia
+
+    Los nombres compuestos ("ANÁLISIS I - ANÁLISIS MATEMÁTICO I") aportan
+    cada parte, y se agrega cada forma sin las aclaraciones entre paréntesis.
+    """
+    formas = []
+    for parte in [nombre] + re.split(r'\s+[-–]\s+|\s*[-–]\s*$', nombre):
+        for variante in (parte, re.sub(r'\([^)]*\)', ' ', parte)):
+            normalizada = normalizar_consulta(variante)
+            if normalizada and normalizada not in formas:
+                formas.append(normalizada)
+    return formas
+
+
+class IndiceNombres:
+    """Formas de nombres de materias -> IDs FAISS, con búsqueda exacta y por prefijo"""
+
+    def __init__(self):
+        self.formas: Dict[str, Set[int]] = {}
+        # Las siglas solo se buscan exactas: como prefijo coincidirían con cualquier palabra
+        self.siglas: Set[str] = set()
+        self.max_palabras = 0
+        self._ordenadas: Optional[List[str]] = None
+
+    def construir(self, documentos: Iterable[Dict]):
+        """Registra las formas de todos los documentos RAG"""
+        self.formas = {}
+        self.siglas = set()
+        self.max_palabras = 0
+        for documento in documentos:
+            self.agregar_documento(documento)
+
+    @staticmethod
+    def formas_documento(documento: Dict) -> Tuple[List[str], List[str]]:
+        """(formas del nombre, siglas) con las que se reconoce un documento"""
+        metadatos = documento['metadatos']
+        formas = []
+        for nombre in (metadatos.get('materia_nombre', ''), metadatos.get('materia_normalizada', '')):
+            for forma in alias_nombre(nombre):
+                for variante in [forma] + variantes_numericas(forma):
+                    if variante not in formas:
+                        formas.append(variante)
+        sigla = siglas(metadatos.get('materia_nombre', ''))
+        return formas, [sigla] if len(sigla) >= 3 else []
+
+    def agregar_documento(self, documento: Dict):
+        formas, siglas_documento = self.formas_documento(documento)
+        for forma in formas + siglas_documento:
+            if forma not in self.formas:
+                self.formas[forma] = set()
+                self._ordenadas = None
+            self.formas[forma].add(documento['faiss_id'])
+            self.max_palabras = max(self.max_palabras, len(forma.split()))
+        self.siglas.update(siglas_documento)
+
+    def quitar_documentos(self, faiss_ids: Iterable[int]):
+        faiss_ids = set(faiss_ids)
+        for forma in list(self.formas):
+            self.formas[forma] -= faiss_ids
+            if not self.formas[forma]:
+                del self.formas[forma]
+                self.siglas.discard(forma)
+                self._ordenadas = None
+
+    def __len__(self) -> int:
+        return len(self.formas)
+
+    def buscar_exacto(self, texto: str) -> Set[int]:
+        """IDs de las materias con una forma igual al texto"""
+        return set(self.formas.get(normalizar_consulta(texto), ()))
+
+    def buscar_prefijo(self, texto: str, minimo: int = MINIMO_PREFIJO) -> Set[int]:
+        """IDs de las materias con alguna forma que empieza con el texto"""
+        prefijo = normalizar_consulta(texto)
+        if len(prefijo) < minimo:
+            return set()
+        if self._ordenadas is None:
+            self._ordenadas = sorted(forma for forma in self.formas if forma not in self.siglas)
+
+        ids: Set[int] = set()
+        posicion = bisect_left(self._ordenadas, prefijo)
+        while posicion < len(self._ordenadas) and self._ordenadas[posicion].startswith(prefijo):
+            ids |= self.formas[self._ordenadas[posicion]]
+            posicion += 1
+        return ids
+
+    def buscar(self, texto: str) -> Tuple[Set[int], Optional[str]]:
+        """
+        Coincidencia exacta o, si no hay, por prefijo
+
+        Returns:
+            (IDs, 'exacto' | 'prefijo' | None si no hubo coincidencia)
+        """
+        ids = self.buscar_exacto(texto)
+        if ids:
+            return ids, 'exacto'
+        ids = self.buscar_prefijo(texto)
+        return ids, 'prefijo' if ids else None
+
+    def reconocer(self, palabras: List[str], ignorar: Set[str] = frozenset()) -> Tuple[List[str], List[str], Set[int]]:
+        """
+        Reconoce nombres exactos dentro de una secuencia de palabras (la coincidencia más larga primero)
+
+        Args:
+            palabras: Palabras normalizadas de la consulta
+            ignorar: Palabras que solas no cuentan como nombre ("clases", "tarde")
+
+        Returns:
+            (palabras restantes, nombres reconocidos, IDs de las materias)
+        """
+        restantes, nombres = [], []
+        ids: Set[int] = set()
+        i = 0
+        while i < len(palabras):
+            for largo in range(min(self.max_palabras, len(palabras) - i), 0, -1):
+                frase = ' '.join(palabras[i:i + largo])
+                if largo == 1 and (frase in ignorar or frase.isdigit()):
+                    continue
+                encontrados = self.formas.get(frase)
+                if encontrados:
+                    ids |= encontrados
+                    nombres.append(frase)
+                    i += largo
+                    break
+            else:
+                restantes.append(palabras[i])
+                i += 1
+        return restantes, nombres, ids
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Interpretador de Consultas de Horarios
+Extrae de una consulta en lenguaje natural los criterios estructurados (día,
+rango horario, franja, departamento, tipo de actividad y nombres de materias)
+y deja aparte el texto libre que queda
+
+Las consultas completamente estructuradas ("¿qué hay los martes de 14 a 18?")
+se responden con los índices exactos sin usar el modelo; el modelo solo se usa
+para el texto libre restante.
+
+Ejemplo:
+    >>> interpretador.interpretar("álgebra los martes por la tarde")
+    {'dias': ['martes'], 'franja': 'tarde', 'desde': 780, 'hasta': 1080,
+     'criterio_horario': 'superpone', 'materias': [12, 13], 'texto_libre': '', ...}
+
+Autor: Sistema RAG MVP
+Fecha: 2025-08-12
+"""
+
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from .bm25_horarios import PALABRAS_VACIAS
+    from .indice_horarios import DIAS_SEMANA, FRANJAS_HORARIAS, normalizar_dia
+    from .indice_nombres import IndiceNombres, normalizar_consulta
+except ImportError:
+    from bm25_horarios import PALABRAS_VACIAS
+    from indice_horarios import DIAS_SEMANA, FRANJAS_HORARIAS, normalizar_dia
+    from indice_nombres import IndiceNombres, normalizar_consulta
+
+# Palabras que solo dan contexto a la pregunta: no son texto libre a buscar
+PALABRAS_CONTEXTO = PALABRAS_VACIAS | {
+    'materia', 'materias', 'clase', 'clases', 'horario', 'horarios', 'cursada', 'cursadas', 'curso', 'cursos',
+    'cursa', 'cursan', 'dicta', 'dictan', 'dictada', 'dictadas', 'hay', 'tengo', 'son', 'cuales', 'cual',
+    'empieza', 'empiezan', 'comienza', 'comienzan', 'termina', 'terminan', 'dia', 'dias', 'semana',
+    'hora', 'horas', 'hs', 'turno', 'franja', 'todas', 'todos', 'tambien', 'algo', 'alguna', 'algunas',
+}
+
+# Días completos (con plurales); las abreviaturas son ambiguas en texto libre
+_PALABRAS_DIAS = {
+    'lunes', 'martes', 'miercoles', 'jueves', 'viernes', 'sabado', 'sabados', 'domingo', 'domingos',
+}
+
+_PALABRAS_FRANJAS = {
+    'manana': 'mañana', 'mananas': 'mañana', 'tarde': 'tarde', 'tardes': 'tarde', 'noche': 'noche', 'noches': 'noche',
+}
+
+_PALABRAS_TIPOS = {
+    'teorica': 'teorica', 'teoricas': 'teorica', 'teorico': 'teorica', 'teoricos': 'teorica',
+    'practica': 'practica', 'practicas': 'practica', 'practico': 'practica', 'practicos': 'practica',
+    'laboratorio': 'laboratorio', 'laboratorios': 'laboratorio',
+}
+
+# Una palabra suelta de contexto no es un nombre ("clases", "tarde")
+_NO_NOMBRES = PALABRAS_CONTEXTO | set(_PALABRAS_FRANJAS) | _PALABRAS_DIAS
+
+_HORA = r'(\d{1,2})(?:[:.](\d{2}))?\s*(?:hs|h|horas)?\b'
+_LAS = r'(?:las?\s+)?'
+
+# (patrón, criterio); se prueban en orden y cada coincidencia se quita del texto
+_PATRONES_HORARIO = [
+    (re.compile(rf'\b(?:entre|de|desde)\s+{_LAS}{_HORA}\s+(?:y|a|hasta)\s+{_LAS}{_HORA}'), 'superpone'),
+    (re.compile(rf'\b(?:terminan?|finalizan?|salen?)\s+a\s+{_LAS}{_HORA}'), 'termina_a'),
+    (re.compile(rf'\b(?:desde|despues\s+de|a\s+partir\s+de)\s+{_LAS}{_HORA}'), 'empieza_desde'),
+    (re.compile(rf'\b(?:hasta|antes\s+de)\s+{_LAS}{_HORA}'), 'termina_hasta'),
+    (re.compile(rf'\ba\s+las?\s+{_HORA}'), 'empieza_a'),
+]
+
+
+# Rango con guion ("14-18", "9:30–12"), que la normalización convertiría en dos números sueltos
+_RANGO_CON_GUION = re.compile(r'(\d{1,2}(?:[:.]\d{2})?)\s*(?:hs)?\s*[-–]\s*(\d{1,2}(?:[:.]\d{2})?)')
+
+# Separa tramos de disponibilidad: comas, o "y" seguida de un día ("martes 14-18 y jueves mañana")
+_SEPARADOR_VENTANAS = re.compile(r'\s+y\s+(?=(?:el\s+|los\s+)?(?:' + '|'.join(sorted(_PALABRAS_DIAS)) + r')\b)')
+
+
+def _minutos(horas: str, minutos: Optional[str]) -> Optional[int]:
+    horas, minutos = int(horas), int(minutos or 0)
+    if horas > 24 or minutos > 59:
+        return None
+    return horas * 60 + minutos
+
+
+class InterpretadorConsultas:
+    """Extrae criterios estructurados de consultas sobre horarios"""
+
+    def __init__(self):
+        # Formas de los nombres de materias -> IDs FAISS de sus comisiones
+        self.nombres = IndiceNombres()
+        # Frase normalizada -> código de departamento
+        self.departamentos: Dict[Tuple[str, ...], str] = {}
+
+    def construir(self, documentos: Iterable[Dict]):
+        """Arma los vocabularios de nombres y departamentos a partir de los documentos RAG"""
+        self.nombres = IndiceNombres()
+        self.departamentos = {}
+        for documento in documentos:
+            self.agregar_documento(documento)
+
+    def agregar_documento(self, documento: Dict):
+        metadatos = documento['metadatos']
+        self.nombres.agregar_documento(documento)
+
+        codigo = metadatos.get('departamento_codigo', '').upper()
+        if codigo:
+            self.departamentos[(codigo.lower(),)] = codigo
+            nombre_departamento = normalizar_consulta(metadatos.get('departamento_nombre', ''))
+            if nombre_departamento:
+                self.departamentos[tuple(nombre_departamento.split())] = codigo
+
+    def quitar_documentos(self, faiss_ids: Iterable[int]):
+        self.nombres.quitar_documentos(faiss_ids)
+
+    def interpretar(self, consulta: str) -> Dict[str, Any]:
+        """
+        Criterios estructurados y texto libre de una consulta
+
+        Returns:
+            dias: días canónicos pedidos (OR)
+            franja: 'mañana', 'tarde' o 'noche' si se nombró una
+            desde, hasta: ventana en minutos (None = abierta)
+            criterio_horario: 'superpone', 'empieza' o 'termina' (None = sin restricción horaria)
+            departamentos: códigos de departamento (OR)
+            tipos_actividad: tipos de actividad (OR)
+            nombres: nombres de materias reconocidos
+            materias: IDs FAISS de las materias reconocidas (OR)
+            coincidencia_nombre: 'exacto' o 'prefijo' según cómo se reconocieron los nombres
+            texto_libre: lo que queda sin interpretar, para la búsqueda semántica
+            estructurada: si se reconoció al menos un criterio
+        """
+        texto = normalizar_consulta(consulta)
+        intencion: Dict[str, Any] = {
+            'consulta': consulta, 'dias': [], 'franja': None, 'desde': None, 'hasta': None,
+            'criterio_horario': None, 'departamentos': [], 'tipos_actividad': [],
+            'nombres': [], 'materias': [], 'coincidencia_nombre': None, 'texto_libre': '', 'estructurada': False,
+        }
+
+        texto = self._extraer_horario(texto, intencion)
+        palabras = texto.split()
+        palabras = self._extraer_departamentos(palabras, intencion)
+        palabras = self._extraer_nombres(palabras, intencion)
+
+        libres = []
+        franjas = []
+        for palabra in palabras:
+            if palabra in _PALABRAS_DIAS:
+                dia = normalizar_dia(palabra[:-1] if palabra in ('sabados', 'domingos') else palabra)
+                if dia not in intencion['dias']:
+                    intencion['dias'].append(dia)
+            elif palabra in _PALABRAS_FRANJAS:
+                franjas.append(_PALABRAS_FRANJAS[palabra])
+            elif palabra in _PALABRAS_TIPOS:
+                if _PALABRAS_TIPOS[palabra] not in intencion['tipos_actividad']:
+                    intencion['tipos_actividad'].append(_PALABRAS_TIPOS[palabra])
+            elif palabra not in PALABRAS_CONTEXTO:
+                libres.append(palabra)
+
+        # Una franja solo define la ventana si no se dio un rango explícito
+        if franjas:
+            intencion['franja'] = franjas[0]
+            if intencion['criterio_horario'] is None:
+                intencion['criterio_horario'] = 'superpone'
+                intencion['desde'] = min(FRANJAS_HORARIAS[f][0] for f in franjas)
+                intencion['hasta'] = max(FRANJAS_HORARIAS[f][1] for f in franjas)
+
+        intencion['texto_libre'] = ' '.join(libres)
+        intencion['estructurada'] = bool(
+            intencion['dias'] or intencion['criterio_horario'] or intencion['departamentos']
+            or intencion['tipos_actividad'] or intencion['materias']
+        )
+        return intencion
+
+    def interpretar_ventanas(self, texto: str) -> List[Tuple[str, int, int]]:
+        """
+        Ventanas de disponibilidad (día, desde, hasta) en minutos
+
+        "martes 14-18 y jueves a la mañana" -> [('martes', 840, 1080), ('jueves', 420, 780)].
+        Los días sin horario toman el del tramo siguiente ("martes y jueves de 14 a 18");
+        si no queda ninguno, el día completo. Un horario sin días vale de lunes a sábado.
+        """
+        texto = _RANGO_CON_GUION.sub(r' de \1 a \2 ', texto)
+        ventanas: List[Tuple[str, int, int]] = []
+        pendientes: List[str] = []
+        for parte in re.split(r'[,;]', texto):
+            for tramo in _SEPARADOR_VENTANAS.split(normalizar_consulta(parte)):
+                intencion = self.interpretar(tramo)
+                pendientes += [dia for dia in intencion['dias'] if dia not in pendientes]
+                criterio = intencion['criterio_horario']
+                if criterio is None:
+                    continue
+
+                desde = intencion['desde'] if intencion['desde'] is not None else 0
+                hasta = intencion['hasta'] if intencion['hasta'] is not None else 24 * 60
+                if criterio == 'empieza':
+                    hasta = 24 * 60
+                elif criterio == 'termina':
+                    desde = 0
+                ventanas += [(dia, desde, hasta) for dia in pendientes or DIAS_SEMANA[:6]]
+                pendientes = []
+
+        ventanas += [(dia, 0, 24 * 60) for dia in pendientes]
+        return ventanas
+
+    @staticmethod
+    def _extraer_horario(texto: str, intencion: Dict[str, Any]) -> str:
+        """Reconoce la primera expresión horaria y la quita del texto"""
+        for patron, criterio in _PATRONES_HORARIO:
+            coincidencia = patron.search(texto)
+            if not coincidencia:
+                continue
+            grupos = coincidencia.groups()
+            primera = _minutos(grupos[0], grupos[1])
+            if primera is None:
+                continue
+
+            if criterio == 'superpone':
+                segunda = _minutos(grupos[2], grupos[3])
+                if segunda is None or segunda <= primera:
+                    continue
+                intencion.update(criterio_horario='superpone', desde=primera, hasta=segunda)
+            elif criterio == 'empieza_a':
+                intencion.update(criterio_horario='empieza', desde=primera, hasta=primera)
+            elif criterio == 'empieza_desde':
+                intencion.update(criterio_horario='empieza', desde=primera)
+            elif criterio == 'termina_a':
+                intencion.update(criterio_horario='termina', desde=primera, hasta=primera)
+            else:
+                intencion.update(criterio_horario='termina', hasta=primera)
+            return texto[:coincidencia.start()] + ' ' + texto[coincidencia.end():]
+        return texto
+
+    def _extraer_departamentos(self, palabras: List[str], intencion: Dict[str, Any]) -> List[str]:
+        """Reconoce códigos y nombres de departamento (la frase más larga primero) y los quita"""
+        maximo = max((len(frase) for frase in self.departamentos), default=0)
+        restantes = []
+        i = 0
+        while i < len(palabras):
+            for largo in range(min(maximo, len(palabras) - i), 0, -1):
+                codigo = self.departamentos.get(tuple(palabras[i:i + largo]))
+                if codigo is not None:
+                    if codigo not in intencion['departamentos']:
+                        intencion['departamentos'].append(codigo)
+                    i += largo
+                    break
+            else:
+                restantes.append(palabras[i])
+                i += 1
+        return restantes
+
+    def _extraer_nombres(self, palabras: List[str], intencion: Dict[str, Any]) -> List[str]:
+        """
+        Reconoce nombres de materias y los quita del texto
+
+        Primero busca nombres exactos (la coincidencia más larga); si no hay
+        ninguno, prueba el texto restante como prefijo de un nombre
+        ("algoritmos y estruc" -> Algoritmos y Estructuras de Datos I, II, III).
+        """
+        restantes, nombres, materias = self.nombres.reconocer(palabras, _NO_NOMBRES)
+        coincidencia = 'exacto' if materias else None
+
+        if not materias:
+            # El prefijo es el tramo sin días, franjas ni tipos, sin palabras de contexto en los bordes
+            tramo = [p for p in restantes if p not in _PALABRAS_DIAS and p not in _PALABRAS_FRANJAS
+                     and p not in _PALABRAS_TIPOS]
+            while tramo and tramo[0] in PALABRAS_CONTEXTO:
+                tramo.pop(0)
+            while tramo and tramo[-1] in PALABRAS_CONTEXTO:
+                tramo.pop()
+            materias = self.nombres.buscar_prefijo(' '.join(tramo)) if tramo else set()
+            if materias:
+                coincidencia = 'prefijo'
+                nombres = [' '.join(tramo)]
+                quitar = set(tramo)
+                restantes = [p for p in restantes if p not in quitar]
+
+        intencion['nombres'].extend(nombres)
+        intencion['materias'] = sorted(materias)
+        intencion['coincidencia_nombre'] = coincidencia
+        return restantes
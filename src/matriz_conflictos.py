@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Matriz de Conflictos entre Comisiones
+Precalcula qué comisiones se superponen con cuáles para responder
+"¿X choca con Y?" en O(1) y "¿con qué choca X?" en O(fila)
+
+Cada fila es una comisión de un documento (sus bloques con la misma etiqueta
+de comisión; los bloques sin comisión forman la suya). La ocupación semanal
+de todas las comisiones es una matriz booleana (comisiones × franjas de 5
+minutos) y los conflictos salen de un producto matricial por bloques de filas:
+dos comisiones chocan si comparten alguna franja.
+
+La matriz se guarda con los bits empaquetados (n × n/8 bytes) junto al índice
+FAISS y se abre con memory-map al cargar: no se lee entera a memoria.
+
+Autor: Sistema RAG MVP
+Fecha: 2025-08-14
+"""
+
+import json
+import os
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+try:
+    from .config_paths import RAG_CONFLICTOS_FILE, RAG_COMISIONES_FILE
+    from .motor_conflictos import MINUTOS_DIA, MotorConflictos
+    from .indice_horarios import DIAS_SEMANA
+except ImportError:
+    from config_paths import RAG_CONFLICTOS_FILE, RAG_COMISIONES_FILE
+    from motor_conflictos import MINUTOS_DIA, MotorConflictos
+    from indice_horarios import DIAS_SEMANA
+
+GRANULARIDAD_MINUTOS = 5
+
+# Filas por bloque del producto matricial (acota la memoria temporal del producto
+# y de la parte sin empaquetar)
+FILAS_POR_BLOQUE = 1024
+
+# Fila: (ID FAISS, etiqueta de comisión; '' = bloques sin comisión)
+Fila = Tuple[int, str]
+
+
+class MatrizConflictos:
+    """Matriz booleana empaquetada de superposiciones entre comisiones"""
+
+    def __init__(self):
+        self.filas: List[Fila] = []
+        self.posiciones: Dict[Fila, int] = {}
+        self.filas_documento: Dict[int, List[int]] = {}
+        self.bits: Optional[np.ndarray] = None  # uint8 (n, ceil(n / 8)), posiblemente memory-map
+        self.granularidad = GRANULARIDAD_MINUTOS
+
+    def __len__(self) -> int:
+        return len(self.filas)
+
+    def _indexar(self, filas: List[Fila]):
+        self.filas = filas
+        self.posiciones = {fila: posicion for posicion, fila in enumerate(filas)}
+        self.filas_documento = {}
+        for posicion, (faiss_id, _) in enumerate(filas):
+            self.filas_documento.setdefault(faiss_id, []).append(posicion)
+
+    def construir(self, motor: MotorConflictos, granularidad: int = GRANULARIDAD_MINUTOS):
+        """Calcula la matriz a partir de los bloques del motor de conflictos"""
+        self.granularidad = granularidad
+        bloques_fila: Dict[Fila, List[Tuple[int, int]]] = {}
+        for faiss_id in sorted(motor.bloques):
+            for inicio, fin, _, comision, _ in motor.bloques[faiss_id]:
+                bloques_fila.setdefault((faiss_id, comision), []).append((inicio, fin))
+        self._indexar(list(bloques_fila))
+
+        franjas = len(DIAS_SEMANA) * MINUTOS_DIA // granularidad
+        ocupacion = np.zeros((len(self.filas), franjas), dtype=np.float32)
+        for posicion, fila in enumerate(self.filas):
+            for inicio, fin in bloques_fila[fila]:
+                ocupacion[posicion, inicio // granularidad:-(-fin // granularidad)] = 1.0
+
+        # Cada bloque de filas se empaqueta al calcularlo: la matriz completa
+        # nunca existe sin empaquetar
+        n = len(self.filas)
+        self.bits = np.zeros((n, -(-n // 8)), dtype=np.uint8)
+        for desde in range(0, n, FILAS_POR_BLOQUE):
+            bloque = ocupacion[desde:desde + FILAS_POR_BLOQUE] @ ocupacion.T > 0
+            filas = np.arange(len(bloque))
+            bloque[filas, desde + filas] = False
+            self.bits[desde:desde + len(bloque)] = np.packbits(bloque, axis=1)
+
+    def guardar(self, directorio: str):
+        np.save(os.path.join(directorio, RAG_CONFLICTOS_FILE.name), np.ascontiguousarray(self.bits))
+        with open(os.path.join(directorio, RAG_COMISIONES_FILE.name), 'w', encoding='utf-8') as f:
+            json.dump({'granularidad': self.granularidad, 'filas': self.filas}, f, ensure_ascii=False)
+
+    def cargar(self, directorio: str) -> bool:
+        """Abre la matriz guardada con memory-map; False si no existe"""
+        ruta_matriz = os.path.join(directorio, RAG_CONFLICTOS_FILE.name)
+        ruta_filas = os.path.join(directorio, RAG_COMISIONES_FILE.name)
+        if not (os.path.exists(ruta_matriz) and os.path.exists(ruta_filas)):
+            return False
+        with open(ruta_filas, 'r', encoding='utf-8') as f:
+            datos = json.load(f)
+        self.granularidad = datos['granularidad']
+        self._indexar([(faiss_id, comision) for faiss_id, comision in datos['filas']])
+        self.bits = np.load(ruta_matriz, mmap_mode='r')
+        return True
+
+    def documentos(self) -> Set[int]:
+        return set(self.filas_documento)
+
+    def chocan(self, fila_a: int, fila_b: int) -> bool:
+        """Si dos comisiones se superponen (O(1))"""
+        return bool((self.bits[fila_a, fila_b >> 3] >> (7 - (fila_b & 7))) & 1)
+
+    def conflictos_fila(self, fila: int) -> np.ndarray:
+        """Posiciones de las comisiones que se superponen con una (O(fila))"""
+        return np.flatnonzero(np.unpackbits(self.bits[fila], count=len(self.filas)))
+
+    def documentos_chocan(self, faiss_id_a: int, faiss_id_b: int) -> List[Tuple[str, str]]:
+        """Pares de comisiones (de a, de b) que se superponen entre dos documentos"""
+        return [(self.filas[a][1], self.filas[b][1])
+                for a in self.filas_documento.get(faiss_id_a, ())
+                for b in self.filas_documento.get(faiss_id_b, ())
+                if self.chocan(a, b)]
+
+    def conflictos_documento(self, faiss_id: int) -> Dict[int, List[Tuple[str, str]]]:
+        """Por cada otro documento, los pares de comisiones (propia, ajena) que se superponen"""
+        resultado: Dict[int, List[Tuple[str, str]]] = {}
+        for propia in self.filas_documento.get(faiss_id, ()):
+            for ajena in self.conflictos_fila(propia):
+                otro, comision = self.filas[ajena]
+                if otro != faiss_id:
+                    resultado.setdefault(otro, []).append((self.filas[propia][1], comision))
+        return resultado
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Motor de Conflictos de Horarios (precisión de minutos)
+Detecta superposiciones reales entre las comisiones de varias materias
+
+Al cargar el índice cada documento se convierte en bloques semanales
+(inicio y fin en minutos desde el lunes 00:00, tipo de actividad, comisión)
+y en sus opciones de cursada: una comisión por tipo de actividad
+("Teórica 2" + "Práctica 1"); los bloques sin comisión son comunes a todas.
+
+Para N bloques pedidos se ordena una sola vez y se barre la semana con un
+heap de bloques activos: O(N log N + conflictos), sin comparar todos contra
+todos.
+
+Uso:
+    python motor_conflictos.py "Álgebra I" "Análisis II"
+    python motor_conflictos.py dc_horarios_algoritmos_1c_20250727 "Probabilidad"
+
+Autor: Sistema RAG MVP
+Fecha: 2025-08-13
+"""
+
+import argparse
+import heapq
+from itertools import product
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+try:
+    from .indice_horarios import DIAS_SEMANA, hora_a_minutos, minutos_a_hora, normalizar_dia
+except ImportError:
+    from indice_horarios import DIAS_SEMANA, hora_a_minutos, minutos_a_hora, normalizar_dia
+
+MINUTOS_DIA = 24 * 60
+
+# Bloque: (inicio, fin) en minutos de la semana, tipo de actividad, comisión, posición del horario
+Bloque = Tuple[int, int, str, str, int]
+
+# Opción de cursada: (tipo, comisión) elegidos, ordenados por tipo
+Opcion = Tuple[Tuple[str, str], ...]
+
+
+def minuto_semana(dia: str, minutos: int) -> int:
+    return DIAS_SEMANA.index(dia) * MINUTOS_DIA + minutos
+
+
+def describir_minuto(minuto: int) -> Tuple[str, str]:
+    """(día, 'HH:MM') de un minuto de la semana"""
+    return DIAS_SEMANA[minuto // MINUTOS_DIA], minutos_a_hora(minuto % MINUTOS_DIA)
+
+
+def describir_bloques(bloques: Iterable[Bloque]) -> List[Dict[str, str]]:
+    """Bloques como horarios legibles (día, desde, hasta, tipo, comisión)"""
+    horarios = []
+    for inicio, fin, tipo, comision, _ in bloques:
+        dia, desde = describir_minuto(inicio)
+        horarios.append({'dia': dia, 'desde': desde, 'hasta': minutos_a_hora(fin - DIAS_SEMANA.index(dia) * MINUTOS_DIA),
+                         'tipo_actividad': tipo, 'comision': comision})
+    return horarios
+
+
+class MotorConflictos:
+    """Bloques y opciones de cursada por documento, con detección de superposiciones"""
+
+    def __init__(self):
+        self.bloques: Dict[int, List[Bloque]] = {}
+        self.opciones: Dict[int, List[Opcion]] = {}
+        # Por bloque, las opciones del documento que lo incluyen
+        self.opciones_bloque: Dict[int, List[List[int]]] = {}
+        self.nombres: Dict[int, str] = {}
+        self.por_id_materia: Dict[str, Set[int]] = {}
+
+    def construir(self, documentos: Iterable[Dict]):
+        """Precalcula bloques y opciones de todos los documentos RAG"""
+        self.bloques, self.opciones, self.opciones_bloque = {}, {}, {}
+        self.nombres, self.por_id_materia = {}, {}
+        for documento in documentos:
+            self.agregar_documento(documento)
+
+    def agregar_documento(self, documento: Dict):
+        faiss_id = documento['faiss_id']
+        bloques = self._bloques_documento(documento)
+        opciones = self._opciones(bloques)
+
+        self.bloques[faiss_id] = bloques
+        self.opciones[faiss_id] = opciones
+        self.opciones_bloque[faiss_id] = [
+            [i for i, opcion in enumerate(opciones) if not bloque[3] or (bloque[2], bloque[3]) in opcion]
+            for bloque in bloques
+        ]
+        self.nombres[faiss_id] = documento['metadatos'].get('materia_nombre', '')
+        self.por_id_materia.setdefault(documento.get('id', ''), set()).add(faiss_id)
+
+    def quitar_documentos(self, faiss_ids: Iterable[int]):
+        for faiss_id in faiss_ids:
+            for tabla in (self.bloques, self.opciones, self.opciones_bloque, self.nombres):
+                tabla.pop(faiss_id, None)
+            for id_materia in list(self.por_id_materia):
+                self.por_id_materia[id_materia].discard(faiss_id)
+                if not self.por_id_materia[id_materia]:
+                    del self.por_id_materia[id_materia]
+
+    @staticmethod
+    def _bloques_documento(documento: Dict) -> List[Bloque]:
+        bloques = []
+        horarios = documento.get('materia_original', {}).get('horarios', [])
+        for posicion, horario in enumerate(horarios):
+            dia = normalizar_dia(horario.get('dia', ''))
+            inicio = hora_a_minutos(horario.get('hora_inicio', ''))
+            fin = hora_a_minutos(horario.get('hora_fin', ''))
+            if dia is None or inicio is None or fin is None or fin <= inicio:
+                continue
+            bloques.append((minuto_semana(dia, inicio), minuto_semana(dia, fin),
+                            horario.get('tipo_actividad') or 'general', (horario.get('comision') or '').strip(),
+                            posicion))
+        bloques.sort()
+        return bloques
+
+    @staticmethod
+    def _opciones(bloques: List[Bloque]) -> List[Opcion]:
+        """Combinaciones de una comisión por tipo de actividad (los bloques sin comisión van en todas)"""
+        comisiones: Dict[str, List[str]] = {}
+        for _, _, tipo, comision, _ in bloques:
+            if comision and comision not in comisiones.setdefault(tipo, []):
+                comisiones[tipo].append(comision)
+        tipos = sorted(tipo for tipo in comisiones if comisiones[tipo])
+        return [tuple(zip(tipos, eleccion)) for eleccion in product(*(comisiones[tipo] for tipo in tipos))]
+
+    def bloques_opcion(self, faiss_id: int, opcion: int) -> List[Bloque]:
+        """Bloques que cursa quien elige esa opción del documento"""
+        return [bloque for bloque, opciones in zip(self.bloques[faiss_id], self.opciones_bloque[faiss_id])
+                if opcion in opciones]
+
+    def opciones_dentro(self, faiss_id: int, posiciones: Set[int]) -> List[int]:
+        """Opciones del documento cuyos bloques están todos entre las posiciones de horario indicadas"""
+        descartadas: Set[int] = set()
+        for bloque, opciones in zip(self.bloques.get(faiss_id, ()), self.opciones_bloque.get(faiss_id, ())):
+            if bloque[4] not in posiciones:
+                descartadas.update(opciones)
+        return [i for i in range(len(self.opciones.get(faiss_id, ()))) if i not in descartadas]
+
+    def detectar_conflictos(self, grupos: Dict[str, Iterable[int]]) -> Dict[str, Any]:
+        """
+        Superposiciones entre materias
+
+        Los documentos de un mismo grupo son alternativas entre sí (la misma
+        materia en otra comisión o turno), así que solo se comparan bloques
+        de grupos distintos.
+
+        Args:
+            grupos: Etiqueta de cada materia pedida -> IDs FAISS de sus documentos
+
+        Returns:
+            conflictos: cada superposición entre bloques (materias, comisiones, día, rango, minutos)
+            pares: por par de materias, combinaciones de opciones, cuántas son compatibles y
+                   los minutos superpuestos mínimos entre todas las combinaciones
+            sin_horarios: materias sin horarios cargados
+            compatible: si cada par de materias tiene alguna combinación sin superposición
+                        (que exista un horario para todas juntas lo decide el generador)
+        """
+        grupos = {etiqueta: [i for i in ids if i in self.bloques] for etiqueta, ids in grupos.items()}
+        eventos = []
+        for etiqueta, ids in grupos.items():
+            for faiss_id in ids:
+                for posicion, bloque in enumerate(self.bloques[faiss_id]):
+                    eventos.append((bloque[0], bloque[1], etiqueta, faiss_id, posicion))
+        eventos.sort()
+
+        conflictos = []
+        superpuestos: Dict[Tuple[str, str], Dict[Tuple, int]] = {}
+        activos: List[Tuple[int, int]] = []  # heap (fin, índice del evento)
+        for indice, (inicio, fin, etiqueta, faiss_id, posicion) in enumerate(eventos):
+            while activos and activos[0][0] <= inicio:
+                heapq.heappop(activos)
+            for fin_otro, otro in activos:
+                _, _, etiqueta_otro, faiss_id_otro, posicion_otro = eventos[otro]
+                if etiqueta_otro == etiqueta:
+                    continue
+                minutos = min(fin, fin_otro) - inicio
+                conflictos.append(self._conflicto(eventos[otro], eventos[indice], inicio, min(fin, fin_otro)))
+
+                # Minutos superpuestos por combinación de opciones de ambas materias
+                a, b = (etiqueta_otro, faiss_id_otro, posicion_otro), (etiqueta, faiss_id, posicion)
+                if a[0] > b[0]:
+                    a, b = b, a
+                combinaciones = superpuestos.setdefault((a[0], b[0]), {})
+                for opcion_a in self.opciones_bloque[a[1]][a[2]]:
+                    for opcion_b in self.opciones_bloque[b[1]][b[2]]:
+                        clave = (a[1], opcion_a, b[1], opcion_b)
+                        combinaciones[clave] = combinaciones.get(clave, 0) + minutos
+            heapq.heappush(activos, (fin, indice))
+
+        etiquetas = sorted(grupos)
+        pares = []
+        for i, etiqueta_a in enumerate(etiquetas):
+            for etiqueta_b in etiquetas[i + 1:]:
+                total = self._cantidad_opciones(grupos[etiqueta_a]) * self._cantidad_opciones(grupos[etiqueta_b])
+                if not total:
+                    continue
+                combinaciones = superpuestos.get((etiqueta_a, etiqueta_b), {})
+                compatibles = total - len(combinaciones)
+                pares.append({
+                    'materia_a': etiqueta_a,
+                    'materia_b': etiqueta_b,
+                    'combinaciones': total,
+                    'combinaciones_compatibles': compatibles,
+                    'minutos_superpuestos': 0 if compatibles else min(combinaciones.values()),
+                    'compatible': compatibles > 0,
+                })
+
+        return {
+            'conflictos': conflictos,
+            'pares': pares,
+            'sin_horarios': [etiqueta for etiqueta in etiquetas
+                             if not any(self.bloques[i] for i in grupos[etiqueta])],
+            'compatible': all(par['compatible'] for par in pares),
+        }
+
+    def _cantidad_opciones(self, faiss_ids: List[int]) -> int:
+        return sum(len(self.opciones[i]) for i in faiss_ids if self.bloques[i])
+
+    def _conflicto(self, evento_a: Tuple, evento_b: Tuple, desde: int, hasta: int) -> Dict[str, Any]:
+        bloque_a = self.bloques[evento_a[3]][evento_a[4]]
+        bloque_b = self.bloques[evento_b[3]][evento_b[4]]
+        dia, hora_desde = describir_minuto(desde)
+        return {
+            'materia_a': evento_a[2], 'materia_b': evento_b[2],
+            'faiss_id_a': evento_a[3], 'faiss_id_b': evento_b[3],
+            'nombre_a': self.nombres[evento_a[3]], 'nombre_b': self.nombres[evento_b[3]],
+            'tipo_a': bloque_a[2], 'tipo_b': bloque_b[2],
+            'comision_a': bloque_a[3], 'comision_b': bloque_b[3],
+            'dia': dia, 'desde': hora_desde, 'hasta': describir_minuto(hasta)[1],
+            'minutos': hasta - desde,
+        }
+
+
+def main():
+    """Función principal"""
+    try:
+        from .sistema_embeddings_horarios import SistemaEmbeddingsHorarios
+    except ImportError:
+        from sistema_embeddings_horarios import SistemaEmbeddingsHorarios
+
+    parser = argparse.ArgumentParser(description="Conflictos de horarios entre materias")
+    parser.add_argument("materias", nargs='+', help="Nombres, prefijos o IDs de materias")
+    parser.add_argument("--sistema", "-s", default=None, help="Directorio del sistema RAG")
+    args = parser.parse_args()
+
+    sistema = SistemaEmbeddingsHorarios()
+    sistema.cargar_sistema_horarios(args.sistema)
+    reporte = sistema.detectar_conflictos(args.materias)
+
+    for referencia in reporte['no_encontradas']:
+        print(f"❓ No se encontró: {referencia}")
+    for referencia in reporte['sin_horarios']:
+        print(f"📭 Sin horarios: {referencia}")
+    for par in reporte['pares']:
+        estado = "✅" if par['compatible'] else f"❌ ({par['minutos_superpuestos']} min superpuestos como mínimo)"
+        print(f"{estado} {par['materia_a']} / {par['materia_b']}: "
+              f"{par['combinaciones_compatibles']}/{par['combinaciones']} combinaciones compatibles")
+    for conflicto in reporte['conflictos']:
+        print(f"   ⚠️  {conflicto['dia']} {conflicto['desde']}-{conflicto['hasta']} ({conflicto['minutos']} min): "
+              f"{conflicto['nombre_a']} [{conflicto['comision_a'] or conflicto['tipo_a']}] vs "
+              f"{conflicto['nombre_b']} [{conflicto['comision_b'] or conflicto['tipo_b']}]")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Ocupación Semanal de Horarios (agregación vectorizada)
+Tensores clave × día × franja para estadísticas, mapas de calor y horas pico
+
+Al cargar el índice todas las clases se agregan de una vez con NumPy: por cada
+dimensión (departamento, tipo de actividad, aula) se acumulan +1/-1 en los
+bordes de cada clase y una suma acumulada por franja da cuántas clases hay en
+curso. Agregar o quitar documentos suma o resta solo su aporte, sin recorrer
+el resto.
+
+Uso:
+    python ocupacion_horarios.py
+    python ocupacion_horarios.py --dimension departamento --clave DC
+
+Autor: Sistema RAG MVP
+Fecha: 2025-08-15
+"""
+
+import argparse
+import os
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from .indice_horarios import DIAS_SEMANA, hora_a_minutos, minutos_a_hora, normalizar_dia
+    from .motor_conflictos import MINUTOS_DIA
+except ImportError:
+    from indice_horarios import DIAS_SEMANA, hora_a_minutos, minutos_a_hora, normalizar_dia
+    from motor_conflictos import MINUTOS_DIA
+
+GRANULARIDAD_MINUTOS = 15
+
+DIMENSIONES = ('departamento', 'tipo_actividad', 'aula')
+
+# Columnas de la matriz de clases de un documento: día, franja inicial, franja
+# final (exclusiva) y el índice de su clave en cada dimensión
+_COLUMNAS_CLASE = 3 + len(DIMENSIONES)
+
+
+def normalizar_clave(dimension: str, valor: Any) -> str:
+    """Clave canónica de un valor ('' = sin dato)"""
+    valor = str(valor or '').strip()
+    if dimension == 'tipo_actividad':
+        return valor.lower()
+    return valor.upper()
+
+
+class OcupacionHorarios:
+    """Clases en curso por franja de la semana, agregadas por dimensión"""
+
+    def __init__(self, granularidad: int = GRANULARIDAD_MINUTOS):
+        self.granularidad = granularidad
+        self.franjas = MINUTOS_DIA // granularidad
+        self.claves: Dict[str, Dict[str, int]] = {dimension: {} for dimension in DIMENSIONES}
+        # Por dimensión: int32 (claves, días, franjas)
+        self.tensores: Dict[str, np.ndarray] = {dimension: self._tensor(0) for dimension in DIMENSIONES}
+        self.materias_dia = np.zeros(len(DIAS_SEMANA), dtype=np.int64)
+        self.departamentos: Dict[str, Dict[str, Any]] = {}
+        # Aporte de cada documento, para restarlo al quitarlo
+        self.aportes: Dict[int, Dict[str, Any]] = {}
+
+    def _tensor(self, filas: int) -> np.ndarray:
+        return np.zeros((filas, len(DIAS_SEMANA), self.franjas), dtype=np.int32)
+
+    def _indice_clave(self, dimension: str, clave: str) -> int:
+        """Índice de la clave en su dimensión; las claves nuevas agregan una fila"""
+        indices = self.claves[dimension]
+        if clave not in indices:
+            indices[clave] = len(indices)
+        return indices[clave]
+
+    def _asegurar_filas(self):
+        for dimension in DIMENSIONES:
+            faltantes = len(self.claves[dimension]) - len(self.tensores[dimension])
+            if faltantes > 0:
+                self.tensores[dimension] = np.concatenate([self.tensores[dimension], self._tensor(faltantes)])
+
+    def _aporte_documento(self, documento: Dict) -> Dict[str, Any]:
+        """Clases válidas del documento como matriz de enteros, días que ocupa y departamento"""
+        metadatos = documento.get('metadatos', {})
+        departamento = normalizar_clave('departamento', metadatos.get('departamento_codigo'))
+        clases = []
+        for horario in documento.get('materia_original', {}).get('horarios', []):
+            dia = normalizar_dia(horario.get('dia', ''))
+            inicio = hora_a_minutos(horario.get('hora_inicio', ''))
+            fin = hora_a_minutos(horario.get('hora_fin', ''))
+            if dia is None or inicio is None or fin is None or fin <= inicio:
+                continue
+            valores = (departamento, normalizar_clave('tipo_actividad', horario.get('tipo_actividad')),
+                       normalizar_clave('aula', horario.get('aula')))
+            clases.append((DIAS_SEMANA.index(dia), inicio // self.granularidad, -(-fin // self.granularidad),
+                           *(self._indice_clave(d, v) for d, v in zip(DIMENSIONES, valores))))
+
+        clases = np.array(clases, dtype=np.int64).reshape(-1, _COLUMNAS_CLASE)
+        dias = np.zeros(len(DIAS_SEMANA), dtype=np.int64)
+        dias[clases[:, 0]] = 1
+        return {
+            'clases': clases,
+            'dias': dias,
+            'departamento': departamento,
+            'nombre_departamento': metadatos.get('departamento_nombre', ''),
+            'tiene_horarios': bool(metadatos.get('tiene_horarios')),
+        }
+
+    def _acumular(self, clases: np.ndarray, signo: int):
+        """Suma (o resta) clases a los tensores tocando solo las filas de sus claves"""
+        if not len(clases):
+            return
+        self._asegurar_filas()
+        for posicion, dimension in enumerate(DIMENSIONES):
+            filas, inversa = np.unique(clases[:, 3 + posicion], return_inverse=True)
+            bordes = np.zeros((len(filas), len(DIAS_SEMANA), self.franjas + 1), dtype=np.int32)
+            np.add.at(bordes, (inversa, clases[:, 0], clases[:, 1]), signo)
+            np.add.at(bordes, (inversa, clases[:, 0], clases[:, 2]), -signo)
+            self.tensores[dimension][filas] += np.cumsum(bordes, axis=2, dtype=np.int32)[:, :, :-1]
+
+    def _contar_documento(self, aporte: Dict[str, Any], signo: int):
+        self.materias_dia += signo * aporte['dias']
+        resumen = self.departamentos.setdefault(aporte['departamento'], {
+            'nombre': aporte['nombre_departamento'], 'total': 0, 'con_horarios': 0})
+        resumen['total'] += signo
+        resumen['con_horarios'] += signo * aporte['tiene_horarios']
+        if resumen['total'] <= 0:
+            del self.departamentos[aporte['departamento']]
+
+    def construir(self, documentos: Iterable[Dict]):
+        """Agrega todas las clases de los documentos RAG en una sola pasada vectorizada"""
+        self.claves = {dimension: {} for dimension in DIMENSIONES}
+        self.tensores = {dimension: self._tensor(0) for dimension in DIMENSIONES}
+        self.materias_dia = np.zeros(len(DIAS_SEMANA), dtype=np.int64)
+        self.departamentos, self.aportes = {}, {}
+        for documento in documentos:
+            aporte = self._aporte_documento(documento)
+            self.aportes[documento['faiss_id']] = aporte
+            self._contar_documento(aporte, 1)
+        if self.aportes:
+            self._acumular(np.concatenate([a['clases'] for a in self.aportes.values()]), 1)
+        self._asegurar_filas()
+
+    def agregar_documento(self, documento: Dict):
+        """Suma el aporte de un documento nuevo"""
+        aporte = self._aporte_documento(documento)
+        self.aportes[documento['faiss_id']] = aporte
+        self._contar_documento(aporte, 1)
+        self._acumular(aporte['clases'], 1)
+
+    def quitar_documentos(self, faiss_ids: Iterable[int]):
+        """Resta el aporte de los documentos indicados"""
+        quitados = [self.aportes.pop(faiss_id) for faiss_id in faiss_ids if faiss_id in self.aportes]
+        for aporte in quitados:
+            self._contar_documento(aporte, -1)
+        if quitados:
+            self._acumular(np.concatenate([a['clases'] for a in quitados]), -1)
+
+    def __len__(self) -> int:
+        return len(self.aportes)
+
+    def buscar_clave(self, valor: str) -> Optional[Tuple[str, str]]:
+        """(dimensión, clave) de un valor conocido, probando las dimensiones en orden"""
+        for dimension in DIMENSIONES:
+            clave = normalizar_clave(dimension, valor)
+            if clave and clave in self.claves[dimension]:
+                return dimension, clave
+        return None
+
+    def mapa_calor(self, dimension: Optional[str] = None, clave: Optional[str] = None) -> np.ndarray:
+        """
+        Clases en curso por día y franja (días × franjas)
+
+        Sin dimensión cuenta todas las clases; con dimensión y clave, solo las
+        de ese departamento, tipo de actividad o aula.
+        """
+        if dimension is None or clave is None:
+            return self.tensores[dimension or DIMENSIONES[0]].sum(axis=0)
+        fila = self.claves[dimension].get(normalizar_clave(dimension, clave))
+        if fila is None:
+            return np.zeros((len(DIAS_SEMANA), self.franjas), dtype=np.int32)
+        return self.tensores[dimension][fila].copy()
+
+    def horas_pico(self, n: int = 5, dimension: Optional[str] = None, clave: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Los n tramos con más clases en curso, de mayor a menor (franjas contiguas con igual cantidad se unen)"""
+        mapa = self.mapa_calor(dimension, clave)
+        # Un tramo empieza al inicio de cada día o donde cambia la cantidad de clases
+        cambios = np.ones(mapa.shape, dtype=bool)
+        cambios[:, 1:] = mapa[:, 1:] != mapa[:, :-1]
+        inicios = np.flatnonzero(cambios)
+        finales = np.append(inicios[1:], mapa.size)
+        plano = mapa.ravel()
+        ocupados = plano[inicios] > 0
+        inicios, finales = inicios[ocupados], finales[ocupados]
+        orden = np.lexsort((inicios, -plano[inicios]))[:n]
+        return [{'dia': DIAS_SEMANA[inicio // self.franjas],
+                 'desde': minutos_a_hora(inicio % self.franjas * self.granularidad),
+                 'hasta': minutos_a_hora((fin - inicio // self.franjas * self.franjas) * self.granularidad),
+                 'clases': int(plano[inicio])} for inicio, fin in zip(inicios[orden], finales[orden])]
+
+    def materias_por_dia(self) -> Dict[str, int]:
+        """Documentos con al menos una clase en cada día (solo días con clases)"""
+        return {dia: int(cantidad) for dia, cantidad in zip(DIAS_SEMANA, self.materias_dia) if cantidad}
+
+    def horas_semanales(self, dimension: str) -> Dict[str, float]:
+        """Horas de clase por semana de cada clave de la dimensión (redondeadas a la franja)"""
+        totales = self.tensores[dimension].sum(axis=(1, 2)) * self.granularidad / 60
+        return {clave: float(totales[fila]) for clave, fila in self.claves[dimension].items() if totales[fila]}
+
+    def resumen_departamentos(self) -> Dict[str, Dict[str, Any]]:
+        """Por departamento: nombre, materias, materias con horarios y horas semanales de clase"""
+        horas = self.horas_semanales('departamento')
+        return {codigo: {**resumen, 'horas_semanales': horas.get(codigo, 0.0)}
+                for codigo, resumen in sorted(self.departamentos.items())}
+
+
+def dibujar_mapa_calor(mapa: np.ndarray, granularidad: int, desde_hora: int = 7, hasta_hora: int = 23) -> str:
+    """Mapa de calor en texto: un renglón por día con clases y una columna por hora"""
+    franjas_hora = 60 // granularidad
+    por_hora = mapa[:, :24 * franjas_hora].reshape(len(DIAS_SEMANA), 24, franjas_hora).max(axis=2)
+    por_hora = por_hora[:, desde_hora:hasta_hora]
+    maximo = int(por_hora.max()) if por_hora.size else 0
+    niveles = ' ░▒▓█'
+    lineas = ['          ' + ''.join(f"{hora:<3d}" for hora in range(desde_hora, hasta_hora))]
+    for dia, fila in zip(DIAS_SEMANA, por_hora):
+        if not fila.any():
+            continue
+        celdas = [niveles[0 if not valor else 1 + (len(niveles) - 2) * int(valor) // maximo] * 3 for valor in fila]
+        lineas.append(f"{dia:<10}" + ''.join(celdas))
+    lineas.append(f"          (máximo: {maximo} clases simultáneas)")
+    return '\n'.join(lineas)
+
+
+def main():
+    """Función principal"""
+    try:
+        from .sistema_embeddings_horarios import SistemaEmbeddingsHorarios
+        from .config_paths import RAG_SISTEMA_DIR
+    except ImportError:
+        from sistema_embeddings_horarios import SistemaEmbeddingsHorarios
+        from config_paths import RAG_SISTEMA_DIR
+
+    parser = argparse.ArgumentParser(description="Ocupación semanal de las clases del sistema RAG")
+    parser.add_argument('--dimension', choices=DIMENSIONES, help='Dimensión a filtrar')
+    parser.add_argument('--clave', help='Departamento, tipo de actividad o aula')
+    parser.add_argument('--pico', type=int, default=5, help='Cantidad de franjas pico a mostrar')
+    args = parser.parse_args()
+
+    sistema = SistemaEmbeddingsHorarios()
+    if not os.path.exists(RAG_SISTEMA_DIR):
+        print(f"❌ No se encontró el sistema RAG de horarios en: {RAG_SISTEMA_DIR}")
+        return
+    try:
+        sistema.cargar_sistema_horarios(str(RAG_SISTEMA_DIR))
+    except Exception as e:
+        print(f"❌ Error cargando el sistema RAG de horarios: {e}")
+        return
+
+    ocupacion = sistema.ocupacion
+    print(dibujar_mapa_calor(ocupacion.mapa_calor(args.dimension, args.clave), ocupacion.granularidad))
+    print("\n🔥 Horas pico:")
+    for pico in ocupacion.horas_pico(args.pico, args.dimension, args.clave):
+        print(f"   • {pico['dia']} {pico['desde']}-{pico['hasta']}: {pico['clases']} clases")
+
+
+if __name__ == "__main__":
+    main()
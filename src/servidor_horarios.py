@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Servidor Residente de Consultas de Horarios
+Carga el sistema RAG una sola vez (índice, documentos y modelo) y atiende
+consultas por socket Unix, para que cada invocación del CLI no pague el
+arranque de torch, el modelo y FAISS
+
+consultar_horarios_rag.py usa el servidor automáticamente si está corriendo.
+Las búsquedas concurrentes se agrupan en micro-lotes (agrupador_consultas.py):
+una pasada del modelo y una búsqueda FAISS por lote.
+
+Si el sistema usa snapshots versionados (snapshots_horarios.py), el servidor
+recarga la versión publicada sin dejar de atender ('recargar', SIGHUP o
+--vigilar): la nueva versión se carga aparte reutilizando el modelo ya
+cargado y se activa entre dos lotes.
+
+Uso:
+    python servidor_horarios.py                       # sistema y socket por defecto
+    python servidor_horarios.py --modo hibrido --socket /tmp/rag.sock
+    python servidor_horarios.py --max-lote 64 --espera-ms 2
+    python servidor_horarios.py --vigilar 10          # recargar al publicarse una versión
+
+Autor: Sistema RAG MVP
+Fecha: 2025-08-10
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import signal
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from .config_paths import RAG_SISTEMA_DIR, RAG_SOCKET_FILE
+    from .agrupador_consultas import AgrupadorConsultas
+    from .consultar_horarios_rag import ConsultorHorarios
+    from .cliente_horarios import ClienteHorarios
+    from .sistema_embeddings_horarios import MODOS_BUSQUEDA, SistemaEmbeddingsHorarios
+    from .snapshots_horarios import resolver_directorio, verificar_snapshot, version_actual
+except ImportError:
+    from config_paths import RAG_SISTEMA_DIR, RAG_SOCKET_FILE
+    from agrupador_consultas import AgrupadorConsultas
+    from consultar_horarios_rag import ConsultorHorarios
+    from cliente_horarios import ClienteHorarios
+    from sistema_embeddings_horarios import MODOS_BUSQUEDA, SistemaEmbeddingsHorarios
+    from snapshots_horarios import resolver_directorio, verificar_snapshot, version_actual
+
+logger = logging.getLogger(__name__)
+
+
+class ServidorHorarios:
+    """Servidor asyncio de consultas sobre un ConsultorHorarios cargado"""
+
+    def __init__(self, directorio_sistema: str = str(RAG_SISTEMA_DIR), ruta_socket: Optional[str] = None,
+                 modo_busqueda: str = "vectorial", precalentar: bool = True,
+                 max_lote: int = 32, espera_maxima_ms: float = 5.0, intervalo_vigilancia: float = 0.0):
+        """
+        Args:
+            directorio_sistema: Directorio del sistema RAG de horarios
+            ruta_socket: Socket Unix donde escuchar (None = ubicación por defecto)
+            modo_busqueda: Modo por defecto de las consultas
+            precalentar: Si True, carga el modelo antes de aceptar consultas
+            max_lote: Consultas máximas por micro-lote (1 = sin agrupar)
+            espera_maxima_ms: Espera máxima de una consulta a que se junte su lote
+            intervalo_vigilancia: Segundos entre controles de versión publicada (0 = no vigilar)
+        """
+        self.directorio_sistema = directorio_sistema
+        self.ruta_socket = str(ruta_socket or RAG_SOCKET_FILE)
+        self.precalentar = precalentar
+        self.consultor = ConsultorHorarios(directorio_sistema, modo_busqueda)
+        # El sistema no es seguro entre hilos: las búsquedas se serializan en un único hilo
+        self._ejecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rag-consultas")
+        self.agrupador = AgrupadorConsultas(self.buscar_lote, max_lote, espera_maxima_ms, self._ejecutor)
+        self._detener: Optional[asyncio.Event] = None
+        self._recargando: Optional[asyncio.Lock] = None
+        self.intervalo_vigilancia = intervalo_vigilancia
+        self.recargas = 0
+        self.consultas_atendidas = 0
+        self.tiempo_consultas = 0.0
+        self.inicio: Optional[float] = None
+
+    @property
+    def sistema(self):
+        return self.consultor.sistema
+
+    def cargar(self) -> bool:
+        """Carga el sistema y, opcionalmente, el modelo"""
+        if not self.consultor.cargar_sistema():
+            return False
+        if self.precalentar and self.sistema.modo_busqueda != 'lexico':
+            self.sistema.codificar_consultas(["horarios"])
+        return True
+
+    def buscar(self, consulta: str, k: int = 5, modo: Optional[str] = None) -> List[Dict]:
+        """Búsqueda sincrónica con resultados serializables"""
+        resultados, _ = self.sistema.buscar_con_intencion(consulta, k=k, modo=modo)
+        return [self.consultor.estructurar_resultado(doc, score) for doc, score in resultados]
+
+    def preparar_version(self) -> SistemaEmbeddingsHorarios:
+        """
+        Carga la versión publicada en un sistema nuevo, sin tocar el que atiende
+
+        Reutiliza el modelo y el cache de consultas del sistema actual si el
+        codificador es el mismo, así la recarga no paga el arranque del modelo.
+        """
+        actual = self.sistema
+        ruta = resolver_directorio(self.directorio_sistema)
+        if ruta != self.directorio_sistema:
+            verificar_snapshot(ruta)
+
+        nuevo = SistemaEmbeddingsHorarios(
+            modelo_nombre=actual.modelo_nombre, directorio_cache=actual.directorio_cache,
+            backend=actual.backend, directorio_onnx=actual.directorio_onnx,
+            modo_busqueda=actual.modo_busqueda, candidatos_fusion=actual.candidatos_fusion,
+            tipo_indice=actual.tipo_indice, parametros_indice=actual.parametros_indice,
+        )
+        nuevo.cargar_sistema_horarios(ruta)
+
+        if actual.modelo_cargado and nuevo.dimension == actual.dimension:
+            nuevo.modelo = actual.modelo
+            nuevo.cache_consultas = actual.cache_consultas
+        elif self.precalentar and nuevo.modo_busqueda != 'lexico':
+            nuevo.codificar_consultas(["horarios"])
+        if nuevo.modo_busqueda != 'vectorial':
+            nuevo.indice_bm25
+        return nuevo
+
+    def activar_version(self, nuevo: SistemaEmbeddingsHorarios):
+        """Reemplaza el sistema que atiende (se llama en el hilo de búsquedas, entre dos lotes)"""
+        self.consultor.sistema = nuevo
+        self.recargas += 1
+
+    async def recargar(self) -> Dict[str, Any]:
+        """Carga y activa la versión publicada si cambió; las consultas se siguen atendiendo mientras tanto"""
+        async with self._recargando:
+            publicada = version_actual(self.directorio_sistema)
+            if publicada is None or publicada == self.sistema.version_snapshot:
+                return {'recargado': False, 'version': self.sistema.version_snapshot}
+
+            loop = asyncio.get_running_loop()
+            inicio = perf_counter()
+            nuevo = await loop.run_in_executor(None, self.preparar_version)
+            await loop.run_in_executor(self._ejecutor, self.activar_version, nuevo)
+            logger.info(f"🔄 Versión {nuevo.version_snapshot} activa ({perf_counter() - inicio:.2f}s)")
+            return {'recargado': True, 'version': nuevo.version_snapshot}
+
+    async def _recargar_en_segundo_plano(self):
+        """Recarga disparada por señal o vigilancia: los errores no detienen el servidor"""
+        try:
+            await self.recargar()
+        except Exception as e:
+            logger.error(f"❌ Error recargando el sistema: {e}")
+
+    async def _vigilar(self):
+        """Controla periódicamente si se publicó otra versión"""
+        while True:
+            await asyncio.sleep(self.intervalo_vigilancia)
+            if version_actual(self.directorio_sistema) != self.sistema.version_snapshot:
+                await self._recargar_en_segundo_plano()
+
+    def buscar_lote(self, solicitudes: List[Tuple[str, int, Optional[str]]]) -> List[List[Dict]]:
+        """
+        Búsqueda sincrónica de un micro-lote de (consulta, k, modo)
+
+        Las consultas con el mismo k y modo se resuelven con una sola llamada
+        a buscar_con_intencion_batch (las estructuradas salen de los índices exactos
+        y las demás comparten una búsqueda); los resultados vuelven en el orden recibido.
+        """
+        sistema = self.sistema
+        grupos: Dict[Tuple[int, Optional[str]], List[int]] = {}
+        for posicion, (_, k, modo) in enumerate(solicitudes):
+            grupos.setdefault((k, modo), []).append(posicion)
+
+        resultados: List[List[Dict]] = [[] for _ in solicitudes]
+        for (k, modo), posiciones in grupos.items():
+            lote = sistema.buscar_con_intencion_batch(
+                [solicitudes[posicion][0] for posicion in posiciones], k=k, modo=modo
+            )
+            for posicion, (encontrados, _) in zip(posiciones, lote):
+                resultados[posicion] = [self.consultor.estructurar_resultado(doc, score) for doc, score in encontrados]
+        return resultados
+
+    def estado(self) -> Dict[str, Any]:
+        """Estadísticas del servidor"""
+        return {
+            'sistema': os.path.realpath(self.directorio_sistema),
+            'documentos': len(self.sistema.documentos),
+            'version': self.sistema.version_snapshot,
+            'recargas': self.recargas,
+            'modo_busqueda': self.sistema.modo_busqueda,
+            'modelo_cargado': self.sistema.modelo_cargado,
+            'consultas_atendidas': self.consultas_atendidas,
+            'latencia_media_ms': self.tiempo_consultas / self.consultas_atendidas * 1000 if self.consultas_atendidas else 0.0,
+            'segundos_activo': perf_counter() - self.inicio if self.inicio else 0.0,
+            'cache_consultas': self.sistema.cache_consultas.estadisticas(),
+            'lotes': self.agrupador.estadisticas(),
+        }
+
+    async def procesar(self, mensaje: Dict[str, Any]) -> Dict[str, Any]:
+        """Atiende una solicitud y arma la respuesta"""
+        operacion = mensaje.get('op')
+
+        if operacion == 'ping':
+            return {'ok': True}
+
+        if operacion == 'estado':
+            return {'ok': True, 'estado': self.estado()}
+
+        if operacion == 'recargar':
+            return {'ok': True, **await self.recargar()}
+
+        if operacion == 'detener':
+            self._detener.set()
+            return {'ok': True}
+
+        if operacion == 'buscar':
+            sistema_pedido = mensaje.get('sistema')
+            if sistema_pedido and sistema_pedido != os.path.realpath(self.directorio_sistema):
+                return {'ok': False, 'error': f"El servidor atiende otro sistema: {self.directorio_sistema}"}
+            modo = mensaje.get('modo')
+            if modo is not None and modo not in MODOS_BUSQUEDA:
+                return {'ok': False, 'error': f"Modo de búsqueda desconocido: {modo}"}
+
+            inicio = perf_counter()
+            resultados = await self.agrupador.enviar((str(mensaje.get('consulta', '')), int(mensaje.get('k', 5)), modo))
+            self.consultas_atendidas += 1
+            self.tiempo_consultas += perf_counter() - inicio
+            return {'ok': True, 'resultados': resultados}
+
+        return {'ok': False, 'error': f"Operación desconocida: {operacion}"}
+
+    async def atender(self, lector: asyncio.StreamReader, escritor: asyncio.StreamWriter):
+        """Atiende una conexión: una respuesta por cada línea recibida"""
+        try:
+            while True:
+                linea = await lector.readline()
+                if not linea:
+                    break
+                try:
+                    respuesta = await self.procesar(json.loads(linea))
+                except Exception as e:
+                    logger.error(f"❌ Error atendiendo solicitud: {e}")
+                    respuesta = {'ok': False, 'error': str(e)}
+                escritor.write(json.dumps(respuesta, ensure_ascii=False).encode('utf-8') + b'\n')
+                await escritor.drain()
+        except ConnectionError:
+            pass
+        finally:
+            escritor.close()
+
+    def _preparar_socket(self):
+        """Quita un socket abandonado; falla si otro servidor ya está escuchando"""
+        if not os.path.exists(self.ruta_socket):
+            return
+        if ClienteHorarios(self.ruta_socket, timeout=2).disponible():
+            raise RuntimeError(f"Ya hay un servidor escuchando en {self.ruta_socket}")
+        os.remove(self.ruta_socket)
+
+    async def servir(self):
+        """Escucha en el socket hasta recibir 'detener' o una señal de terminación"""
+        self._detener = asyncio.Event()
+        self._recargando = asyncio.Lock()
+        self._preparar_socket()
+        servidor = await asyncio.start_unix_server(self.atender, path=self.ruta_socket)
+        os.chmod(self.ruta_socket, 0o600)
+
+        loop = asyncio.get_running_loop()
+        for senal in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(senal, self._detener.set)
+            except (NotImplementedError, RuntimeError):
+                pass  # fuera del hilo principal (p. ej. en tests)
+        try:
+            loop.add_signal_handler(signal.SIGHUP, lambda: loop.create_task(self._recargar_en_segundo_plano()))
+        except (AttributeError, NotImplementedError, RuntimeError):
+            pass
+
+        vigilancia = loop.create_task(self._vigilar()) if self.intervalo_vigilancia > 0 else None
+
+        self.agrupador.iniciar()
+        self.inicio = perf_counter()
+        logger.info(f"🟢 Servidor de horarios escuchando en {self.ruta_socket}")
+        try:
+            async with servidor:
+                await self._detener.wait()
+        finally:
+            if vigilancia is not None:
+                vigilancia.cancel()
+            await self.agrupador.detener()
+            if os.path.exists(self.ruta_socket):
+                os.remove(self.ruta_socket)
+            self._ejecutor.shutdown(wait=False)
+            logger.info("🔴 Servidor de horarios detenido")
+
+    def iniciar(self):
+        """Carga el sistema y atiende consultas (bloqueante)"""
+        if not self.cargar():
+            return
+        asyncio.run(self.servir())
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Servidor residente de consultas de horarios")
+    parser.add_argument("--sistema", "-s", default=str(RAG_SISTEMA_DIR), help="Directorio del sistema RAG")
+    parser.add_argument("--socket", default=str(RAG_SOCKET_FILE), help="Socket Unix donde escuchar")
+    parser.add_argument("--modo", "-m", choices=MODOS_BUSQUEDA, default="vectorial", help="Modo de búsqueda por defecto")
+    parser.add_argument("--sin-precalentar", action="store_true", help="Cargar el modelo recién con la primera consulta")
+    parser.add_argument("--max-lote", type=int, default=32, help="Consultas máximas por micro-lote (1 = sin agrupar)")
+    parser.add_argument("--espera-ms", type=float, default=5.0, help="Espera máxima para juntar un micro-lote (ms)")
+    parser.add_argument("--vigilar", type=float, default=0.0, metavar="SEGUNDOS",
+                        help="Recargar sola la versión publicada, controlando cada SEGUNDOS")
+    args = parser.parse_args()
+
+    ServidorHorarios(args.sistema, args.socket, args.modo, precalentar=not args.sin_precalentar,
+                     max_lote=args.max_lote, espera_maxima_ms=args.espera_ms,
+                     intervalo_vigilancia=args.vigilar).iniciar()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,47 @@
 import json
 import numpy as np
-from sentence_transformers import SentenceTransformer
 import faiss
 import pickle
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Tuple, Optional
 import os
+try:
+    from .codificadores import crear_codificador
+    from .fabrica_indices import TIPOS_INDICE, crear_indice, configurar_busqueda, resolver_parametros
+except ImportError:
+    from codificadores import crear_codificador
+    from fabrica_indices import TIPOS_INDICE, crear_indice, configurar_busqueda, resolver_parametros
 
 
 class SistemaEmbeddings:
     def __init__(
         self,
         modelo_nombre: str = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2",
+        backend: str = "torch",
+        directorio_onnx: Optional[str] = None,
+        tipo_indice: str = "flat",
+        parametros_indice: Optional[Dict[str, int]] = None,
     ):
         """
         Inicializa el sistema de embeddings
 
         Args:
             modelo_nombre: Nombre del modelo de sentence transformers para español
+            backend: Backend de codificación ('torch', 'onnx' u 'onnx-int8')
+            directorio_onnx: Directorio base de los modelos exportados a ONNX
+            tipo_indice: Índice FAISS a construir ('flat', 'hnsw', 'ivf-flat' o 'ivf-pq')
+            parametros_indice: Parámetros del índice (M, nlist, m, nbits, efSearch, nprobe)
         """
-        print(f"🤖 Cargando modelo de embeddings: {modelo_nombre}")
-        self.modelo = SentenceTransformer(modelo_nombre)
+        if tipo_indice not in TIPOS_INDICE:
+            raise ValueError(f"Tipo de índice desconocido: {tipo_indice} (opciones: {', '.join(TIPOS_INDICE)})")
+        print(f"🤖 Cargando modelo de embeddings: {modelo_nombre} ({backend})")
+        self.modelo_nombre = modelo_nombre
+        self.backend = backend
+        self.modelo = crear_codificador(backend, modelo_nombre, directorio_onnx)
         self.dimension = self.modelo.get_sentence_embedding_dimension()
         self.index = None
+        self.tipo_indice = tipo_indice
+        self.parametros_indice = parametros_indice
+        self.configuracion_indice = {"tipo": tipo_indice, "parametros": {}}
         self.documentos = []
 
     def crear_embeddings(self, documentos: List[Dict[str, Any]]) -> np.ndarray:
@@ -47,14 +67,22 @@ class SistemaEmbeddings:
             f"🗃️ Creando índice FAISS con {len(embeddings)} vectores de dimensión {self.dimension}"
         )
 
-        # Usar IndexFlatIP para similitud coseno (Inner Product tras normalización)
-        self.index = faiss.IndexFlatIP(self.dimension)
-
         # Normalizar embeddings para usar producto interno como similitud coseno
-        embeddings_norm = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+        embeddings_norm = (
+            embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+        ).astype(np.float32)
+
+        # Índice exacto (Flat) o aproximado según tipo_indice
+        parametros = resolver_parametros(
+            self.tipo_indice, self.dimension, len(embeddings_norm), self.parametros_indice
+        )
+        self.index = crear_indice(
+            self.tipo_indice, self.dimension, embeddings_norm, parametros
+        )
+        self.configuracion_indice = {"tipo": self.tipo_indice, "parametros": parametros}
 
         # Agregar al índice
-        self.index.add(embeddings_norm.astype(np.float32))
+        self.index.add(embeddings_norm)
 
         print(f"✅ Índice creado con {self.index.ntotal} vectores")
 
@@ -102,7 +130,8 @@ class SistemaEmbeddings:
         # Devolver documentos con scores
         resultados = []
         for i, (score, idx) in enumerate(zip(scores[0], indices[0])):
-            if idx < len(self.documentos):  # Verificar índice válido
+            # HNSW e IVF devuelven -1 cuando no encuentran k vecinos
+            if 0 <= idx < len(self.documentos):  # Verificar índice válido
                 documento = self.documentos[idx]
                 resultados.append((documento, float(score)))
 
@@ -123,12 +152,10 @@ class SistemaEmbeddings:
 
         # Guardar metadatos del sistema
         metadatos = {
-            "modelo_nombre": (
-                self.modelo.model_name
-                if hasattr(self.modelo, "model_name")
-                else "unknown"
-            ),
+            "modelo_nombre": self.modelo_nombre,
+            "backend": self.backend,
             "dimension": self.dimension,
+            "indice": self.configuracion_indice,
             "total_documentos": len(self.documentos),
             "total_vectores": self.index.ntotal if self.index else 0,
         }
@@ -159,6 +186,19 @@ class SistemaEmbeddings:
         ) as f:
             metadatos = json.load(f)
 
+        backend_indice = metadatos.get("backend", "torch")
+        if backend_indice != self.backend:
+            print(f"⚠️ El índice se construyó con el backend {backend_indice} y el sistema usa {self.backend}")
+
+        self.configuracion_indice = metadatos.get(
+            "indice", {"tipo": "flat", "parametros": {}}
+        )
+        self.tipo_indice = self.configuracion_indice["tipo"]
+        configurar_busqueda(
+            self.index,
+            {**self.configuracion_indice["parametros"], **(self.parametros_indice or {})},
+        )
+
         print(
             f"✅ Sistema cargado: {metadatos['total_documentos']} documentos, {metadatos['total_vectores']} vectores"
         )
@@ -9,19 +9,49 @@ Fecha: 2025-07-27
 
 import json
 import numpy as np
-from sentence_transformers import SentenceTransformer
 import faiss
 import pickle
-from typing import List, Dict, Any, Tuple, Optional
+from typing import List, Dict, Any, Iterable, Set, Tuple, Optional, Union
 import os
 import re
-from datetime import datetime, time
+from datetime import datetime
+from time import perf_counter
 import logging
 import unicodedata
 try:
-    from .config_paths import RAG_DOCUMENTOS_FILE, RAG_INDICE_FILE, RAG_METADATOS_FILE, RAG_SISTEMA_DIR
+    from .config_paths import RAG_DOCUMENTOS_FILE, RAG_DOCUMENTOS_BIN_FILE, RAG_INDICE_FILE, RAG_METADATOS_FILE, RAG_CAMBIOS_FILE, RAG_SISTEMA_DIR, RAG_CACHE_EMBEDDINGS_DIR, RAG_MANIFIESTO_FILE
+    from .cache_embeddings import CacheEmbeddings, CacheConsultasLRU
+    from .indice_horarios import IndiceHorarios, hora_a_minutos, normalizar_dia, unir_ventanas, DIAS_SEMANA
+    from .filtros_metadatos import IndiceMetadatos
+    from .almacen_documentos import AlmacenDocumentos
+    from .codificadores import crear_codificador, identificador_codificador
+    from .bm25_horarios import IndiceBM25, fusionar_rrf
+    from .interpretador_consultas import InterpretadorConsultas
+    from .motor_conflictos import MotorConflictos, describir_bloques
+    from .ocupacion_horarios import OcupacionHorarios
+    from .generador_horarios import GeneradorHorarios
+    from .matriz_conflictos import MatrizConflictos
+    from .snapshots_horarios import directorio_versiones, leer_manifiesto, publicar_snapshot, version_actual
+    from .fabrica_indices import (TIPOS_INDICE, bytes_indice, comprimir_indice, crear_indice, configurar_busqueda,
+                                  consultas_sinteticas, indice_base, medir_indice, parametros_busqueda, quitar_ids,
+                                  resolver_parametros, vectores_indice)
 except ImportError:
-    from config_paths import RAG_DOCUMENTOS_FILE, RAG_INDICE_FILE, RAG_METADATOS_FILE, RAG_SISTEMA_DIR
+    from config_paths import RAG_DOCUMENTOS_FILE, RAG_DOCUMENTOS_BIN_FILE, RAG_INDICE_FILE, RAG_METADATOS_FILE, RAG_CAMBIOS_FILE, RAG_SISTEMA_DIR, RAG_CACHE_EMBEDDINGS_DIR, RAG_MANIFIESTO_FILE
+    from cache_embeddings import CacheEmbeddings, CacheConsultasLRU
+    from indice_horarios import IndiceHorarios, hora_a_minutos, normalizar_dia, unir_ventanas, DIAS_SEMANA
+    from filtros_metadatos import IndiceMetadatos
+    from almacen_documentos import AlmacenDocumentos
+    from codificadores import crear_codificador, identificador_codificador
+    from bm25_horarios import IndiceBM25, fusionar_rrf
+    from interpretador_consultas import InterpretadorConsultas
+    from motor_conflictos import MotorConflictos, describir_bloques
+    from ocupacion_horarios import OcupacionHorarios
+    from generador_horarios import GeneradorHorarios
+    from matriz_conflictos import MatrizConflictos
+    from snapshots_horarios import directorio_versiones, leer_manifiesto, publicar_snapshot, version_actual
+    from fabrica_indices import (TIPOS_INDICE, bytes_indice, comprimir_indice, crear_indice, configurar_busqueda,
+                                 consultas_sinteticas, indice_base, medir_indice, parametros_busqueda, quitar_ids,
+                                 resolver_parametros, vectores_indice)
 
 # Configuración de logging
 logging.basicConfig(
@@ -30,25 +60,78 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Modos de recuperación: solo FAISS, solo BM25 o ambos fusionados con RRF
+MODOS_BUSQUEDA = ('vectorial', 'lexico', 'hibrido')
+
 class SistemaEmbeddingsHorarios:
     """Sistema de embeddings especializado para consultas de horarios académicos"""
     
     def __init__(
         self,
         modelo_nombre: str = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2",
+        directorio_cache: Optional[str] = None,
+        tamano_cache_consultas: int = 1024,
+        backend: str = "torch",
+        directorio_onnx: Optional[str] = None,
+        modo_busqueda: str = "vectorial",
+        candidatos_fusion: int = 50,
+        tipo_indice: str = "flat",
+        parametros_indice: Optional[Dict[str, int]] = None,
     ):
         """
         Inicializa el sistema de embeddings para horarios
         
         Args:
             modelo_nombre: Modelo de sentence transformers para español
+            directorio_cache: Directorio del cache de embeddings (None = ubicación por defecto)
+            tamano_cache_consultas: Consultas cuyo vector se mantiene en memoria (0 = sin cache)
+            backend: Backend de codificación ('torch', 'onnx' u 'onnx-int8')
+            directorio_onnx: Directorio base de los modelos exportados a ONNX
+            modo_busqueda: Modo por defecto de buscar_similares_horarios ('vectorial', 'lexico' o 'hibrido')
+            candidatos_fusion: Candidatos que aporta cada recuperador a la fusión híbrida
+            tipo_indice: Índice FAISS a construir ('flat', 'hnsw', 'ivf-flat' o 'ivf-pq')
+            parametros_indice: Parámetros del índice (M, nlist, m, nbits...); los de
+                búsqueda (efSearch, nprobe) también se aplican al cargar un índice guardado
         """
-        logger.info(f"🤖 Cargando modelo de embeddings para horarios: {modelo_nombre}")
-        self.modelo = SentenceTransformer(modelo_nombre)
-        self.dimension = self.modelo.get_sentence_embedding_dimension()
+        if modo_busqueda not in MODOS_BUSQUEDA:
+            raise ValueError(f"Modo de búsqueda desconocido: {modo_busqueda} (opciones: {', '.join(MODOS_BUSQUEDA)})")
+        if tipo_indice not in TIPOS_INDICE:
+            raise ValueError(f"Tipo de índice desconocido: {tipo_indice} (opciones: {', '.join(TIPOS_INDICE)})")
+        self.modelo_nombre = modelo_nombre
+        self.backend = backend
+        self.directorio_onnx = directorio_onnx
+        # El modelo se carga en el primer uso: las consultas estructuradas,
+        # listados y estadísticas no lo necesitan
+        self._modelo = None
+        self._dimension = None
+        self.tiempo_carga_modelo: Optional[float] = None
+        self.directorio_cache = directorio_cache or str(RAG_CACHE_EMBEDDINGS_DIR)
+        self.cache_embeddings = None
+        self.cache_consultas = CacheConsultasLRU(tamano_cache_consultas)
         self.index = None
+        self.tipo_indice = tipo_indice
+        self.parametros_indice = parametros_indice
+        self.configuracion_indice: Dict[str, Any] = {'tipo': tipo_indice, 'parametros': {}, 'compresion': 'fp32'}
         self.documentos = []
+        self.documentos_por_faiss_id = {}
+        self._proximo_faiss_id = 0
+        self._cambios_pendientes = []
+        self.indice_horarios = IndiceHorarios()
+        self.indice_metadatos = IndiceMetadatos()
+        self.interpretador = InterpretadorConsultas()
+        self.motor_conflictos = MotorConflictos()
+        self.ocupacion = OcupacionHorarios()
+        # Matriz de conflictos entre comisiones: se guarda con el índice y se
+        # recalcula en el primer uso si cambian los documentos
+        self._matriz_conflictos = None
+        # El índice BM25 necesita el contenido de cada documento: se construye
+        # en la primera búsqueda léxica o híbrida
+        self._indice_bm25 = None
+        self.modo_busqueda = modo_busqueda
+        self.candidatos_fusion = candidatos_fusion
         self.metadata_horarios = {}
+        # Versión del snapshot cargado (None = directorio sin versiones)
+        self.version_snapshot: Optional[str] = None
         
         # Mapeos para normalización de consultas
         self.dias_semana = {
@@ -61,6 +144,62 @@ class SistemaEmbeddingsHorarios:
             'domingo': 'domingo', 'do': 'domingo', 'dom': 'domingo'
         }
 
+    @property
+    def modelo(self):
+        """Modelo de sentence transformers, cargado en el primer uso"""
+        if self._modelo is None:
+            logger.info(f"🤖 Cargando modelo de embeddings para horarios: {self.modelo_nombre} ({self.backend})")
+            inicio = perf_counter()
+            self._modelo = crear_codificador(self.backend, self.modelo_nombre, self.directorio_onnx)
+            self.tiempo_carga_modelo = perf_counter() - inicio
+            logger.info(f"✅ Modelo cargado en {self.tiempo_carga_modelo:.2f}s")
+        return self._modelo
+
+    @modelo.setter
+    def modelo(self, modelo):
+        self._modelo = modelo
+
+    @property
+    def modelo_cargado(self) -> bool:
+        """Indica si el modelo ya fue cargado"""
+        return self._modelo is not None
+
+    @property
+    def codificador_id(self) -> str:
+        """Modelo + backend: identifica vectores comparables entre sí"""
+        return identificador_codificador(self.modelo_nombre, self.backend)
+
+    @property
+    def dimension(self) -> int:
+        """Dimensión de los embeddings (del índice cargado o del modelo)"""
+        if self._dimension is None:
+            self._dimension = self.modelo.get_sentence_embedding_dimension()
+        return self._dimension
+
+    @property
+    def indice_bm25(self) -> IndiceBM25:
+        """Índice léxico BM25, construido en el primer uso"""
+        if self._indice_bm25 is None:
+            inicio = perf_counter()
+            self._indice_bm25 = IndiceBM25()
+            self._indice_bm25.construir(self.documentos)
+            logger.info(f"🔤 Índice BM25 construido con {len(self._indice_bm25)} documentos en {perf_counter() - inicio:.2f}s")
+        return self._indice_bm25
+
+    @property
+    def matriz_conflictos(self) -> MatrizConflictos:
+        """Matriz de superposiciones entre comisiones, calculada en el primer uso"""
+        if self._matriz_conflictos is None:
+            self._construir_matriz_conflictos()
+        return self._matriz_conflictos
+
+    def _construir_matriz_conflictos(self):
+        """Calcula la matriz de conflictos desde los bloques del motor"""
+        inicio = perf_counter()
+        self._matriz_conflictos = MatrizConflictos()
+        self._matriz_conflictos.construir(self.motor_conflictos)
+        logger.info(f"🧮 Matriz de conflictos calculada: {len(self._matriz_conflictos)} comisiones en {perf_counter() - inicio:.2f}s")
+
     def generar_texto_enriquecido(self, materia: Dict) -> str:
         """Genera texto enriquecido con información de horarios para embeddings"""
         textos = []
@@ -177,46 +316,51 @@ class SistemaEmbeddingsHorarios:
             datos = json.load(f)
         
         materias = datos.get('materias', [])
-        documentos = []
-        
-        for i, materia in enumerate(materias):
-            # Generar texto enriquecido
-            contenido = self.generar_texto_enriquecido(materia)
-            
-            # Crear metadatos enriquecidos
-            metadatos = {
-                'id': materia.get('id', f'materia_{i}'),
-                'materia_nombre': materia.get('nombre', ''),
-                'materia_normalizada': materia.get('nombre_normalizado', ''),
-                'departamento_codigo': materia.get('departamento', {}).get('codigo', ''),
-                'departamento_nombre': materia.get('departamento', {}).get('nombre', ''),
-                'tiene_horarios': len(materia.get('horarios', [])) > 0,
-                'cantidad_horarios': len(materia.get('horarios', [])),
-                'docentes_count': len(materia.get('docentes', [])),
-                'fuente_original': materia.get('metadata', {}).get('fuente_original', ''),
-                'periodo': materia.get('periodo', {}),
-                
-                # Metadatos específicos para horarios
-                'dias_semana': list(set([h.get('dia', '') for h in materia.get('horarios', []) if h.get('dia')])),
-                'horas_inicio': [h.get('hora_inicio', '') for h in materia.get('horarios', []) if h.get('hora_inicio')],
-                'horas_fin': [h.get('hora_fin', '') for h in materia.get('horarios', []) if h.get('hora_fin')],
-                'tipos_actividad': list(set([h.get('tipo_actividad', '') for h in materia.get('horarios', []) if h.get('tipo_actividad')])),
-            }
-            
-            documento = {
-                'id': metadatos['id'],
-                'contenido': contenido,
-                'metadatos': metadatos,
-                'materia_original': materia  # Mantener datos originales para referencia
-            }
-            
-            documentos.append(documento)
+        documentos = [self.crear_documento(materia, i) for i, materia in enumerate(materias)]
         
         logger.info(f"✅ Creados {len(documentos)} documentos desde {len(materias)} materias")
         return documentos
 
-    def crear_embeddings(self, documentos: List[Dict[str, Any]]) -> np.ndarray:
-        """Crea embeddings optimizados para consultas de horarios"""
+    def crear_documento(self, materia: Dict, posicion: int = 0) -> Dict:
+        """Crea un documento RAG a partir de una materia"""
+        # Generar texto enriquecido
+        contenido = self.generar_texto_enriquecido(materia)
+        
+        # Crear metadatos enriquecidos
+        metadatos = {
+            'id': materia.get('id', f'materia_{posicion}'),
+            'materia_nombre': materia.get('nombre', ''),
+            'materia_normalizada': materia.get('nombre_normalizado', ''),
+            'departamento_codigo': materia.get('departamento', {}).get('codigo', ''),
+            'departamento_nombre': materia.get('departamento', {}).get('nombre', ''),
+            'tiene_horarios': len(materia.get('horarios', [])) > 0,
+            'cantidad_horarios': len(materia.get('horarios', [])),
+            'docentes_count': len(materia.get('docentes', [])),
+            'fuente_original': materia.get('metadata', {}).get('fuente_original', ''),
+            'periodo': materia.get('periodo', {}),
+            
+            # Metadatos específicos para horarios
+            'dias_semana': list(set([h.get('dia', '') for h in materia.get('horarios', []) if h.get('dia')])),
+            'horas_inicio': [h.get('hora_inicio', '') for h in materia.get('horarios', []) if h.get('hora_inicio')],
+            'horas_fin': [h.get('hora_fin', '') for h in materia.get('horarios', []) if h.get('hora_fin')],
+            'tipos_actividad': list(set([h.get('tipo_actividad', '') for h in materia.get('horarios', []) if h.get('tipo_actividad')])),
+        }
+        
+        return {
+            'id': metadatos['id'],
+            'contenido': contenido,
+            'metadatos': metadatos,
+            'materia_original': materia  # Mantener datos originales para referencia
+        }
+
+    def crear_embeddings(self, documentos: List[Dict[str, Any]], usar_cache: bool = True) -> np.ndarray:
+        """
+        Crea embeddings optimizados para consultas de horarios
+        
+        Args:
+            documentos: Documentos RAG con su contenido enriquecido
+            usar_cache: Si True, solo se codifican los textos nuevos o modificados
+        """
         logger.info(f"🔄 Generando embeddings para {len(documentos)} documentos de horarios...")
 
         textos = []
@@ -224,31 +368,187 @@ class SistemaEmbeddingsHorarios:
             # Usar contenido enriquecido directamente
             textos.append(doc['contenido'])
 
+        if not usar_cache:
+            return self._codificar_textos(textos)
+
+        if self.cache_embeddings is None:
+            self.cache_embeddings = CacheEmbeddings(self.directorio_cache, self.codificador_id, self.dimension)
+
+        hashes = [CacheEmbeddings.hash_texto(texto) for texto in textos]
+        cacheados = self.cache_embeddings.obtener(hashes)
+
+        # Codificar solo textos que no están en cache (sin repetir textos idénticos)
+        pendientes = {}
+        for texto, h in zip(textos, hashes):
+            if h not in cacheados and h not in pendientes:
+                pendientes[h] = texto
+
+        logger.info(f"♻️ {len(textos) - len(pendientes)} embeddings desde cache, {len(pendientes)} a generar")
+
+        if pendientes:
+            nuevos = self._codificar_textos(list(pendientes.values()))
+            self.cache_embeddings.agregar(list(pendientes.keys()), nuevos)
+            self.cache_embeddings.guardar()
+            cacheados.update(zip(pendientes.keys(), nuevos))
+
+        embeddings = np.empty((len(textos), self.dimension), dtype=np.float32)
+        for i, h in enumerate(hashes):
+            embeddings[i] = cacheados[h]
+
+        return embeddings
+
+    def _codificar_textos(self, textos: List[str]) -> np.ndarray:
+        """Codifica textos con el modelo en lotes"""
         # Generar embeddings en lotes para eficiencia
-        embeddings = self.modelo.encode(
+        return self.modelo.encode(
             textos, 
             batch_size=32, 
             show_progress_bar=True, 
             convert_to_numpy=True
         )
 
-        return embeddings
-
     def crear_indice_faiss(self, embeddings: np.ndarray):
         """Crea índice FAISS optimizado para búsquedas de horarios"""
-        logger.info(f"🗃️ Creando índice FAISS para horarios con {len(embeddings)} vectores")
+        logger.info(f"🗃️ Creando índice FAISS ({self.tipo_indice}) para horarios con {len(embeddings)} vectores")
+
+        # Normalizar embeddings (producto interno = similitud coseno)
+        embeddings_norm = (embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)).astype(np.float32)
+
+        # Índice con IDs propios para poder actualizar o borrar materias sin reconstruirlo
+        parametros = resolver_parametros(self.tipo_indice, self.dimension, len(embeddings_norm), self.parametros_indice)
+        self.index = faiss.IndexIDMap2(crear_indice(self.tipo_indice, self.dimension, embeddings_norm, parametros))
 
-        # Usar IndexFlatIP para similitud coseno
-        self.index = faiss.IndexFlatIP(self.dimension)
+        # Agregar al índice (el ID de cada vector es la posición del documento)
+        faiss_ids = np.arange(len(embeddings), dtype=np.int64)
+        self.index.add_with_ids(embeddings_norm, faiss_ids)
+        self.configuracion_indice = {'tipo': self.tipo_indice, 'parametros': parametros, 'compresion': 'fp32'}
 
-        # Normalizar embeddings
-        embeddings_norm = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+        # Índices aproximados: recall@10 contra búsqueda exacta y latencia
+        if self.tipo_indice != 'flat' and len(embeddings_norm):
+            consultas = consultas_sinteticas(embeddings_norm, min(200, len(embeddings_norm)))
+            reporte = medir_indice(self.index, embeddings_norm, consultas, k=10)
+            self.configuracion_indice['reporte'] = reporte
+            logger.info(f"📏 Índice {self.tipo_indice}: " + ", ".join(f"{clave}={valor:.3f}" for clave, valor in reporte.items()))
 
-        # Agregar al índice
-        self.index.add(embeddings_norm.astype(np.float32))
+        for documento, faiss_id in zip(self.documentos, faiss_ids):
+            documento['faiss_id'] = int(faiss_id)
+        self._indexar_documentos()
+        self._construir_indices_estructurados()
+        self._cambios_pendientes = []
 
         logger.info(f"✅ Índice de horarios creado con {self.index.ntotal} vectores")
 
+    def _indexar_documentos(self):
+        """Reconstruye el mapeo ID FAISS -> documento"""
+        self.documentos_por_faiss_id = {}
+        for posicion, documento in enumerate(self.documentos):
+            # Documentos guardados antes de usar IDs propios: el ID es la posición
+            if 'faiss_id' not in documento:
+                documento['faiss_id'] = posicion
+            self.documentos_por_faiss_id[documento['faiss_id']] = documento
+        self._proximo_faiss_id = max(self.documentos_por_faiss_id, default=-1) + 1
+
+    def _construir_indices_estructurados(self):
+        """Construye los índices que no dependen del modelo (horarios, metadatos, nombres, conflictos y ocupación)"""
+        self.indice_horarios.construir(self.documentos)
+        self.indice_metadatos.construir(self.documentos)
+        self.interpretador.construir(self.documentos)
+        self.motor_conflictos.construir(self.documentos)
+        self.ocupacion.construir(self.documentos)
+        self._indice_bm25 = None
+        self._matriz_conflictos = None
+
+    def actualizar_materias(self, materias: List[Dict]) -> Dict[str, int]:
+        """
+        Agrega o reemplaza materias en el índice sin reconstruirlo
+        
+        Las materias se agrupan por `id`: todas las comisiones ya indexadas con
+        ese id se reemplazan por las recibidas.
+        
+        Args:
+            materias: Materias con el mismo formato que materias unificadas
+            
+        Returns:
+            Cantidad de documentos agregados y reemplazados
+        """
+        if self.index is None:
+            raise ValueError("Debe procesar documentos primero")
+        
+        nuevos = []
+        for materia in materias:
+            documento = self.crear_documento(materia, self._proximo_faiss_id + len(nuevos))
+            documento['faiss_id'] = self._proximo_faiss_id + len(nuevos)
+            nuevos.append(documento)
+        
+        ids_materia = list(dict.fromkeys(doc['id'] for doc in nuevos))
+        reemplazados = self._quitar_documentos(ids_materia)
+        
+        if nuevos:
+            embeddings = self.crear_embeddings(nuevos)
+            embeddings_norm = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+            faiss_ids = np.array([doc['faiss_id'] for doc in nuevos], dtype=np.int64)
+            self.index.add_with_ids(embeddings_norm.astype(np.float32), faiss_ids)
+            
+            self.documentos.extend(nuevos)
+            for documento in nuevos:
+                self.documentos_por_faiss_id[documento['faiss_id']] = documento
+                self.indice_horarios.agregar_documento(documento)
+                self.indice_metadatos.agregar_documento(documento)
+                self.interpretador.agregar_documento(documento)
+                self.motor_conflictos.agregar_documento(documento)
+                self.ocupacion.agregar_documento(documento)
+                if self._indice_bm25 is not None:
+                    self._indice_bm25.agregar_documento(documento)
+            self._proximo_faiss_id += len(nuevos)
+            self._matriz_conflictos = None
+        
+        for id_materia in ids_materia:
+            self._cambios_pendientes.append({
+                'op': 'upsert',
+                'id': id_materia,
+                'documentos': [doc for doc in nuevos if doc['id'] == id_materia]
+            })
+        
+        logger.info(f"🔁 Materias actualizadas: {len(nuevos)} documentos agregados, {reemplazados} reemplazados")
+        return {'agregados': len(nuevos), 'reemplazados': reemplazados}
+
+    def eliminar_materias(self, ids_materia: List[str]) -> int:
+        """Elimina del índice todas las comisiones de las materias indicadas"""
+        if self.index is None:
+            raise ValueError("Debe procesar documentos primero")
+        
+        eliminados = self._quitar_documentos(ids_materia)
+        for id_materia in ids_materia:
+            self._cambios_pendientes.append({'op': 'delete', 'id': id_materia})
+        
+        logger.info(f"🗑️ {eliminados} documentos eliminados del índice")
+        return eliminados
+
+    def _quitar_documentos(self, ids_materia: List[str], actualizar_indice: bool = True) -> int:
+        """Quita documentos por id de materia de la lista y, opcionalmente, del índice"""
+        ids_materia = set(ids_materia)
+        quitados = [doc for doc in self.documentos if doc['id'] in ids_materia]
+        if not quitados:
+            return 0
+        
+        if actualizar_indice:
+            faiss_ids = np.array([doc['faiss_id'] for doc in quitados], dtype=np.int64)
+            self.index = quitar_ids(self.index, faiss_ids)
+        
+        self.documentos = [doc for doc in self.documentos if doc['id'] not in ids_materia]
+        for documento in quitados:
+            self.documentos_por_faiss_id.pop(documento['faiss_id'], None)
+        faiss_ids_quitados = [doc['faiss_id'] for doc in quitados]
+        self.indice_horarios.quitar_documentos(faiss_ids_quitados)
+        self.indice_metadatos.quitar_documentos(faiss_ids_quitados)
+        self.interpretador.quitar_documentos(faiss_ids_quitados)
+        self.motor_conflictos.quitar_documentos(faiss_ids_quitados)
+        self.ocupacion.quitar_documentos(faiss_ids_quitados)
+        self._matriz_conflictos = None
+        if self._indice_bm25 is not None:
+            self._indice_bm25.quitar_documentos(faiss_ids_quitados)
+        return len(quitados)
+
     def procesar_materias_unificadas(self, archivo_materias: str = "materias_unificadas_20250727_030943.json"):
         """Procesa materias unificadas para crear sistema RAG de horarios"""
         logger.info("📚 Procesando materias unificadas para sistema RAG de horarios...")
@@ -262,6 +562,9 @@ class SistemaEmbeddingsHorarios:
         # Crear índice FAISS
         self.crear_indice_faiss(embeddings)
         
+        # Conflictos entre comisiones, para guardarlos con el índice
+        self._construir_matriz_conflictos()
+        
         logger.info("✅ Sistema RAG de horarios procesado exitosamente")
         return self
 
@@ -305,124 +608,644 @@ class SistemaEmbeddingsHorarios:
         return consulta_norm
 
     def buscar_por_horario_especifico(self, dia: str = "", hora_inicio: str = "", hora_fin: str = "") -> List[Dict]:
-        """Busca materias por criterios específicos de horario"""
+        """
+        Busca materias por criterios específicos de horario usando el índice día × intervalo
+        
+        Args:
+            dia: Día de la semana ('' = cualquier día)
+            hora_inicio: Con hora_fin, ventana a superponer; sola, clases que empiezan desde esa hora
+            hora_fin: Con hora_inicio, ventana a superponer; sola, clases que terminan hasta esa hora
+        """
+        if dia and normalizar_dia(dia) is None:
+            return []
+        
+        desde = hora_a_minutos(hora_inicio)
+        hasta = hora_a_minutos(hora_fin)
+        
+        if desde is not None and hasta is not None:
+            coincidencias = self.indice_horarios.buscar_superpuestos(dia, desde, hasta)
+        elif desde is not None:
+            coincidencias = self.indice_horarios.buscar_por_inicio(dia, desde=desde)
+        elif hasta is not None:
+            coincidencias = self.indice_horarios.buscar_por_fin(dia, hasta=hasta)
+        else:
+            coincidencias = self.indice_horarios.buscar_superpuestos(dia)
+        
+        # Un resultado por documento: el primer horario coincidente en la semana
+        coincidencias.sort(key=lambda c: (DIAS_SEMANA.index(c[0]), c[1]))
         resultados = []
+        vistos = set()
+        for _, (_, _, faiss_id, posicion) in coincidencias:
+            if faiss_id in vistos:
+                continue
+            vistos.add(faiss_id)
+            doc = self.documentos_por_faiss_id[faiss_id]
+            resultados.append({
+                'documento': doc,
+                'horario_coincidente': doc['materia_original']['horarios'][posicion],
+                'score': 1.0  # Score máximo para coincidencia exacta
+            })
         
-        for doc in self.documentos:
-            materia = doc['materia_original']
-            horarios = materia.get('horarios', [])
+        return resultados
+
+    def buscar_con_intencion(self, consulta: str, k: Optional[int] = 5, modo: Optional[str] = None,
+                             filtro_horarios: bool = True) -> Tuple[List[Tuple[Dict[str, Any], float]], Dict[str, Any]]:
+        """
+        Busca interpretando primero los criterios estructurados de la consulta
+        
+        - Sin criterios reconocidos: búsqueda semántica normal.
+        - Solo criterios (día, horario, franja, departamento, tipo, materia):
+          respuesta completa desde los índices exactos, sin usar el modelo. Todas
+          tienen score 1.0: el orden es el de candidatos_intencion (primer horario
+          coincidente de la semana o nombre de materia), no un ranking.
+        - Criterios y texto libre: búsqueda semántica del texto libre restringida
+          a los documentos que cumplen los criterios.
+        - Una materia reconocida solo por prefijo: búsqueda semántica de la
+          consulta completa restringida a los documentos que cumplen los criterios.
+        - Criterios sin candidatos: la interpretación no es confiable y se hace
+          la búsqueda semántica de la consulta completa (salvo con k=None).
+        
+        Args:
+            k: Cantidad de resultados (None = todos los que cumplen, solo respuestas exactas)
             
-            coincide = True
+        Returns:
+            (resultados (documento, score), interpretación de la consulta)
+        """
+        return self.buscar_con_intencion_batch([consulta], k, modo, filtro_horarios)[0]
+
+    def buscar_con_intencion_batch(self, consultas: List[str], k: Optional[int] = 5, modo: Optional[str] = None,
+                                   filtro_horarios: bool = True) -> List[Tuple[List[Tuple[Dict[str, Any], float]], Dict[str, Any]]]:
+        """Versión por lotes de buscar_con_intencion: las consultas sin criterios comparten una búsqueda"""
+        intenciones = [self.interpretador.interpretar(consulta) for consulta in consultas]
+        respuestas: List[Optional[List[Tuple[Dict[str, Any], float]]]] = [None] * len(consultas)
+
+        libres = []
+        for posicion, intencion in enumerate(intenciones):
+            if not intencion['estructurada']:
+                libres.append(posicion)
+                continue
+
+            candidatos = self.candidatos_intencion(intencion, filtro_horarios)
+            if k is not None and not candidatos:
+                libres.append(posicion)
+            elif k is not None and intencion['coincidencia_nombre'] == 'prefijo':
+                # El prefijo acota las materias pero no las ordena: decide la similitud con la consulta completa
+                respuestas[posicion] = self.buscar_similares_horarios(
+                    consultas[posicion], k, filtro_horarios, modo=modo, candidatos=candidatos
+                )
+            elif not intencion['texto_libre']:
+                exactos = candidatos if k is None else candidatos[:k]
+                respuestas[posicion] = [(self.documentos_por_faiss_id[faiss_id], 1.0) for faiss_id in exactos]
+            elif candidatos:
+                respuestas[posicion] = self.buscar_similares_horarios(
+                    intencion['texto_libre'], k or len(candidatos), filtro_horarios, modo=modo, candidatos=candidatos
+                )
+            else:
+                respuestas[posicion] = []
+
+        if libres:
+            lote = self.buscar_similares_horarios_batch([consultas[p] for p in libres], k or 5, filtro_horarios, modo=modo)
+            for posicion, resultados in zip(libres, lote):
+                respuestas[posicion] = resultados
+
+        return list(zip(respuestas, intenciones))
+
+    def candidatos_intencion(self, intencion: Dict[str, Any], filtro_horarios: bool = True) -> List[int]:
+        """
+        IDs FAISS que cumplen todos los criterios estructurados de una interpretación
+        
+        Con criterios de día u horario se ordenan por el primer horario coincidente
+        de la semana; si no, por nombre de materia.
+        """
+        filtros = {
+            'departamento': intencion['departamentos'] or None,
+            'tipo_actividad': intencion['tipos_actividad'] or None,
+            'tiene_horarios': True if filtro_horarios else None,
+        }
+        mascara = self.indice_metadatos.mascara(filtros)
+
+        def cumple(faiss_id: int) -> bool:
+            return mascara is None or (faiss_id < len(mascara) and bool(mascara[faiss_id]))
+
+        materias = set(intencion['materias']) if intencion['materias'] else None
+
+        if intencion['dias'] or intencion['criterio_horario']:
+            desde = intencion['desde'] if intencion['desde'] is not None else 0
+            hasta = intencion['hasta'] if intencion['hasta'] is not None else 24 * 60
+            coincidencias = []
+            for dia in intencion['dias'] or ['']:
+                if intencion['criterio_horario'] == 'empieza':
+                    coincidencias += self.indice_horarios.buscar_por_inicio(dia, desde, hasta)
+                elif intencion['criterio_horario'] == 'termina':
+                    coincidencias += self.indice_horarios.buscar_por_fin(dia, desde, hasta)
+                else:
+                    coincidencias += self.indice_horarios.buscar_superpuestos(dia, desde, hasta)
+            coincidencias.sort(key=lambda c: (DIAS_SEMANA.index(c[0]), c[1]))
+            ids = dict.fromkeys(intervalo[2] for _, intervalo in coincidencias)
+        else:
+            ids = sorted(materias if materias is not None else self.documentos_por_faiss_id,
+                         key=lambda i: (self.documentos_por_faiss_id[i]['metadatos']['materia_nombre'], i))
+
+        return [faiss_id for faiss_id in ids
+                if faiss_id in self.documentos_por_faiss_id and cumple(faiss_id)
+                and (materias is None or faiss_id in materias)]
+
+    def resolver_materias(self, referencias: Iterable[Union[int, str]]) -> Dict[str, List[int]]:
+        """
+        IDs FAISS de cada materia pedida por ID FAISS, id de materia o nombre
+
+        Los nombres se resuelven con el índice de nombres (exacto y, si no hay, por prefijo).
+        Las referencias que no se encuentran quedan con una lista vacía.
+        """
+        resueltas = {}
+        for referencia in referencias:
+            if isinstance(referencia, int):
+                documento = self.documentos_por_faiss_id.get(referencia)
+                etiqueta = documento['metadatos']['materia_nombre'] if documento else str(referencia)
+                resueltas[etiqueta] = [referencia] if documento else []
+            elif referencia in self.motor_conflictos.por_id_materia:
+                resueltas[referencia] = sorted(self.motor_conflictos.por_id_materia[referencia])
+            else:
+                resueltas[referencia] = sorted(self.interpretador.nombres.buscar(referencia)[0])
+        return resueltas
+
+    def detectar_conflictos(self, materias: Iterable[Union[int, str]]) -> Dict[str, Any]:
+        """
+        Superposiciones en minutos entre las comisiones de varias materias
+        
+        Args:
+            materias: IDs FAISS, ids de materia o nombres (ver resolver_materias)
             
-            for horario in horarios:
-                if dia and horario.get('dia', '').lower() != dia.lower():
-                    continue
-                if hora_inicio and horario.get('hora_inicio', '') != hora_inicio:
-                    continue
-                if hora_fin and horario.get('hora_fin', '') != hora_fin:
-                    continue
-                
-                # Si llegamos aquí, este horario coincide
-                resultados.append({
-                    'documento': doc,
-                    'horario_coincidente': horario,
-                    'score': 1.0  # Score máximo para coincidencia exacta
-                })
-                break
+        Returns:
+            El reporte de MotorConflictos.detectar_conflictos más 'no_encontradas'
+        """
+        grupos = self.resolver_materias(materias)
+        reporte = self.motor_conflictos.detectar_conflictos({e: ids for e, ids in grupos.items() if ids})
+        reporte['no_encontradas'] = [etiqueta for etiqueta, ids in grupos.items() if not ids]
+        return reporte
+
+    def buscar_en_ventanas(self, ventanas: Union[str, Iterable[Tuple[str, Any, Any]]], interes: Optional[str] = None,
+                           k: Optional[int] = None, modo: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Materias con alguna opción de cursada que entra completa en las ventanas libres
         
-        return resultados
+        Los candidatos salen del índice de horarios (intervalos contenidos en cada
+        ventana), sin recorrer los documentos; después se verifica que todos los
+        bloques de alguna opción (una comisión por tipo de actividad) estén entre ellos.
+        
+        Args:
+            ventanas: Texto ("martes 14-18 y jueves mañana") o [(día, desde, hasta)] en minutos o 'HH:MM'
+            interes: Texto libre para ordenar por relevancia semántica (None = por nombre)
+            k: Cantidad máxima de resultados (None = todos)
+            modo: Modo de búsqueda para ordenar por interés
+            
+        Returns:
+            [{'documento', 'score', 'opciones': [{'comisiones', 'horarios'}]}]
+        """
+        if isinstance(ventanas, str):
+            ventanas = self.interpretador.interpretar_ventanas(ventanas)
+        ventanas = [(dia, hora_a_minutos(desde) if isinstance(desde, str) else desde,
+                     hora_a_minutos(hasta) if isinstance(hasta, str) else hasta) for dia, desde, hasta in ventanas]
+
+        posiciones: Dict[int, Set[int]] = {}
+        for dia, desde, hasta in unir_ventanas(ventanas):
+            for _, (_, _, faiss_id, posicion) in self.indice_horarios.buscar_contenidos(dia, desde, hasta):
+                posiciones.setdefault(faiss_id, set()).add(posicion)
+
+        opciones_por_id = {}
+        for faiss_id, disponibles in posiciones.items():
+            opciones = self.motor_conflictos.opciones_dentro(faiss_id, disponibles)
+            if opciones:
+                opciones_por_id[faiss_id] = [
+                    {'comisiones': dict(self.motor_conflictos.opciones[faiss_id][opcion]),
+                     'horarios': describir_bloques(self.motor_conflictos.bloques_opcion(faiss_id, opcion))}
+                    for opcion in opciones
+                ]
+        if not opciones_por_id:
+            return []
+
+        if interes:
+            ordenados = [(doc['faiss_id'], score) for doc, score in self.buscar_similares_horarios(
+                interes, len(opciones_por_id), modo=modo, candidatos=list(opciones_por_id))]
+        else:
+            ordenados = [(faiss_id, 1.0) for faiss_id in sorted(
+                opciones_por_id, key=lambda i: (self.documentos_por_faiss_id[i]['metadatos']['materia_nombre'], i))]
+
+        resultados = [{'documento': self.documentos_por_faiss_id[faiss_id], 'score': score,
+                       'opciones': opciones_por_id[faiss_id]} for faiss_id, score in ordenados]
+        return resultados if k is None else resultados[:k]
+
+    def comisiones_en_conflicto(self, materia_a: Union[int, str], materia_b: Union[int, str]) -> List[Dict[str, Any]]:
+        """
+        Pares de comisiones superpuestas entre dos materias, desde la matriz precalculada
+        
+        Returns:
+            [{'faiss_id_a', 'faiss_id_b', 'comision_a', 'comision_b'}] (vacío = ninguna comisión choca)
+        """
+        ids_a = next(iter(self.resolver_materias([materia_a]).values()))
+        ids_b = next(iter(self.resolver_materias([materia_b]).values()))
+        return [
+            {'faiss_id_a': a, 'faiss_id_b': b, 'comision_a': comision_a, 'comision_b': comision_b}
+            for a in ids_a for b in ids_b
+            for comision_a, comision_b in self.matriz_conflictos.documentos_chocan(a, b)
+        ]
+
+    def conflictos_materia(self, materia: Union[int, str]) -> List[Dict[str, Any]]:
+        """
+        Todas las materias con alguna comisión que se superpone con las de una materia
+        
+        Returns:
+            [{'faiss_id', 'id', 'nombre', 'comisiones': [(propia, ajena), ...]}] ordenadas por nombre
+        """
+        propios = set(next(iter(self.resolver_materias([materia]).values())))
+        por_documento: Dict[int, List[Tuple[str, str]]] = {}
+        for faiss_id in propios:
+            for otro, pares in self.matriz_conflictos.conflictos_documento(faiss_id).items():
+                if otro not in propios:
+                    por_documento.setdefault(otro, []).extend(pares)
+        resultados = []
+        for faiss_id, pares in por_documento.items():
+            documento = self.documentos_por_faiss_id[faiss_id]
+            resultados.append({'faiss_id': faiss_id, 'id': documento['id'],
+                               'nombre': documento['metadatos']['materia_nombre'], 'comisiones': pares})
+        return sorted(resultados, key=lambda r: (r['nombre'], r['faiss_id']))
+
+    def generar_horarios(self, materias: Iterable[Union[int, str]], preferencias: Optional[Dict[str, Any]] = None,
+                         max_soluciones: int = 10) -> Dict[str, Any]:
+        """
+        Combinaciones de comisiones sin superposiciones para cursar varias materias juntas
+        
+        Args:
+            materias: IDs FAISS, ids de materia o nombres (ver resolver_materias)
+            preferencias: no_antes_de, no_despues_de, dias_libres, estrictas (ver GeneradorHorarios)
+            max_soluciones: Cantidad de combinaciones a devolver
+            
+        Returns:
+            El reporte de GeneradorHorarios.generar más 'no_encontradas'
+        """
+        grupos = self.resolver_materias(materias)
+        reporte = GeneradorHorarios(self.motor_conflictos).generar(
+            {e: ids for e, ids in grupos.items() if ids}, preferencias, max_soluciones
+        )
+        reporte['no_encontradas'] = [etiqueta for etiqueta, ids in grupos.items() if not ids]
+        return reporte
 
-    def buscar_similares_horarios(self, consulta: str, k: int = 5, filtro_horarios: bool = True) -> List[Tuple[Dict[str, Any], float]]:
+    def buscar_similares_horarios(
+        self,
+        consulta: str,
+        k: int = 5,
+        filtro_horarios: bool = True,
+        filtros: Optional[Dict[str, Any]] = None,
+        modo: Optional[str] = None,
+        candidatos: Optional[Iterable[int]] = None,
+    ) -> List[Tuple[Dict[str, Any], float]]:
         """
         Busca documentos similares con optimización para consultas de horarios
         
+        Los filtros se aplican antes de puntuar (IDSelector de FAISS). Con el
+        índice exacto (flat) se devuelven k resultados si hay al menos k
+        documentos que cumplen; con HNSW o IVF solo se puntúan los vecinos que
+        alcanza a recorrer la búsqueda (efSearch, nprobe), así que un filtro muy
+        selectivo puede devolver menos.
+        
         Args:
             consulta: Texto de la consulta
             k: Número de resultados
-            filtro_horarios: Si True, prioriza materias con horarios
+            filtro_horarios: Si True, solo considera materias con horarios
+            filtros: Filtros por metadatos (departamento, dia, tipo_actividad,
+                tiene_horarios, periodo); cada uno acepta un valor o una lista
+            modo: 'vectorial', 'lexico' (BM25) o 'hibrido' (RRF de ambos);
+                None usa el modo por defecto del sistema
+            candidatos: Si se indica, solo se consideran estos IDs FAISS
+        """
+        return self.buscar_similares_horarios_batch([consulta], k, filtro_horarios, filtros, modo, candidatos)[0]
+
+    def buscar_similares_horarios_batch(
+        self,
+        consultas: List[str],
+        k: int = 5,
+        filtro_horarios: bool = True,
+        filtros: Optional[Dict[str, Any]] = None,
+        modo: Optional[str] = None,
+        candidatos: Optional[Iterable[int]] = None,
+    ) -> List[List[Tuple[Dict[str, Any], float]]]:
+        """
+        Busca varias consultas con una sola pasada del modelo y una sola búsqueda FAISS
+        
+        Args:
+            consultas: Textos de las consultas
+            k: Número de resultados por consulta
+            filtro_horarios: Si True, solo considera materias con horarios
+            filtros: Filtros por metadatos compartidos por todas las consultas
+            modo: 'vectorial', 'lexico' o 'hibrido' (None = modo por defecto)
+            candidatos: Si se indica, solo se consideran estos IDs FAISS
+            
+        Returns:
+            Una lista de resultados (documento, score) por consulta, en el mismo orden.
+            El score es la similitud coseno, el score BM25 o el score RRF según el modo.
         """
         if self.index is None:
             raise ValueError("Debe procesar documentos primero")
+        modo = modo or self.modo_busqueda
+        if modo not in MODOS_BUSQUEDA:
+            raise ValueError(f"Modo de búsqueda desconocido: {modo} (opciones: {', '.join(MODOS_BUSQUEDA)})")
+        if not consultas:
+            return []
 
-        # Normalizar consulta para horarios
-        consulta_normalizada = self.normalizar_consulta_horario(consulta)
+        filtros = dict(filtros or {})
+        if filtro_horarios:
+            filtros.setdefault('tiene_horarios', True)
         
-        # Generar embedding de la consulta
-        embedding_consulta = self.modelo.encode([consulta_normalizada], convert_to_numpy=True)
-        embedding_consulta = embedding_consulta / np.linalg.norm(
-            embedding_consulta, axis=1, keepdims=True
-        )
+        mascara = self.indice_metadatos.mascara(filtros)
+        if candidatos is not None:
+            mascara_candidatos = np.zeros(self.indice_metadatos.capacidad, dtype=bool)
+            ids = np.fromiter(candidatos, dtype=np.int64)
+            mascara_candidatos[ids[ids < len(mascara_candidatos)]] = True
+            mascara = mascara_candidatos if mascara is None else mascara & mascara_candidatos
+        if mascara is not None and not mascara.any():
+            return [[] for _ in consultas]
+
+        if modo == 'lexico':
+            return [[(self.documentos_por_faiss_id[faiss_id], score)
+                     for faiss_id, score in self.indice_bm25.buscar(consulta, k, mascara)]
+                    for consulta in consultas]
+
+        # En modo híbrido cada recuperador aporta más candidatos que k para la fusión
+        k_vectorial = k if modo == 'vectorial' else max(k, self.candidatos_fusion)
+        selector, _ = self.indice_metadatos.selector_mascara(mascara)
+        parametros = parametros_busqueda(self.index, selector)
 
-        # Buscar más candidatos para filtrar después
-        k_busqueda = k * 3 if filtro_horarios else k
-        scores, indices = self.index.search(embedding_consulta.astype(np.float32), k_busqueda)
+        embeddings_consultas = self.codificar_consultas(consultas)
+        scores, indices = self.index.search(embeddings_consultas, k_vectorial, params=parametros)
+
+        if modo == 'vectorial':
+            return [self._resultados_busqueda(fila_scores, fila_indices)
+                    for fila_scores, fila_indices in zip(scores, indices)]
 
-        # Procesar resultados
         resultados = []
-        for i, (score, idx) in enumerate(zip(scores[0], indices[0])):
-            if idx < len(self.documentos):
-                documento = self.documentos[idx]
-                
-                # Aplicar filtro de horarios si está habilitado
-                if filtro_horarios and not documento['metadatos']['tiene_horarios']:
-                    continue
-                
-                resultados.append((documento, float(score)))
-                
-                # Limitar a k resultados
-                if len(resultados) >= k:
-                    break
+        for consulta, fila_indices in zip(consultas, indices):
+            ranking_vectorial = [int(idx) for idx in fila_indices if idx in self.documentos_por_faiss_id]
+            ranking_lexico = [faiss_id for faiss_id, _ in self.indice_bm25.buscar(consulta, k_vectorial, mascara)]
+            fusionados = fusionar_rrf([ranking_vectorial, ranking_lexico])[:k]
+            resultados.append([(self.documentos_por_faiss_id[faiss_id], score) for faiss_id, score in fusionados])
+        return resultados
 
+    def codificar_consultas(self, consultas: List[str]) -> np.ndarray:
+        """Normaliza y codifica consultas en un único lote (vectores float32 de norma 1)"""
+        # Normalizar consultas para horarios
+        consultas_normalizadas = [self.normalizar_consulta_horario(consulta) for consulta in consultas]
+        
+        embeddings = np.empty((len(consultas), self.dimension), dtype=np.float32)
+        pendientes = {}
+        for i, consulta_normalizada in enumerate(consultas_normalizadas):
+            vector = self.cache_consultas.obtener(consulta_normalizada)
+            if vector is not None:
+                embeddings[i] = vector
+            else:
+                pendientes.setdefault(consulta_normalizada, []).append(i)
+        
+        if pendientes:
+            # Generar embeddings solo de las consultas que no están en cache
+            nuevos = self.modelo.encode(list(pendientes), batch_size=64, convert_to_numpy=True)
+            nuevos = (nuevos / np.linalg.norm(nuevos, axis=1, keepdims=True)).astype(np.float32)
+            for (consulta_normalizada, posiciones), vector in zip(pendientes.items(), nuevos):
+                self.cache_consultas.agregar(consulta_normalizada, vector)
+                embeddings[posiciones] = vector
+        
+        return embeddings
+
+    def _resultados_busqueda(self, scores: np.ndarray, indices: np.ndarray) -> List[Tuple[Dict[str, Any], float]]:
+        """Convierte una fila de resultados FAISS en pares (documento, score)"""
+        # FAISS completa con -1 si hay menos de k candidatos
+        resultados = []
+        for score, idx in zip(scores, indices):
+            documento = self.documentos_por_faiss_id.get(int(idx))
+            if documento is not None:
+                resultados.append((documento, float(score)))
         return resultados
 
-    def guardar_sistema_horarios(self, directorio: str = "rag_sistema_horarios"):
-        """Guarda el sistema RAG especializado en horarios"""
+    def guardar_sistema_horarios(self, directorio: str = "rag_sistema_horarios", compresion: Optional[str] = None):
+        """
+        Guarda el sistema RAG especializado en horarios
+        
+        Args:
+            directorio: Directorio destino
+            compresion: Almacenamiento de los vectores ('fp32', 'fp16' o 'sq8');
+                None conserva el del índice actual. La carga lo detecta sola.
+        """
         os.makedirs(directorio, exist_ok=True)
 
+        if compresion is not None and compresion != self.configuracion_indice.get('compresion', 'fp32'):
+            self.comprimir_vectores(compresion)
+
         # Guardar índice FAISS
-        faiss.write_index(self.index, os.path.join(directorio, "indice_horarios.faiss"))
+        faiss.write_index(self.index, os.path.join(directorio, RAG_INDICE_FILE.name))
+
+        # Guardar documentos (almacén binario con decodificación perezosa)
+        AlmacenDocumentos.guardar(os.path.join(directorio, RAG_DOCUMENTOS_BIN_FILE.name), self.documentos)
+
+        # Los documentos completos ya incluyen los cambios incrementales
+        ruta_cambios = os.path.join(directorio, RAG_CAMBIOS_FILE.name)
+        if os.path.exists(ruta_cambios):
+            os.remove(ruta_cambios)
+        self._cambios_pendientes = []
+
+        self._guardar_metadatos(directorio)
+
+        # Matriz de conflictos entre comisiones (se abre con memory-map al cargar)
+        self.matriz_conflictos.guardar(directorio)
+
+        logger.info(f"💾 Sistema RAG de horarios guardado en: {directorio}")
+
+    def comprimir_vectores(self, compresion: str) -> Dict[str, Any]:
+        """
+        Cambia el almacenamiento de los vectores del índice (cuantización escalar)
+        
+        Returns:
+            Reporte con bytes antes y después y recall@10 contra los vectores actuales
+        """
+        if self.index is None:
+            raise ValueError("Debe procesar documentos primero")
+        
+        vectores = vectores_indice(self.index)
+        bytes_antes = bytes_indice(self.index)
+        self.index = comprimir_indice(self.index, self.tipo_indice, self.configuracion_indice['parametros'], compresion)
+        
+        reporte = {'bytes_antes': bytes_antes, 'bytes_despues': bytes_indice(self.index)}
+        if len(vectores):
+            consultas = consultas_sinteticas(vectores, min(200, len(vectores)))
+            reporte.update(medir_indice(indice_base(self.index), vectores, consultas, k=10))
+        self.configuracion_indice['compresion'] = compresion
+        self.configuracion_indice['reporte_compresion'] = reporte
+        
+        logger.info(f"🗜️ Vectores en {compresion}: {reporte['bytes_antes'] / 1024:.0f} KB -> {reporte['bytes_despues'] / 1024:.0f} KB"
+                    + (f", recall@10 {reporte['recall_at_10']:.3f}" if 'recall_at_10' in reporte else ""))
+        return reporte
+
+    def guardar_cambios_horarios(self, directorio: str = str(RAG_SISTEMA_DIR)):
+        """
+        Persiste solo las actualizaciones incrementales pendientes
+        
+        Los cambios de documentos se agregan a un journal que se aplica al cargar,
+        sin reescribir el archivo completo de documentos. Un directorio con
+        versiones no se modifica nunca: los cambios se publican como una
+        versión nueva.
+        """
+        if not self._cambios_pendientes:
+            logger.info("💤 No hay cambios pendientes para guardar")
+            return
+        if version_actual(directorio) is not None:
+            self.publicar_snapshot_horarios(directorio)
+            return
+
+        os.makedirs(directorio, exist_ok=True)
 
-        # Guardar documentos
-        with open(os.path.join(directorio, "documentos_horarios.json"), "w", encoding="utf-8") as f:
-            json.dump(self.documentos, f, ensure_ascii=False, indent=2)
+        # Primero el journal: si se interrumpe la escritura del índice, el
+        # cambio sigue registrado y se detecta la inconsistencia al cargar
+        with open(os.path.join(directorio, RAG_CAMBIOS_FILE.name), "a", encoding="utf-8") as f:
+            for cambio in self._cambios_pendientes:
+                f.write(json.dumps(cambio, ensure_ascii=False) + "\n")
 
-        # Guardar metadatos del sistema
+        ruta_indice = os.path.join(directorio, RAG_INDICE_FILE.name)
+        faiss.write_index(self.index, ruta_indice + ".tmp")
+        os.replace(ruta_indice + ".tmp", ruta_indice)
+
+        self._guardar_metadatos(directorio)
+
+        logger.info(f"💾 {len(self._cambios_pendientes)} cambios incrementales guardados en: {directorio}")
+        self._cambios_pendientes = []
+
+    def _guardar_metadatos(self, directorio: str):
+        """Guarda los metadatos del sistema"""
         metadatos = {
             "tipo_sistema": "rag_horarios_academicos",
-            "modelo_nombre": self.modelo.model_name if hasattr(self.modelo, "model_name") else "unknown",
+            "modelo_nombre": self.modelo_nombre,
+            "backend": self.backend,
             "dimension": self.dimension,
+            "indice": self.configuracion_indice,
             "total_documentos": len(self.documentos),
             "total_vectores": self.index.ntotal if self.index else 0,
             "materias_con_horarios": sum(1 for d in self.documentos if d['metadatos']['tiene_horarios']),
             "fecha_creacion": datetime.now().isoformat(),
-            "version": "1.0"
+            "version": "1.2"
         }
 
-        with open(os.path.join(directorio, "metadatos_horarios.json"), "w", encoding="utf-8") as f:
+        with open(os.path.join(directorio, RAG_METADATOS_FILE.name), "w", encoding="utf-8") as f:
             json.dump(metadatos, f, ensure_ascii=False, indent=2)
 
-        logger.info(f"💾 Sistema RAG de horarios guardado en: {directorio}")
+    def publicar_snapshot_horarios(self, directorio: str = str(RAG_SISTEMA_DIR), compresion: Optional[str] = None,
+                                   conservar: int = 3) -> str:
+        """
+        Guarda el sistema como una versión nueva y la publica de forma atómica
+        (ver snapshots_horarios.py)
+        
+        Returns:
+            Nombre de la versión publicada
+        """
+        self.version_snapshot = publicar_snapshot(self, directorio, compresion=compresion, conservar=conservar)
+        return self.version_snapshot
 
     def cargar_sistema_horarios(self, directorio: str = None):
-        """Carga sistema RAG de horarios previamente guardado"""
+        """
+        Carga sistema RAG de horarios previamente guardado
+        
+        Si el directorio tiene versiones, carga completa la versión publicada
+        en ese momento aunque se publique otra durante la carga. También acepta
+        directamente el directorio de una versión.
+        """
         if directorio is None:
             directorio = str(RAG_SISTEMA_DIR)
         
+        version = version_actual(directorio)
+        if version is not None:
+            directorio = os.path.join(directorio_versiones(directorio), version)
+        
+        self.version_snapshot = None
+        if os.path.exists(os.path.join(directorio, RAG_MANIFIESTO_FILE.name)):
+            manifiesto = leer_manifiesto(directorio)
+            self.version_snapshot = manifiesto['version']
+            if manifiesto['modelo_nombre'] != self.modelo_nombre:
+                logger.warning(f"⚠️ El snapshot usa {manifiesto['modelo_nombre']} y el sistema {self.modelo_nombre}")
+        
         logger.info(f"📂 Cargando sistema RAG de horarios desde: {directorio}")
 
-        # Cargar índice FAISS
-        self.index = faiss.read_index(str(RAG_INDICE_FILE))
+        # Cargar índice FAISS (define la dimensión sin necesidad de cargar el modelo)
+        self.index = faiss.read_index(os.path.join(directorio, RAG_INDICE_FILE.name))
+        self._dimension = self.index.d
+
+        # Cargar documentos: solo se decodifica la tabla del almacén binario,
+        # el contenido de cada documento se lee al accederlo
+        ruta_almacen = os.path.join(directorio, RAG_DOCUMENTOS_BIN_FILE.name)
+        if os.path.exists(ruta_almacen):
+            self.documentos = AlmacenDocumentos(ruta_almacen).cargar()
+        else:
+            with open(os.path.join(directorio, RAG_DOCUMENTOS_FILE.name), "r", encoding="utf-8") as f:
+                self.documentos = json.load(f)
+        self._indexar_documentos()
+
+        # Aplicar cambios incrementales guardados después del último guardado completo
+        self._aplicar_journal_cambios(os.path.join(directorio, RAG_CAMBIOS_FILE.name))
+        self._cambios_pendientes = []
+
+        # Índices estructurados para consultas por horario y filtros
+        self._construir_indices_estructurados()
+
+        # La matriz guardada vale si cubre exactamente los documentos con horarios
+        # (los cambios del journal usan IDs nuevos); si no, se recalcula al usarla
+        matriz = MatrizConflictos()
+        if matriz.cargar(directorio):
+            if matriz.documentos() == {i for i, bloques in self.motor_conflictos.bloques.items() if bloques}:
+                self._matriz_conflictos = matriz
+            else:
+                logger.info("🧮 La matriz de conflictos guardada no corresponde a los documentos: se recalculará")
 
-        # Cargar documentos
-        with open(str(RAG_DOCUMENTOS_FILE), "r", encoding="utf-8") as f:
-            self.documentos = json.load(f)
+        # Índices guardados antes de usar IDs propios: el ID es la posición
+        if not isinstance(self.index, faiss.IndexIDMap2):
+            vectores = self.index.reconstruct_n(0, self.index.ntotal)
+            self.index = faiss.IndexIDMap2(faiss.IndexFlatIP(self.dimension))
+            self.index.add_with_ids(vectores, np.arange(len(vectores), dtype=np.int64))
+
+        if self.index.ntotal != len(self.documentos):
+            logger.warning(f"⚠️ El índice tiene {self.index.ntotal} vectores y hay {len(self.documentos)} documentos")
 
         # Cargar metadatos
-        with open(str(RAG_METADATOS_FILE), "r", encoding="utf-8") as f:
+        with open(os.path.join(directorio, RAG_METADATOS_FILE.name), "r", encoding="utf-8") as f:
             metadatos = json.load(f)
 
+        # Los vectores de distintos backends no son intercambiables con los de las consultas
+        backend_indice = metadatos.get('backend', 'torch')
+        if backend_indice != self.backend:
+            logger.warning(f"⚠️ El índice se construyó con el backend {backend_indice} y el sistema usa {self.backend}")
+
+        # Tipo de índice guardado; los parámetros de búsqueda indicados al crear el sistema tienen prioridad
+        self.configuracion_indice = metadatos.get('indice', {'tipo': 'flat', 'parametros': {}, 'compresion': 'fp32'})
+        self.tipo_indice = self.configuracion_indice['tipo']
+        configurar_busqueda(self.index, {**self.configuracion_indice['parametros'], **(self.parametros_indice or {})})
+
         logger.info(f"✅ Sistema de horarios cargado: {metadatos['total_documentos']} documentos, {metadatos['materias_con_horarios']} con horarios")
         return self
+
+    def _aplicar_journal_cambios(self, ruta_cambios: str):
+        """Aplica sobre los documentos el journal de cambios incrementales"""
+        if not os.path.exists(ruta_cambios):
+            return
+        
+        cantidad = 0
+        with open(ruta_cambios, "r", encoding="utf-8") as f:
+            for linea in f:
+                if not linea.strip():
+                    continue
+                cambio = json.loads(linea)
+                # El índice guardado ya refleja estos cambios
+                self._quitar_documentos([cambio['id']], actualizar_indice=False)
+                if cambio['op'] == 'upsert':
+                    for documento in cambio['documentos']:
+                        self.documentos.append(documento)
+                        self.documentos_por_faiss_id[documento['faiss_id']] = documento
+                        self._proximo_faiss_id = max(self._proximo_faiss_id, documento['faiss_id'] + 1)
+                cantidad += 1
+        
+        logger.info(f"🔁 Aplicados {cantidad} cambios incrementales")
     
     def _normalizar_nombre_sin_acentos(self, nombre: str) -> str:
         """Normaliza nombre eliminando acentos, ñ y caracteres especiales"""
@@ -499,8 +1322,8 @@ def main():
     # Procesar materias unificadas
     sistema.procesar_materias_unificadas()
 
-    # Guardar sistema
-    sistema.guardar_sistema_horarios()
+    # Publicar una versión nueva del sistema
+    sistema.publicar_snapshot_horarios()
 
     # Realizar pruebas
     logger.info("\n" + "=" * 60)
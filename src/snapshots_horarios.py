@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Snapshots Versionados del Sistema RAG de Horarios
+Cada construcción se escribe completa en su propio directorio de versión con
+un manifiesto (checksums, modelo, dimensión, cantidad de documentos) y recién
+entonces se publica cambiando el puntero ACTUAL con un reemplazo atómico
+
+Estructura:
+    rag_sistema_con_horarios/
+        ACTUAL                      # nombre de la versión publicada
+        versiones/
+            20250811T101500123456/
+                indice_horarios.faiss
+                documentos_horarios.bin
+                metadatos_horarios.json
+                manifiesto.json
+
+Un lector resuelve ACTUAL una sola vez y lee todo desde esa versión, que no
+se modifica nunca: no puede ver un índice nuevo con documentos viejos.
+Los directorios sin ACTUAL (formato anterior) se siguen leyendo tal cual.
+
+Uso:
+    python snapshots_horarios.py                    # listar versiones
+    python snapshots_horarios.py --verificar        # verificar checksums de la versión actual
+    python snapshots_horarios.py --activar VERSION  # volver a una versión anterior
+
+Autor: Sistema RAG MVP
+Fecha: 2025-08-11
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+try:
+    from .config_paths import RAG_SISTEMA_DIR, RAG_VERSIONES_DIR, RAG_VERSION_ACTUAL_FILE, RAG_MANIFIESTO_FILE
+except ImportError:
+    from config_paths import RAG_SISTEMA_DIR, RAG_VERSIONES_DIR, RAG_VERSION_ACTUAL_FILE, RAG_MANIFIESTO_FILE
+
+logger = logging.getLogger(__name__)
+
+# Un temporal sin modificar durante este tiempo es de una publicación interrumpida;
+# los más recientes pueden ser de otro proceso que está publicando
+TEMPORAL_ABANDONADO_SEGUNDOS = 3600
+
+
+def _sincronizar(ruta: str):
+    """Fuerza a disco un archivo o directorio"""
+    descriptor = os.open(ruta, os.O_RDONLY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+
+def checksum_archivo(ruta: str) -> str:
+    """SHA-256 de un archivo, leído por bloques"""
+    digest = hashlib.sha256()
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(1 << 20), b''):
+            digest.update(bloque)
+    return digest.hexdigest()
+
+
+def directorio_versiones(directorio: str) -> str:
+    return os.path.join(directorio, RAG_VERSIONES_DIR.name)
+
+
+def version_actual(directorio: str) -> Optional[str]:
+    """Versión publicada en el directorio, o None si usa el formato sin versiones"""
+    try:
+        with open(os.path.join(directorio, RAG_VERSION_ACTUAL_FILE.name), 'r', encoding='utf-8') as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def resolver_directorio(directorio: str) -> str:
+    """Directorio de la versión publicada (o el mismo directorio si no tiene versiones)"""
+    version = version_actual(directorio)
+    if version is None:
+        return directorio
+    return os.path.join(directorio_versiones(directorio), version)
+
+
+def listar_versiones(directorio: str) -> List[str]:
+    """Versiones completas disponibles, de la más vieja a la más nueva"""
+    ruta = directorio_versiones(directorio)
+    if not os.path.isdir(ruta):
+        return []
+    return sorted(nombre for nombre in os.listdir(ruta)
+                  if not nombre.startswith('.') and os.path.exists(os.path.join(ruta, nombre, RAG_MANIFIESTO_FILE.name)))
+
+
+def leer_manifiesto(directorio_version: str) -> Dict[str, Any]:
+    with open(os.path.join(directorio_version, RAG_MANIFIESTO_FILE.name), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def verificar_snapshot(directorio_version: str) -> Dict[str, Any]:
+    """
+    Comprueba los checksums de una versión contra su manifiesto
+
+    Returns:
+        El manifiesto
+
+    Raises:
+        ValueError: Si falta un archivo o no coincide su checksum
+    """
+    manifiesto = leer_manifiesto(directorio_version)
+    for nombre, esperado in manifiesto['archivos'].items():
+        ruta = os.path.join(directorio_version, nombre)
+        if not os.path.exists(ruta):
+            raise ValueError(f"Falta {nombre} en el snapshot {manifiesto['version']}")
+        if checksum_archivo(ruta) != esperado['sha256']:
+            raise ValueError(f"Checksum distinto en {nombre} del snapshot {manifiesto['version']}")
+    return manifiesto
+
+
+def activar_version(directorio: str, version: str):
+    """Publica una versión existente cambiando el puntero ACTUAL de forma atómica"""
+    if version not in listar_versiones(directorio):
+        raise ValueError(f"No existe la versión {version} en {directorio}")
+
+    ruta_actual = os.path.join(directorio, RAG_VERSION_ACTUAL_FILE.name)
+    temporal = f"{ruta_actual}.tmp"
+    with open(temporal, 'w', encoding='utf-8') as f:
+        f.write(version + '\n')
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporal, ruta_actual)
+    _sincronizar(directorio)
+    logger.info(f"📌 Versión activa: {version}")
+
+
+def publicar_snapshot(sistema, directorio: str = str(RAG_SISTEMA_DIR), compresion: Optional[str] = None,
+                      conservar: int = 3) -> str:
+    """
+    Guarda el sistema como una versión nueva y la publica
+
+    Args:
+        sistema: SistemaEmbeddingsHorarios con el índice construido
+        directorio: Directorio raíz del sistema RAG
+        compresion: Almacenamiento de los vectores (ver guardar_sistema_horarios)
+        conservar: Versiones a conservar contando la nueva (las más viejas se borran)
+
+    Returns:
+        Nombre de la versión publicada
+    """
+    versiones = directorio_versiones(directorio)
+    os.makedirs(versiones, exist_ok=True)
+
+    version = datetime.now().strftime('%Y%m%dT%H%M%S%f')
+    temporal = os.path.join(versiones, f".{version}.tmp")
+    sistema.guardar_sistema_horarios(temporal, compresion=compresion)
+
+    archivos = {}
+    for nombre in sorted(os.listdir(temporal)):
+        ruta = os.path.join(temporal, nombre)
+        archivos[nombre] = {'sha256': checksum_archivo(ruta), 'bytes': os.path.getsize(ruta)}
+        _sincronizar(ruta)
+
+    manifiesto = {
+        'version': version,
+        'fecha_creacion': datetime.now().isoformat(),
+        'modelo_nombre': sistema.modelo_nombre,
+        'backend': sistema.backend,
+        'dimension': sistema.dimension,
+        'total_documentos': len(sistema.documentos),
+        'total_vectores': sistema.index.ntotal,
+        'indice': sistema.configuracion_indice.get('tipo', 'flat'),
+        'archivos': archivos,
+    }
+    with open(os.path.join(temporal, RAG_MANIFIESTO_FILE.name), 'w', encoding='utf-8') as f:
+        json.dump(manifiesto, f, ensure_ascii=False, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    _sincronizar(temporal)
+
+    # El directorio completo aparece de una vez con su nombre final
+    os.rename(temporal, os.path.join(versiones, version))
+    _sincronizar(versiones)
+    activar_version(directorio, version)
+
+    limpiar_versiones(directorio, conservar)
+    logger.info(f"📦 Snapshot {version} publicado: {manifiesto['total_documentos']} documentos")
+    return version
+
+
+def limpiar_versiones(directorio: str, conservar: int = 3) -> List[str]:
+    """
+    Borra las versiones más viejas (nunca la activa) y los temporales abandonados
+
+    Solo se consideran abandonados los temporales sin cambios desde hace
+    TEMPORAL_ABANDONADO_SEGUNDOS, para no borrar la publicación en curso de otro proceso.
+    """
+    versiones = directorio_versiones(directorio)
+    if not os.path.isdir(versiones):
+        return []
+
+    activa = version_actual(directorio)
+    disponibles = listar_versiones(directorio)
+    borrar = [v for v in disponibles[:max(0, len(disponibles) - max(1, conservar))] if v != activa]
+    limite = time.time() - TEMPORAL_ABANDONADO_SEGUNDOS
+    for nombre in os.listdir(versiones):
+        if nombre.startswith('.') and nombre.endswith('.tmp'):
+            try:
+                if os.path.getmtime(os.path.join(versiones, nombre)) < limite:
+                    borrar.append(nombre)
+            except FileNotFoundError:
+                pass  # otro proceso lo publicó o lo borró mientras tanto
+
+    for nombre in borrar:
+        shutil.rmtree(os.path.join(versiones, nombre), ignore_errors=True)
+    if borrar:
+        logger.info(f"🧹 Versiones eliminadas: {', '.join(borrar)}")
+    return borrar
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Snapshots versionados del sistema RAG de horarios")
+    parser.add_argument("--sistema", "-s", default=str(RAG_SISTEMA_DIR), help="Directorio del sistema RAG")
+    parser.add_argument("--verificar", action="store_true", help="Verificar checksums de la versión actual")
+    parser.add_argument("--activar", metavar="VERSION", help="Publicar una versión existente")
+    parser.add_argument("--conservar", type=int, help="Borrar versiones viejas dejando esta cantidad")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    if args.activar:
+        activar_version(args.sistema, args.activar)
+    if args.conservar:
+        limpiar_versiones(args.sistema, args.conservar)
+
+    activa = version_actual(args.sistema)
+    if activa is None:
+        print(f"📂 {args.sistema} no tiene versiones (formato anterior)")
+        return
+
+    for version in listar_versiones(args.sistema):
+        manifiesto = leer_manifiesto(os.path.join(directorio_versiones(args.sistema), version))
+        marca = "👉" if version == activa else "  "
+        print(f"{marca} {version}  {manifiesto['total_documentos']} docs  dim {manifiesto['dimension']}  "
+              f"{manifiesto['indice']}  {manifiesto['modelo_nombre']}")
+
+    if args.verificar:
+        verificar_snapshot(resolver_directorio(args.sistema))
+        print(f"✅ Checksums correctos en {activa}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Tests del Cliente HTTP compartido, su Cache en Disco y el Coordinador de Scrapers
+Usa un servidor HTTP local: keep-alive, límites por host, reintentos, GET condicional y ejecución en paralelo
+
+Autor: Sistema RAG MVP
+Fecha: 2025-08-16
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'scrapers'))
+
+import asyncio
+import importlib.util
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from cache_http import CacheHTTP
+from cliente_http import ErrorHTTP, ejecutar_con_cliente
+from coordinador_scrapers import ejecutar_scrapers
+from scraper_horarios_instituto_calculo import ScraperHorariosIC
+
+
+FECHA = "Wed, 13 Aug 2025 10:00:00 GMT"
+HAY_AIOHTTP = importlib.util.find_spec("aiohttp") is not None
+
+
+class ManejadorPrueba(BaseHTTPRequestHandler):
+    """
+    Rutas: /lento (0.2s), /falla-una-vez (500 y luego 200), /no-existe (404),
+    /ic y /etag (ETag "v1"), /fecha (Last-Modified), resto (200)
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        servidor = self.server
+        with servidor.candado:
+            servidor.puertos.add(self.client_address[1])
+            servidor.en_curso += 1
+            servidor.max_en_curso = max(servidor.max_en_curso, servidor.en_curso)
+            servidor.solicitudes[self.path] = servidor.solicitudes.get(self.path, 0) + 1
+            servidor.condicionales.append(
+                (self.path, self.headers.get("If-None-Match"), self.headers.get("If-Modified-Since")))
+            veces = servidor.solicitudes[self.path]
+        try:
+            if self.path == "/lento":
+                time.sleep(0.2)
+            if self.path == "/no-existe":
+                self._responder(404, "no existe")
+            elif self.path == "/falla-una-vez" and veces == 1:
+                self._responder(500, "error")
+            elif self.path in ("/ic", "/etag") and self.headers.get("If-None-Match") == '"v1"':
+                self._responder(304, "", {"ETag": '"v1"'})
+            elif self.path in ("/ic", "/etag"):
+                self._responder(200, '<div class="academicItem">Materia</div>', {"ETag": '"v1"'})
+            elif self.path == "/fecha" and self.headers.get("If-Modified-Since") == FECHA:
+                self._responder(304, "")
+            elif self.path == "/fecha":
+                self._responder(200, "con fecha", {"Last-Modified": FECHA})
+            else:
+                self._responder(200, f"ok {self.path}")
+        finally:
+            with servidor.candado:
+                servidor.en_curso -= 1
+
+    def _responder(self, estado, texto, encabezados=None):
+        cuerpo = texto.encode("utf-8")
+        self.send_response(estado)
+        for clave, valor in (encabezados or {}).items():
+            self.send_header(clave, valor)
+        if estado != 304:
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestClienteHTTP(unittest.TestCase):
+    """Casos de prueba del cliente y del coordinador"""
+
+    def setUp(self):
+        self.servidor = ThreadingHTTPServer(("127.0.0.1", 0), ManejadorPrueba)
+        self.servidor.candado = threading.Lock()
+        self.servidor.puertos, self.servidor.solicitudes, self.servidor.condicionales = set(), {}, []
+        self.servidor.en_curso = self.servidor.max_en_curso = 0
+        threading.Thread(target=self.servidor.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.servidor.server_address[1]}"
+
+        # Las llamadas bloqueantes usan la cache por defecto: que sea temporal
+        self.tmp = tempfile.TemporaryDirectory()
+        self.entorno_anterior = os.environ.get("SCRAPERS_CACHE_HTTP")
+        os.environ["SCRAPERS_CACHE_HTTP"] = os.path.join(self.tmp.name, "defecto")
+
+    def tearDown(self):
+        self.servidor.shutdown()
+        self.servidor.server_close()
+        if self.entorno_anterior is None:
+            os.environ.pop("SCRAPERS_CACHE_HTTP", None)
+        else:
+            os.environ["SCRAPERS_CACHE_HTTP"] = self.entorno_anterior
+        self.tmp.cleanup()
+
+    def cache(self, **opciones):
+        return CacheHTTP(os.path.join(self.tmp.name, "cache"), **opciones)
+
+    def test_01_keep_alive(self):
+        """Las descargas sucesivas al mismo host reutilizan la conexión"""
+        async def descargar(cliente):
+            return [await cliente.obtener_texto(f"{self.url}/pagina{i}") for i in range(3)]
+
+        self.assertEqual(ejecutar_con_cliente(descargar), ["ok /pagina0", "ok /pagina1", "ok /pagina2"])
+        self.assertEqual(len(self.servidor.puertos), 1)
+
+    def test_02_limite_por_host(self):
+        """Nunca hay más descargas en curso que el límite por host"""
+        async def descargar(cliente):
+            return await asyncio.gather(*(cliente.obtener(f"{self.url}/lento") for _ in range(6)))
+
+        respuestas = ejecutar_con_cliente(descargar, conexiones_por_host=2)
+        self.assertEqual([r["estado"] for r in respuestas], [200] * 6)
+        self.assertEqual(self.servidor.max_en_curso, 2)
+
+    def test_03_reintentos(self):
+        """Los 5xx se reintentan; los 4xx fallan sin reintentar"""
+        async def descargar(cliente):
+            texto = await cliente.obtener_texto(f"{self.url}/falla-una-vez")
+            with self.assertRaises(ErrorHTTP) as contexto:
+                await cliente.obtener(f"{self.url}/no-existe")
+            return texto, contexto.exception.estado, dict(cliente.stats)
+
+        texto, estado, stats = ejecutar_con_cliente(descargar, espera_reintento=0)
+        self.assertEqual((texto, estado), ("ok /falla-una-vez", 404))
+        self.assertEqual((stats["reintentos"], stats["errores"]), (1, 1))
+        self.assertEqual(self.servidor.solicitudes["/no-existe"], 1)
+
+    def test_04_coordinador_en_paralelo(self):
+        """El coordinador tarda lo que el scraper más lento y aísla los errores"""
+        url = self.url
+
+        class ScraperLento:
+            async def ejecutar_scraping_completo_async(self, cliente, omitir_sin_cambios=False):
+                await cliente.obtener_texto(f"{url}/lento")
+                return {"exito": True}
+
+        class ScraperBooleano:
+            async def ejecutar_scraping_completo_async(self, cliente, omitir_sin_cambios=False):
+                await cliente.obtener_texto(f"{url}/lento")
+                return True
+
+        class ScraperRoto:
+            async def ejecutar_scraping_completo_async(self, cliente, omitir_sin_cambios=False):
+                raise RuntimeError("sin conexión")
+
+        inicio = time.perf_counter()
+        resultados = asyncio.run(ejecutar_scrapers(scrapers={
+            "a": ScraperLento(), "b": ScraperLento(), "c": ScraperBooleano(), "d": ScraperRoto()}))
+        self.assertLess(time.perf_counter() - inicio, 0.5)
+        self.assertEqual({n: r["exito"] for n, r in resultados.items()}, {"a": True, "b": True, "c": True, "d": False})
+        self.assertEqual(resultados["d"]["error"], "sin conexión")
+
+    def test_05_scraper_descarga_con_cliente(self):
+        """Los scrapers descargan y verifican el HTML a través del cliente"""
+        scraper = ScraperHorariosIC()
+        scraper.url_materias = f"{self.url}/ic"
+        self.assertIn("academicItem", scraper.obtener_html_materias())
+
+        scraper.url_materias = f"{self.url}/no-existe"
+        self.assertIsNone(scraper.obtener_html_materias())
+
+    def test_06_revalidacion_con_etag(self):
+        """Vencido el TTL se revalida con If-None-Match y un 304 reutiliza el cuerpo guardado"""
+        async def descargar(cliente):
+            return [await cliente.obtener(f"{self.url}/etag") for _ in range(2)], dict(cliente.stats)
+
+        respuestas, stats = ejecutar_con_cliente(descargar, cache=self.cache(ttl=0))
+        self.assertEqual([r["origen"] for r in respuestas], ["red", "revalidada"])
+        self.assertEqual(respuestas[0]["texto"], respuestas[1]["texto"])
+        self.assertEqual(self.servidor.condicionales, [("/etag", None, None), ("/etag", '"v1"', None)])
+        self.assertEqual((stats["revalidadas"], stats["bytes"]), (1, len(respuestas[0]["texto"])))
+
+    def test_07_ttl_y_bypass(self):
+        """Dentro del TTL no se consulta al servidor; ignorar la cache descarga completo"""
+        async def descargar(cliente):
+            origenes = [(await cliente.obtener(f"{self.url}/fecha"))["origen"] for _ in range(2)]
+            origenes.append((await cliente.obtener(f"{self.url}/fecha", ignorar_cache=True))["origen"])
+            return origenes, cliente.sin_cambios(f"{self.url}/fecha")
+
+        origenes, sin_cambios = ejecutar_con_cliente(descargar, cache=self.cache(ttl=60))
+        self.assertEqual(origenes, ["red", "cache", "red"])
+        self.assertTrue(sin_cambios)
+        self.assertEqual(self.servidor.condicionales, [("/fecha", None, None)] * 2)
+
+        origenes, _ = ejecutar_con_cliente(descargar, cache=self.cache(ttl=0))
+        self.assertEqual(origenes[:2], ["revalidada", "revalidada"])
+        self.assertEqual(self.servidor.condicionales[2], ("/fecha", None, FECHA))
+
+    def test_08_edad_maxima(self):
+        """Las entradas más viejas que la edad máxima se descartan"""
+        cache = self.cache(edad_maxima=60)
+        entrada = cache.guardar("http://ejemplo/x", {"estado": 200, "texto": "x", "encabezados": {"ETag": '"a"'}})
+        self.assertEqual(cache.encabezados_condicionales(cache.leer("http://ejemplo/x")), {"If-None-Match": '"a"'})
+
+        cache._escribir({**entrada, "guardado": entrada["guardado"] - 120})
+        self.assertIsNone(cache.leer("http://ejemplo/x"))
+        self.assertEqual(os.listdir(cache.directorio), [])
+
+    def test_09_scraper_omite_parseo_sin_cambios(self):
+        """Con omitir_sin_cambios un 304 no vuelve a parsear la página"""
+        scraper = ScraperHorariosIC()
+        scraper.url_materias = f"{self.url}/ic"
+
+        async def ejecutar(cliente):
+            await cliente.obtener(scraper.url_materias)
+            return await scraper.ejecutar_scraping_completo_async(cliente, omitir_sin_cambios=True)
+
+        resultado = ejecutar_con_cliente(ejecutar, cache=self.cache(ttl=0))
+        self.assertTrue(resultado["sin_cambios"])
+        self.assertEqual(scraper.stats["materias_procesadas"], 0)
+
+    @unittest.skipUnless(HAY_AIOHTTP, "requiere aiohttp")
+    def test_10_descarga_con_aiohttp(self):
+        """Con aiohttp se reutiliza la conexión, se reintentan los 5xx, fallan los 4xx y se revalida con ETag"""
+        async def descargar(cliente):
+            self.assertTrue(cliente.usar_aiohttp)
+            textos = [await cliente.obtener_texto(f"{self.url}/pagina{i}") for i in range(2)]
+            textos.append(await cliente.obtener_texto(f"{self.url}/falla-una-vez"))
+            with self.assertRaises(ErrorHTTP) as contexto:
+                await cliente.obtener(f"{self.url}/no-existe")
+            origenes = [(await cliente.obtener(f"{self.url}/etag"))["origen"] for _ in range(2)]
+            return textos, contexto.exception.estado, origenes, dict(cliente.stats)
+
+        textos, estado, origenes, stats = ejecutar_con_cliente(
+            descargar, usar_aiohttp=True, espera_reintento=0, cache=self.cache(ttl=0))
+        self.assertEqual(textos, ["ok /pagina0", "ok /pagina1", "ok /falla-una-vez"])
+        self.assertEqual(estado, 404)
+        self.assertEqual(origenes, ["red", "revalidada"])
+        self.assertEqual((stats["reintentos"], stats["errores"], stats["revalidadas"]), (1, 1, 1))
+        self.assertEqual(self.servidor.condicionales[-1], ("/etag", '"v1"', None))
+        self.assertEqual(len(self.servidor.puertos), 1)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
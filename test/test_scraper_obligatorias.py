@@ -11,6 +11,7 @@ import unittest
 from unittest.mock import patch, MagicMock
 import json
 import os
+import tempfile
 from scraper_materias_obligatorias import ScraperMateriasObligatorias
 
 class TestScraperMateriasObligatorias(unittest.TestCase):
@@ -164,8 +165,18 @@ class TestIntegracion(unittest.TestCase):
     
     def setUp(self):
         self.scraper = ScraperMateriasObligatorias()
+        # La descarga pasa por la cache HTTP en disco: usar un directorio temporal
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        entorno = patch.dict(os.environ, {"SCRAPERS_CACHE_HTTP": self.tmp.name})
+        entorno.start()
+        self.addCleanup(entorno.stop)
+        # El mock es de requests: forzar ese camino aunque aiohttp esté instalado
+        sin_aiohttp = patch('cliente_http.aiohttp', None)
+        sin_aiohttp.start()
+        self.addCleanup(sin_aiohttp.stop)
     
-    @patch('scraper_materias_obligatorias.requests.Session.get')
+    @patch('cliente_http.requests.Session.get')
     def test_scraping_completo_mock(self, mock_get):
         """Test del proceso completo con HTTP mockeado"""
         # Configurar mock response
@@ -183,6 +194,8 @@ class TestIntegracion(unittest.TestCase):
             </table>
         </body></html>
         """
+        mock_response.status_code = 200
+        mock_response.headers = {}
         mock_response.raise_for_status.return_value = None
         mock_get.return_value = mock_response
         
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Datos de Prueba Compartidos por los Tests del Sistema RAG de Horarios
+Codificador determinístico, materias de ejemplo y documentos mínimos
+
+No es un módulo de tests: lo importan los tests que necesitan un sistema
+sin descargar el modelo de embeddings.
+
+Autor: Sistema RAG MVP
+Fecha: 2025-08-07
+"""
+
+import hashlib
+import re
+import numpy as np
+
+
+class CodificadorDeterministico:
+    """Bolsa de palabras hasheada: mismo texto, mismo vector"""
+
+    dimension = 64
+
+    def __init__(self):
+        self.textos_codificados = 0
+
+    def get_sentence_embedding_dimension(self):
+        return self.dimension
+
+    def encode(self, textos, batch_size=32, show_progress_bar=False, convert_to_numpy=True):
+        self.textos_codificados += len(textos)
+        vectores = np.full((len(textos), self.dimension), 0.01, dtype=np.float32)
+        for i, texto in enumerate(textos):
+            for palabra in re.findall(r'\w+', texto.lower()):
+                vectores[i, int(hashlib.md5(palabra.encode()).hexdigest(), 16) % self.dimension] += 1
+        return vectores
+
+
+def crear_materia(id_materia, nombre, departamento, horarios):
+    """Materia con el formato de materias unificadas"""
+    return {
+        'id': id_materia,
+        'nombre': nombre,
+        'nombre_normalizado': nombre.lower(),
+        'departamento': {'codigo': departamento, 'nombre': f'Departamento {departamento}'},
+        'periodo': {'año': 2025, 'cuatrimestre': '2', 'codigo': '2C'},
+        'docentes': [],
+        'horarios': [
+            {'dia': dia, 'hora_inicio': inicio, 'hora_fin': fin, 'tipo_actividad': tipo, 'comision': '', 'aula': ''}
+            for dia, inicio, fin, tipo in horarios
+        ],
+    }
+
+
+MATERIAS = [
+    crear_materia('dc_algo1', 'Algoritmos y Estructuras de Datos I', 'DC',
+                  [('lunes', '09:00', '13:00', 'teorica'), ('miércoles', '09:00', '13:00', 'practica')]),
+    crear_materia('dc_algo1', 'Algoritmos y Estructuras de Datos I', 'DC',
+                  [('martes', '17:00', '22:00', 'teorica')]),
+    crear_materia('dm_algebra1', 'Álgebra I', 'DM',
+                  [('martes', '14:00', '16:00', 'teorica'), ('jueves', '14:00', '17:00', 'practica')]),
+    crear_materia('dm_analisis2', 'Análisis II', 'DM',
+                  [('viernes', '19:00', '22:00', 'teorica')]),
+    crear_materia('ic_estadistica', 'Estadística', 'IC',
+                  [('martes', '15:00', '18:00', 'laboratorio')]),
+    crear_materia('dc_sin_horario', 'Sistemas Digitales', 'DC', []),
+]
+
+
+def crear_documento_horarios(faiss_id, nombre, horarios):
+    """Documento RAG mínimo para el motor de conflictos: horarios como (día, inicio, fin, tipo, comisión)"""
+    return {
+        'faiss_id': faiss_id, 'id': f'materia_{faiss_id}', 'metadatos': {'materia_nombre': nombre},
+        'materia_original': {'horarios': [
+            {'dia': dia, 'hora_inicio': inicio, 'hora_fin': fin, 'tipo_actividad': tipo, 'comision': comision}
+            for dia, inicio, fin, tipo, comision in horarios
+        ]},
+    }
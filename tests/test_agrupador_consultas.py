@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Tests del Agrupador de Consultas Concurrentes
+Formación de micro-lotes, límites de tamaño y espera, y propagación de errores
+
+Autor: Sistema RAG MVP
+Fecha: 2025-08-11
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import unittest
+import asyncio
+import time
+from agrupador_consultas import AgrupadorConsultas
+
+
+class TestAgrupadorConsultas(unittest.TestCase):
+    """Casos de prueba del micro-batching"""
+
+    def setUp(self):
+        self.lotes = []
+
+    def duplicar(self, solicitudes):
+        self.lotes.append(list(solicitudes))
+        return [s * 2 for s in solicitudes]
+
+    def test_01_solicitudes_concurrentes_en_un_lote(self):
+        """Las solicitudes simultáneas se procesan juntas y cada una recibe su resultado"""
+        async def escenario():
+            agrupador = AgrupadorConsultas(self.duplicar, max_lote=32, espera_maxima_ms=20)
+            resultados = await asyncio.gather(*(agrupador.enviar(i) for i in range(10)))
+            await agrupador.detener()
+            return resultados
+
+        self.assertEqual(asyncio.run(escenario()), [i * 2 for i in range(10)])
+        self.assertEqual(len(self.lotes), 1)
+
+    def test_02_respeta_max_lote(self):
+        """Ningún lote supera max_lote"""
+        async def escenario():
+            agrupador = AgrupadorConsultas(self.duplicar, max_lote=4, espera_maxima_ms=20)
+            resultados = await asyncio.gather(*(agrupador.enviar(i) for i in range(10)))
+            await agrupador.detener()
+            return resultados
+
+        self.assertEqual(asyncio.run(escenario()), [i * 2 for i in range(10)])
+        self.assertEqual([len(lote) for lote in self.lotes], [4, 4, 2])
+
+    def test_03_lote_completo_no_espera(self):
+        """Un lote lleno se procesa sin esperar la ventana completa"""
+        async def escenario():
+            agrupador = AgrupadorConsultas(self.duplicar, max_lote=3, espera_maxima_ms=5000)
+            inicio = time.perf_counter()
+            await asyncio.gather(*(agrupador.enviar(i) for i in range(3)))
+            await agrupador.detener()
+            return time.perf_counter() - inicio
+
+        self.assertLess(asyncio.run(escenario()), 1.0)
+
+    def test_04_error_se_propaga_a_todo_el_lote(self):
+        """Si el lote falla, todas sus solicitudes reciben la excepción y el agrupador sigue"""
+        def fallar(solicitudes):
+            if 'malo' in solicitudes:
+                raise ValueError('lote inválido')
+            return solicitudes
+
+        async def escenario():
+            agrupador = AgrupadorConsultas(fallar, max_lote=8, espera_maxima_ms=20)
+            errores = await asyncio.gather(agrupador.enviar('malo'), agrupador.enviar('bueno'),
+                                           return_exceptions=True)
+            siguiente = await agrupador.enviar('bueno')
+            await agrupador.detener()
+            return errores, siguiente
+
+        errores, siguiente = asyncio.run(escenario())
+        self.assertTrue(all(isinstance(e, ValueError) for e in errores))
+        self.assertEqual(siguiente, 'bueno')
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Tests del Almacén Binario de Documentos
+Ida y vuelta del formato y decodificación perezosa por documento
+
+Autor: Sistema RAG MVP
+Fecha: 2025-08-07
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import unittest
+import tempfile
+import almacen_documentos
+from almacen_documentos import AlmacenDocumentos, a_dict
+
+
+def crear_documento(faiss_id, nombre, horarios):
+    """Documento RAG con la misma forma que los del sistema de horarios"""
+    materia = {
+        'id': f'dc_{faiss_id}',
+        'nombre': nombre,
+        'horarios': horarios,
+        'docentes': [{'nombre': 'Pérez, Ana', 'rol': 'profesor'}],
+    }
+    return {
+        'id': materia['id'],
+        'faiss_id': faiss_id,
+        'contenido': f"Materia: {nombre}",
+        'metadatos': {'materia_nombre': nombre, 'tiene_horarios': bool(horarios)},
+        'materia_original': materia,
+    }
+
+
+class TestAlmacenDocumentos(unittest.TestCase):
+    """Casos de prueba del almacén binario"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.ruta = os.path.join(self.tmp.name, 'documentos.bin')
+        self.documentos = [
+            crear_documento(0, 'Álgebra I', [{'dia': 'lunes', 'hora_inicio': '09:00', 'hora_fin': '13:00'}]),
+            crear_documento(3, 'Análisis II', []),
+        ]
+        self.almacenes = []
+
+    def tearDown(self):
+        for almacen in self.almacenes:
+            almacen.cerrar()
+        self.tmp.cleanup()
+
+    def cargar(self):
+        almacen = AlmacenDocumentos(self.ruta)
+        self.almacenes.append(almacen)
+        return almacen.cargar()
+
+    def test_01_ida_y_vuelta(self):
+        """Los documentos cargados son iguales a los guardados"""
+        AlmacenDocumentos.guardar(self.ruta, self.documentos)
+        cargados = self.cargar()
+        self.assertEqual([a_dict(doc) for doc in cargados], self.documentos)
+
+    def test_02_decodificacion_perezosa(self):
+        """Metadatos y horarios no requieren decodificar el registro"""
+        AlmacenDocumentos.guardar(self.ruta, self.documentos)
+        documento = self.cargar()[0]
+
+        self.assertEqual(documento['faiss_id'], 0)
+        self.assertEqual(documento['metadatos']['materia_nombre'], 'Álgebra I')
+        self.assertEqual(documento['materia_original']['horarios'][0]['dia'], 'lunes')
+        self.assertIsNone(documento._cache)
+
+        self.assertEqual(documento['materia_original'].get('nombre'), 'Álgebra I')
+        self.assertIsNotNone(documento._cache)
+
+    def test_03_regrabar_desde_documentos_cargados(self):
+        """Se puede guardar un almacén a partir de documentos perezosos"""
+        AlmacenDocumentos.guardar(self.ruta, self.documentos)
+        cargados = self.cargar()
+        AlmacenDocumentos.guardar(self.ruta, cargados + [crear_documento(7, 'Física I', [])])
+
+        recargados = self.cargar()
+        self.assertEqual([doc['faiss_id'] for doc in recargados], [0, 3, 7])
+        self.assertEqual(recargados[1]['contenido'], 'Materia: Análisis II')
+
+    def test_04_codec_json_sin_msgpack(self):
+        """Sin msgpack el almacén usa JSON compacto"""
+        original = almacen_documentos.msgpack
+        almacen_documentos.msgpack = None
+        try:
+            AlmacenDocumentos.guardar(self.ruta, self.documentos)
+            cargados = self.cargar()
+            self.assertEqual(self.almacenes[-1].codec, almacen_documentos.CODEC_JSON)
+            self.assertEqual(a_dict(cargados[0]), self.documentos[0])
+        finally:
+            almacen_documentos.msgpack = original
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
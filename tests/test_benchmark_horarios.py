@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Tests del Benchmark de Recuperación
+Criterios de relevancia, recall@k/MRR y formato del reporte
+
+Autor: Sistema RAG MVP
+Fecha: 2025-08-12
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append(os.path.dirname(__file__))
+
+import unittest
+import tempfile
+import json
+from sistema_embeddings_horarios import SistemaEmbeddingsHorarios
+from benchmark_horarios import comparar_reportes, ejecutar_benchmark, es_relevante, evaluar_calidad, percentiles_ms
+from fixtures_horarios import MATERIAS, CodificadorDeterministico
+
+CONSULTAS = [
+    {'consulta': 'Álgebra I', 'materias': ['algebra i']},
+    {'consulta': 'Estadística', 'materias': ['estadistica']},
+    {'consulta': 'materias los martes por la tarde', 'dia': 'martes', 'franja': 'tarde'},
+    {'consulta': 'Física', 'materias': ['fisica']},
+]
+
+
+class TestBenchmarkHorarios(unittest.TestCase):
+    """Casos de prueba del benchmark"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        archivo_materias = os.path.join(cls.tmp.name, 'materias.json')
+        with open(archivo_materias, 'w', encoding='utf-8') as f:
+            json.dump({'materias': MATERIAS}, f)
+        cls.sistema = SistemaEmbeddingsHorarios(directorio_cache=os.path.join(cls.tmp.name, 'cache'))
+        cls.sistema.modelo = CodificadorDeterministico()
+        cls.sistema.procesar_materias_unificadas(archivo_materias)
+        cls.documentos = {d['metadatos']['materia_nombre']: d for d in cls.sistema.documentos}
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_01_criterios_de_relevancia(self):
+        """Nombre con límites de palabra y horario con día y franja en el mismo horario"""
+        algebra = self.documentos['Álgebra I']
+        self.assertTrue(es_relevante(algebra, {'materias': ['algebra i']}))
+        self.assertFalse(es_relevante(self.documentos['Análisis II'], {'materias': ['analisis i']}))
+        self.assertTrue(es_relevante(algebra, {'dia': 'martes', 'franja': 'tarde'}))
+        self.assertFalse(es_relevante(algebra, {'dia': 'martes', 'franja': 'mañana'}))
+        self.assertTrue(es_relevante(algebra, {'inicio': '14:00'}))
+        self.assertTrue(es_relevante(algebra, {'departamento': 'DM'}))
+
+    def test_02_recall_y_mrr(self):
+        """Las consultas por nombre encuentran su materia primero; sin relevantes no promedian"""
+        calidad = evaluar_calidad(self.sistema, CONSULTAS, k=3, modo='lexico')
+        detalle = {fila['consulta']: fila for fila in calidad['detalle']}
+        self.assertEqual(detalle['Álgebra I']['reciprocal_rank'], 1.0)
+        self.assertEqual(detalle['Estadística']['recall_at_3'], 1.0)
+        self.assertEqual(calidad['consultas_sin_relevantes'], 1)
+        self.assertTrue(0 < calidad['mrr'] <= 1)
+
+    def test_03_reporte_y_comparacion(self):
+        """El reporte es JSON con percentiles y se puede comparar con uno anterior"""
+        reporte = ejecutar_benchmark(self.sistema, CONSULTAS, k=3, repeticiones=2)
+        json.dumps(reporte)
+        for fase in ('frio_ms', 'caliente_ms'):
+            latencia = reporte['latencia'][fase]
+            self.assertLessEqual(latencia['p50'], latencia['p95'])
+            self.assertLessEqual(latencia['p95'], latencia['p99'])
+        self.assertGreater(reporte['construccion_indice_s'], 0)
+
+        diferencias = comparar_reportes(reporte, reporte)
+        self.assertIn('calidad.recall_at_3', diferencias)
+        self.assertTrue(all(d['diferencia'] == 0 for d in diferencias.values()))
+
+    def test_04_percentiles(self):
+        """Percentiles en milisegundos"""
+        self.assertEqual(percentiles_ms([0.001] * 10)['p99'], 1.0)
+        self.assertEqual(percentiles_ms([])['p50'], 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
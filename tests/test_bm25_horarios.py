@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Tests del Índice Léxico BM25
+Tokenización, siglas, ranking y fusión RRF
+
+Autor: Sistema RAG MVP
+Fecha: 2025-08-08
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import unittest
+import numpy as np
+from bm25_horarios import IndiceBM25, fusionar_rrf, siglas, tokenizar
+
+
+def crear_documento(faiss_id, nombre, contenido=''):
+    """Documento RAG mínimo para el índice léxico"""
+    return {
+        'faiss_id': faiss_id,
+        'contenido': f"Materia: {nombre}\n{contenido}",
+        'metadatos': {'materia_nombre': nombre, 'materia_normalizada': nombre.lower()},
+    }
+
+
+class TestIndiceBM25(unittest.TestCase):
+    """Casos de prueba del índice BM25"""
+
+    def setUp(self):
+        self.indice = IndiceBM25()
+        self.indice.construir([
+            crear_documento(0, 'Álgebra Lineal Computacional', 'martes de 14:00 a 17:00'),
+            crear_documento(1, 'ÁLGEBRA I', 'lunes de 09:00 a 13:00'),
+            crear_documento(2, 'Análisis Matemático I', 'jueves de 18:00 a 22:00'),
+            crear_documento(5, 'Laboratorio de Datos (LCD) Comisión 1', 'viernes de 09:00 a 12:00'),
+        ])
+
+    def test_01_tokenizacion_sin_acentos(self):
+        """Los términos se normalizan sin acentos ni palabras vacías"""
+        self.assertEqual(tokenizar('¿Cuándo se dicta Álgebra?'), ['dicta', 'algebra'])
+        self.assertEqual(siglas('Álgebra Lineal Computacional'), 'alc')
+        self.assertEqual(siglas('Análisis Matemático I'), 'am')
+        self.assertEqual(siglas('Estadística'), '')
+
+    def test_02_nombre_exacto_primero(self):
+        """El nombre completo de la materia queda primero"""
+        resultados = self.indice.buscar('algebra lineal computacional', k=2)
+        self.assertEqual(resultados[0][0], 0)
+        self.assertEqual(len(resultados), 2)
+
+    def test_03_siglas(self):
+        """Las siglas del nombre y las del texto se encuentran"""
+        self.assertEqual(self.indice.buscar('ALC', k=1)[0][0], 0)
+        self.assertEqual(self.indice.buscar('LCD', k=1)[0][0], 5)
+
+    def test_04_mascara_y_borrado(self):
+        """La máscara de filtros y el borrado excluyen documentos"""
+        mascara = np.zeros(8, dtype=bool)
+        mascara[1] = True
+        self.assertEqual([i for i, _ in self.indice.buscar('algebra', k=5, mascara=mascara)], [1])
+
+        self.indice.quitar_documentos([0])
+        self.assertNotIn(0, [i for i, _ in self.indice.buscar('algebra lineal', k=5)])
+        self.assertNotIn('computacional', self.indice.postings)
+
+    def test_05_fusion_rrf(self):
+        """Un documento bien ubicado en ambos rankings supera a los de uno solo"""
+        fusionados = fusionar_rrf([[3, 1, 2], [1, 4]])
+        self.assertEqual(fusionados[0][0], 1)
+        self.assertEqual({i for i, _ in fusionados}, {1, 2, 3, 4})
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
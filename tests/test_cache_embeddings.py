@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Tests del Cache de Embeddings en Disco
+Verifica reutilización de vectores entre ejecuciones
+
+Autor: Sistema RAG MVP
+Fecha: 2025-08-06
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import unittest
+import tempfile
+import numpy as np
+from cache_embeddings import CacheEmbeddings, CacheConsultasLRU
+
+
+class TestCacheEmbeddings(unittest.TestCase):
+    """Casos de prueba del cache de embeddings"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directorio = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_01_persistencia_entre_instancias(self):
+        """Los vectores guardados se recuperan desde una nueva instancia"""
+        cache = CacheEmbeddings(self.directorio, "modelo/test", 4)
+        hashes = [CacheEmbeddings.hash_texto(t) for t in ["a", "b"]]
+        vectores = np.arange(8, dtype=np.float32).reshape(2, 4)
+        cache.agregar(hashes, vectores)
+        cache.guardar()
+
+        cache2 = CacheEmbeddings(self.directorio, "modelo/test", 4)
+        self.assertEqual(len(cache2), 2)
+        encontrados = cache2.obtener(hashes)
+        np.testing.assert_array_equal(encontrados[hashes[1]], vectores[1])
+
+    def test_02_agregado_incremental(self):
+        """Agregar vectores no modifica las filas existentes"""
+        cache = CacheEmbeddings(self.directorio, "modelo", 2)
+        h1, h2 = CacheEmbeddings.hash_texto("uno"), CacheEmbeddings.hash_texto("dos")
+        cache.agregar([h1], np.array([[1, 1]], dtype=np.float32))
+        cache.guardar()
+
+        cache = CacheEmbeddings(self.directorio, "modelo", 2)
+        cache.agregar([h2], np.array([[2, 2]], dtype=np.float32))
+        # Disponible antes de persistir
+        np.testing.assert_array_equal(cache.obtener([h2])[h2], [2, 2])
+        cache.guardar()
+
+        cache = CacheEmbeddings(self.directorio, "modelo", 2)
+        encontrados = cache.obtener([h1, h2])
+        np.testing.assert_array_equal(encontrados[h1], [1, 1])
+        np.testing.assert_array_equal(encontrados[h2], [2, 2])
+
+    def test_03_otro_modelo_no_comparte_cache(self):
+        """La clave incluye el nombre del modelo"""
+        cache = CacheEmbeddings(self.directorio, "modelo-a", 2)
+        h = CacheEmbeddings.hash_texto("texto")
+        cache.agregar([h], np.ones((1, 2), dtype=np.float32))
+        cache.guardar()
+
+        otro = CacheEmbeddings(self.directorio, "modelo-b", 2)
+        self.assertEqual(otro.obtener([h]), {})
+
+    def test_04_dimension_distinta_reinicia_cache(self):
+        """Un cache de otra dimensión se descarta en lugar de leerse mal"""
+        cache = CacheEmbeddings(self.directorio, "modelo", 2)
+        h = CacheEmbeddings.hash_texto("texto")
+        cache.agregar([h], np.ones((1, 2), dtype=np.float32))
+        cache.guardar()
+
+        cache = CacheEmbeddings(self.directorio, "modelo", 3)
+        self.assertEqual(len(cache), 0)
+        cache.agregar([h], np.full((1, 3), 5, dtype=np.float32))
+        cache.guardar()
+
+        cache = CacheEmbeddings(self.directorio, "modelo", 3)
+        np.testing.assert_array_equal(cache.obtener([h])[h], [5, 5, 5])
+
+
+class TestCacheConsultasLRU(unittest.TestCase):
+    """Casos de prueba del cache LRU de consultas"""
+
+    def test_01_desaloja_el_menos_usado(self):
+        """Al superar la capacidad se desaloja la consulta usada hace más tiempo"""
+        cache = CacheConsultasLRU(capacidad=2)
+        cache.agregar("algebra", np.zeros(2))
+        cache.agregar("analisis", np.ones(2))
+        cache.obtener("algebra")
+        cache.agregar("fisica", np.ones(2))
+
+        self.assertIsNotNone(cache.obtener("algebra"))
+        self.assertIsNone(cache.obtener("analisis"))
+        self.assertEqual(len(cache), 2)
+
+    def test_02_contadores(self):
+        """Aciertos y fallos se reflejan en las estadísticas"""
+        cache = CacheConsultasLRU(capacidad=10)
+        cache.obtener("horarios de analisis")
+        cache.agregar("horarios de analisis", np.ones(2))
+        cache.obtener("horarios de analisis")
+
+        stats = cache.estadisticas()
+        self.assertEqual((stats['aciertos'], stats['fallos']), (1, 1))
+        self.assertAlmostEqual(stats['tasa_aciertos'], 0.5)
+
+    def test_03_capacidad_cero_deshabilita(self):
+        """Con capacidad 0 no se guarda nada"""
+        cache = CacheConsultasLRU(capacidad=0)
+        cache.agregar("algebra", np.ones(2))
+        self.assertEqual(len(cache), 0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
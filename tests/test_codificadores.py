@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Tests de los Backends de Codificación
+Exportación ONNX (fp32 e int8) y paridad con el SentenceTransformer original
+
+Se usa un BERT diminuto con pesos aleatorios guardado en un directorio
+temporal, para no depender de descargar el modelo real.
+
+Autor: Sistema RAG MVP
+Fecha: 2025-08-08
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import importlib.util
+import tempfile
+import unittest
+import numpy as np
+from codificadores import CodificadorOnnx, crear_codificador, exportar_onnx, verificar_paridad
+
+DEPENDENCIAS_ONNX = ('onnxruntime', 'onnx', 'torch', 'transformers', 'sentence_transformers')
+HAY_ONNX = all(importlib.util.find_spec(modulo) is not None for modulo in DEPENDENCIAS_ONNX)
+
+PALABRAS = "materia álgebra análisis algoritmos martes jueves clases de noche cuándo se dicta".split()
+
+TEXTOS = [
+    "Materia: Álgebra I",
+    "clases de noche los martes",
+    "¿Cuándo se dicta Algoritmos?",
+    "análisis los jueves",
+    "materia sin horario",
+]
+
+
+def crear_modelo_diminuto(directorio):
+    """BERT de 2 capas con vocabulario mínimo, cargable por SentenceTransformer (mean pooling)"""
+    from transformers import BertConfig, BertModel, BertTokenizerFast
+
+    vocabulario = ['[PAD]', '[UNK]', '[CLS]', '[SEP]', '[MASK]'] + PALABRAS + list('abcdefghijklmnopqrstuvwxyzáéíóú?¿:')
+    archivo_vocabulario = os.path.join(directorio, 'vocab.txt')
+    with open(archivo_vocabulario, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(vocabulario))
+
+    modelo = os.path.join(directorio, 'modelo')
+    BertTokenizerFast(archivo_vocabulario).save_pretrained(modelo)
+    config = BertConfig(vocab_size=len(vocabulario), hidden_size=32, num_hidden_layers=2, num_attention_heads=2,
+                        intermediate_size=64, max_position_embeddings=64)
+    BertModel(config).save_pretrained(modelo)
+    return modelo
+
+
+@unittest.skipUnless(HAY_ONNX, "requiere onnxruntime, onnx, torch y sentence_transformers")
+class TestCodificadoresOnnx(unittest.TestCase):
+    """Casos de prueba de la exportación ONNX"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.modelo = crear_modelo_diminuto(cls.tmp.name)
+        cls.directorio_onnx = os.path.join(cls.tmp.name, 'onnx')
+        exportar_onnx(cls.modelo, cls.directorio_onnx)
+        cls.referencia = crear_codificador('torch', cls.modelo)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_01_paridad_fp32(self):
+        """El ONNX fp32 reproduce los vectores de torch"""
+        codificador = crear_codificador('onnx', self.modelo, self.directorio_onnx)
+        reporte = verificar_paridad(self.referencia, codificador, TEXTOS)
+        self.assertGreater(reporte['coseno_minimo'], 0.9999)
+        self.assertEqual(reporte['coincidencia_vecino_mas_cercano'], 1.0)
+
+    def test_02_paridad_int8(self):
+        """La cuantización int8 deriva poco y conserva el vecino más cercano"""
+        codificador = crear_codificador('onnx-int8', self.modelo, self.directorio_onnx)
+        reporte = verificar_paridad(self.referencia, codificador, TEXTOS)
+        self.assertGreater(reporte['coseno_minimo'], 0.99)
+        self.assertEqual(reporte['coincidencia_vecino_mas_cercano'], 1.0)
+
+    def test_03_interfaz_de_sentence_transformer(self):
+        """encode() respeta los lotes y la dimensión, también con un texto suelto o ninguno"""
+        codificador = CodificadorOnnx(self.modelo, cuantizado=False, directorio_base=self.directorio_onnx)
+        self.assertEqual(codificador.get_sentence_embedding_dimension(), 32)
+        np.testing.assert_allclose(codificador.encode(TEXTOS, batch_size=2), codificador.encode(TEXTOS), atol=1e-5)
+        self.assertEqual(codificador.encode("Álgebra").shape, (1, 32))
+        self.assertEqual(codificador.encode([]).shape, (0, 32))
+
+    def test_04_sin_exportar(self):
+        """Sin exportación previa se indica cómo generarla"""
+        with self.assertRaises(FileNotFoundError):
+            CodificadorOnnx(self.modelo, directorio_base=os.path.join(self.tmp.name, 'vacio'))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Tests de la Fábrica de Índices FAISS
+Construcción de cada tipo, búsqueda filtrada, borrado y recall contra Flat
+
+Autor: Sistema RAG MVP
+Fecha: 2025-08-09
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import unittest
+import faiss
+import numpy as np
+from fabrica_indices import (TIPOS_INDICE, comprimir_indice, crear_indice, descripcion_factory, medir_indice,
+                             parametros_busqueda, parametros_por_defecto, quitar_ids, reporte_compresion)
+
+
+def vectores_normalizados(cantidad, dimension=32, semilla=0):
+    """Vectores aleatorios de norma 1"""
+    vectores = np.random.default_rng(semilla).normal(size=(cantidad, dimension)).astype(np.float32)
+    return vectores / np.linalg.norm(vectores, axis=1, keepdims=True)
+
+
+class TestFabricaIndices(unittest.TestCase):
+    """Casos de prueba de la fábrica de índices"""
+
+    def setUp(self):
+        self.vectores = vectores_normalizados(600)
+
+    def crear_con_ids(self, tipo):
+        indice = faiss.IndexIDMap2(crear_indice(tipo, self.vectores.shape[1], self.vectores))
+        indice.add_with_ids(self.vectores, np.arange(len(self.vectores), dtype=np.int64))
+        return indice
+
+    def test_01_parametros_por_defecto(self):
+        """Los parámetros se ajustan al tamaño del corpus y la dimensión"""
+        self.assertEqual(descripcion_factory('ivf-pq', parametros_por_defecto('ivf-pq', 384, 100000)), 'IVF1264,PQ48x8')
+        pequeno = parametros_por_defecto('ivf-flat', 384, 108)
+        self.assertEqual(pequeno['nlist'], 2)
+        with self.assertRaises(ValueError):
+            descripcion_factory('lsh', {})
+
+    def test_02_todos_los_tipos_encuentran_el_vector_exacto(self):
+        """Cada tipo devuelve el propio vector como vecino más cercano"""
+        for tipo in TIPOS_INDICE:
+            with self.subTest(tipo=tipo):
+                indice = self.crear_con_ids(tipo)
+                _, ids = indice.search(self.vectores[:20], 1, params=parametros_busqueda(indice))
+                self.assertGreaterEqual(np.mean(ids[:, 0] == np.arange(20)), 0.9)
+
+    def test_03_busqueda_filtrada(self):
+        """El selector de IDs funciona con parámetros propios de HNSW e IVF"""
+        permitidos = np.array([3, 7, 11], dtype=np.int64)
+        for tipo in ('hnsw', 'ivf-flat'):
+            with self.subTest(tipo=tipo):
+                indice = self.crear_con_ids(tipo)
+                parametros = parametros_busqueda(indice, faiss.IDSelectorBatch(permitidos))
+                _, ids = indice.search(self.vectores[7:8], 3, params=parametros)
+                self.assertEqual(ids[0, 0], 7)
+                self.assertTrue(set(ids[0]) <= set(permitidos) | {-1})
+
+    def test_04_borrado_en_hnsw(self):
+        """HNSW se reconstruye sin los IDs borrados"""
+        indice = quitar_ids(self.crear_con_ids('hnsw'), np.array([5, 6], dtype=np.int64))
+        self.assertEqual(indice.ntotal, len(self.vectores) - 2)
+        _, ids = indice.search(self.vectores[5:6], 5, params=parametros_busqueda(indice))
+        self.assertNotIn(5, ids[0])
+
+    def test_05_recall_contra_flat(self):
+        """Flat tiene recall perfecto y el reporte incluye latencia"""
+        indice = crear_indice('flat', self.vectores.shape[1], self.vectores)
+        indice.add(self.vectores)
+        reporte = medir_indice(indice, self.vectores, self.vectores[:50], k=10)
+        self.assertEqual(reporte['recall_at_10'], 1.0)
+        self.assertIn('latencia_ms_p95', reporte)
+
+    def test_06_compresion_conserva_ids(self):
+        """fp16 y sq8 conservan los IDs y los vecinos, con menos memoria"""
+        indice = faiss.IndexIDMap2(crear_indice('flat', self.vectores.shape[1], self.vectores))
+        ids = np.arange(len(self.vectores), dtype=np.int64) * 3
+        indice.add_with_ids(self.vectores, ids)
+
+        for compresion in ('fp16', 'sq8'):
+            with self.subTest(compresion=compresion):
+                comprimido = comprimir_indice(indice, 'flat', {}, compresion)
+                _, encontrados = comprimido.search(self.vectores[:10], 1)
+                np.testing.assert_array_equal(encontrados[:, 0], ids[:10])
+        with self.assertRaises(ValueError):
+            descripcion_factory('ivf-pq', parametros_por_defecto('ivf-pq', 32, 600), 'sq8')
+
+    def test_07_reporte_compresion(self):
+        """El reporte ordena la memoria por vector: fp32 > fp16 > sq8"""
+        reporte = reporte_compresion(self.vectores, self.vectores[:50], k=10)
+        bytes_por_vector = [fila['bytes_por_vector'] for fila in reporte]
+        self.assertEqual([fila['compresion'] for fila in reporte], ['fp32', 'fp16', 'sq8'])
+        self.assertEqual(bytes_por_vector, sorted(bytes_por_vector, reverse=True))
+        self.assertGreater(reporte[-1]['recall_at_10'], 0.9)
+
+    def test_08_borrado_y_upsert_conservan_ids(self):
+        """Tras borrar y reinsertar, cada vector sobreviviente sigue devolviendo su propio ID"""
+        borrados = np.arange(0, len(self.vectores), 2, dtype=np.int64)
+        reinsertados = borrados[:50]
+        sobrevivientes = np.setdiff1d(np.arange(len(self.vectores)), borrados[50:])
+        for tipo in TIPOS_INDICE:
+            with self.subTest(tipo=tipo):
+                indice = quitar_ids(self.crear_con_ids(tipo), borrados)
+                self.assertEqual(indice.ntotal, len(self.vectores) - len(borrados))
+                # Upsert: se vuelven a agregar algunos IDs borrados, con ID nuevo en el mismo vector
+                indice.add_with_ids(self.vectores[reinsertados], reinsertados + 1000)
+                ids_esperados = np.where(np.isin(sobrevivientes, reinsertados), sobrevivientes + 1000, sobrevivientes)
+
+                _, ids = indice.search(self.vectores[sobrevivientes], 1, params=parametros_busqueda(indice))
+                self.assertGreaterEqual(np.mean(ids[:, 0] == ids_esperados), 0.9)
+                self.assertFalse(np.isin(ids, borrados[50:]).any())
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Tests de Filtros de Metadatos para Búsqueda Vectorial
+Verifica que la búsqueda filtrada devuelva exactamente k resultados válidos
+
+Autor: Sistema RAG MVP
+Fecha: 2025-08-06
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import unittest
+import faiss
+import numpy as np
+from filtros_metadatos import IndiceMetadatos
+
+
+def crear_documento(faiss_id, departamento, dias, tipos, cuatrimestre='2'):
+    """Documento RAG mínimo con los metadatos filtrables"""
+    return {
+        'faiss_id': faiss_id,
+        'metadatos': {
+            'departamento_codigo': departamento,
+            'dias_semana': dias,
+            'tipos_actividad': tipos,
+            'tiene_horarios': bool(dias),
+            'periodo': {'cuatrimestre': cuatrimestre},
+        }
+    }
+
+
+class TestFiltrosMetadatos(unittest.TestCase):
+    """Casos de prueba de los bitsets de metadatos"""
+
+    def setUp(self):
+        self.documentos = []
+        for i in range(100):
+            departamento = ['DC', 'DM', 'IC'][i % 3]
+            dias = [] if i % 4 == 0 else [['lunes', 'miércoles', 'viernes'][i % 3]]
+            tipos = ['teorica'] if i % 2 else ['practica']
+            self.documentos.append(crear_documento(i, departamento, dias, tipos, '1' if i < 50 else '2'))
+
+        self.indice = IndiceMetadatos()
+        self.indice.construir(self.documentos)
+
+        rng = np.random.default_rng(0)
+        self.vectores = rng.standard_normal((100, 8)).astype(np.float32)
+        faiss.normalize_L2(self.vectores)
+        self.index = faiss.IndexIDMap2(faiss.IndexFlatIP(8))
+        self.index.add_with_ids(self.vectores, np.arange(100, dtype=np.int64))
+
+    def seleccionados(self, filtros):
+        return set(np.flatnonzero(self.indice.mascara(filtros)))
+
+    def test_01_and_entre_atributos_or_entre_valores(self):
+        """Combinación de filtros por atributo"""
+        esperados = {d['faiss_id'] for d in self.documentos
+                     if d['metadatos']['departamento_codigo'] in ('DC', 'IC')
+                     and d['metadatos']['tiene_horarios']}
+        self.assertEqual(self.seleccionados({'departamento': ['dc', 'IC'], 'tiene_horarios': True}), esperados)
+
+    def test_02_normalizacion_de_valores(self):
+        """Días sin acento y períodos como dict"""
+        por_dia = self.seleccionados({'dia': 'miercoles'})
+        self.assertTrue(por_dia)
+        self.assertTrue(all('miércoles' in self.documentos[i]['metadatos']['dias_semana'] for i in por_dia))
+        self.assertEqual(self.seleccionados({'periodo': {'cuatrimestre': '1'}}), set(range(50)))
+
+    def test_03_busqueda_filtrada_devuelve_k(self):
+        """Con un filtro selectivo se obtienen exactamente k resultados que lo cumplen"""
+        filtros = {'departamento': 'IC', 'tipo_actividad': 'teorica', 'periodo': '2C'}
+        validos = self.seleccionados(filtros)
+        self.assertGreaterEqual(len(validos), 5)
+
+        selector, cantidad = self.indice.selector(filtros)
+        self.assertEqual(cantidad, len(validos))
+        _, indices = self.index.search(self.vectores[:1], 5, params=faiss.SearchParameters(sel=selector))
+        self.assertEqual(len(indices[0]), 5)
+        self.assertTrue(set(indices[0]) <= validos)
+
+    def test_04_actualizacion_incremental(self):
+        """Quitar y agregar documentos actualiza los bitsets"""
+        self.indice.quitar_documentos([1])
+        self.assertNotIn(1, self.seleccionados({'departamento': 'DM'}))
+
+        self.indice.agregar_documento(crear_documento(500, 'DF', ['sábado'], ['laboratorio']))
+        self.assertEqual(self.seleccionados({'departamento': 'DF', 'dia': 'sabado'}), {500})
+
+    def test_05_atributo_invalido(self):
+        """Un atributo desconocido es un error"""
+        with self.assertRaises(ValueError):
+            self.indice.mascara({'aula': 'Pabellón 1'})
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Tests del Generador de Horarios sin Conflictos
+Máscaras semanales, preferencias estrictas y flexibles, y poda
+
+Autor: Sistema RAG MVP
+Fecha: 2025-08-14
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append(os.path.dirname(__file__))
+
+import unittest
+from itertools import product
+from motor_conflictos import MotorConflictos
+from generador_horarios import GeneradorHorarios
+from fixtures_horarios import crear_documento_horarios as documento
+
+
+class TestGeneradorHorarios(unittest.TestCase):
+    """Casos de prueba del generador de horarios"""
+
+    def setUp(self):
+        self.motor = MotorConflictos()
+        self.motor.construir([
+            documento(0, 'Álgebra I', [
+                ('martes', '08:00', '10:00', 'teorica', 'Teórica 1'),
+                ('martes', '14:00', '16:00', 'teorica', 'Teórica 2'),
+                ('martes', '08:00', '10:00', 'teorica', 'Teórica 3'),
+                ('jueves', '10:00', '13:00', 'practica', 'Práctica 1'),
+                ('viernes', '10:00', '13:00', 'practica', 'Práctica 2'),
+            ]),
+            documento(1, 'Análisis II', [('martes', '09:00', '11:00', 'teorica', 'Teórica 1'),
+                                         ('jueves', '14:00', '16:00', 'teorica', 'Teórica 2'),
+                                         ('jueves', '16:00', '18:00', 'practica', '')]),
+            documento(2, 'Física I', [('jueves', '11:00', '12:30', 'teorica', '')]),
+        ])
+        self.generador = GeneradorHorarios(self.motor)
+
+    def grupos(self, *ids):
+        return {self.motor.nombres[i]: [i] for i in ids}
+
+    def test_01_mascaras(self):
+        """Una franja por cada 5 minutos; las opciones idénticas se colapsan"""
+        bloques = self.motor.bloques_opcion(2, 0)
+        self.assertEqual(bin(self.generador.mascara_bloques(bloques)).count('1'), 18)
+        opciones = self.generador._opciones_materia([0], 0, True)
+        self.assertEqual(len(opciones), 4)
+        self.assertEqual(sum(len(o['equivalentes']) for o in opciones), 2)
+
+    def test_02_sin_superposiciones(self):
+        """Cada solución elige una opción por materia y ninguna se superpone"""
+        reporte = self.generador.generar(self.grupos(0, 1, 2), max_soluciones=10)
+        self.assertTrue(reporte['completo'])
+        self.assertGreater(len(reporte['soluciones']), 0)
+        for solucion in reporte['soluciones']:
+            ocupados = []
+            for asignacion in solucion['asignacion']:
+                for horario in asignacion['horarios']:
+                    ocupados.append((horario['dia'], horario['desde'], horario['hasta']))
+            for (dia_a, desde_a, hasta_a), (dia_b, desde_b, hasta_b) in product(ocupados, ocupados):
+                if (dia_a, desde_a, hasta_a) != (dia_b, desde_b, hasta_b) and dia_a == dia_b:
+                    self.assertTrue(hasta_a <= desde_b or hasta_b <= desde_a)
+            # Física (jueves 11:00) obliga a cursar Álgebra con la Práctica 2
+            algebra = next(a for a in solucion['asignacion'] if a['faiss_id'] == 0)
+            self.assertEqual(algebra['comisiones']['practica'], 'Práctica 2')
+
+    def test_03_mejor_solucion_primero(self):
+        """Se prefieren menos días con clase y luego menos huecos"""
+        reporte = self.generador.generar(self.grupos(0, 1), max_soluciones=3)
+        costos = [tuple(s['costo'].values()) for s in reporte['soluciones']]
+        self.assertEqual(costos, sorted(costos))
+        self.assertEqual(reporte['soluciones'][0]['costo']['dias_con_clase'], 2)
+
+    def test_04_preferencias_estrictas(self):
+        """Sin clases antes de las 10 ni los viernes"""
+        preferencias = {'no_antes_de': '10:00', 'dias_libres': ['viernes']}
+        reporte = self.generador.generar(self.grupos(0, 1), preferencias)
+        asignaciones = [a for s in reporte['soluciones'] for a in s['asignacion']]
+        self.assertTrue(asignaciones)
+        for asignacion in asignaciones:
+            for horario in asignacion['horarios']:
+                self.assertNotEqual(horario['dia'], 'viernes')
+                self.assertGreaterEqual(horario['desde'], '10:00')
+
+        # Álgebra solo puede cursar la Práctica 1 (jueves), que se superpone con Física
+        reporte = self.generador.generar(self.grupos(0, 2), preferencias)
+        self.assertEqual((reporte['soluciones'], reporte['sin_opciones']), ([], []))
+
+        reporte = self.generador.generar(self.grupos(0, 2), {'no_antes_de': '15:00'})
+        self.assertEqual(reporte['sin_opciones'], ['Álgebra I', 'Física I'])
+
+    def test_05_preferencias_flexibles(self):
+        """Con preferencias flexibles se informa cuánto se aparta cada solución"""
+        preferencias = {'no_antes_de': '10:00', 'dias_libres': ['viernes'], 'estrictas': False}
+        reporte = self.generador.generar(self.grupos(0, 2), preferencias)
+        self.assertEqual(reporte['soluciones'][0]['costo']['minutos_fuera_de_preferencia'], 180)
+
+    def test_06_limite_de_nodos(self):
+        """La búsqueda se corta al alcanzar el límite y lo informa"""
+        reporte = self.generador.generar(self.grupos(0, 1, 2), limite_nodos=1)
+        self.assertFalse(reporte['completo'])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
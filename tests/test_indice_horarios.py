@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Tests del Índice Estructurado de Horarios
+Superposición real de intervalos por día, sin modelo de embeddings
+
+Autor: Sistema RAG MVP
+Fecha: 2025-08-06
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import unittest
+from indice_horarios import IndiceHorarios, hora_a_minutos, normalizar_dia, unir_ventanas
+
+
+def crear_documento(faiss_id, horarios):
+    """Documento RAG mínimo con los horarios indicados"""
+    return {
+        'faiss_id': faiss_id,
+        'materia_original': {
+            'horarios': [
+                {'dia': dia, 'hora_inicio': inicio, 'hora_fin': fin, 'tipo_actividad': 'teorica'}
+                for dia, inicio, fin in horarios
+            ]
+        }
+    }
+
+
+class TestIndiceHorarios(unittest.TestCase):
+    """Casos de prueba del índice día × intervalo"""
+
+    def setUp(self):
+        self.indice = IndiceHorarios()
+        self.indice.construir([
+            crear_documento(0, [('martes', '09:00', '13:00')]),
+            crear_documento(1, [('martes', '14:00', '17:00'), ('jueves', '14:00', '17:00')]),
+            crear_documento(2, [('martes', '17:00', '22:00')]),
+            crear_documento(3, [('miércoles', '19:30', '22:00')]),
+            crear_documento(4, [('Lunes', '8', '10')]),
+        ])
+
+    def ids(self, coincidencias):
+        return sorted({intervalo[2] for _, intervalo in coincidencias})
+
+    def test_01_conversion_horas_y_dias(self):
+        """Formatos de hora y variantes de días"""
+        self.assertEqual(hora_a_minutos('14:30'), 870)
+        self.assertEqual(hora_a_minutos('9'), 540)
+        self.assertEqual(hora_a_minutos('18hs'), 1080)
+        self.assertIsNone(hora_a_minutos(''))
+        self.assertEqual(normalizar_dia('Miercoles'), 'miércoles')
+        self.assertEqual(normalizar_dia('sab'), 'sábado')
+        self.assertIsNone(normalizar_dia('feriado'))
+
+    def test_02_superposicion_real(self):
+        """Martes 14:00-16:00 solo se superpone con la clase de 14 a 17"""
+        coincidencias = self.indice.buscar_superpuestos('martes', 14 * 60, 16 * 60)
+        self.assertEqual(self.ids(coincidencias), [1])
+
+    def test_03_bordes_no_se_superponen(self):
+        """Intervalos que solo se tocan en el borde no se superponen"""
+        coincidencias = self.indice.buscar_superpuestos('martes', 13 * 60, 14 * 60)
+        self.assertEqual(self.ids(coincidencias), [])
+
+    def test_04_ventana_que_contiene_clase_larga(self):
+        """Una clase larga que empieza antes de la ventana también cuenta"""
+        coincidencias = self.indice.buscar_superpuestos('martes', 20 * 60, 21 * 60)
+        self.assertEqual(self.ids(coincidencias), [2])
+
+    def test_05_inicio_desde_hora(self):
+        """Qué empieza a partir de las 18:00 en cualquier día"""
+        coincidencias = self.indice.buscar_por_inicio(desde=18 * 60)
+        self.assertEqual(self.ids(coincidencias), [3])
+
+    def test_06_fin_hasta_hora(self):
+        """Qué termina antes de las 13:00"""
+        coincidencias = self.indice.buscar_por_fin(hasta=13 * 60)
+        self.assertEqual(self.ids(coincidencias), [0, 4])
+
+    def test_07_actualizacion_incremental(self):
+        """Agregar y quitar documentos mantiene el índice consistente"""
+        self.indice.quitar_documentos([1])
+        self.assertEqual(self.ids(self.indice.buscar_superpuestos('jueves')), [])
+
+        self.indice.agregar_documento(crear_documento(9, [('jueves', '10:00', '12:00')]))
+        self.assertEqual(self.ids(self.indice.buscar_superpuestos('jueves', 11 * 60, 11 * 60 + 30)), [9])
+
+
+    def test_08_intervalos_contenidos(self):
+        """Solo las clases que empiezan y terminan dentro de la ventana"""
+        self.assertEqual(self.ids(self.indice.buscar_contenidos('martes', 13 * 60, 22 * 60)), [1, 2])
+        self.assertEqual(self.ids(self.indice.buscar_contenidos('martes', 14 * 60, 21 * 60)), [1])
+        self.assertEqual(self.ids(self.indice.buscar_contenidos('jueves', 0, 12 * 60)), [])
+
+    def test_09_unir_ventanas(self):
+        """Las ventanas del mismo día que se tocan o superponen se unen"""
+        self.assertEqual(unir_ventanas([('Martes', 900, 1000), ('martes', 840, 900), ('jueves', 600, 700),
+                                        ('martes', 1100, 1200)]),
+                         [('martes', 840, 1000), ('martes', 1100, 1200), ('jueves', 600, 700)])
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
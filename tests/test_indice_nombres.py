@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Tests del Índice de Nombres de Materias
+Coincidencias exactas, por prefijo, alias y actualización incremental
+
+Autor: Sistema RAG MVP
+Fecha: 2025-08-13
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import unittest
+from indice_nombres import IndiceNombres, variantes_numericas
+
+
+def documento(faiss_id, nombre, normalizada=''):
+    return {'faiss_id': faiss_id, 'metadatos': {'materia_nombre': nombre, 'materia_normalizada': normalizada}}
+
+
+class TestIndiceNombres(unittest.TestCase):
+    """Casos de prueba del índice de nombres"""
+
+    def setUp(self):
+        self.indice = IndiceNombres()
+        self.indice.construir([
+            documento(0, 'Algoritmos y Estructuras de Datos I'),
+            documento(1, 'Algoritmos y Estructuras de Datos II'),
+            documento(2, 'Álgebra I'),
+            documento(3, 'Álgebra Lineal', 'ALGEBRA LINEAL COMPUTACIONAL'),
+            documento(4, 'ANÁLISIS I - ANÁLISIS MATEMÁTICO I'),
+        ])
+
+    def test_01_exacto_sin_acentos(self):
+        """El nombre se encuentra sin acentos ni mayúsculas"""
+        self.assertEqual(self.indice.buscar_exacto('ÁLGEBRA I'), {2})
+        self.assertEqual(self.indice.buscar_exacto('algebra lineal computacional'), {3})
+        self.assertEqual(self.indice.buscar_exacto('análisis matemático i'), {4})
+        self.assertEqual(self.indice.buscar_exacto('algebra'), set())
+
+    def test_02_alias_numericos_y_siglas(self):
+        """Números romanos y arábigos son intercambiables; las siglas solo coinciden exactas"""
+        self.assertEqual(variantes_numericas('analisis i'), ['analisis 1'])
+        self.assertEqual(variantes_numericas('algebra 2'), ['algebra ii'])
+        self.assertEqual(self.indice.buscar_exacto('Análisis Matemático 1'), {4})
+        self.assertEqual(self.indice.buscar_exacto('aed'), {0, 1})
+        self.assertEqual(self.indice.buscar_prefijo('aed'), set())
+
+    def test_03_prefijo(self):
+        """Prefijos de palabra parcial; los prefijos demasiado cortos no buscan"""
+        self.assertEqual(self.indice.buscar_prefijo('algoritmos y estruc'), {0, 1})
+        self.assertEqual(self.indice.buscar_prefijo('álgebra'), {2, 3})
+        self.assertEqual(self.indice.buscar_prefijo('alg'), set())
+        self.assertEqual(self.indice.buscar('Álgebra I'), ({2}, 'exacto'))
+        self.assertEqual(self.indice.buscar('algebra lin'), ({3}, 'prefijo'))
+        self.assertEqual(self.indice.buscar('probabilidad'), (set(), None))
+
+    def test_04_actualizacion(self):
+        """Agregar y quitar documentos actualiza exactos y prefijos"""
+        self.indice.buscar_prefijo('algebra')
+        self.indice.agregar_documento(documento(5, 'Álgebra III'))
+        self.assertEqual(self.indice.buscar_prefijo('algebra'), {2, 3, 5})
+
+        self.indice.quitar_documentos([2, 5])
+        self.assertEqual(self.indice.buscar_prefijo('algebra'), {3})
+        self.assertEqual(self.indice.buscar_exacto('algebra i'), set())
+
+    def test_05_reconocer_en_frase(self):
+        """La coincidencia más larga gana y las palabras ignoradas no son nombres"""
+        restantes, nombres, ids = self.indice.reconocer('horarios de algebra lineal los martes'.split(), {'de', 'los'})
+        self.assertEqual(nombres, ['algebra lineal'])
+        self.assertEqual(ids, {3})
+        self.assertEqual(restantes, ['horarios', 'de', 'los', 'martes'])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
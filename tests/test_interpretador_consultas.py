@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Tests del Interpretador de Consultas de Horarios
+Extracción de día, rango horario, franja, departamento, tipo y nombres
+
+Autor: Sistema RAG MVP
+Fecha: 2025-08-12
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import unittest
+from indice_nombres import alias_nombre
+from interpretador_consultas import InterpretadorConsultas
+
+
+def documento(faiss_id, nombre, departamento, nombre_departamento):
+    return {'faiss_id': faiss_id, 'metadatos': {'materia_nombre': nombre, 'departamento_codigo': departamento,
+                                                'departamento_nombre': nombre_departamento}}
+
+
+class TestInterpretadorConsultas(unittest.TestCase):
+    """Casos de prueba del interpretador"""
+
+    def setUp(self):
+        self.interpretador = InterpretadorConsultas()
+        self.interpretador.construir([
+            documento(0, 'ANÁLISIS I - ANÁLISIS MATEMÁTICO I - MATEMÁTICA 1', 'DM', 'Departamento de Matemática'),
+            documento(1, 'Álgebra I', 'DM', 'Departamento de Matemática'),
+            documento(2, 'Estadística', 'IC', 'Instituto de Cálculo'),
+            documento(3, 'Estadística', 'IC', 'Instituto de Cálculo'),
+        ])
+
+    def test_01_dia_y_franja(self):
+        """Días completos y franja definen la ventana horaria"""
+        intencion = self.interpretador.interpretar('¿Qué materias hay los miércoles por la tarde?')
+        self.assertEqual(intencion['dias'], ['miércoles'])
+        self.assertEqual((intencion['desde'], intencion['hasta']), (13 * 60, 18 * 60))
+        self.assertEqual(intencion['criterio_horario'], 'superpone')
+        self.assertEqual(intencion['texto_libre'], '')
+        self.assertTrue(intencion['estructurada'])
+
+    def test_02_expresiones_horarias(self):
+        """Rangos, horas de inicio y de fin"""
+        casos = {
+            'clases entre las 14 y las 18 hs': ('superpone', 840, 1080),
+            'de 9:30 a 12': ('superpone', 570, 720),
+            'materias que empiezan a las 14:00': ('empieza', 840, 840),
+            'después de las 18': ('empieza', 1080, None),
+            'antes de las 12': ('termina', None, 720),
+            'terminan a las 22': ('termina', 1320, 1320),
+        }
+        for consulta, esperado in casos.items():
+            intencion = self.interpretador.interpretar(consulta)
+            self.assertEqual((intencion['criterio_horario'], intencion['desde'], intencion['hasta']), esperado, consulta)
+
+    def test_03_rango_explicito_tiene_prioridad_sobre_franja(self):
+        """Con rango explícito la franja no cambia la ventana"""
+        intencion = self.interpretador.interpretar('a la noche de 19 a 21')
+        self.assertEqual(intencion['franja'], 'noche')
+        self.assertEqual((intencion['desde'], intencion['hasta']), (19 * 60, 21 * 60))
+
+    def test_04_departamentos_y_tipos(self):
+        """Códigos y nombres de departamento, tipos de actividad en plural"""
+        intencion = self.interpretador.interpretar('prácticas del Instituto de Cálculo y del DM')
+        self.assertEqual(intencion['departamentos'], ['IC', 'DM'])
+        self.assertEqual(intencion['tipos_actividad'], ['practica'])
+
+    def test_05_nombres_de_materias(self):
+        """Partes de nombres compuestos, coincidencia más larga y texto libre restante"""
+        intencion = self.interpretador.interpretar('¿Cuándo se dicta Análisis Matemático I?')
+        self.assertEqual(intencion['materias'], [0])
+
+        intencion = self.interpretador.interpretar('estadística con R los lunes')
+        self.assertEqual(intencion['materias'], [2, 3])
+        self.assertEqual(intencion['texto_libre'], 'r')
+
+        intencion = self.interpretador.interpretar('probabilidad y procesos')
+        self.assertFalse(intencion['estructurada'])
+        self.assertEqual(intencion['texto_libre'], 'probabilidad procesos')
+
+    def test_06_quitar_documentos(self):
+        """Las materias quitadas dejan de reconocerse"""
+        self.interpretador.quitar_documentos([1])
+        self.assertEqual(self.interpretador.interpretar('álgebra i')['materias'], [])
+
+    def test_07_alias(self):
+        """Partes del nombre y variantes sin paréntesis"""
+        self.assertEqual(alias_nombre('Estadística (Lic. Matemática) - Probabilidad'),
+                         ['estadistica lic matematica probabilidad', 'estadistica probabilidad',
+                          'estadistica lic matematica', 'estadistica', 'probabilidad'])
+
+    def test_08_nombre_por_prefijo(self):
+        """Sin nombre exacto, el texto restante se prueba como prefijo"""
+        intencion = self.interpretador.interpretar('horarios de Estadística')
+        self.assertEqual((intencion['materias'], intencion['coincidencia_nombre']), ([2, 3], 'exacto'))
+
+        intencion = self.interpretador.interpretar('clases de álgeb los lunes')
+        self.assertEqual((intencion['materias'], intencion['coincidencia_nombre']), ([1], 'prefijo'))
+        self.assertEqual(intencion['dias'], ['lunes'])
+        self.assertEqual(intencion['texto_libre'], '')
+
+
+    def test_09_ventanas_libres(self):
+        """Días con rango, franja o sin hora; la hora sin día vale de lunes a sábado"""
+        self.assertEqual(self.interpretador.interpretar_ventanas('martes 14-18 y jueves a la mañana'),
+                         [('martes', 840, 1080), ('jueves', 420, 780)])
+        self.assertEqual(self.interpretador.interpretar_ventanas('lunes y miércoles de 9 a 12, viernes'),
+                         [('lunes', 540, 720), ('miércoles', 540, 720), ('viernes', 0, 1440)])
+        self.assertEqual(len(self.interpretador.interpretar_ventanas('después de las 18')), 6)
+        self.assertEqual(self.interpretador.interpretar_ventanas('hola'), [])
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
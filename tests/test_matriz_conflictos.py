@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Tests de la Matriz de Conflictos entre Comisiones
+Cálculo vectorizado, consultas O(1)/O(fila) y persistencia con memory-map
+
+Autor: Sistema RAG MVP
+Fecha: 2025-08-14
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append(os.path.dirname(__file__))
+
+import unittest
+import random
+import tempfile
+import numpy as np
+from unittest.mock import patch
+from motor_conflictos import MotorConflictos
+from matriz_conflictos import MatrizConflictos
+from fixtures_horarios import crear_documento_horarios as documento
+
+
+class TestMatrizConflictos(unittest.TestCase):
+    """Casos de prueba de la matriz de conflictos"""
+
+    def setUp(self):
+        self.motor = MotorConflictos()
+        self.motor.construir([
+            documento(0, 'M0', [('martes', '09:00', '11:00', 'teorica', 'Teórica 1'),
+                                ('martes', '14:00', '16:00', 'teorica', 'Teórica 2')]),
+            documento(1, 'M1', [('martes', '10:55', '12:00', 'teorica', '')]),
+            documento(2, 'M2', [('martes', '11:00', '13:00', 'teorica', ''), ('jueves', '09:00', '10:00', 'teorica', '')]),
+            documento(3, 'M3', []),
+        ])
+        self.matriz = MatrizConflictos()
+        self.matriz.construir(self.motor)
+
+    def test_01_filas_por_comision(self):
+        """Una fila por comisión de cada documento con horarios"""
+        self.assertEqual(self.matriz.filas, [(0, 'Teórica 1'), (0, 'Teórica 2'), (1, ''), (2, '')])
+        self.assertEqual(self.matriz.documentos(), {0, 1, 2})
+
+    def test_02_consultas(self):
+        """Superposición de 5 minutos detectada; bloques contiguos no chocan"""
+        self.assertTrue(self.matriz.chocan(0, 2))
+        self.assertFalse(self.matriz.chocan(0, 3))
+        self.assertFalse(self.matriz.chocan(2, 2))
+        self.assertEqual(list(self.matriz.conflictos_fila(2)), [0, 3])
+        self.assertEqual(self.matriz.documentos_chocan(0, 1), [('Teórica 1', '')])
+        self.assertEqual(self.matriz.conflictos_documento(1), {0: [('', 'Teórica 1')], 2: [('', '')]})
+
+    def test_03_equivale_a_comparar_bloques(self):
+        """La matriz coincide con la comparación directa de todos los bloques"""
+        aleatorio = random.Random(3)
+        documentos = []
+        for faiss_id in range(60):
+            horarios = []
+            for comision in ('A', 'B'):
+                inicio = aleatorio.randint(8 * 60, 20 * 60) // 5 * 5
+                fin = inicio + aleatorio.randint(6, 36) * 5
+                horarios.append((aleatorio.choice(['lunes', 'martes']), f'{inicio // 60:02d}:{inicio % 60:02d}',
+                                 f'{fin // 60:02d}:{fin % 60:02d}', 'teorica', comision))
+            documentos.append(documento(faiss_id, f'M{faiss_id}', horarios))
+        self.motor.construir(documentos)
+        self.matriz.construir(self.motor)
+
+        bloques = {(faiss_id, b[3]): (b[0], b[1]) for faiss_id in self.motor.bloques for b in self.motor.bloques[faiss_id]}
+        for a, fila_a in enumerate(self.matriz.filas):
+            for b, fila_b in enumerate(self.matriz.filas):
+                inicio_a, fin_a = bloques[fila_a]
+                inicio_b, fin_b = bloques[fila_b]
+                esperado = a != b and inicio_a < fin_b and inicio_b < fin_a
+                self.assertEqual(self.matriz.chocan(a, b), esperado)
+
+    def test_04_guardar_y_cargar_con_memory_map(self):
+        """La matriz guardada se abre con memory-map y responde igual"""
+        with tempfile.TemporaryDirectory() as directorio:
+            self.assertFalse(MatrizConflictos().cargar(directorio))
+            self.matriz.guardar(directorio)
+            cargada = MatrizConflictos()
+            self.assertTrue(cargada.cargar(directorio))
+            self.assertIsInstance(cargada.bits, np.memmap)
+            self.assertEqual(cargada.filas, self.matriz.filas)
+            self.assertEqual(cargada.conflictos_documento(1), self.matriz.conflictos_documento(1))
+            del cargada
+
+    def test_05_bloques_de_filas_empaquetados(self):
+        """Calcular por bloques pequeños da la misma matriz, ya empaquetada en uint8"""
+        aleatorio = random.Random(5)
+        documentos = []
+        for faiss_id in range(27):
+            inicio = aleatorio.randint(8, 20)
+            horarios = [('lunes', f'{inicio:02d}:00', f'{inicio + 2:02d}:00', 'teorica', '')]
+            documentos.append(documento(faiss_id, f'M{faiss_id}', horarios))
+        self.motor.construir(documentos)
+        self.matriz.construir(self.motor)
+
+        with patch('matriz_conflictos.FILAS_POR_BLOQUE', 5):
+            por_bloques = MatrizConflictos()
+            por_bloques.construir(self.motor)
+        self.assertEqual((por_bloques.bits.dtype, por_bloques.bits.shape), (np.uint8, (27, 4)))
+        np.testing.assert_array_equal(por_bloques.bits, self.matriz.bits)
+        self.assertFalse(any(por_bloques.chocan(i, i) for i in range(27)))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
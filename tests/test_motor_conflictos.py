@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Tests del Motor de Conflictos de Horarios
+Opciones de cursada por comisión y superposiciones en minutos
+
+Autor: Sistema RAG MVP
+Fecha: 2025-08-13
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append(os.path.dirname(__file__))
+
+import unittest
+import random
+from motor_conflictos import MotorConflictos
+from fixtures_horarios import crear_documento_horarios as documento
+
+
+class TestMotorConflictos(unittest.TestCase):
+    """Casos de prueba del motor de conflictos"""
+
+    def setUp(self):
+        self.motor = MotorConflictos()
+        self.motor.construir([
+            documento(0, 'Álgebra I', [
+                ('martes', '09:00', '11:00', 'teorica', 'Teórica 1'),
+                ('martes', '14:00', '16:00', 'teorica', 'Teórica 2'),
+                ('jueves', '11:00', '14:00', 'practica', 'Práctica 1'),
+                ('jueves', '16:00', '19:00', 'practica', 'Práctica 2'),
+            ]),
+            documento(1, 'Análisis II', [('martes', '10:30', '12:00', 'teorica', ''),
+                                         ('jueves', '13:00', '15:00', 'practica', '')]),
+            documento(2, 'Física I', [('lunes', '08:00', '10:00', 'teorica', '')]),
+            documento(3, 'Sin horario', []),
+        ])
+
+    def test_01_opciones_por_comision(self):
+        """Una comisión por tipo de actividad; los bloques sin comisión son comunes"""
+        self.assertEqual(len(self.motor.opciones[0]), 4)
+        self.assertEqual(self.motor.opciones[1], [()])
+        opcion = self.motor.opciones[0].index((('practica', 'Práctica 2'), ('teorica', 'Teórica 1')))
+        self.assertEqual([b[3] for b in self.motor.bloques_opcion(0, opcion)], ['Teórica 1', 'Práctica 2'])
+
+    def test_02_superposicion_en_minutos(self):
+        """Se informan los rangos superpuestos y las combinaciones que los evitan"""
+        reporte = self.motor.detectar_conflictos({'algebra': [0], 'analisis': [1], 'fisica': [2], 'nada': [3]})
+        rangos = sorted((c['dia'], c['desde'], c['hasta'], c['minutos']) for c in reporte['conflictos'])
+        self.assertEqual(rangos, [('jueves', '13:00', '14:00', 60), ('martes', '10:30', '11:00', 30)])
+
+        par = next(p for p in reporte['pares'] if {p['materia_a'], p['materia_b']} == {'algebra', 'analisis'})
+        self.assertEqual((par['combinaciones'], par['combinaciones_compatibles']), (4, 1))
+        self.assertTrue(reporte['compatible'])
+        self.assertEqual(reporte['sin_horarios'], ['nada'])
+
+    def test_03_minutos_minimos_sin_combinacion_compatible(self):
+        """Si ninguna combinación es compatible se informa la de menor superposición"""
+        self.motor.agregar_documento(documento(4, 'Química', [('martes', '08:00', '17:00', 'teorica', '')]))
+        reporte = self.motor.detectar_conflictos({'algebra': [0], 'quimica': [4]})
+        self.assertFalse(reporte['compatible'])
+        self.assertEqual(reporte['pares'][0]['minutos_superpuestos'], 120)
+
+    def test_04_mismo_grupo_son_alternativas(self):
+        """Los documentos de un mismo grupo no se comparan entre sí"""
+        reporte = self.motor.detectar_conflictos({'algebra o analisis': [0, 1]})
+        self.assertEqual(reporte['conflictos'], [])
+
+    def test_05_barrido_equivale_a_comparar_todos(self):
+        """El barrido encuentra exactamente los pares superpuestos de la comparación O(N²)"""
+        aleatorio = random.Random(7)
+        dias = ['lunes', 'martes', 'miércoles']
+        documentos = []
+        for faiss_id in range(40):
+            horarios = []
+            for _ in range(aleatorio.randint(1, 3)):
+                inicio = aleatorio.randint(8, 20)
+                horarios.append((aleatorio.choice(dias), f'{inicio:02d}:00', f'{inicio + aleatorio.randint(1, 3):02d}:30',
+                                 'teorica', ''))
+            documentos.append(documento(faiss_id, f'M{faiss_id}', horarios))
+        self.motor.construir(documentos)
+
+        reporte = self.motor.detectar_conflictos({str(i): [i] for i in range(40)})
+        encontrados = sorted(tuple(sorted((c['faiss_id_a'], c['faiss_id_b']))) + (c['minutos'],)
+                             for c in reporte['conflictos'])
+        esperados = []
+        for a in range(40):
+            for b in range(a + 1, 40):
+                for inicio_a, fin_a, *_ in self.motor.bloques[a]:
+                    for inicio_b, fin_b, *_ in self.motor.bloques[b]:
+                        minutos = min(fin_a, fin_b) - max(inicio_a, inicio_b)
+                        if minutos > 0:
+                            esperados.append((a, b, minutos))
+        self.assertEqual(encontrados, sorted(esperados))
+
+    def test_06_quitar_documentos(self):
+        """Los documentos quitados dejan de tener bloques e id de materia"""
+        self.motor.quitar_documentos([0])
+        self.assertNotIn(0, self.motor.bloques)
+        self.assertNotIn('materia_0', self.motor.por_id_materia)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
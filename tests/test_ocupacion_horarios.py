@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Tests de la Ocupación Semanal de Horarios
+Tensores por dimensión, horas pico, conteos por día y actualización incremental
+
+Autor: Sistema RAG MVP
+Fecha: 2025-08-15
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import unittest
+import numpy as np
+from ocupacion_horarios import OcupacionHorarios, dibujar_mapa_calor
+from indice_horarios import DIAS_SEMANA, hora_a_minutos
+
+
+def crear_documento(faiss_id, departamento, horarios, tiene_horarios=True):
+    """Documento RAG mínimo: horarios como (día, inicio, fin, tipo, aula)"""
+    return {
+        'faiss_id': faiss_id,
+        'metadatos': {'departamento_codigo': departamento, 'departamento_nombre': f'Departamento {departamento}',
+                      'tiene_horarios': tiene_horarios},
+        'materia_original': {
+            'horarios': [
+                {'dia': dia, 'hora_inicio': inicio, 'hora_fin': fin, 'tipo_actividad': tipo, 'aula': aula}
+                for dia, inicio, fin, tipo, aula in horarios
+            ]
+        }
+    }
+
+
+DOCUMENTOS = [
+    crear_documento(0, 'DC', [('lunes', '09:00', '13:00', 'teorica', 'Aula 1'),
+                              ('miércoles', '09:00', '13:00', 'practica', 'Lab 2')]),
+    crear_documento(1, 'DM', [('Lunes', '11:00', '14:00', 'Teorica', 'Aula 1'),
+                              ('sábado', '10:00', '12:30', 'practica', None)]),
+    crear_documento(2, 'DM', [('domingo', '18:00', '20:00', 'laboratorio', '')]),
+    crear_documento(3, 'IC', [], tiene_horarios=False),
+]
+
+
+class TestOcupacionHorarios(unittest.TestCase):
+    """Casos de prueba de la agregación vectorizada"""
+
+    def setUp(self):
+        self.ocupacion = OcupacionHorarios(granularidad=30)
+        self.ocupacion.construir(DOCUMENTOS)
+
+    def franja(self, hora):
+        return hora_a_minutos(hora) // 30
+
+    def test_01_coincide_con_conteo_directo(self):
+        """Cada franja cuenta las clases en curso, también sábado y domingo"""
+        esperado = np.zeros((len(DIAS_SEMANA), 48), dtype=np.int32)
+        for documento in DOCUMENTOS:
+            for horario in documento['materia_original']['horarios']:
+                dia = DIAS_SEMANA.index(horario['dia'].lower())
+                esperado[dia, self.franja(horario['hora_inicio']):-(-hora_a_minutos(horario['hora_fin']) // 30)] += 1
+        np.testing.assert_array_equal(self.ocupacion.mapa_calor(), esperado)
+        self.assertEqual(self.ocupacion.mapa_calor('aula', 'aula 1')[0, self.franja('11:30')], 2)
+        self.assertEqual(self.ocupacion.mapa_calor('tipo_actividad', 'teorica')[0, self.franja('12:00')], 2)
+        self.assertEqual(self.ocupacion.mapa_calor('departamento', 'XX').sum(), 0)
+
+    def test_02_horas_pico(self):
+        """Las franjas contiguas con igual cantidad forman un solo tramo"""
+        picos = self.ocupacion.horas_pico(2)
+        self.assertEqual(picos[0], {'dia': 'lunes', 'desde': '11:00', 'hasta': '13:00', 'clases': 2})
+        self.assertEqual((picos[1]['dia'], picos[1]['desde'], picos[1]['hasta']), ('lunes', '09:00', '11:00'))
+        self.assertEqual(self.ocupacion.horas_pico(5, 'departamento', 'IC'), [])
+
+    def test_03_conteos_por_dia_y_departamento(self):
+        """Materias por día y resumen por departamento sin recorrer los documentos"""
+        self.assertEqual(self.ocupacion.materias_por_dia(),
+                         {'lunes': 2, 'miércoles': 1, 'sábado': 1, 'domingo': 1})
+        resumen = self.ocupacion.resumen_departamentos()
+        self.assertEqual(list(resumen), ['DC', 'DM', 'IC'])
+        self.assertEqual((resumen['DM']['total'], resumen['DM']['con_horarios'], resumen['DM']['horas_semanales']),
+                         (2, 2, 7.5))
+        self.assertEqual((resumen['IC']['total'], resumen['IC']['con_horarios']), (1, 0))
+
+    def test_04_actualizacion_incremental(self):
+        """Agregar y quitar documentos equivale a reconstruir"""
+        nuevo = crear_documento(4, 'DC', [('martes', '14:00', '17:00', 'teorica', 'Aula 9')])
+        self.ocupacion.quitar_documentos([1, 3])
+        self.ocupacion.agregar_documento(nuevo)
+
+        reconstruida = OcupacionHorarios(granularidad=30)
+        reconstruida.construir([DOCUMENTOS[0], DOCUMENTOS[2], nuevo])
+        np.testing.assert_array_equal(self.ocupacion.mapa_calor(), reconstruida.mapa_calor())
+        self.assertEqual(self.ocupacion.materias_por_dia(), reconstruida.materias_por_dia())
+        self.assertEqual(self.ocupacion.resumen_departamentos(), reconstruida.resumen_departamentos())
+        self.assertEqual(self.ocupacion.horas_semanales('aula'), reconstruida.horas_semanales('aula'))
+        self.assertEqual(self.ocupacion.buscar_clave('aula 9'), ('aula', 'AULA 9'))
+
+    def test_05_mapa_en_texto(self):
+        """Un renglón por día con clases y una columna por hora"""
+        texto = dibujar_mapa_calor(self.ocupacion.mapa_calor(), 30)
+        renglones = texto.splitlines()
+        self.assertEqual([r.split()[0] for r in renglones[1:-1]], ['lunes', 'miércoles', 'sábado', 'domingo'])
+        self.assertIn('█', renglones[1])
+        self.assertIn('máximo: 2', renglones[-1])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Tests del Servidor Residente de Consultas de Horarios
+Protocolo por socket Unix y uso transparente desde el CLI
+
+Autor: Sistema RAG MVP
+Fecha: 2025-08-10
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append(os.path.dirname(__file__))
+
+import unittest
+import tempfile
+import asyncio
+import threading
+import time
+import json
+import io
+import contextlib
+from sistema_embeddings_horarios import SistemaEmbeddingsHorarios
+from servidor_horarios import ServidorHorarios
+from cliente_horarios import ClienteHorarios, ErrorServidor
+from consultar_horarios_rag import ConsultorHorarios
+from fixtures_horarios import MATERIAS, CodificadorDeterministico
+
+
+class TestServidorHorarios(unittest.TestCase):
+    """Casos de prueba del servidor y su cliente"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directorio = os.path.join(self.tmp.name, 'sistema')
+        archivo_materias = os.path.join(self.tmp.name, 'materias.json')
+        with open(archivo_materias, 'w', encoding='utf-8') as f:
+            json.dump({'materias': MATERIAS}, f)
+
+        sistema = SistemaEmbeddingsHorarios(directorio_cache=os.path.join(self.tmp.name, 'cache'))
+        sistema.modelo = CodificadorDeterministico()
+        sistema.procesar_materias_unificadas(archivo_materias)
+        sistema.guardar_sistema_horarios(self.directorio)
+
+        self.socket = os.path.join(self.tmp.name, 'rag.sock')
+        self.servidor = ServidorHorarios(self.directorio, self.socket)
+        self.servidor.sistema.modelo = CodificadorDeterministico()
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertTrue(self.servidor.cargar())
+
+        self.hilo = threading.Thread(target=asyncio.run, args=(self.servidor.servir(),), daemon=True)
+        self.hilo.start()
+        self.cliente = ClienteHorarios(self.socket, timeout=5)
+        for _ in range(100):
+            if self.cliente.disponible():
+                break
+            time.sleep(0.02)
+
+    def tearDown(self):
+        if self.hilo.is_alive():
+            self.cliente.solicitar({'op': 'detener'})
+            self.hilo.join(timeout=5)
+        self.tmp.cleanup()
+
+    def test_01_busqueda_igual_a_la_local(self):
+        """El servidor devuelve los mismos resultados que la búsqueda en proceso"""
+        remotos = self.cliente.buscar('Álgebra martes', k=3, directorio_sistema=self.directorio)
+        locales = self.servidor.buscar('Álgebra martes', k=3)
+        self.assertEqual([r['nombre'] for r in remotos], [r['nombre'] for r in locales])
+        self.assertEqual(self.cliente.estado()['consultas_atendidas'], 1)
+
+    def test_02_errores(self):
+        """Otro sistema u operación desconocida devuelven error sin cortar el servidor"""
+        with self.assertRaises(ErrorServidor):
+            self.cliente.buscar('algebra', directorio_sistema=self.tmp.name)
+        with self.assertRaises(ErrorServidor):
+            self.cliente.solicitar({'op': 'reiniciar'})
+        self.assertTrue(self.cliente.disponible())
+
+    def test_03_cli_usa_el_servidor(self):
+        """El CLI responde desde el servidor sin cargar el sistema en su proceso"""
+        consultor = ConsultorHorarios(self.directorio, ruta_socket=self.socket)
+        salida = io.StringIO()
+        with contextlib.redirect_stdout(salida):
+            consultor.ejecutar_consulta_individual('Estadística', k=2)
+        self.assertFalse(consultor.sistema_cargado)
+        self.assertIn('Encontrados', salida.getvalue())
+
+    def test_04_detener_elimina_el_socket(self):
+        """Al detenerse el servidor quita su socket"""
+        self.cliente.solicitar({'op': 'detener'})
+        self.hilo.join(timeout=5)
+        self.assertFalse(os.path.exists(self.socket))
+        self.assertFalse(self.cliente.disponible())
+
+    def test_05_consultas_concurrentes_en_lote(self):
+        """Clientes concurrentes reciben lo mismo que en serie, agrupados en menos lotes"""
+        consultas = ['Álgebra martes', 'Estadística', 'programación', 'física'] * 4
+        esperados = [[r['nombre'] for r in self.servidor.buscar(c, k=3)] for c in consultas]
+        obtenidos = [None] * len(consultas)
+
+        def consultar(posicion):
+            resultados = ClienteHorarios(self.socket, timeout=5).buscar(consultas[posicion], k=3)
+            obtenidos[posicion] = [r['nombre'] for r in resultados]
+
+        hilos = [threading.Thread(target=consultar, args=(i,)) for i in range(len(consultas))]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join(timeout=5)
+
+        self.assertEqual(obtenidos, esperados)
+        lotes = self.cliente.estado()['lotes']
+        self.assertEqual(lotes['solicitudes'], len(consultas))
+        self.assertLessEqual(lotes['lotes'], len(consultas))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
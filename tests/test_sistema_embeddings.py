@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Tests del Sistema de Embeddings General
+Búsqueda con índices aproximados que no completan los k vecinos
+
+Autor: Sistema RAG MVP
+Fecha: 2025-08-09
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append(os.path.dirname(__file__))
+
+import unittest
+import tempfile
+import json
+from unittest.mock import patch
+from sistema_embeddings import SistemaEmbeddings
+from fixtures_horarios import CodificadorDeterministico
+
+
+class TestSistemaEmbeddings(unittest.TestCase):
+    """Casos de prueba del sistema de embeddings con codificador de prueba"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.archivo = os.path.join(self.tmp.name, 'documentos.json')
+        documentos = [
+            {'metadatos': {'materia_nombre': f'Materia {i}'}, 'contenido': f'tema{i % 37} unidad{i % 11} clase{i}'}
+            for i in range(320)
+        ]
+        with open(self.archivo, 'w', encoding='utf-8') as f:
+            json.dump(documentos, f)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def crear_sistema(self, **opciones):
+        with patch('sistema_embeddings.crear_codificador', return_value=CodificadorDeterministico()):
+            return SistemaEmbeddings(**opciones)
+
+    def test_01_ivf_con_nprobe_bajo_no_devuelve_huecos(self):
+        """Con IVF y nprobe=1 faltan vecinos: los -1 no se convierten en el último documento"""
+        sistema = self.crear_sistema(tipo_indice='ivf-flat', parametros_indice={'nlist': 8, 'nprobe': 1})
+        sistema.procesar_documentos(self.archivo)
+
+        resultados = sistema.buscar_similares('tema3 unidad4', k=100)
+        self.assertLess(len(resultados), 100)
+        contenidos = [doc['contenido'] for doc, _ in resultados]
+        self.assertEqual(len(contenidos), len(set(contenidos)))
+        self.assertTrue(all(score > -1.0 for _, score in resultados))
+
+    def test_02_flat_completa_k(self):
+        """El índice exacto siempre devuelve k resultados"""
+        sistema = self.crear_sistema()
+        sistema.procesar_documentos(self.archivo)
+        self.assertEqual(len(sistema.buscar_similares('tema3 unidad4', k=100)), 100)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
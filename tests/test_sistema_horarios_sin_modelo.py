@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+Tests del Sistema RAG de Horarios sin Modelo de Embeddings
+Carga perezosa del modelo, índices estructurados y actualizaciones incrementales
+
+Se usa un codificador determinístico en lugar de sentence transformers para
+que los tests no dependan de descargar el modelo.
+
+Autor: Sistema RAG MVP
+Fecha: 2025-08-07
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append(os.path.dirname(__file__))
+
+import unittest
+import tempfile
+import json
+import copy
+import faiss
+import numpy as np
+from sistema_embeddings_horarios import SistemaEmbeddingsHorarios
+from config_paths import RAG_SISTEMA_DIR
+from fixtures_horarios import MATERIAS, CodificadorDeterministico
+
+
+class TestSistemaHorariosSinModelo(unittest.TestCase):
+    """Casos de prueba del sistema de horarios con codificador de prueba"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directorio = self.tmp.name
+        archivo_materias = os.path.join(self.directorio, 'materias.json')
+        with open(archivo_materias, 'w', encoding='utf-8') as f:
+            json.dump({'materias': MATERIAS}, f)
+
+        self.codificador = CodificadorDeterministico()
+        self.sistema = self.crear_sistema()
+        self.sistema.procesar_materias_unificadas(archivo_materias)
+        self.sistema.guardar_sistema_horarios(os.path.join(self.directorio, 'sistema'))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def crear_sistema(self):
+        sistema = SistemaEmbeddingsHorarios(directorio_cache=os.path.join(self.directorio, 'cache'))
+        sistema.modelo = self.codificador
+        return sistema
+
+    def cargar(self):
+        sistema = self.crear_sistema()
+        return sistema.cargar_sistema_horarios(os.path.join(self.directorio, 'sistema'))
+
+    def test_01_carga_sin_modelo(self):
+        """Cargar el sistema y consultar por horario no carga el modelo"""
+        sistema = SistemaEmbeddingsHorarios(directorio_cache=os.path.join(self.directorio, 'cache'))
+        sistema.cargar_sistema_horarios(str(RAG_SISTEMA_DIR))
+        resultados = sistema.buscar_por_horario_especifico('martes', '14:00', '16:00')
+
+        self.assertGreater(len(resultados), 0)
+        self.assertFalse(sistema.modelo_cargado)
+        self.assertEqual(sistema.dimension, sistema.index.d)
+
+    def test_02_consulta_por_horario_superpuesto(self):
+        """Martes 15:00-16:00 se superpone con Álgebra I y Estadística"""
+        resultados = self.cargar().buscar_por_horario_especifico('martes', '15:00', '16:00')
+        ids = sorted(r['documento']['id'] for r in resultados)
+        self.assertEqual(ids, ['dm_algebra1', 'ic_estadistica'])
+
+    def test_03_busqueda_filtrada_devuelve_k(self):
+        """Con filtro de departamento se devuelven exactamente k documentos del departamento"""
+        resultados = self.cargar().buscar_similares_horarios('algebra', k=2, filtros={'departamento': 'DM'})
+        self.assertEqual(len(resultados), 2)
+        self.assertTrue(all(doc['metadatos']['departamento_codigo'] == 'DM' for doc, _ in resultados))
+
+    def test_04_batch_equivale_a_consultas_individuales(self):
+        """La búsqueda en lote devuelve lo mismo que las búsquedas individuales"""
+        sistema = self.cargar()
+        consultas = ['algebra', 'estadistica martes', 'analisis noche']
+        individuales = [[doc['faiss_id'] for doc, _ in sistema.buscar_similares_horarios(c, k=3)] for c in consultas]
+        en_lote = [[doc['faiss_id'] for doc, _ in r] for r in sistema.buscar_similares_horarios_batch(consultas, k=3)]
+        self.assertEqual(individuales, en_lote)
+
+    def test_05_cache_de_embeddings_en_reconstruccion(self):
+        """Reconstruir con los mismos textos no vuelve a codificar documentos"""
+        codificados = self.codificador.textos_codificados
+        self.sistema.crear_embeddings(self.sistema.documentos)
+        self.assertEqual(self.codificador.textos_codificados, codificados)
+        self.assertTrue(os.listdir(os.path.join(self.directorio, 'cache')))
+
+    def test_06_actualizacion_incremental_persistida(self):
+        """Upsert y borrado se persisten con el journal y sobreviven a la recarga"""
+        sistema = self.cargar()
+        algo1 = copy.deepcopy(MATERIAS[0])
+        algo1['horarios'] = [{'dia': 'sábado', 'hora_inicio': '10:00', 'hora_fin': '12:00',
+                              'tipo_actividad': 'teorica', 'comision': '', 'aula': ''}]
+        resultado = sistema.actualizar_materias([algo1])
+        self.assertEqual(resultado, {'agregados': 1, 'reemplazados': 2})
+        self.assertEqual(sistema.eliminar_materias(['dm_analisis2']), 1)
+        sistema.guardar_cambios_horarios(os.path.join(self.directorio, 'sistema'))
+
+        recargado = self.cargar()
+        self.assertEqual(len(recargado.documentos), 4)
+        self.assertEqual(recargado.index.ntotal, 4)
+        self.assertEqual([r['documento']['id'] for r in recargado.buscar_por_horario_especifico('sábado')], ['dc_algo1'])
+        self.assertEqual(recargado.buscar_por_horario_especifico('viernes'), [])
+
+        resultados = recargado.buscar_similares_horarios('Algoritmos y Estructuras de Datos', k=4)
+        self.assertNotIn('dm_analisis2', [doc['id'] for doc, _ in resultados])
+
+    def test_07_backend_en_cache_y_metadatos(self):
+        """El backend forma parte de la clave del cache y queda en los metadatos"""
+        sistema = SistemaEmbeddingsHorarios(directorio_cache=os.path.join(self.directorio, 'cache'), backend='onnx-int8')
+        self.assertTrue(sistema.codificador_id.endswith('@onnx-int8'))
+
+        with open(os.path.join(self.directorio, 'sistema', 'metadatos_horarios.json'), encoding='utf-8') as f:
+            self.assertEqual(json.load(f)['backend'], 'torch')
+
+        # Cargar un índice de torch con otro backend se advierte
+        with self.assertLogs('sistema_embeddings_horarios', level='WARNING') as registro:
+            sistema.cargar_sistema_horarios(os.path.join(self.directorio, 'sistema'))
+        self.assertTrue(any('backend torch' in linea for linea in registro.output))
+
+        with self.assertRaises(ValueError):
+            SistemaEmbeddingsHorarios(backend='tensorflow').modelo
+
+    def test_08_modo_lexico_sin_modelo(self):
+        """El modo léxico encuentra la materia por nombre exacto sin cargar el modelo"""
+        sistema = SistemaEmbeddingsHorarios(directorio_cache=os.path.join(self.directorio, 'cache'))
+        sistema.cargar_sistema_horarios(os.path.join(self.directorio, 'sistema'))
+        resultados = sistema.buscar_similares_horarios('¿Cuándo se dicta Estadística?', k=3, modo='lexico')
+
+        self.assertEqual(resultados[0][0]['id'], 'ic_estadistica')
+        self.assertFalse(sistema.modelo_cargado)
+
+    def test_09_modo_hibrido_respeta_k_y_filtros(self):
+        """La fusión híbrida devuelve k documentos que cumplen los filtros"""
+        sistema = self.cargar()
+        resultados = sistema.buscar_similares_horarios('algebra', k=2, filtros={'departamento': 'DM'}, modo='hibrido')
+
+        self.assertEqual(len(resultados), 2)
+        self.assertEqual(resultados[0][0]['id'], 'dm_algebra1')
+        self.assertTrue(all(doc['metadatos']['departamento_codigo'] == 'DM' for doc, _ in resultados))
+
+        sistema.eliminar_materias(['dm_algebra1'])
+        resultados = sistema.buscar_similares_horarios('algebra', k=2, modo='lexico')
+        self.assertNotIn('dm_algebra1', [doc['id'] for doc, _ in resultados])
+
+    def test_10_indice_hnsw_persistido(self):
+        """El tipo de índice se guarda en los metadatos y soporta borrado incremental"""
+        directorio = os.path.join(self.directorio, 'sistema_hnsw')
+        sistema = SistemaEmbeddingsHorarios(directorio_cache=os.path.join(self.directorio, 'cache'), tipo_indice='hnsw')
+        sistema.modelo = self.codificador
+        sistema.procesar_materias_unificadas(os.path.join(self.directorio, 'materias.json'))
+        sistema.guardar_sistema_horarios(directorio)
+
+        recargado = SistemaEmbeddingsHorarios(directorio_cache=os.path.join(self.directorio, 'cache'),
+                                              parametros_indice={'efSearch': 16})
+        recargado.modelo = self.codificador
+        recargado.cargar_sistema_horarios(directorio)
+        self.assertEqual(recargado.tipo_indice, 'hnsw')
+        self.assertEqual(recargado.configuracion_indice['parametros']['M'], 32)
+        self.assertEqual(faiss.downcast_index(recargado.index.index).hnsw.efSearch, 16)
+
+        recargado.eliminar_materias(['dm_algebra1'])
+        resultados = recargado.buscar_similares_horarios('algebra', k=3, filtros={'departamento': 'DM'})
+        self.assertEqual([doc['id'] for doc, _ in resultados], ['dm_analisis2'])
+
+    def test_11_guardado_con_compresion(self):
+        """Guardar en sq8 reduce el índice y la carga lo detecta sin configuración"""
+        directorio = os.path.join(self.directorio, 'sistema_sq8')
+        self.sistema.guardar_sistema_horarios(directorio, compresion='sq8')
+        reporte = self.sistema.configuracion_indice['reporte_compresion']
+        self.assertLess(reporte['bytes_despues'], reporte['bytes_antes'])
+
+        recargado = self.crear_sistema().cargar_sistema_horarios(directorio)
+        self.assertEqual(recargado.configuracion_indice['compresion'], 'sq8')
+        self.assertIsInstance(faiss.downcast_index(recargado.index.index), faiss.IndexScalarQuantizer)
+        resultados = recargado.buscar_similares_horarios('Estadística', k=1, filtros={'departamento': 'IC'})
+        self.assertEqual(resultados[0][0]['id'], 'ic_estadistica')
+
+
+    def test_12_consulta_estructurada_sin_modelo(self):
+        """Día y franja se responden completos desde los índices, sin cargar el modelo"""
+        sistema = self.cargar()
+        sistema.modelo = None
+        resultados, intencion = sistema.buscar_con_intencion('¿Qué materias hay los martes por la tarde?', k=None)
+        self.assertEqual(intencion['texto_libre'], '')
+        self.assertEqual(sorted(doc['id'] for doc, _ in resultados), ['dc_algo1', 'dm_algebra1', 'ic_estadistica'])
+        self.assertFalse(sistema.modelo_cargado)
+
+        resultados, _ = sistema.buscar_con_intencion('materias del DC que empiezan a las 9', k=None)
+        self.assertEqual([doc['id'] for doc, _ in resultados], ['dc_algo1'])
+
+    def test_13_nombre_y_texto_libre(self):
+        """Un nombre de materia se resuelve exacto; el texto libre se busca solo entre los candidatos"""
+        sistema = self.cargar()
+        resultados, intencion = sistema.buscar_con_intencion('Algoritmos y Estructuras de Datos I los martes')
+        self.assertEqual(intencion['nombres'], ['algoritmos y estructuras de datos i'])
+        self.assertEqual([doc['metadatos']['horas_inicio'] for doc, _ in resultados], [['17:00']])
+
+        resultados, intencion = sistema.buscar_con_intencion('laboratorio de probabilidad los martes', k=3)
+        self.assertEqual(intencion['texto_libre'], 'probabilidad')
+        self.assertEqual([doc['id'] for doc, _ in resultados], ['ic_estadistica'])
+
+    def test_14_intencion_en_lote(self):
+        """El lote con consultas estructuradas y libres equivale a las consultas individuales"""
+        sistema = self.cargar()
+        consultas = ['algebra', 'viernes de noche', 'Estadística', 'analisis']
+        individuales = [[doc['faiss_id'] for doc, _ in sistema.buscar_con_intencion(c, k=3)[0]] for c in consultas]
+        en_lote = [[doc['faiss_id'] for doc, _ in r] for r, _ in sistema.buscar_con_intencion_batch(consultas, k=3)]
+        self.assertEqual(individuales, en_lote)
+
+    def test_15_conflictos_por_nombre_e_id(self):
+        """Conflictos en minutos por nombre, prefijo o id de materia; las comisiones de un id son alternativas"""
+        reporte = self.cargar().detectar_conflictos(['Álgebra I', 'estadís', 'dc_algo1', 'xyz'])
+        self.assertEqual(reporte['no_encontradas'], ['xyz'])
+
+        pares = {(p['materia_a'], p['materia_b']): p for p in reporte['pares']}
+        self.assertTrue(pares[('dc_algo1', 'Álgebra I')]['compatible'])
+        self.assertEqual(pares[('dc_algo1', 'estadís')]['combinaciones_compatibles'], 1)
+        self.assertFalse(pares[('estadís', 'Álgebra I')]['compatible'])
+        self.assertEqual(pares[('estadís', 'Álgebra I')]['minutos_superpuestos'], 60)
+        self.assertFalse(reporte['compatible'])
+
+        rangos = sorted((c['dia'], c['desde'], c['hasta']) for c in reporte['conflictos'])
+        self.assertEqual(rangos, [('martes', '15:00', '16:00'), ('martes', '17:00', '18:00')])
+
+    def test_16_matriz_de_conflictos_persistida(self):
+        """La matriz se guarda con el índice, se abre con memory-map y se recalcula si cambian los documentos"""
+        sistema = self.cargar()
+        self.assertIsInstance(sistema.matriz_conflictos.bits, np.memmap)
+        self.assertEqual([c['id'] for c in sistema.conflictos_materia('Álgebra I')], ['ic_estadistica'])
+        self.assertEqual(sistema.comisiones_en_conflicto('Álgebra I', 'Análisis II'), [])
+
+        algebra = copy.deepcopy(MATERIAS[2])
+        algebra['horarios'][0]['dia'] = 'viernes'
+        algebra['horarios'][0]['hora_inicio'] = '20:00'
+        algebra['horarios'][0]['hora_fin'] = '21:00'
+        sistema.actualizar_materias([algebra])
+        self.assertEqual([c['id'] for c in sistema.conflictos_materia('Álgebra I')], ['dm_analisis2'])
+        sistema.guardar_cambios_horarios(os.path.join(self.directorio, 'sistema'))
+
+        recargado = self.cargar()
+        self.assertNotIsInstance(recargado.matriz_conflictos.bits, np.memmap)
+        self.assertEqual(len(recargado.comisiones_en_conflicto('Álgebra I', 'Análisis II')), 1)
+
+    def test_17_materias_en_ventanas_libres(self):
+        """Solo entran las materias con alguna opción completa dentro de las ventanas"""
+        sistema = self.cargar()
+        resultados = sistema.buscar_en_ventanas('martes 14-18 y jueves 14-17')
+        self.assertEqual([r['documento']['id'] for r in resultados], ['ic_estadistica', 'dm_algebra1'])
+        self.assertEqual([(h['dia'], h['desde'], h['hasta']) for h in resultados[1]['opciones'][0]['horarios']],
+                         [('martes', '14:00', '16:00'), ('jueves', '14:00', '17:00')])
+
+        self.assertEqual([r['documento']['id'] for r in sistema.buscar_en_ventanas([('martes', 840, 1080)])],
+                         ['ic_estadistica'])
+        self.assertEqual([r['documento']['faiss_id'] for r in sistema.buscar_en_ventanas('martes desde las 17')], [1])
+
+        ordenados = sistema.buscar_en_ventanas('martes y jueves', interes='álgebra', modo='lexico')
+        self.assertEqual(ordenados[0]['documento']['id'], 'dm_algebra1')
+
+    def test_18_ocupacion_sigue_las_actualizaciones(self):
+        """La ocupación semanal se agrega al cargar y se actualiza con los upserts"""
+        sistema = self.cargar()
+        self.assertEqual(sistema.ocupacion.materias_por_dia()['martes'], 3)
+        self.assertEqual(sistema.ocupacion.horas_pico(1)[0],
+                         {'dia': 'martes', 'desde': '15:00', 'hasta': '16:00', 'clases': 2})
+
+        estadistica = copy.deepcopy(MATERIAS[4])
+        estadistica['horarios'][0]['dia'] = 'sábado'
+        sistema.actualizar_materias([estadistica])
+        self.assertEqual(sistema.ocupacion.materias_por_dia()['martes'], 2)
+        self.assertEqual(sistema.ocupacion.materias_por_dia()['sábado'], 1)
+        self.assertEqual(sistema.ocupacion.resumen_departamentos()['IC']['horas_semanales'], 3.0)
+
+        sistema.eliminar_materias(['ic_estadistica'])
+        self.assertNotIn('IC', sistema.ocupacion.resumen_departamentos())
+
+    def test_19_actualizaciones_en_cada_tipo_de_indice(self):
+        """Tras upsert y borrado cada documento restante se encuentra a sí mismo, con cualquier índice"""
+        algo1 = copy.deepcopy(MATERIAS[0])
+        algo1['horarios'][0]['dia'] = 'sábado'
+        for tipo in ('flat', 'hnsw', 'ivf-flat', 'ivf-pq'):
+            with self.subTest(tipo=tipo):
+                sistema = SistemaEmbeddingsHorarios(directorio_cache=os.path.join(self.directorio, 'cache'),
+                                                    tipo_indice=tipo)
+                sistema.modelo = self.codificador
+                sistema.procesar_materias_unificadas(os.path.join(self.directorio, 'materias.json'))
+                sistema.eliminar_materias(['dm_algebra1'])
+                sistema.actualizar_materias([algo1])
+
+                self.assertEqual(sistema.index.ntotal, len(sistema.documentos))
+                vectores = sistema.crear_embeddings(sistema.documentos)
+                _, ids = sistema.index.search(vectores, 1)
+                self.assertEqual(ids[:, 0].tolist(), [doc['faiss_id'] for doc in sistema.documentos])
+
+    def test_20_sin_candidatos_vuelve_a_la_busqueda_semantica(self):
+        """Sin candidatos con horario se busca en todo; un prefijo con candidatos se busca solo entre ellos"""
+        sistema = self.cargar()
+        # "Sistemas" es prefijo de Sistemas Digitales, que no tiene horarios
+        resultados, intencion = sistema.buscar_con_intencion('Sistemas horarios', k=3)
+        self.assertEqual(intencion['coincidencia_nombre'], 'prefijo')
+        semanticos = sistema.buscar_similares_horarios('Sistemas horarios', k=3)
+        self.assertEqual([doc['faiss_id'] for doc, _ in resultados], [doc['faiss_id'] for doc, _ in semanticos])
+        self.assertEqual(len(resultados), 3)
+
+        # Con k=None se piden solo respuestas exactas
+        self.assertEqual(sistema.buscar_con_intencion('Sistemas horarios', k=None)[0], [])
+
+        # Un prefijo con candidatos ordena por similitud solo esas materias
+        consulta = 'Algoritmos y Estruc horarios'
+        resultados, intencion = sistema.buscar_con_intencion(consulta, k=3)
+        self.assertEqual(intencion['coincidencia_nombre'], 'prefijo')
+        esperados = sistema.buscar_similares_horarios(consulta, k=3, candidatos=intencion['materias'])
+        self.assertEqual([doc['faiss_id'] for doc, _ in resultados], [doc['faiss_id'] for doc, _ in esperados])
+        self.assertEqual(sorted(doc['faiss_id'] for doc, _ in resultados), [0, 1])
+
+    def test_21_batch_equivale_con_scores_y_filtros(self):
+        """En lote se obtienen los mismos documentos y scores con filtros, sin filtro de horarios y consultas repetidas"""
+        sistema = self.cargar()
+        consultas = ['algebra martes', 'sistemas digitales', 'algebra martes', 'clases de noche']
+        for opciones in ({'filtros': {'departamento': 'DM'}}, {'filtro_horarios': False}, {'k': 10}):
+            with self.subTest(**opciones):
+                opciones = {'k': 3, **opciones}
+                en_lote = sistema.buscar_similares_horarios_batch(consultas, **opciones)
+                self.assertEqual(len(en_lote), len(consultas))
+                for consulta, resultados in zip(consultas, en_lote):
+                    individuales = sistema.buscar_similares_horarios(consulta, **opciones)
+                    self.assertEqual([doc['faiss_id'] for doc, _ in resultados],
+                                     [doc['faiss_id'] for doc, _ in individuales])
+                    np.testing.assert_allclose([score for _, score in resultados],
+                                               [score for _, score in individuales], rtol=1e-5)
+        self.assertEqual(sistema.buscar_similares_horarios_batch([]), [])
+
+    def test_22_ids_estables_en_upsert_y_borrado(self):
+        """Los IDs FAISS no se reutilizan ni se corren; upsert reemplaza y borrar quita del índice"""
+        sistema = self.cargar()
+        antes = {doc['faiss_id']: doc['id'] for doc in sistema.documentos}
+        ids_algo1 = {faiss_id for faiss_id, id_materia in antes.items() if id_materia == 'dc_algo1'}
+
+        algo1 = copy.deepcopy(MATERIAS[0])
+        algo1['horarios'][0]['hora_inicio'] = '08:00'
+        sistema.actualizar_materias([algo1])
+        sistema.eliminar_materias(['ic_estadistica'])
+
+        ids_indice = set(faiss.vector_to_array(sistema.index.id_map).tolist())
+        despues = {doc['faiss_id']: doc['id'] for doc in sistema.documentos}
+        self.assertEqual(ids_indice, set(despues))
+
+        # Los documentos que no cambiaron conservan su ID
+        for faiss_id, id_materia in antes.items():
+            if id_materia not in ('dc_algo1', 'ic_estadistica'):
+                self.assertEqual(despues[faiss_id], id_materia)
+
+        # Upsert: las comisiones viejas se reemplazan por una nueva con ID sin usar
+        nuevos = [faiss_id for faiss_id, id_materia in despues.items() if id_materia == 'dc_algo1']
+        self.assertEqual(len(nuevos), 1)
+        self.assertGreater(nuevos[0], max(antes))
+        self.assertFalse(ids_algo1 & ids_indice)
+        self.assertEqual(sistema.documentos_por_faiss_id[nuevos[0]]['metadatos']['horas_inicio'][0], '08:00')
+
+        # Borrado: la materia no aparece ni buscando todo el índice
+        self.assertNotIn('ic_estadistica', despues.values())
+        resultados = sistema.buscar_similares_horarios('Estadística laboratorio', k=10, filtro_horarios=False)
+        self.assertNotIn('ic_estadistica', [doc['id'] for doc, _ in resultados])
+        self.assertEqual(len(resultados), len(despues))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Tests de Snapshots Versionados del Sistema RAG de Horarios
+Publicación atómica, manifiesto con checksums, limpieza y recarga en caliente
+
+Autor: Sistema RAG MVP
+Fecha: 2025-08-11
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append(os.path.dirname(__file__))
+
+import unittest
+import tempfile
+import asyncio
+import copy
+import json
+import time
+from sistema_embeddings_horarios import SistemaEmbeddingsHorarios
+from servidor_horarios import ServidorHorarios
+from snapshots_horarios import (TEMPORAL_ABANDONADO_SEGUNDOS, activar_version, checksum_archivo, leer_manifiesto,
+                                limpiar_versiones, listar_versiones, resolver_directorio, verificar_snapshot,
+                                version_actual)
+from fixtures_horarios import MATERIAS, CodificadorDeterministico, crear_materia
+
+
+class TestSnapshotsHorarios(unittest.TestCase):
+    """Casos de prueba de los snapshots versionados"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directorio = os.path.join(self.tmp.name, 'sistema')
+        archivo_materias = os.path.join(self.tmp.name, 'materias.json')
+        with open(archivo_materias, 'w', encoding='utf-8') as f:
+            json.dump({'materias': MATERIAS}, f)
+
+        self.sistema = SistemaEmbeddingsHorarios(directorio_cache=os.path.join(self.tmp.name, 'cache'))
+        self.sistema.modelo = CodificadorDeterministico()
+        self.sistema.procesar_materias_unificadas(archivo_materias)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def cargar(self, directorio=None):
+        sistema = SistemaEmbeddingsHorarios(directorio_cache=os.path.join(self.tmp.name, 'cache'))
+        sistema.modelo = CodificadorDeterministico()
+        return sistema.cargar_sistema_horarios(directorio or self.directorio)
+
+    def test_01_publicar_y_cargar(self):
+        """La versión publicada queda activa, con manifiesto, y se carga desde el directorio raíz"""
+        version = self.sistema.publicar_snapshot_horarios(self.directorio)
+        self.assertEqual(version_actual(self.directorio), version)
+
+        manifiesto = verificar_snapshot(resolver_directorio(self.directorio))
+        self.assertEqual(manifiesto['total_documentos'], len(MATERIAS))
+        self.assertEqual(manifiesto['dimension'], CodificadorDeterministico.dimension)
+        self.assertIn('indice_horarios.faiss', manifiesto['archivos'])
+
+        cargado = self.cargar()
+        self.assertEqual(cargado.version_snapshot, version)
+        self.assertEqual(len(cargado.documentos), len(MATERIAS))
+
+    def test_02_checksum_detecta_archivos_alterados(self):
+        """Un archivo modificado después de publicar invalida la versión"""
+        self.sistema.publicar_snapshot_horarios(self.directorio)
+        ruta = resolver_directorio(self.directorio)
+        with open(os.path.join(ruta, 'metadatos_horarios.json'), 'a', encoding='utf-8') as f:
+            f.write(' ')
+        with self.assertRaises(ValueError):
+            verificar_snapshot(ruta)
+
+    def test_03_limpieza_y_vuelta_atras(self):
+        """Se conservan las últimas versiones y se puede volver a una anterior"""
+        versiones = [self.sistema.publicar_snapshot_horarios(self.directorio, conservar=2) for _ in range(3)]
+        self.assertEqual(listar_versiones(self.directorio), versiones[1:])
+
+        activar_version(self.directorio, versiones[1])
+        self.assertEqual(self.cargar().version_snapshot, versiones[1])
+        with self.assertRaises(ValueError):
+            activar_version(self.directorio, versiones[0])
+
+    def test_04_versiones_inmutables(self):
+        """Los cambios incrementales sobre un directorio versionado se publican como versión nueva"""
+        anterior = self.sistema.publicar_snapshot_horarios(self.directorio)
+        self.sistema.eliminar_materias(['dc_sin_horario'])
+        self.sistema.guardar_cambios_horarios(self.directorio)
+
+        nueva = version_actual(self.directorio)
+        self.assertNotEqual(nueva, anterior)
+        self.assertEqual(listar_versiones(self.directorio), [anterior, nueva])
+        self.assertEqual(verificar_snapshot(resolver_directorio(self.directorio))['total_documentos'], len(MATERIAS) - 1)
+        self.assertFalse(os.path.exists(os.path.join(resolver_directorio(self.directorio), 'cambios_documentos.jsonl')))
+
+        self.assertEqual(len(self.cargar().documentos), len(MATERIAS) - 1)
+        activar_version(self.directorio, anterior)
+        self.assertEqual(len(self.cargar().documentos), len(MATERIAS))
+
+    def test_05_recarga_en_caliente_reutiliza_el_modelo(self):
+        """El servidor activa la versión nueva sin volver a cargar el modelo"""
+        self.sistema.publicar_snapshot_horarios(self.directorio)
+        servidor = ServidorHorarios(self.directorio, os.path.join(self.tmp.name, 'rag.sock'))
+        modelo = CodificadorDeterministico()
+        servidor.sistema.modelo = modelo
+        self.assertTrue(servidor.cargar())
+        self.assertEqual(servidor.recargas, 0)
+
+        nueva = copy.deepcopy(MATERIAS) + [crear_materia('dc_tleng', 'Teoría de Lenguajes', 'DC',
+                                                          [('lunes', '17:00', '20:00', 'teorica')])]
+        self.sistema.actualizar_materias(nueva)
+        version = self.sistema.publicar_snapshot_horarios(self.directorio)
+
+        async def recargar():
+            servidor._recargando = asyncio.Lock()
+            primera = await servidor.recargar()
+            segunda = await servidor.recargar()
+            return primera, segunda
+
+        primera, segunda = asyncio.run(recargar())
+        self.assertEqual(primera, {'recargado': True, 'version': version})
+        self.assertFalse(segunda['recargado'])
+        self.assertIs(servidor.sistema.modelo, modelo)
+        self.assertEqual(servidor.buscar('Teoría de Lenguajes', k=1)[0]['nombre'], 'Teoría de Lenguajes')
+        self.assertEqual(servidor.estado()['version'], version)
+
+    def test_06_contenido_del_manifiesto(self):
+        """El manifiesto describe la versión y tiene el checksum y tamaño de cada archivo publicado"""
+        version = self.sistema.publicar_snapshot_horarios(self.directorio)
+        ruta = resolver_directorio(self.directorio)
+        manifiesto = leer_manifiesto(ruta)
+
+        self.assertEqual(os.path.basename(ruta), version)
+        self.assertEqual(manifiesto['version'], version)
+        self.assertEqual((manifiesto['modelo_nombre'], manifiesto['backend']), (self.sistema.modelo_nombre, 'torch'))
+        self.assertEqual(manifiesto['dimension'], CodificadorDeterministico.dimension)
+        self.assertEqual(manifiesto['total_documentos'], len(self.sistema.documentos))
+        self.assertEqual(manifiesto['total_vectores'], self.sistema.index.ntotal)
+        self.assertEqual(manifiesto['indice'], 'flat')
+
+        publicados = sorted(nombre for nombre in os.listdir(ruta) if nombre != 'manifiesto.json')
+        self.assertEqual(sorted(manifiesto['archivos']), publicados)
+        for nombre, archivo in manifiesto['archivos'].items():
+            self.assertEqual(archivo['sha256'], checksum_archivo(os.path.join(ruta, nombre)))
+            self.assertEqual(archivo['bytes'], os.path.getsize(os.path.join(ruta, nombre)))
+
+    def test_07_limpieza_respeta_publicaciones_en_curso(self):
+        """Solo se borran los temporales abandonados, no los de otra publicación en curso"""
+        self.sistema.publicar_snapshot_horarios(self.directorio)
+        versiones = os.path.join(self.directorio, 'versiones')
+        en_curso = os.path.join(versiones, '.20250811T101500000000.tmp')
+        abandonado = os.path.join(versiones, '.20250810T101500000000.tmp')
+        os.makedirs(en_curso)
+        os.makedirs(abandonado)
+        viejo = time.time() - TEMPORAL_ABANDONADO_SEGUNDOS - 60
+        os.utime(abandonado, (viejo, viejo))
+
+        self.assertEqual(limpiar_versiones(self.directorio), ['.20250810T101500000000.tmp'])
+        self.assertTrue(os.path.isdir(en_curso))
+        self.assertFalse(os.path.exists(abandonado))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)